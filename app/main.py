@@ -8,21 +8,34 @@ from app.routers import (
 from app.routers import scheduler_router
 from app.routers import api_error_exclusions
 from app.routers import users_router
+from app.routers import logs
+from app.routers import artifacts
+from app.routers import runs
+from app.routers import metrics
+from app.routers import api_stats
 from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.db_metrics_middleware import DbMetricsMiddleware
+from app.middleware.cache_middleware import DataVersionMiddleware
 from app import scheduler
+from core.metrics import start_loop_monitor
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Start
     scheduler.start()
+    loop_monitor = start_loop_monitor()
     yield
     # Stop
+    if loop_monitor:
+        loop_monitor.cancel()
     scheduler.stop()
 
 
 app = FastAPI(title="WACEK - Strażnik TERGsasu", lifespan=lifespan)
+app.add_middleware(DataVersionMiddleware)
 app.add_middleware(AuthMiddleware)
+app.add_middleware(DbMetricsMiddleware)  # najbardziej zewnętrzny — obejmuje całe żądanie
 
 # Static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -47,6 +60,11 @@ app.include_router(config.router)
 app.include_router(scheduler_router.router)
 app.include_router(api_error_exclusions.router)
 app.include_router(users_router.router)
+app.include_router(logs.router)
+app.include_router(artifacts.router)
+app.include_router(runs.router)
+app.include_router(metrics.router)
+app.include_router(api_stats.router)
 
 
 @app.get("/")
@@ -5,7 +5,7 @@ from starlette.responses import Response, RedirectResponse
 from core.auth_core import get_session, SESSION_COOKIE
 
 EXEMPT_PATHS = {"/auth/login", "/auth/logout", "/auth/setup"}
-STATIC_PREFIXES = ("/static/", "/screenshots/")
+STATIC_PREFIXES = ("/static/", "/screenshots/", "/artifacts/")
 
 
 class AuthMiddleware(BaseHTTPMiddleware):
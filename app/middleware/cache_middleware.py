@@ -0,0 +1,22 @@
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from core import response_cache
+
+# Metody które nie zmieniają danych — nie unieważniają cache
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class DataVersionMiddleware(BaseHTTPMiddleware):
+    """
+    Podbija wersję danych po każdym udanym żądaniu modyfikującym
+    (zmiana statusu alertu, edycja konfiguracji, usunięcie runu...).
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response_cache.bump(f"{request.method} {request.url.path}")
+
+        return response
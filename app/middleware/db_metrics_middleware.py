@@ -0,0 +1,30 @@
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.routing import Route
+
+from core import db_metrics, metrics
+
+
+class DbMetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Liczy zapytania SQL i czas bazy żądania (core/db_metrics.py).
+    Wynik w nagłówku Server-Timing (DevTools → Network → Timing), w agregatach /metrics/db
+    i w histogramie shop_monitor_http_request_duration_seconds (tylko dopasowane trasy — etykieta to szablon).
+    Zapytania wykonywane po zwróceniu odpowiedzi (StreamingResponse) nie są liczone.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        with db_metrics.track(f"{request.method} {request.url.path}") as stats:
+            response = await call_next(request)
+
+        elapsed = time.perf_counter() - start
+        response.headers["Server-Timing"] = db_metrics.server_timing(stats, elapsed)
+
+        route = request.scope.get("route")
+        if isinstance(route, Route):
+            db_metrics.record_request(f"{request.method} {route.path}", stats)
+            metrics.HTTP_REQUEST_DURATION.observe(elapsed, route=route.path, method=request.method)
+        return response
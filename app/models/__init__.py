@@ -7,7 +7,12 @@ from app.models.scenario import Scenario
 from app.models.suite_run import SuiteRun
 from app.models.run import ScenarioRun
 from app.models.basket_snapshot import BasketSnapshot
+from app.models.scenario_run_data import ScenarioRunData
+from app.models.price_point import PricePoint
+from app.models.flakiness_score import FlakinessScore
+from app.models.artifact import Artifact
 from app.models.api_error import ApiError
+from app.models.api_endpoint_stat import ApiEndpointStat, ApiEndpointRollup
 from app.models.alert import Alert
 from app.models.alert_type import AlertType
 from app.models.alert_config import AlertConfig
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, now_utc
 from datetime import datetime
@@ -30,9 +30,13 @@ class Alert(Base):
     - czy jest liczony w raporcie (is_counted) — False dla disabled/temp_disabled
     """
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Wyszukiwanie pełnotekstowe na MySQL — SQLite używa alert_fts (core/alert_search.py)
+        Index("ft_alerts_text", "business_rule", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), nullable=False)
+    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), nullable=False, index=True)
     scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"), nullable=False)
     environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from enum import Enum
 from datetime import datetime, timezone
@@ -7,6 +7,7 @@ from typing import Optional, TYPE_CHECKING
 from app.models.base import Base, now_utc
 
 if TYPE_CHECKING:
+    from app.models.environment import Environment
     from app.models.suite_run import SuiteRun
 
 
@@ -57,11 +58,22 @@ class AlertGroup(Base):
     Jeśli alert powtarza się w kolejnych runach, zwiększa się repeat_count.
     """
     __tablename__ = "alert_groups"
+    __table_args__ = (
+        # Paginacja keyset /alerts — ORDER BY last_seen_at DESC, id DESC
+        Index("ix_alert_groups_last_seen_at_id", "last_seen_at", "id"),
+        # Filtry statusu listy alertów, liczniki GROUP BY status, kandydaci deduplikacji w SuiteExecutor
+        Index("ix_alert_groups_status_last_seen_at", "status", "last_seen_at"),
+        # Wyszukiwanie pełnotekstowe na MySQL — SQLite używa alert_fts (core/alert_search.py)
+        Index("ft_alert_groups_text", "business_rule", "title", "resolution_note", "notes", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    # Ostatni suite_run który zaktualizował ten alert
-    last_suite_run_id: Mapped[int] = mapped_column(ForeignKey("suite_runs.id"), nullable=False)
+    # Środowisko grupy — deduplikacja i filtry nie zależą od istnienia last_suite_run
+    environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False, index=True)
+
+    # Ostatni suite_run który zaktualizował ten alert (NULL — run usunięty przez retencję, grupa zamknięta)
+    last_suite_run_id: Mapped[Optional[int]] = mapped_column(ForeignKey("suite_runs.id"), nullable=True, index=True)
 
     # Historia wszystkich suite_run_ids które ten alert wygenerowały
     suite_run_history: Mapped[Optional[str]] = mapped_column(Text, default="[]")
@@ -109,7 +121,7 @@ class AlertGroup(Base):
     assigned_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # Timestamps
-    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc, nullable=False)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc, nullable=False, index=True)
     last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc, nullable=False)
 
     # Stare pole — zostawiamy dla kompatybilności, używaj resolved_at
@@ -124,7 +136,8 @@ class AlertGroup(Base):
     updated_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     # Relacje
-    last_suite_run: Mapped["SuiteRun"] = relationship(back_populates="alert_groups")
+    last_suite_run: Mapped[Optional["SuiteRun"]] = relationship(back_populates="alert_groups")
+    environment: Mapped["Environment"] = relationship()
     duplicate_of: Mapped[Optional["AlertGroup"]] = relationship(
         "AlertGroup", remote_side="AlertGroup.id", foreign_keys=[duplicate_of_id]
     )
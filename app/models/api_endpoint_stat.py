@@ -0,0 +1,77 @@
+from sqlalchemy import String, DateTime, Date, ForeignKey, Index, Integer, BigInteger, Float, JSON
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.models.base import Base, now_utc
+from datetime import date, datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.run import ScenarioRun
+
+
+class ApiEndpointStat(Base):
+    """
+    Agregat żądań XHR/fetch sklepu z jednego runu — jeden wiersz na (metoda, znormalizowana ścieżka).
+    Liczony w przeglądarce przez ShopRunner (core/api_stats.py); usuwany razem z runem.
+
+    histogram — rzadki histogram czasów w koszykach logarytmicznych {"indeks": liczba},
+    z którego rollup suite runu (ApiEndpointRollup) liczy percentyle bez surowych czasów.
+    """
+    __tablename__ = "api_endpoint_stats"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), nullable=False, index=True)
+    environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False)
+
+    method: Mapped[str] = mapped_column(String(10), nullable=False)
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[int] = mapped_column(Integer, default=0)      # odpowiedzi HTTP >= 400
+    failures: Mapped[int] = mapped_column(Integer, default=0)    # bez odpowiedzi (sieć, przerwane)
+    p50_ms: Mapped[float | None] = mapped_column(Float)
+    p95_ms: Mapped[float | None] = mapped_column(Float)
+    max_ms: Mapped[float | None] = mapped_column(Float)
+    total_ms: Mapped[float] = mapped_column(Float, default=0.0)
+    bytes: Mapped[int] = mapped_column(BigInteger, default=0)    # rozmiar odpowiedzi (nagłówki + body)
+    histogram: Mapped[dict | None] = mapped_column(JSON)
+    captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+
+    # Relacje
+    run: Mapped["ScenarioRun"] = relationship(back_populates="api_endpoint_stats")
+
+    def __repr__(self) -> str:
+        return f"<ApiEndpointStat {self.method} {self.path[:50]} n={self.count} p95={self.p95_ms}>"
+
+
+class ApiEndpointRollup(Base):
+    """
+    Rollup statystyk endpointu per środowisko — jeden wiersz na (suite run, metoda, ścieżka).
+
+    Tylko INSERT przy finalizacji suite runu: równoległe suite na tym samym środowisku
+    nie nadpisują sobie liczników, a panel scala wiersze okna (dzień = day).
+    Przeżywa retencję runów; usuwany po RETENTION_SHOP_API_DAYS.
+    """
+    __tablename__ = "api_endpoint_rollups"
+    __table_args__ = (
+        # Panel /api-stats — WHERE environment_id AND day >= …
+        Index("ix_api_endpoint_rollups_env_day", "environment_id", "day"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False)
+    # Bez FK — rollup przeżywa retencję i archiwizację suite runów
+    suite_run_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+
+    method: Mapped[str] = mapped_column(String(10), nullable=False)
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    runs: Mapped[int] = mapped_column(Integer, default=0)        # scenario runy, które wołały endpoint
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[int] = mapped_column(Integer, default=0)
+    failures: Mapped[int] = mapped_column(Integer, default=0)
+    max_ms: Mapped[float | None] = mapped_column(Float)
+    total_ms: Mapped[float] = mapped_column(Float, default=0.0)
+    bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    histogram: Mapped[dict | None] = mapped_column(JSON)
+
+    def __repr__(self) -> str:
+        return f"<ApiEndpointRollup {self.day} {self.method} {self.path[:50]} n={self.count}>"
@@ -16,7 +16,7 @@ class ApiError(Base):
     __tablename__ = "api_errors"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), nullable=False)
+    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), nullable=False, index=True)
 
     endpoint: Mapped[str] = mapped_column(String(1000), nullable=False)
     method: Mapped[str] = mapped_column(String(10), nullable=False)   # GET/POST/PUT/DELETE
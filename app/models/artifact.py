@@ -0,0 +1,29 @@
+from sqlalchemy import String, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base, now_utc
+from datetime import datetime
+
+
+class Artifact(Base):
+    """
+    Plik PNG adresowany treścią (screenshot) w magazynie artifacts/.
+    Klucz to SHA-256 zawartości — identyczne zrzuty z wielu runów to jeden plik.
+
+    ref_count — liczba basket_snapshots (w bazie i w archiwum), które wskazują
+    na artefakt przez raw_data['artifact']. Wiersze z ref_count <= 0 usuwa
+    artifact_store.collect_garbage() razem z plikami.
+    """
+    __tablename__ = "artifacts"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    width: Mapped[int | None] = mapped_column(Integer)
+    height: Mapped[int | None] = mapped_column(Integer)
+    thumb_size: Mapped[int | None] = mapped_column(Integer)  # None = brak miniatury (bez Pillow)
+
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+
+    def __repr__(self) -> str:
+        return f"<Artifact {self.hash[:12]} refs={self.ref_count}>"
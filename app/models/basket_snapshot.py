@@ -19,7 +19,7 @@ class BasketSnapshot(Base):
     __tablename__ = "basket_snapshots"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), nullable=False)
+    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), nullable=False, index=True)
 
     stage: Mapped[str] = mapped_column(String(50), nullable=False)
     product_price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2))
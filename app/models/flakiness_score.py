@@ -0,0 +1,68 @@
+from sqlalchemy import String, DateTime, ForeignKey, Index, Integer, Float, Boolean, JSON
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.models.base import Base, now_utc
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.environment import Environment
+
+
+class FlakinessScore(Base):
+    """
+    Wygaszane wykładniczo liczniki niestabilności — jeden wiersz na
+    (scenariusz, środowisko) albo (business_rule, środowisko).
+
+    Każdy licznik c po obserwacji x: c = c·α + x, α = 0.5^(1/FLAKINESS_HALF_LIFE),
+    więc aktualizacja jest O(1) i nie wymaga historii runów (core/flakiness.py).
+    "Porażka" scenariusza = run inny niż success; "porażka" reguły = reguła wystąpiła.
+    """
+    __tablename__ = "flakiness_scores"
+    __table_args__ = (
+        Index("ix_flakiness_scores_key", "kind", "environment_id", "scenario_id", "business_rule"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)   # scenario / rule
+    environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False)
+    scenario_id: Mapped[int | None] = mapped_column(ForeignKey("scenarios.id"))
+    business_rule: Mapped[str | None] = mapped_column(String(255))
+
+    # Wygaszane liczniki
+    weight: Mapped[float] = mapped_column(Float, default=0.0)        # suma wag obserwacji
+    failures: Mapped[float] = mapped_column(Float, default=0.0)
+    transitions: Mapped[float] = mapped_column(Float, default=0.0)   # zmiany pass ↔ fail
+    retry_saved: Mapped[float] = mapped_column(Float, default=0.0)   # sukces dopiero po retry
+
+    observations: Mapped[int] = mapped_column(Integer, default=0)
+    last_failed: Mapped[bool | None] = mapped_column(Boolean)
+    # Reguły: scenariusze, w których reguła wystąpiła — obserwacja tylko gdy któryś z nich był w suite runie
+    scenario_ids: Mapped[list | None] = mapped_column(JSON)
+    # Bez FK — liczniki przeżywają retencję suite runów
+    last_suite_run_id: Mapped[int | None] = mapped_column(Integer)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc, onupdate=now_utc)
+
+    environment: Mapped["Environment"] = relationship()
+
+    @property
+    def score(self) -> float:
+        """0 = stabilny, 1 = zmienia wynik co run (przejścia i ratunki przez retry)."""
+        if not self.weight:
+            return 0.0
+        return min(1.0, (self.transitions + self.retry_saved) / self.weight)
+
+    @property
+    def fail_rate(self) -> float:
+        return self.failures / self.weight if self.weight else 0.0
+
+    @property
+    def transition_rate(self) -> float:
+        return self.transitions / self.weight if self.weight else 0.0
+
+    @property
+    def retry_rate(self) -> float:
+        return self.retry_saved / self.weight if self.weight else 0.0
+
+    def __repr__(self) -> str:
+        subject = self.business_rule if self.kind == "rule" else f"scenario={self.scenario_id}"
+        return f"<FlakinessScore {self.kind} {subject} env={self.environment_id} score={self.score:.2f}>"
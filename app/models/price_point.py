@@ -0,0 +1,33 @@
+from sqlalchemy import String, DateTime, ForeignKey, Index, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base, now_utc
+from datetime import datetime
+from decimal import Decimal
+
+
+class PricePoint(Base):
+    """
+    Punkt szeregu czasowego cen — jedna cena z jednego etapu jednego runu.
+    Szereg = (environment_id, product_url, stage); analiza w core/price_series.py.
+
+    Szeregi żyją dłużej niż runy: retencja i archiwum zerują run_id,
+    punkty usuwa dopiero RETENTION_PRICE_DAYS.
+    """
+    __tablename__ = "price_points"
+    __table_args__ = (
+        # Okno historii szeregu — WHERE environment_id, product_url, stage ORDER BY captured_at
+        Index("ix_price_points_series", "environment_id", "product_url", "stage", "captured_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    run_id: Mapped[int | None] = mapped_column(ForeignKey("scenario_runs.id"), index=True)
+    environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False)
+    scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"), nullable=False)
+
+    product_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    stage: Mapped[str] = mapped_column(String(20), nullable=False)   # listing/cart0/cart1/cart4
+    price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc, index=True)
+
+    def __repr__(self) -> str:
+        return f"<PricePoint {self.stage} {self.price} {self.product_url[:50]}>"
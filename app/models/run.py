@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, ForeignKey, Enum, Integer
+from sqlalchemy import String, DateTime, ForeignKey, Enum, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, now_utc
 from datetime import datetime
@@ -12,7 +12,9 @@ if TYPE_CHECKING:
     from app.models.environment import Environment
     from app.models.basket_snapshot import BasketSnapshot
     from app.models.api_error import ApiError
+    from app.models.api_endpoint_stat import ApiEndpointStat
     from app.models.alert import Alert
+    from app.models.scenario_run_data import ScenarioRunData
 
 
 class RunStatus(str, enum.Enum):
@@ -29,9 +31,15 @@ class ScenarioRun(Base):
     Teraz nalezy do suite_run (agregacja).
     """
     __tablename__ = "scenario_runs"
+    __table_args__ = (
+        # Paginacja keyset /runs — ORDER BY started_at DESC, id DESC
+        Index("ix_scenario_runs_started_at_id", "started_at", "id"),
+        # Historia scenariusza (strona scenariusza, statystyki) — WHERE scenario_id ORDER BY started_at
+        Index("ix_scenario_runs_scenario_id_started_at", "scenario_id", "started_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    suite_run_id: Mapped[int] = mapped_column(ForeignKey("suite_runs.id"), nullable=False)
+    suite_run_id: Mapped[int] = mapped_column(ForeignKey("suite_runs.id"), nullable=False, index=True)
     scenario_id: Mapped[int] = mapped_column(ForeignKey("scenarios.id"), nullable=False)
     suite_id: Mapped[int] = mapped_column(ForeignKey("suites.id"), nullable=False)
     environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False)
@@ -47,6 +55,7 @@ class ScenarioRun(Base):
     product_name: Mapped[str | None] = mapped_column(String(500))
     screenshot_url: Mapped[str | None] = mapped_column(String(1000))
     video_url: Mapped[str | None] = mapped_column(String(1000))
+    attempts: Mapped[int] = mapped_column(Integer, default=1)   # próby ShopRunner (1 + retry)
 
     # Relacje
     suite_run: Mapped["SuiteRun"] = relationship(back_populates="scenario_runs")
@@ -59,9 +68,15 @@ class ScenarioRun(Base):
     api_errors: Mapped[list["ApiError"]] = relationship(
         back_populates="run", cascade="all, delete-orphan"
     )
+    api_endpoint_stats: Mapped[list["ApiEndpointStat"]] = relationship(
+        back_populates="run", cascade="all, delete-orphan"
+    )
     alerts: Mapped[list["Alert"]] = relationship(
         back_populates="run", cascade="all, delete-orphan"
     )
+    run_data: Mapped["ScenarioRunData | None"] = relationship(
+        back_populates="run", cascade="all, delete-orphan", uselist=False
+    )
 
     @property
     def duration_seconds(self) -> int | None:
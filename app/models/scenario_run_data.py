@@ -0,0 +1,30 @@
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.models.base import Base, now_utc
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.run import ScenarioRun
+
+
+class ScenarioRunData(Base):
+    """
+    Pełne RunData scenario_runu (home/listing/cart0..cart4) razem z ScenarioContext
+    i alertami reguł z przebiegu — wejście offline'owego replay reguł (core/replay.py).
+
+    data — JSON bez pól równych domyślnym, skompresowany zlib (core/run_data_store.py).
+    Jeden wiersz na run; osobna tabela, żeby listy runów nie ładowały bloba.
+    """
+    __tablename__ = "scenario_run_data"
+
+    run_id: Mapped[int] = mapped_column(ForeignKey("scenario_runs.id"), primary_key=True)
+    format_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+
+    # Relacje
+    run: Mapped["ScenarioRun"] = relationship(back_populates="run_data")
+
+    def __repr__(self) -> str:
+        return f"<ScenarioRunData run={self.run_id} {len(self.data)} B>"
@@ -23,6 +23,8 @@ class Suite(Base):
     description: Mapped[str | None] = mapped_column(Text)
     workers: Mapped[int] = mapped_column(Integer, default=6)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    # Niestabilne scenariusze (FLAKINESS_THRESHOLD): off / quarantine (run bez alertów) / skip
+    flaky_policy: Mapped[str] = mapped_column(String(20), default="off")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc, onupdate=now_utc)
     created_by: Mapped[str | None] = mapped_column(String(64), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, ForeignKey, Integer, Enum
+from sqlalchemy import String, DateTime, ForeignKey, Integer, BigInteger, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, now_utc
 from datetime import datetime
@@ -28,13 +28,19 @@ class SuiteRun(Base):
     Dashboard pokazuje suite_runs, nie pojedyncze scenariusze.
     """
     __tablename__ = "suite_runs"
+    __table_args__ = (
+        # Paginacja keyset listy runów — ORDER BY started_at DESC, id DESC
+        Index("ix_suite_runs_started_at_id", "started_at", "id"),
+        # Alerty per środowisko (JOIN z alert_groups w SuiteExecutor i /alerts), polityki retencji
+        Index("ix_suite_runs_environment_id_started_at", "environment_id", "started_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     suite_id: Mapped[int] = mapped_column(ForeignKey("suites.id"), nullable=False)
     environment_id: Mapped[int] = mapped_column(ForeignKey("environments.id"), nullable=False)
     
     status: Mapped[SuiteRunStatus] = mapped_column(
-        Enum(SuiteRunStatus), default=SuiteRunStatus.RUNNING, nullable=False
+        Enum(SuiteRunStatus), default=SuiteRunStatus.RUNNING, nullable=False, index=True
     )
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -45,6 +51,13 @@ class SuiteRun(Base):
     success_scenarios: Mapped[int] = mapped_column(Integer, default=0)
     failed_scenarios: Mapped[int] = mapped_column(Integer, default=0)
     total_alerts: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Archiwum — szczegóły runu przeniesione do pliku miesięcznego (core/archive.py)
+    # Zostaje tylko ten wiersz; offset/length wskazują członka gzip z danymi tej suite
+    archived_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    archive_path: Mapped[str | None] = mapped_column(String(255))
+    archive_offset: Mapped[int | None] = mapped_column(BigInteger)
+    archive_length: Mapped[int | None] = mapped_column(Integer)
     
     # Relacje
     suite: Mapped["Suite"] = relationship(back_populates="suite_runs")
@@ -57,6 +70,10 @@ class SuiteRun(Base):
         foreign_keys="AlertGroup.last_suite_run_id"
     )
 
+    @property
+    def is_archived(self) -> bool:
+        return self.archived_at is not None
+
     @property
     def duration_seconds(self) -> int | None:
         if self.finished_at and self.started_at:
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
+from sqlalchemy import desc
 import json
 from datetime import datetime, timezone
 from typing import Optional
+from urllib.parse import urlencode
 
 from database import get_db
 from app.models.alert_group import (
@@ -16,9 +17,13 @@ from app.models.environment import Environment
 from app.models.scenario import Scenario
 from app.templates import templates
 from core.auth_core import get_current_user
+from core import alert_search, flakiness, pagination, read_models
+from core.config import settings
 
 router = APIRouter(tags=["alerts"])
 
+PAGE_SIZE = 50
+
 
 # ── Lista alertów ─────────────────────────────────────────────────────────────
 
@@ -30,10 +35,75 @@ async def alerts_list(
     search: str = "",
     db: Session = Depends(get_db)
 ):
-    query = (
+    rows = _rows_context(db, status, environment_id, search, cursor=None)
+
+    # Statystyki — jedno zapytanie GROUP BY po statusie
+    counts = pagination.status_counts(db, AlertGroup.status)
+    total_open = counts.get(AlertStatus.OPEN, 0) + counts.get(AlertStatus.IN_PROGRESS, 0)
+    total_awaiting = counts.get(AlertStatus.AWAITING_FIX, 0) + counts.get(AlertStatus.AWAITING_TEST_UPDATE, 0)
+    total_closed = counts.get(AlertStatus.CLOSED, 0)
+
+    # Backlog — AWAITING_FIX + AWAITING_TEST_UPDATE (dla sekcji na dole)
+    backlog = (
         db.query(AlertGroup)
         .join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
-        .order_by(desc(AlertGroup.last_seen_at))
+        .filter(AlertGroup.status.in_([
+            AlertStatus.AWAITING_FIX,
+            AlertStatus.AWAITING_TEST_UPDATE,
+        ]))
+        .options(*read_models.ALERT_GROUP_ROW)
+        .order_by(desc(AlertGroup.repeat_count))
+        .all()
+    ) if status in ("active", "awaiting", "all") else []
+
+    environments = db.query(Environment).filter_by(is_active=True).all()
+
+    scenarios_map, scenario_run_map = _scenario_maps(db, rows["alert_groups"] + backlog)
+
+    return templates.TemplateResponse("alerts_list.html", {
+        "request": request,
+        **rows,
+        "backlog": backlog,
+        "current_status": status,
+        "current_environment": environment_id,
+        "search_query": search,
+        "total_open": total_open,
+        "total_awaiting": total_awaiting,
+        "total_closed": total_closed,
+        "environments": environments,
+        "scenarios_map": scenarios_map,
+        "scenario_run_map": scenario_run_map,
+        "resolution_types": [r.value for r in ResolutionType],
+    })
+
+
+@router.get("/alerts/rows")
+async def alerts_rows(
+    request: Request,
+    status: str = "active",
+    environment_id: str = "all",
+    search: str = "",
+    cursor: str | None = None,
+    db: Session = Depends(get_db)
+):
+    """Kolejna strona wierszy (infinite scroll — htmx, hx-trigger="revealed")."""
+    rows = _rows_context(db, status, environment_id, search, cursor)
+    scenarios_map, scenario_run_map = _scenario_maps(db, rows["alert_groups"])
+    return templates.TemplateResponse("alerts_rows.html", {
+        "request": request,
+        **rows,
+        "scenarios_map": scenarios_map,
+        "scenario_run_map": scenario_run_map,
+    })
+
+
+def _rows_context(db: Session, status: str, environment_id: str, search: str, cursor: str | None) -> dict:
+    """Strona alert_groups dla filtrów — keyset po (last_seen_at, id)."""
+    # Outer join — zamknięte grupy po retencji ostatniego runu nie mają last_suite_run
+    query = (
+        db.query(AlertGroup)
+        .outerjoin(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
+        .options(*read_models.ALERT_GROUP_ROW)
     )
 
     # Filtr statusu
@@ -53,47 +123,33 @@ async def alerts_list(
 
     # Filtr środowiska
     if environment_id != "all":
-        query = query.filter(SuiteRun.environment_id == int(environment_id))
+        query = query.filter(AlertGroup.environment_id == int(environment_id))
 
-    # Wyszukiwanie
+    # Wyszukiwanie — indeks pełnotekstowy (grupy + opisy alertów z runów)
+    search_snippets = {}
     if search:
-        query = query.filter(
-            or_(
-                AlertGroup.business_rule.ilike(f"%{search}%"),
-                AlertGroup.title.ilike(f"%{search}%")
-            )
-        )
-
-    alert_groups = query.limit(200).all()
-
-    # Statystyki
-    total_open = db.query(AlertGroup).filter(
-        AlertGroup.status.in_([AlertStatus.OPEN, AlertStatus.IN_PROGRESS])
-    ).count()
-    total_awaiting = db.query(AlertGroup).filter(
-        AlertGroup.status.in_([AlertStatus.AWAITING_FIX, AlertStatus.AWAITING_TEST_UPDATE])
-    ).count()
-    total_closed = db.query(AlertGroup).filter(
-        AlertGroup.status == AlertStatus.CLOSED
-    ).count()
-
-    # Backlog — AWAITING_FIX + AWAITING_TEST_UPDATE (dla sekcji na dole)
-    backlog = (
-        db.query(AlertGroup)
-        .join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
-        .filter(AlertGroup.status.in_([
-            AlertStatus.AWAITING_FIX,
-            AlertStatus.AWAITING_TEST_UPDATE,
-        ]))
-        .order_by(desc(AlertGroup.repeat_count))
-        .all()
-    ) if status in ("active", "awaiting", "all") else []
-
-    environments = db.query(Environment).filter_by(is_active=True).all()
-
-    # Załaduj scenariusze dla wyświetlenia nazw
+        result = alert_search.search(db, search)
+        query = query.filter(result.clause)
+        search_snippets = result.snippets
+
+    page = pagination.keyset_page(query, AlertGroup.last_seen_at, AlertGroup.id, cursor, PAGE_SIZE)
+    next_url = None
+    if page.has_more:
+        next_url = "/alerts/rows?" + urlencode({
+            "status": status, "environment_id": environment_id, "search": search, "cursor": page.next_cursor,
+        })
+
+    return {
+        "alert_groups": page.items,
+        "next_url": next_url,
+        "search_snippets": search_snippets,
+    }
+
+
+def _scenario_maps(db: Session, alert_groups: list[AlertGroup]) -> tuple[dict, dict]:
+    """Scenariusze (nazwy) i scenario_run_id z ostatniego suite_run — linki w wierszach."""
     all_scenario_ids = set()
-    for ag in alert_groups + backlog:
+    for ag in alert_groups:
         try:
             ids = json.loads(ag.scenario_ids)
             all_scenario_ids.update(ids)
@@ -108,7 +164,7 @@ async def alerts_list(
 
         all_suite_run_ids = {
             ag.last_suite_run_id
-            for ag in alert_groups + backlog
+            for ag in alert_groups
             if ag.last_suite_run_id is not None
         }
         if all_suite_run_ids:
@@ -123,21 +179,7 @@ async def alerts_list(
             for r in runs:
                 scenario_run_map[f"{r.suite_run_id}_{r.scenario_id}"] = r.id
 
-    return templates.TemplateResponse("alerts_list.html", {
-        "request": request,
-        "alert_groups": alert_groups,
-        "backlog": backlog,
-        "current_status": status,
-        "current_environment": environment_id,
-        "search_query": search,
-        "total_open": total_open,
-        "total_awaiting": total_awaiting,
-        "total_closed": total_closed,
-        "environments": environments,
-        "scenarios_map": scenarios_map,
-        "scenario_run_map": scenario_run_map,
-        "resolution_types": [r.value for r in ResolutionType],
-    })
+    return scenarios_map, scenario_run_map
 
 
 # ── Szczegóły alertu ──────────────────────────────────────────────────────────
@@ -193,6 +235,11 @@ async def alert_detail(
         "parent": parent,
         "scenarios": scenarios,
         "resolution_types": [r.value for r in ResolutionType],
+        "rule_flakiness": (
+            flakiness.rule_score(db, alert.business_rule, alert.environment_id)
+        ),
+        "flaky_threshold": settings.flakiness_threshold,
+        "flaky_min_runs": settings.flakiness_min_runs,
     })
 
 
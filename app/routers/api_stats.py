@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Request, Depends
+from sqlalchemy.orm import Session
+
+from database import get_db
+from app.models.environment import Environment
+from app.templates import templates
+from core import api_stats
+
+router = APIRouter(prefix="/api-stats", tags=["api_stats"])
+
+WINDOWS = (1, 7, 30, 90)
+LIMIT = 50
+
+# Ranking nie promuje endpointów wołanych raz czy dwa — pojedynczy wolny request to szum
+MIN_CALLS = 5
+
+SORTS = {
+    "p95":        lambda r: r.p95_ms or 0.0,
+    "errors":     lambda r: (r.current.error_rate, r.current.errors + r.current.failures),
+    "regression": lambda r: r.p95_change if r.p95_change is not None else float("-inf"),
+    "calls":      lambda r: r.current.count,
+}
+
+
+@router.get("")
+async def api_stats_page(
+    request: Request,
+    environment_id: int | None = None,
+    days: int = 7,
+    sort: str = "p95",
+    db: Session = Depends(get_db),
+):
+    """Najwolniejsze i najczęściej zawodzące API sklepu na środowisku (rollupy per suite run)."""
+    environments = db.query(Environment).filter_by(is_active=True).order_by(Environment.name).all()
+    environment = next((e for e in environments if e.id == environment_id), environments[0] if environments else None)
+    days = days if days in WINDOWS else 7
+    sort = sort if sort in SORTS else "p95"
+
+    endpoints, hidden = [], 0
+    if environment:
+        report = api_stats.endpoint_report(db, environment.id, days)
+        endpoints = [r for r in report if r.current.count >= MIN_CALLS]
+        hidden = len(report) - len(endpoints)
+        endpoints.sort(key=SORTS[sort], reverse=True)
+
+    return templates.TemplateResponse("api_stats.html", {
+        "request": request,
+        "environments": environments,
+        "environment": environment,
+        "days": days,
+        "windows": WINDOWS,
+        "sort": sort,
+        "endpoints": endpoints[:LIMIT],
+        "total_endpoints": len(endpoints),
+        "hidden": hidden,
+        "min_calls": MIN_CALLS,
+    })
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import FileResponse, Response
+
+from core import artifact_store
+
+router = APIRouter(tags=["artifacts"])
+
+# Treść pod danym hashem nigdy się nie zmienia — przeglądarka i proxy trzymają ją rok
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def _serve(request: Request, artifact_hash: str, thumb: bool) -> Response:
+    if not artifact_store.is_valid_hash(artifact_hash):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    path, media_type, etag = artifact_store.file_path(artifact_hash), "image/png", f'"{artifact_hash}"'
+    if thumb:
+        thumb_path = artifact_store.thumb_path(artifact_hash)
+        if thumb_path.exists():
+            path, media_type, etag = thumb_path, "image/jpeg", f'"{artifact_hash}-thumb"'
+
+    headers = {"Cache-Control": IMMUTABLE_CACHE, "ETag": etag}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@router.get("/artifacts/{artifact_hash}")
+def artifact(artifact_hash: str, request: Request):
+    return _serve(request, artifact_hash, thumb=False)
+
+
+@router.get("/artifacts/{artifact_hash}/thumb")
+def artifact_thumb(artifact_hash: str, request: Request):
+    """Miniatura JPEG — bez Pillow (lub dla starszych artefaktów) pełny PNG."""
+    return _serve(request, artifact_hash, thumb=True)
@@ -8,25 +8,33 @@ from app.models.suite_run import SuiteRun, SuiteRunStatus
 from app.models.alert_group import AlertGroup, AlertStatus
 from app.models.run import ScenarioRun, RunStatus
 from app.templates import templates
+from core import pagination, read_models, response_cache
 
 router = APIRouter(tags=["dashboard"])
 
 
 @router.get("/dashboard")
 async def dashboard(request: Request, db: Session = Depends(get_db)):
+    return response_cache.cached_response(request, lambda: _render_dashboard(request, db), db)
+
+
+@router.get("/dashboard/runs-table")
+async def dashboard_runs_table(request: Request, db: Session = Depends(get_db)):
+    return response_cache.cached_response(request, lambda: _render_runs_table(request, db), db)
+
+
+# ── Renderowanie (wywoływane tylko przy braku wpisu w cache) ─────────────────
+
+def _render_dashboard(request: Request, db: Session):
     now = datetime.now(timezone.utc)
     today = now - timedelta(hours=24)
     week_ago = now - timedelta(days=7)
     two_weeks_ago = now - timedelta(days=14)
 
     # ── Liczniki alertów ──────────────────────────────────────────────────────
-    active_alerts = db.query(AlertGroup).filter(
-        AlertGroup.status.in_([AlertStatus.OPEN, AlertStatus.IN_PROGRESS])
-    ).count()
-
-    backlog_alerts = db.query(AlertGroup).filter(
-        AlertGroup.status.in_([AlertStatus.AWAITING_FIX, AlertStatus.AWAITING_TEST_UPDATE])
-    ).count()
+    alert_counts = pagination.status_counts(db, AlertGroup.status)
+    active_alerts = alert_counts.get(AlertStatus.OPEN, 0) + alert_counts.get(AlertStatus.IN_PROGRESS, 0)
+    backlog_alerts = alert_counts.get(AlertStatus.AWAITING_FIX, 0) + alert_counts.get(AlertStatus.AWAITING_TEST_UPDATE, 0)
 
     new_today = db.query(AlertGroup).filter(
         AlertGroup.first_seen_at >= today
@@ -70,11 +78,12 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
 
     top_alerts_raw = (
         db.query(AlertGroup)
-        .join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
+        .outerjoin(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
         .filter(
             AlertGroup.last_seen_at >= week_ago,
-            SuiteRun.environment_id == prod_env.id if prod_env else True
+            AlertGroup.environment_id == prod_env.id if prod_env else True
         )
+        .options(*read_models.ALERT_GROUP_ROW)
         .order_by(desc(AlertGroup.repeat_count))
         .all()
     )
@@ -92,6 +101,7 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
     # ── Ostatnie runy (10) ────────────────────────────────────────────────────
     recent_runs = (
         db.query(SuiteRun)
+        .options(*read_models.SUITE_RUN_ROW)
         .order_by(desc(SuiteRun.started_at))
         .limit(10)
         .all()
@@ -115,10 +125,10 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
     })
 
 
-@router.get("/dashboard/runs-table")
-async def dashboard_runs_table(request: Request, db: Session = Depends(get_db)):
+def _render_runs_table(request: Request, db: Session):
     recent_runs = (
         db.query(SuiteRun)
+        .options(*read_models.SUITE_RUN_ROW)
         .order_by(desc(SuiteRun.started_at))
         .limit(10)
         .all()
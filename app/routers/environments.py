@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 from database import get_db
 from app.models.environment import Environment
 from app.models.suite_run import SuiteRun
+from app.models.flakiness_score import FlakinessScore
+from app.models.api_endpoint_stat import ApiEndpointRollup
 from app.templates import templates
 from core.auth_core import get_current_user
 
@@ -93,6 +95,8 @@ async def environment_delete(env_id: int, db: Session = Depends(get_db)):
             status_code=409,
             detail=f"Nie można usunąć — środowisko ma {run_count} powiązanych run(ów). Usuń je najpierw.",) 
 
+    db.query(FlakinessScore).filter_by(environment_id=env_id).delete()
+    db.query(ApiEndpointRollup).filter_by(environment_id=env_id).delete()
     db.delete(env)
     db.commit()
     return RedirectResponse(url="/environments", status_code=303)
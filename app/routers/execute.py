@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Request, Depends, Form, HTTPException
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timezone
@@ -7,13 +7,12 @@ import asyncio
 from database import SessionLocal, get_db
 from app.models.suite import Suite
 from app.models.environment import Environment
-from app.models.suite_scenario import SuiteScenario
 from app.models.scenario import Scenario
 from app.models.suite_run import SuiteRun, SuiteRunStatus
 from app.models.run import ScenarioRun, RunStatus
 from scenarios.suite_executor import SuiteExecutor
 from app.templates import templates
-from core import runner_registry
+from core import runner_registry, event_bus, read_models
 
 router = APIRouter(tags=["execute"])
 
@@ -90,6 +89,25 @@ async def execute_form(request: Request, db: Session = Depends(get_db)):
     })
 
 
+@router.get("/execute/events")
+async def execute_events(request: Request):
+    """Strumień SSE z liczbą aktywnych suite (RUNNING_CHANGED) — dla licznika w formularzu."""
+    def initial() -> list[event_bus.Event]:
+        # Stan odczytany po subskrypcji — późniejsze zmiany przyjdą z kolejki
+        return [event_bus.Event(type=event_bus.RUNNING_CHANGED, data={"running": runner_registry.count_running()})]
+
+    return StreamingResponse(
+        event_bus.sse_stream(
+            None,
+            request.is_disconnected,
+            initial=initial,
+            types={event_bus.RUNNING_CHANGED},
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 def _resolve_environment(db: Session, environment_id_str: str, custom_url: str):
     if environment_id_str == "custom":
         url = custom_url.strip()
@@ -118,6 +136,7 @@ async def execute_run(
     workers_override: str = Form(""),
     headless: bool = Form(False),
     retries: int = Form(0),
+    profile: bool = Form(False),
     db: Session = Depends(get_db),
 ):
     workers = int(workers_override) if workers_override.strip() else None
@@ -135,7 +154,7 @@ async def execute_run(
         })
 
     env_id, _ = _resolve_environment(db, environment_id, custom_url)
-    suite_run_id = await _start_suite(suite_id, env_id, workers, headless, max_retries=retries)
+    suite_run_id = await _start_suite(suite_id, env_id, workers, headless, max_retries=retries, profile=profile)
     return RedirectResponse(url=f"/suite-runs/{suite_run_id}", status_code=303)
 
 
@@ -148,6 +167,7 @@ async def execute_manual(
     workers_override: str = Form(""),
     headless: bool = Form(False),
     retries: int = Form(0),
+    profile: bool = Form(False),
     db: Session = Depends(get_db),
 ):
     workers = int(workers_override) if workers_override.strip() else None
@@ -158,7 +178,7 @@ async def execute_manual(
         count = max(1, min(int(form.get(f"count_{sid}") or 1), 20))
         expanded_ids.extend([sid] * count)
     env_id, _ = _resolve_environment(db, environment_id, custom_url)
-    suite_run_id = await _start_manual(expanded_ids, env_id, workers, headless, max_retries=retries)
+    suite_run_id = await _start_manual(expanded_ids, env_id, workers, headless, max_retries=retries, profile=profile)
     return RedirectResponse(url=f"/suite-runs/{suite_run_id}", status_code=303)
 
 
@@ -171,6 +191,7 @@ async def _start_suite(
     headless: bool,
     triggered_by: str = "manual",
     max_retries: int = 0,
+    profile: bool = False,
 ) -> int:
     """
     Tworzy suite_run w bazie, rejestruje task i zwraca suite_run_id.
@@ -184,13 +205,7 @@ async def _start_suite(
         if not suite or not environment:
             raise HTTPException(status_code=404, detail="Suite lub environment nie znaleziony")
 
-        suite_scenarios = (
-            db.query(SuiteScenario)
-            .filter_by(suite_id=suite.id, is_active=True)
-            .order_by(SuiteScenario.order)
-            .all()
-        )
-        scenarios = [ss.scenario for ss in suite_scenarios if ss.scenario.is_active]
+        scenarios = read_models.suite_scenarios(db, suite.id)
 
         if not scenarios:
             raise HTTPException(status_code=400, detail="Brak aktywnych scenariuszy w suite")
@@ -216,7 +231,7 @@ async def _start_suite(
     # Uruchom w tle przez registry
     await runner_registry.run_suite(
         suite_run_id,
-        _run_suite_background(suite_run_id, suite_id, environment_id, workers, headless, max_retries),
+        _run_suite_background(suite_run_id, suite_id, environment_id, workers, headless, max_retries, profile),
     )
 
     return suite_run_id
@@ -228,6 +243,7 @@ async def _start_manual(
     workers_override,
     headless: bool,
     max_retries: int = 0,
+    profile: bool = False,
 ) -> int:
     db = SessionLocal()
     try:
@@ -235,12 +251,7 @@ async def _start_manual(
         if not environment:
             raise HTTPException(status_code=404, detail="Environment nie znaleziony")
 
-        scenarios_map = {
-            s.id: s for s in db.query(Scenario)
-            .filter(Scenario.id.in_(scenario_ids), Scenario.is_active == True)
-            .all()
-        }
-        scenarios = [scenarios_map[sid] for sid in scenario_ids if sid in scenarios_map]
+        scenarios = read_models.scenarios_by_ids(db, scenario_ids)
         if not scenarios:
             raise HTTPException(status_code=400, detail="Brak aktywnych scenariuszy")
 
@@ -265,7 +276,7 @@ async def _start_manual(
 
     await runner_registry.run_suite(
         suite_run_id,
-        _run_manual_background(suite_run_id, scenario_ids, environment_id, workers, headless, max_retries),
+        _run_manual_background(suite_run_id, scenario_ids, environment_id, workers, headless, max_retries, profile),
     )
 
     return suite_run_id
@@ -280,6 +291,7 @@ async def _run_suite_background(
     workers: int,
     headless: bool,
     max_retries: int = 0,
+    profile: bool = False,
 ):
     db = SessionLocal()
     try:
@@ -287,13 +299,7 @@ async def _run_suite_background(
         environment = db.query(Environment).filter_by(id=environment_id).first()
         suite_run = db.query(SuiteRun).filter_by(id=suite_run_id).first()
 
-        suite_scenarios = (
-            db.query(SuiteScenario)
-            .filter_by(suite_id=suite.id, is_active=True)
-            .order_by(SuiteScenario.order)
-            .all()
-        )
-        scenarios = [ss.scenario for ss in suite_scenarios if ss.scenario.is_active]
+        scenarios = read_models.suite_scenarios(db, suite.id)
 
         executor = SuiteExecutor(
             suite=suite,
@@ -304,6 +310,7 @@ async def _run_suite_background(
             db=db,
             suite_run=suite_run,
             max_retries=max_retries,
+            profile=profile,
         )
         await executor.run()
 
@@ -322,6 +329,7 @@ async def _run_manual_background(
     workers: int,
     headless: bool,
     max_retries: int = 0,
+    profile: bool = False,
 ):
     db = SessionLocal()
     try:
@@ -329,12 +337,7 @@ async def _run_manual_background(
         environment = db.query(Environment).filter_by(id=environment_id).first()
         suite_run = db.query(SuiteRun).filter_by(id=suite_run_id).first()
         
-        scenarios_map = {
-            s.id: s for s in db.query(Scenario)
-            .filter(Scenario.id.in_(scenario_ids), Scenario.is_active == True)
-            .all()
-        }
-        scenarios = [scenarios_map[sid] for sid in scenario_ids if sid in scenarios_map]
+        scenarios = read_models.scenarios_by_ids(db, scenario_ids)
 
         executor = SuiteExecutor(
             suite=manual_suite,
@@ -345,6 +348,7 @@ async def _run_manual_background(
             db=db,
             suite_run=suite_run,
             max_retries=max_retries,
+            profile=profile,
         )
         await executor.run()
 
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Request, Query
+from datetime import datetime, timezone
+import time
+
+from app.templates import templates
+from core import log_index
+
+router = APIRouter(tags=["logs"])
+
+# Dostępne okna czasowe wyszukiwania (godziny)
+WINDOWS = [1, 6, 24, 72, 168, 720]
+
+
+@router.get("/logs/search")
+def logs_search(
+    request: Request,
+    q: str = Query(""),
+    hours: int = Query(24, ge=1, le=24 * 90),
+    level: str = Query(""),
+    scenario: str = Query(""),
+    suite_run_id: int | None = Query(None),
+    limit: int = Query(100, ge=1, le=log_index.MAX_RESULTS),
+):
+    """Wyszukiwanie w logach wszystkich runów (indeks FTS5) w oknie czasowym."""
+    hits = []
+    elapsed_ms = None
+
+    if q or level or scenario or suite_run_id:
+        started = time.perf_counter()
+        hits = log_index.search(
+            q.strip(),
+            since=time.time() - hours * 3600,
+            level=level or None,
+            scenario=scenario.strip() or None,
+            suite_run_id=suite_run_id,
+            limit=limit,
+        )
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    results = [
+        {**hit.__dict__, "time": datetime.fromtimestamp(hit.ts, tz=timezone.utc)}
+        for hit in hits
+    ]
+
+    return templates.TemplateResponse("logs_search.html", {
+        "request": request,
+        "results": results,
+        "q": q,
+        "hours": hours,
+        "level": level,
+        "scenario": scenario,
+        "suite_run_id": suite_run_id,
+        "limit": limit,
+        "windows": WINDOWS,
+        "elapsed_ms": elapsed_ms,
+    })
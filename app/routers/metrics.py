@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, Response
+
+from core import db_metrics, metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Metryki executora, przeglądarek, schedulera i panelu w formacie Prometheusa (core/metrics.py)."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@router.get("/metrics/db")
+async def db_metrics_snapshot():
+    """Zapytania SQL i czas bazy per trasa oraz ostatnie suite runy (core/db_metrics.py)."""
+    return JSONResponse(db_metrics.snapshot())
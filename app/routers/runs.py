@@ -1,31 +1,46 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 
 from database import get_db
 from app.models.run import ScenarioRun
 from app.models.alert import Alert
 from app.models.basket_snapshot import BasketSnapshot
 from app.templates import templates
+from core import pagination, read_models
 
-router = APIRouter()
+router = APIRouter(prefix="/runs", tags=["runs"])
 
+PAGE_SIZE = 50
 
-@router.get("/")
+
+@router.get("")
 async def runs_list(request: Request, db: Session = Depends(get_db)):
-    """Lista wszystkich uruchomień."""
-    runs = (
-        db.query(ScenarioRun)
-        .order_by(desc(ScenarioRun.started_at))
-        .limit(100)
-        .all()
-    )
+    """Lista wszystkich uruchomień — kolejne strony doładowywane przy przewijaniu."""
     return templates.TemplateResponse("runs_list.html", {
         "request": request,
-        "runs": runs,
+        **_rows_context(db, cursor=None),
     })
 
 
+@router.get("/rows")
+async def runs_rows(request: Request, cursor: str | None = None, db: Session = Depends(get_db)):
+    """Kolejna strona wierszy (infinite scroll — htmx, hx-trigger="revealed")."""
+    return templates.TemplateResponse("runs_rows.html", {
+        "request": request,
+        **_rows_context(db, cursor),
+    })
+
+
+def _rows_context(db: Session, cursor: str | None) -> dict:
+    query = db.query(ScenarioRun).options(*read_models.SCENARIO_RUN_ROW)
+    page = pagination.keyset_page(query, ScenarioRun.started_at, ScenarioRun.id, cursor, PAGE_SIZE)
+    return {
+        "runs": page.items,
+        "alert_counts": read_models.counted_alerts(db, [run.id for run in page.items]),
+        "next_url": f"/runs/rows?cursor={page.next_cursor}" if page.has_more else None,
+    }
+
+
 @router.get("/{run_id}")
 async def run_detail(run_id: int, request: Request, db: Session = Depends(get_db)):
     """Szczegóły uruchomienia — alerty, snapshoty koszyka."""
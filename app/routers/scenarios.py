@@ -7,11 +7,13 @@ from database import get_db
 from app.models.scenario import Scenario
 from app.models.suite_scenario import SuiteScenario
 from app.models.run import ScenarioRun
-from app.models.dictionary import Dictionary
 from app.models.flag_definition import FlagDefinition, ScenarioFlag
 from app.models.alert import Alert
+from app.models.flakiness_score import FlakinessScore
 from app.templates import templates
 from core.auth_core import get_current_user
+from core import flakiness, read_models
+from core.config import settings
 
 router = APIRouter(tags=["scenarios"])
 
@@ -19,15 +21,15 @@ router = APIRouter(tags=["scenarios"])
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 def _get_form_context(db: Session) -> dict:
-    def get_values(system_name: str) -> list[str]:
-        entry = db.query(Dictionary).filter_by(system_name=system_name, is_active=True).first()
-        return entry.get_values() if entry else []
+    values = read_models.dictionary_values(
+        db, ["available_deliveries", "available_payments", "basket_types", "available_services"]
+    )
 
     return {
-        "deliveries":   get_values("available_deliveries"),
-        "payments":     get_values("available_payments"),
-        "basket_types": get_values("basket_types"),
-        "services":     get_values("available_services"),
+        "deliveries":   values["available_deliveries"],
+        "payments":     values["available_payments"],
+        "basket_types": values["basket_types"],
+        "services":     values["available_services"],
         "all_flags":    db.query(FlagDefinition).filter_by(is_active=True).order_by(FlagDefinition.display_name).all(),
     }
 
@@ -56,10 +58,7 @@ async def scenarios_list(request: Request, db: Session = Depends(get_db)):
     scenarios = db.query(Scenario).order_by(Scenario.name).all()
     ctx = _get_form_context(db)
 
-    scenario_flags_map = {
-        s.id: {sf.flag_id: sf.is_enabled for sf in s.flags}
-        for s in scenarios
-    }
+    scenario_flags_map = read_models.scenario_flags_map(db)
 
     return templates.TemplateResponse("scenarios_list.html", {
         "request": request,
@@ -187,9 +186,21 @@ async def scenario_detail(scenario_id: int, request: Request, db: Session = Depe
         "scenario": scenario,
         "suite_links": suite_links,
         "recent_runs": recent_runs,
+        "flakiness_scores": flakiness.scenario_scores(db, scenario_id),
+        "flaky_threshold": settings.flakiness_threshold,
+        "flaky_min_runs": settings.flakiness_min_runs,
     })
 
 
+@router.post("/scenarios/{scenario_id}/flakiness/reset")
+async def scenario_flakiness_reset(scenario_id: int, db: Session = Depends(get_db)):
+    """Zeruje liczniki niestabilności — scenariusz wraca do suite z polityką skip/quarantine."""
+    _get_or_404(db, scenario_id)
+    flakiness.reset_scenario(db, scenario_id)
+    db.commit()
+    return RedirectResponse(url=f"/scenarios/{scenario_id}", status_code=303)
+
+
 # ── EDIT ──────────────────────────────────────────────────────────────────────
 
 @router.get("/scenarios/{scenario_id}/edit")
@@ -277,6 +288,7 @@ async def scenario_delete(scenario_id: int, db: Session = Depends(get_db)):
     db.query(SuiteScenario).filter_by(scenario_id=scenario_id).delete()
     db.query(ScenarioRun).filter_by(scenario_id=scenario_id).delete()
     db.query(Alert).filter_by(scenario_id=scenario_id).delete()
+    db.query(FlakinessScore).filter_by(scenario_id=scenario_id).delete()
     db.delete(scenario)
     db.commit()
     return RedirectResponse(url="/scenarios", status_code=303)
@@ -1,21 +1,20 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Query
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc
 import json
 import html
-from pathlib import Path
 from datetime import datetime, timezone
 
 from database import get_db
 from app.models.suite_run import SuiteRun, SuiteRunStatus
 from app.models.run import ScenarioRun, RunStatus
 from app.models.alert import Alert
-from app.models.alert_group import AlertGroup
 from app.models.basket_snapshot import BasketSnapshot
 from app.models.api_error import ApiError
+from app.models.api_endpoint_stat import ApiEndpointStat
 from app.templates import templates
-from core import runner_registry
+from core import runner_registry, event_bus, log_reader, log_index, retention, archive, artifact_store, pagination, profiling, read_models, tracing
 
 router = APIRouter(tags=["suite_runs"])
 
@@ -26,47 +25,59 @@ PAGE_SIZE = 25
 async def suite_runs_list(
     request: Request,
     db: Session = Depends(get_db),
-    page: int = Query(1, ge=1),
 ):
-    total = db.query(SuiteRun).count()
-    total_pages = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
-    page = min(page, total_pages)
-    offset = (page - 1) * PAGE_SIZE
-
-    runs = (
-        db.query(SuiteRun)
-        .order_by(desc(SuiteRun.started_at))
-        .offset(offset)
-        .limit(PAGE_SIZE)
-        .all()
-    )
-
-    # Które suite_run_id są aktualnie uruchomione
-    running_ids = set(runner_registry.get_running().keys())
+    # Liczniki jednym GROUP BY — suma to liczba wszystkich runów
+    counts = pagination.status_counts(db, SuiteRun.status)
 
     return templates.TemplateResponse("suite_runs_list.html", {
         "request": request,
-        "runs": runs,
-        "page": page,
-        "total_pages": total_pages,
-        "total": total,
-        "page_size": PAGE_SIZE,
-        "running_ids": running_ids,
+        **_rows_context(db, cursor=None),
+        "status_counts": {status.value: count for status, count in counts.items()},
+        "total": sum(counts.values()),
+    })
+
+
+@router.get("/suite-runs/rows")
+async def suite_runs_rows(
+    request: Request,
+    db: Session = Depends(get_db),
+    cursor: str | None = None,
+):
+    """Kolejna strona wierszy (infinite scroll — htmx, hx-trigger="revealed")."""
+    return templates.TemplateResponse("suite_runs_rows.html", {
+        "request": request,
+        **_rows_context(db, cursor),
     })
 
 
+def _rows_context(db: Session, cursor: str | None) -> dict:
+    query = db.query(SuiteRun).options(*read_models.SUITE_RUN_ROW)
+    page = pagination.keyset_page(query, SuiteRun.started_at, SuiteRun.id, cursor, PAGE_SIZE)
+    return {
+        "runs": page.items,
+        "next_url": f"/suite-runs/rows?cursor={page.next_cursor}" if page.has_more else None,
+        # Które suite_run_id są aktualnie uruchomione
+        "running_ids": set(runner_registry.get_running().keys()),
+    }
+
+
 @router.get("/suite-runs/{suite_run_id}")
 async def suite_run_detail(suite_run_id: int, request: Request, db: Session = Depends(get_db)):
     suite_run = db.query(SuiteRun).filter(SuiteRun.id == suite_run_id).first()
     if not suite_run:
         raise HTTPException(status_code=404, detail="Suite run not found")
 
-    scenario_runs = (
-        db.query(ScenarioRun)
-        .filter(ScenarioRun.suite_run_id == suite_run_id)
-        .order_by(ScenarioRun.started_at)
-        .all()
-    )
+    if suite_run.is_archived:
+        # Szczegóły przeniesione do archiwum — wczytywane dopiero przy otwarciu strony
+        scenario_runs = archive.load_suite_run(db, suite_run).scenario_runs
+    else:
+        scenario_runs = (
+            db.query(ScenarioRun)
+            .filter(ScenarioRun.suite_run_id == suite_run_id)
+            .order_by(ScenarioRun.started_at)
+            .options(joinedload(ScenarioRun.scenario))
+            .all()
+        )
 
     alert_groups = []
     for group in suite_run.alert_groups:
@@ -92,19 +103,53 @@ async def suite_run_detail(suite_run_id: int, request: Request, db: Session = De
         "scenario_runs": scenario_runs,
         "alert_groups": alert_groups,
         "is_running": is_running,
+        "profile": profiling.load_summary(suite_run_id),
     })
 
 
+@router.get("/suite-runs/{suite_run_id}/events")
+async def suite_run_events(suite_run_id: int, request: Request):
+    """
+    Strumień SSE postępu suite_run — bez zapytań do bazy.
+    Najpierw historia zdarzeń z EventBus, potem zdarzenia na żywo aż do SUITE_FINISHED.
+    """
+    def initial() -> list[event_bus.Event]:
+        # Wywoływane po subskrypcji — zdarzenia z przerwy trafiają do historii albo do kolejki
+        history = event_bus.history(suite_run_id)
+        if not runner_registry.is_running(suite_run_id) and not history:
+            # Run zakończony przed startem panelu (lub w innym procesie) — nic do streamowania
+            history = [event_bus.Event(type=event_bus.SUITE_FINISHED, suite_run_id=suite_run_id)]
+        return history
+
+    return StreamingResponse(
+        event_bus.sse_stream(
+            suite_run_id,
+            request.is_disconnected,
+            initial=initial,
+            stop_on=event_bus.SUITE_FINISHED,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/suite-runs/{suite_run_id}/logs", response_class=HTMLResponse)
-async def suite_run_logs(suite_run_id: int):
-    log_file = Path(f"logs/suite_run_{suite_run_id}.log")
+async def suite_run_logs(
+    suite_run_id: int,
+    limit_kb: int = Query(log_reader.DEFAULT_CHUNK_KB, ge=1, le=log_reader.MAX_CHUNK_KB),
+    level: str | None = Query(None),
+    scenario: str | None = Query(None),
+):
+    """Ostatnie limit_kb KB logu jako <pre> — starsze fragmenty przez /logs/tail."""
+    log_file = log_reader.log_path(suite_run_id)
 
     if not log_file.exists():
         return "<div style='padding: 2rem; text-align: center; color: var(--text-secondary);'>Brak logów</div>"
 
     try:
-        content = log_file.read_text(encoding='utf-8')
-        escaped = html.escape(content)
+        chunk = log_reader.read_tail(log_file, limit_kb)
+        lines = log_reader.filter_lines(chunk.lines, level, scenario)
+        escaped = html.escape("\n".join(lines))
         return f"""<pre style='margin:0; padding:1rem; background:var(--bg-dark); color:var(--text-primary);
                     font-size:11px; line-height:1.6; overflow-x:auto;
                     font-family:"Fira Code",monospace;
@@ -113,6 +158,39 @@ async def suite_run_logs(suite_run_id: int):
         return f"<div style='padding:2rem; color:var(--accent-red);'>Błąd ładowania logów: {e}</div>"
 
 
+@router.get("/suite-runs/{suite_run_id}/logs/tail")
+async def suite_run_logs_tail(
+    suite_run_id: int,
+    before: int | None = Query(None, ge=0),
+    after: int | None = Query(None, ge=0),
+    limit_kb: int = Query(log_reader.DEFAULT_CHUNK_KB, ge=1, le=log_reader.MAX_CHUNK_KB),
+    level: str | None = Query(None),
+    scenario: str | None = Query(None),
+):
+    """
+    Fragment logu jako JSON (offsety bajtowe):
+      - bez parametrów — ostatnie limit_kb KB
+      - before=N       — starszy fragment kończący się na N
+      - after=N        — nowe linie od N (polling w trakcie runu)
+    Filtry level (minimalny poziom) i scenario (podciąg nazwy scenariusza rekordu)
+    stosowane po stronie serwera.
+    """
+    log_file = log_reader.log_path(suite_run_id)
+    if not log_file.exists():
+        return JSONResponse({"lines": [], "start": 0, "end": 0, "size": 0, "has_older": False,
+                             "running": runner_registry.is_running(suite_run_id)})
+
+    if after is not None:
+        chunk = log_reader.read_after(log_file, after, limit_kb)
+    elif before is not None:
+        chunk = log_reader.read_before(log_file, before, limit_kb)
+    else:
+        chunk = log_reader.read_tail(log_file, limit_kb)
+
+    chunk.lines = log_reader.filter_lines(chunk.lines, level, scenario)
+    return JSONResponse({**chunk.to_dict(), "running": runner_registry.is_running(suite_run_id)})
+
+
 @router.post("/suite-runs/{suite_run_id}/cancel")
 async def cancel_suite_run(suite_run_id: int, db: Session = Depends(get_db)):
     """Anuluje trwający suite run."""
@@ -154,13 +232,42 @@ async def delete_suite_run(suite_run_id: int, db: Session = Depends(get_db)):
     if runner_registry.is_running(suite_run_id):
         raise HTTPException(status_code=400, detail="Nie można usunąć uruchomionego runu")
 
-    db.query(AlertGroup).filter(AlertGroup.last_suite_run_id == suite_run_id).delete()
-    db.delete(suite_run)
-    db.commit()
+    # Wiersze zależne razem ze zwolnieniem referencji artefaktów (także z archiwum)
+    retention.delete_suite_runs(db, [suite_run_id], retention.RetentionReport())
+
+    # Screenshoty, logi i wpisy indeksu logów — nie zostają osierocone na dysku
+    retention.delete_suite_run_files(suite_run_id)
+    log_index.delete_suite_runs([suite_run_id])
+    artifact_store.collect_garbage(db)
 
     return RedirectResponse(url="/suite-runs", status_code=303)
 
 
+@router.get("/suite-runs/{suite_run_id}/trace.otlp.json")
+async def suite_run_trace_file(suite_run_id: int):
+    """Surowy trace suite runu (OTLP-JSON) — do importu w narzędziu OpenTelemetry."""
+    path = tracing.trace_path(suite_run_id)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Brak trace dla tego suite runu")
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+@router.get("/suite-runs/{suite_run_id}/profile.prof")
+async def suite_run_profile_file(suite_run_id: int):
+    """Surowy profil cProfile suite runu (pstats) — snakeviz / python -m pstats."""
+    path = profiling.profile_path(suite_run_id)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Brak profilu dla tego suite runu")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@router.get("/suite-runs/{suite_run_id}/{id}/trace")
+async def scenario_run_trace(suite_run_id: int, id: int, request: Request):
+    """Waterfall spanów scenariusza (fragment htmx strony runu) — bez zapytań do bazy."""
+    rows = tracing.waterfall(tracing.load(suite_run_id), scenario_run_id=id)
+    return templates.TemplateResponse("trace_waterfall.html", {"request": request, "rows": rows})
+
+
 @router.get("/suite-runs/{suite_run_id}/{id}")
 async def scenario_run_detail(
     suite_run_id: int,
@@ -172,16 +279,27 @@ async def scenario_run_detail(
     if not suite_run:
         raise HTTPException(status_code=404, detail="Suite run not found")
 
-    run = db.query(ScenarioRun).filter(
-        ScenarioRun.suite_run_id == suite_run_id,
-        ScenarioRun.id == id,
-    ).first()
-    if not run:
-        raise HTTPException(status_code=404, detail="Scenario run not found")
-
-    alerts = db.query(Alert).filter(Alert.run_id == run.id).all()
-    snapshots = db.query(BasketSnapshot).filter(BasketSnapshot.run_id == run.id).all()
-    api_errors = db.query(ApiError).filter(ApiError.run_id == run.id).all()
+    if suite_run.is_archived:
+        archived = archive.load_suite_run(db, suite_run)
+        run = archived.scenario_run(id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Scenario run not found")
+        alerts = archived.for_run(archived.alerts, run.id)
+        snapshots = archived.for_run(archived.basket_snapshots, run.id)
+        api_errors = archived.for_run(archived.api_errors, run.id)
+        endpoint_stats = archived.for_run(archived.api_endpoint_stats, run.id)
+    else:
+        run = db.query(ScenarioRun).filter(
+            ScenarioRun.suite_run_id == suite_run_id,
+            ScenarioRun.id == id,
+        ).first()
+        if not run:
+            raise HTTPException(status_code=404, detail="Scenario run not found")
+
+        alerts = db.query(Alert).filter(Alert.run_id == run.id).all()
+        snapshots = db.query(BasketSnapshot).filter(BasketSnapshot.run_id == run.id).all()
+        api_errors = db.query(ApiError).filter(ApiError.run_id == run.id).all()
+        endpoint_stats = db.query(ApiEndpointStat).filter(ApiEndpointStat.run_id == run.id).all()
 
     return templates.TemplateResponse("suite_run_scenario_detail.html", {
         "request": request,
@@ -190,4 +308,6 @@ async def scenario_run_detail(
         "alerts": alerts,
         "snapshots": snapshots,
         "api_errors": api_errors,
+        "endpoint_stats": sorted(endpoint_stats, key=lambda s: s.p95_ms or 0, reverse=True),
+        "archived": suite_run.is_archived,
     })
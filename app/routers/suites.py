@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Form
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import asc
 
 from database import get_db
@@ -9,6 +9,7 @@ from app.models.scenario import Scenario
 from app.models.suite_scenario import SuiteScenario
 from app.templates import templates
 from core.auth_core import get_current_user
+from core import flakiness, read_models
 
 router = APIRouter(tags=["suites"])
 
@@ -24,23 +25,12 @@ async def suites_list(request: Request, db: Session = Depends(get_db)):
         .order_by(Suite.id)
         .all()
     )
-    # Dołącz liczbę scenariuszy do każdej suite
+    # Dołącz liczbę scenariuszy do każdej suite — jeden GROUP BY dla wszystkich
+    counts = read_models.suite_scenario_counts(db)
     for suite in suites:
-        suite._all_scenario_count = (
-            db.query(SuiteScenario)
-            .filter_by(suite_id=suite.id, is_active=True)
-            .count()
-        )
-        suite._active_scenario_count = (
-            db.query(SuiteScenario)
-            .join(Scenario, SuiteScenario.scenario_id == Scenario.id)
-            .filter(
-                SuiteScenario.suite_id == suite.id,
-                SuiteScenario.is_active == True,
-                Scenario.is_active == True,
-            )
-            .count()
-        )
+        suite_counts = counts.get(suite.id, read_models.SuiteScenarioCounts())
+        suite._all_scenario_count = suite_counts.all
+        suite._active_scenario_count = suite_counts.active
     return templates.TemplateResponse("suites/list.html", {
         "request": request,
         "suites": suites,
@@ -60,6 +50,7 @@ async def suite_new_form(request: Request, db: Session = Depends(get_db)):
         "scenarios": scenarios,
         "assigned_ids": [],
         "title": "Nowa Suite",
+        "flaky_policies": flakiness.POLICIES,
     })
 
 
@@ -71,6 +62,7 @@ async def suite_create(
     description: str = Form(""),
     workers: int = Form(2),
     is_active: bool = Form(False),
+    flaky_policy: str = Form(flakiness.POLICY_OFF),
     scenario_ids: list[int] = Form(default=[]),
 ):
     user = get_current_user(request)
@@ -80,6 +72,7 @@ async def suite_create(
         description=description or None,
         workers=workers,
         is_active=is_active,
+        flaky_policy=_flaky_policy(flaky_policy),
         created_by=username,
         updated_by=username,
     )
@@ -108,6 +101,7 @@ async def suite_detail(suite_id: int, request: Request, db: Session = Depends(ge
             Scenario.is_active == True,
         )
         .order_by(SuiteScenario.order)
+        .options(joinedload(SuiteScenario.scenario))
         .all()
     )
     return templates.TemplateResponse("suites/detail.html", {
@@ -138,6 +132,7 @@ async def suite_edit_form(suite_id: int, request: Request, db: Session = Depends
         "scenarios": scenarios,
         "assigned_ids": assigned_ids,
         "title": f"Edycja: {suite.name}",
+        "flaky_policies": flakiness.POLICIES,
     })
 
 
@@ -150,6 +145,7 @@ async def suite_update(
     description: str = Form(""),
     workers: int = Form(2),
     is_active: bool = Form(False),
+    flaky_policy: str = Form(flakiness.POLICY_OFF),
     scenario_ids: list[int] = Form(default=[]),
 ):
     suite = _get_or_404(db, suite_id)
@@ -158,6 +154,7 @@ async def suite_update(
     suite.description = description or None
     suite.workers = workers
     suite.is_active = is_active
+    suite.flaky_policy = _flaky_policy(flaky_policy)
     suite.updated_by = user["username"] if user else None
 
     _sync_suite_scenarios(db, suite_id, scenario_ids)
@@ -214,6 +211,12 @@ def _get_or_404(db: Session, suite_id: int) -> Suite:
     return suite
 
 
+def _flaky_policy(value: str) -> str:
+    if value not in flakiness.POLICIES:
+        raise HTTPException(status_code=400, detail=f"Nieznana polityka flakiness: {value}")
+    return value
+
+
 def _sync_suite_scenarios(db: Session, suite_id: int, scenario_ids: list[int]):
     """
     Synchronizuje SuiteScenario dla danej suite.
@@ -6,13 +6,15 @@ import logging
 from datetime import datetime, timezone
 from pathlib import Path
 
+from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from croniter import croniter
 
 from database import SessionLocal
 from app.models.scheduled_job import ScheduledJob
-from core import runner_registry
+from core import runner_registry, retention, archive, metrics
+from core.config import settings
 
 Path("logs").mkdir(exist_ok=True)
 
@@ -30,9 +32,19 @@ _apscheduler_logger.addHandler(_handler)
 
 scheduler = AsyncIOScheduler(timezone="UTC")
 
+# Limit liczenia przespanych terminów jednego joba (np. cron co minutę po tygodniu przestoju)
+MISSED_RUNS_LIMIT = 1000
+
 
 def start():
     scheduler.add_job(tick, "interval", minutes=1, id="scheduler_tick", replace_existing=True)
+    if settings.retention_enabled or settings.archive_enabled:
+        scheduler.add_job(
+            retention_pass, "interval", hours=settings.retention_interval_hours,
+            id="retention", replace_existing=True,
+        )
+    scheduler.add_listener(_on_job_submitted, EVENT_JOB_SUBMITTED)
+    scheduler.add_listener(_on_job_missed, EVENT_JOB_MISSED)
     scheduler.start()
     logger.info("[Scheduler] Uruchomiony — tick co minutę")
 
@@ -53,6 +65,10 @@ async def tick():
         ).all()
 
         for job in jobs:
+            missed = _missed_runs(job.cron, job.next_run_at, now)
+            if missed:
+                metrics.SCHEDULER_MISSED_RUNS.inc(missed, job=f"job #{job.id}")
+                logger.warning(f"[Scheduler] Job #{job.id} — pominięte terminy: {missed}")
             logger.info(f"[Scheduler] Uruchamiam job #{job.id} — {job.suite.name} @ {job.environment.name}")
             try:
                 # Import tutaj żeby uniknąć circular import
@@ -83,6 +99,55 @@ async def tick():
         db.close()
 
 
+async def retention_pass():
+    """Cykliczna archiwizacja i retencja — archiwum najpierw, żeby retencja nie usunęła runów do archiwizacji."""
+    try:
+        archive_report = await archive.run_scheduled()
+        if archive_report:
+            logger.info(f"[Scheduler] Archiwum: {archive_report.summary()}")
+    except Exception as e:
+        logger.error(f"[Scheduler] Błąd archiwizacji: {e}")
+
+    try:
+        report = await retention.run_scheduled()
+        if report:
+            logger.info(f"[Scheduler] Retencja: {report.summary()}")
+    except Exception as e:
+        logger.error(f"[Scheduler] Błąd retencji: {e}")
+
+
+# ── Metryki ───────────────────────────────────────────────────────────────────
+
+def _on_job_submitted(event) -> None:
+    """Opóźnienie startu ticka względem planu APSchedulera (zablokowany event loop, uśpiony host)."""
+    if event.job_id != "scheduler_tick" or not event.scheduled_run_times:
+        return
+    lag = (datetime.now(timezone.utc) - event.scheduled_run_times[-1]).total_seconds()
+    metrics.SCHEDULER_TICK_LAG.set(max(0.0, lag))
+
+
+def _missed_runs(cron: str, next_run_at: datetime | None, now: datetime) -> int:
+    """Terminy cron między zaplanowanym next_run_at a teraz — uruchomimy tylko jeden z nich."""
+    if next_run_at is None:
+        return 0
+    if next_run_at.tzinfo is None:
+        next_run_at = next_run_at.replace(tzinfo=timezone.utc)
+    try:
+        cron_iter = croniter(cron, next_run_at)
+    except Exception:
+        return 0
+    missed = 0
+    while missed < MISSED_RUNS_LIMIT and cron_iter.get_next(datetime) <= now:
+        missed += 1
+    return missed
+
+
+def _on_job_missed(event) -> None:
+    """Misfire APSchedulera — job wewnętrzny (tick, retencja) nie wystartował w misfire_grace_time."""
+    metrics.SCHEDULER_MISSED_RUNS.inc(job=event.job_id)
+    logger.warning(f"[Scheduler] Pominięte uruchomienie {event.job_id} (planowane {event.scheduled_run_time})")
+
+
 def _next_run(cron: str) -> datetime:
     """Oblicza następny czas uruchomienia dla wyrażenia cron."""
     now = datetime.now(timezone.utc)
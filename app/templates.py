@@ -7,6 +7,10 @@ templates = Jinja2Templates(directory="app/templates")
 from core.auth_core import get_current_user as _get_current_user
 templates.env.globals["get_current_user"] = _get_current_user
 
+# (pełny obraz, miniatura) screenshotu snapshotu — magazyn artefaktów lub stara ścieżka
+from core.artifact_store import screenshot_urls as _screenshot_urls
+templates.env.globals["screenshot_urls"] = _screenshot_urls
+
 # Custom filter dla Jinja2
 def duration(seconds):
     """Konwertuje sekundy na czytelny format."""
@@ -0,0 +1,311 @@
+"""
+Load — benchmark obciążeniowy tras panelu uruchamiany w procesie (httpx.AsyncClient + ASGITransport).
+
+Odpowiedzialności:
+  1. Przygotowuje bazę: istniejącą (--db, np. wypełnioną seed_history.py --profile large)
+     albo tymczasową z presetu generatora historii
+  2. Dla każdej trasy i poziomu współbieżności uruchamia N wirtualnych użytkowników,
+     którzy wspólnie wykonują zadaną liczbę żądań
+  3. Mierzy przepustowość (req/s), p50/p95/p99, błędy oraz liczbę zapytań SQL i czas bazy
+     na żądanie (z nagłówka Server-Timing — core/db_metrics.py)
+  4. Zapisuje wyniki jako JSON; --compare pokazuje zmiany względem wcześniejszego pliku
+
+Bez serwera HTTP i sieci — mierzy aplikację (routing, middleware, zapytania, szablony).
+Lifespan (scheduler) nie jest uruchamiany. /dashboard korzysta z response_cache,
+więc po pierwszym żądaniu mierzy trafienia w cache — tak jak w produkcji.
+
+Użycie:
+    python benchmarks/load.py                                   # baza tymczasowa, preset small
+    python benchmarks/load.py --profile medium --concurrency 1,10,50
+    python benchmarks/load.py --db perf.db --requests 500       # istniejąca duża baza
+    python benchmarks/load.py --routes alerts,dashboard --out before.json
+    python benchmarks/load.py --db perf.db --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# Nazwa → szablon URL; {suite_run_id} to suite run ze środka historii
+ROUTES = {
+    "dashboard":          "/dashboard",
+    "alerts":             "/alerts",
+    "suite_runs":         "/suite-runs",
+    "scenarios":          "/scenarios",
+    "suite_run_detail":   "/suite-runs/{suite_run_id}",
+    "suite_run_logs":     "/suite-runs/{suite_run_id}/logs",
+    "suite_run_log_tail": "/suite-runs/{suite_run_id}/logs/tail",
+}
+
+# Syntetyczny log dla suite runu bez pliku w logs/ (usuwany po benchmarku)
+SYNTHETIC_LOG_LINES = 20_000
+
+# db;dur=12.3;desc="7 queries" — nagłówek DbMetricsMiddleware
+_SERVER_TIMING_DB_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+@dataclass
+class RouteResult:
+    route: str
+    url: str
+    concurrency: int
+    requests: int
+    errors: int
+    duration_s: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    queries_per_request: float
+    queries_max: int
+    db_ms_per_request: float
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Percentyl metodą najbliższej rangi."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _db_timing(response) -> tuple[int, float]:
+    """(zapytania, ms w bazie) z nagłówka Server-Timing; (0, 0.0) gdy DB_METRICS_ENABLED=false."""
+    match = _SERVER_TIMING_DB_RE.search(response.headers.get("server-timing", ""))
+    if not match:
+        return 0, 0.0
+    return int(match.group(2)), float(match.group(1))
+
+
+# ── Przygotowanie ─────────────────────────────────────────────────────────────
+
+def _write_synthetic_log(path: Path) -> None:
+    levels = ("DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for i in range(SYNTHETIC_LOG_LINES):
+            level = levels[i % len(levels)]
+            fh.write(f"12:{i // 3600 % 60:02d}:{i % 60:02d} | {level:<8} | "
+                     f"[Scenariusz {i % 8 + 1}] krok {i}: koszyk, dostawa, płatność — ok\n")
+
+
+def _target_suite_run_id(session_factory) -> int:
+    from app.models.suite_run import SuiteRun
+
+    db = session_factory()
+    try:
+        count = db.query(SuiteRun).count()
+        if not count:
+            raise RuntimeError("Baza nie ma suite runów — wypełnij ją: python seed_history.py")
+        return db.query(SuiteRun.id).order_by(SuiteRun.id).offset(count // 2).first()[0]
+    finally:
+        db.close()
+
+
+# ── Pomiar ────────────────────────────────────────────────────────────────────
+
+async def _measure(client, route: str, url: str, concurrency: int, total: int) -> RouteResult:
+    latencies: list[float] = []
+    queries: list[int] = []
+    db_ms: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def user():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(url)
+                if response.status_code >= 400:
+                    errors += 1
+                count, ms = _db_timing(response)
+                queries.append(count)
+                db_ms.append(ms)
+            except Exception:
+                errors += 1
+            finally:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    latencies.sort()
+    return RouteResult(
+        route=route, url=url, concurrency=concurrency, requests=len(latencies), errors=errors,
+        duration_s=round(duration, 3),
+        rps=round(len(latencies) / duration, 1) if duration else 0.0,
+        mean_ms=round(sum(latencies) / len(latencies), 2),
+        p50_ms=round(_percentile(latencies, 50), 2),
+        p95_ms=round(_percentile(latencies, 95), 2),
+        p99_ms=round(_percentile(latencies, 99), 2),
+        max_ms=round(latencies[-1], 2),
+        queries_per_request=round(sum(queries) / len(queries), 1) if queries else 0.0,
+        queries_max=max(queries, default=0),
+        db_ms_per_request=round(sum(db_ms) / len(db_ms), 2) if db_ms else 0.0,
+    )
+
+
+async def run_benchmark(app, routes: dict[str, str], levels: list[int], total: int, warmup: int) -> list[RouteResult]:
+    import httpx
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for route, url in routes.items():
+            for _ in range(warmup):
+                await client.get(url)
+            for concurrency in levels:
+                result = await _measure(client, route, url, concurrency, total)
+                results.append(result)
+                print(f"  {route:<20} c={concurrency:<4} {result.rps:>8.1f} req/s  "
+                      f"p50={result.p50_ms:>8.1f}  p95={result.p95_ms:>8.1f}  p99={result.p99_ms:>8.1f} ms  "
+                      f"q/req={result.queries_per_request:>5.1f}  db={result.db_ms_per_request:>7.1f} ms  err={result.errors}")
+    return results
+
+
+# ── Raport ────────────────────────────────────────────────────────────────────
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _row_counts(engine) -> dict[str, int]:
+    with engine.connect() as conn:
+        return {
+            table: conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+            for table in ("suite_runs", "scenario_runs", "alert_groups", "alerts", "basket_snapshots", "api_errors")
+        }
+
+
+def _delta(old: float, new: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def compare(previous_path: str, results: list[RouteResult]) -> None:
+    previous = {(r["route"], r["concurrency"]): r for r in json.loads(Path(previous_path).read_text())["results"]}
+    print(f"\nPorównanie z {previous_path}:")
+    print(f"  {'trasa':<20} {'c':>4} {'req/s':>20} {'p95 ms':>22} {'q/req':>12}")
+    for r in results:
+        old = previous.get((r.route, r.concurrency))
+        if old is None:
+            continue
+        print(f"  {r.route:<20} {r.concurrency:>4} "
+              f"{old['rps']:>7.1f}→{r.rps:<7.1f}{_delta(old['rps'], r.rps)} "
+              f"{old['p95_ms']:>7.1f}→{r.p95_ms:<7.1f}{_delta(old['p95_ms'], r.p95_ms)} "
+              f"{old['queries_per_request']:>5.1f}→{r.queries_per_request:<5.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark obciążeniowy tras panelu (w procesie)")
+    parser.add_argument("--db", help="Istniejąca baza SQLite (domyślnie tymczasowa z generatora)")
+    parser.add_argument("--profile", default="small", help="Preset seed_history.py dla bazy tymczasowej")
+    parser.add_argument("--routes", help=f"Trasy po przecinku (domyślnie wszystkie: {','.join(ROUTES)})")
+    parser.add_argument("--concurrency", default="1,10", help="Poziomy współbieżności, np. 1,10,50")
+    parser.add_argument("--requests", type=int, default=200, help="Żądań na trasę i poziom (domyślnie 200)")
+    parser.add_argument("--warmup", type=int, default=3, help="Żądań rozgrzewających na trasę")
+    parser.add_argument("--out", help="Plik wyników JSON (domyślnie benchmarks/results/load-<czas>.json)")
+    parser.add_argument("--compare", help="Wcześniejszy plik wyników do porównania")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.routes.split(",")] if args.routes else list(ROUTES)
+    unknown = [n for n in names if n not in ROUTES]
+    if unknown:
+        parser.error(f"Nieznane trasy: {', '.join(unknown)}")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    tmp_dir = None
+    if args.db:
+        db_path = Path(args.db).resolve()
+        if not db_path.exists():
+            parser.error(f"Brak bazy: {db_path}")
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix="load_")
+        db_path = Path(tmp_dir) / "load.db"
+
+    # Przed importem aplikacji — database.py tworzy silnik z DATABASE_URL
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+
+    from app.main import app
+    from app.models import Base
+    from core import log_reader
+    from database import SessionLocal, engine
+    from seed_history import PROFILES, generate
+
+    created_log = None
+    try:
+        if tmp_dir:
+            Base.metadata.create_all(engine)
+            generate(engine, PROFILES[args.profile])
+
+        suite_run_id = _target_suite_run_id(SessionLocal)
+        log_file = log_reader.log_path(suite_run_id)
+        if not log_file.exists():
+            _write_synthetic_log(log_file)
+            created_log = log_file
+
+        routes = {name: ROUTES[name].format(suite_run_id=suite_run_id) for name in names}
+        print(f"\nBaza: {db_path}\nWspółbieżność: {levels}, żądań na poziom: {args.requests}\n")
+
+        results = asyncio.run(run_benchmark(app, routes, levels, args.requests, args.warmup))
+
+        output = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "database": str(db_path) if args.db else f"tmp:{args.profile}",
+                "rows": _row_counts(engine),
+                "concurrency": levels,
+                "requests": args.requests,
+            },
+            "results": [asdict(r) for r in results],
+        }
+        out = Path(args.out) if args.out else RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(output, ensure_ascii=False, indent=2))
+        print(f"\nZapisano: {out}")
+
+        if args.compare:
+            compare(args.compare, results)
+    finally:
+        if created_log:
+            created_log.unlink(missing_ok=True)
+        engine.dispose()
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    failed = [r for r in results if r.errors]
+    if failed:
+        print(f"\n❌ Błędy w {len(failed)} pomiarach: " + ", ".join(f"{r.route}@{r.concurrency}" for r in failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
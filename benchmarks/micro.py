@@ -0,0 +1,602 @@
+"""
+Micro — mikrobenchmarki gorących ścieżek czystego Pythona: reguły etapów, przetwarzanie
+wyników reguł, AlertEngine i finalizacja suite runu z deduplikacją alert_groups.
+
+Odpowiedzialności:
+  1. Przypadki w stylu pytest-benchmark: przygotowanie (setup) poza pomiarem, N rund,
+     min / mediana / średnia / odchylenie / wywołań na sekundę
+  2. Dane syntetyczne: RunData (przebieg czysty i z alertami na każdym etapie, 10 / 1000
+     opcji dostaw i płatności), wyniki scenariuszy z 10 / 1k / 10k alertami,
+     100 / 10k istniejących alert_groups we wszystkich statusach workflow,
+     1k / 10k szeregów cen z pełnym oknem historii (detekcja anomalii, wymaga NumPy),
+     1k / 10k żądań XHR jednego runu z identyfikatorami w ścieżkach (TrafficRecorder)
+  3. Baza SQLite w pamięci per rozmiar historii — schemat z modeli, wiersze wstawiane
+     hurtowo, indeks alert_fts przebudowany przed pomiarem; przypadki zapisujące do bazy
+     działają w transakcji wycofywanej po każdej rundzie (każda runda na tym samym stanie)
+  4. Tabela w konsoli + JSON w benchmarks/results/micro-<czas>.json; --compare pokazuje
+     zmianę mediany względem wcześniejszego pliku
+
+Mierzony jest kod w obecnej postaci — łącznie z zapytaniami per alert w AlertEngine
+i per kandydat w deduplikacji. Logi są tworzone, ale nie zapisywane (NullHandler).
+
+Użycie:
+    python benchmarks/micro.py
+    python benchmarks/micro.py --quick                     # bez przypadków 10k
+    python benchmarks/micro.py --filter finalize,dedupe
+    python benchmarks/micro.py --out before.json
+    python benchmarks/micro.py --compare before.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+SEED = 42
+
+# Reguły biznesowe alertów syntetycznych (każda z AlertConfig)
+RULES = [f"BENCH_RULE_{i:03d}" for i in range(50)]
+
+# Scenariusze, do których należą alerty i grupy — wspólna pula, żeby zbiory scenario_ids
+# w grupach i w nowych alertach się pokrywały (ścieżki subset/superset deduplikacji)
+SCENARIO_POOL = 500
+
+# Historia suite runów środowiska
+SUITE_RUNS = 200
+
+
+@dataclass
+class Case:
+    name: str
+    group: str
+    fn: Callable[[Any], Any]                     # mierzone — argumentem jest wynik setup
+    setup: Callable[[], Any] | None = None
+    teardown: Callable[[Any], None] | None = None
+    rounds: int = 20
+    inner: int = 1                               # wywołań fn na rundę (szybkie funkcje)
+    size: int = 0                                # rozmiar danych — do pominięcia przez --quick
+
+
+@dataclass
+class CaseResult:
+    name: str
+    group: str
+    rounds: int
+    inner: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    stddev_ms: float
+    max_ms: float
+    ops: float                                   # wywołań na sekundę (z mediany)
+
+
+def run_case(case: Case) -> CaseResult:
+    timings = []
+    for _ in range(case.rounds):
+        arg = case.setup() if case.setup else None
+        try:
+            started = time.perf_counter()
+            for _ in range(case.inner):
+                case.fn(arg)
+            timings.append((time.perf_counter() - started) / case.inner)
+        finally:
+            if case.teardown:
+                case.teardown(arg)
+
+    median = statistics.median(timings)
+    return CaseResult(
+        name=case.name,
+        group=case.group,
+        rounds=case.rounds,
+        inner=case.inner,
+        min_ms=round(min(timings) * 1000, 4),
+        median_ms=round(median * 1000, 4),
+        mean_ms=round(statistics.fmean(timings) * 1000, 4),
+        stddev_ms=round(statistics.stdev(timings) * 1000, 4) if len(timings) > 1 else 0.0,
+        max_ms=round(max(timings) * 1000, 4),
+        ops=round(1 / median, 1) if median else 0.0,
+    )
+
+
+# ── Baza ──────────────────────────────────────────────────────────────────────
+
+class Fixture:
+    """Baza w pamięci z suite, środowiskiem, słownikiem alertów i historią alert_groups."""
+
+    def __init__(self, groups: int):
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import StaticPool
+
+        from app.models import Base
+
+        self.groups = groups
+        self.engine = create_engine("sqlite://", poolclass=StaticPool,
+                                    connect_args={"check_same_thread": False})
+        Base.metadata.create_all(self.engine)
+        self._populate()
+
+    def _populate(self) -> None:
+        from app.models.alert_config import AlertConfig
+        from app.models.alert_group import AlertGroup, AlertStatus, ResolutionType
+        from app.models.alert_type import AlertType
+        from app.models.environment import Environment
+        from app.models.suite import Suite
+        from app.models.suite_run import SuiteRun, SuiteRunStatus
+        from core import alert_search
+
+        rnd = random.Random(SEED + self.groups)
+        now = datetime.now(timezone.utc)
+        # (status, resolution_type) — cały workflow, z przewagą aktywnych
+        states = [
+            (AlertStatus.OPEN, None), (AlertStatus.OPEN, None), (AlertStatus.IN_PROGRESS, None),
+            (AlertStatus.AWAITING_FIX, ResolutionType.BUG.value),
+            (AlertStatus.AWAITING_TEST_UPDATE, ResolutionType.SCRIPT_FIX.value),
+            (AlertStatus.CLOSED, ResolutionType.NAB.value),
+            (AlertStatus.CLOSED, ResolutionType.CANT_REPRODUCE.value),
+            (AlertStatus.CLOSED, ResolutionType.DUPLICATE.value),
+        ]
+
+        with self.engine.begin() as conn:
+            conn.execute(AlertType.__table__.insert(), [
+                {"name": "Bug", "slug": "bug", "is_active": True},
+                {"name": "Do weryfikacji", "slug": "verify", "is_active": True},
+            ])
+            conn.execute(AlertConfig.__table__.insert(), [
+                {"name": f"Reguła {rule}", "business_rule": rule, "alert_type_id": 1 + i % 2, "is_active": True}
+                for i, rule in enumerate(RULES)
+            ])
+            self.environment_id = conn.execute(Environment.__table__.insert().values(
+                name="BENCH", base_url="http://127.0.0.1", type="web", is_active=True,
+            )).inserted_primary_key[0]
+            self.suite_id = conn.execute(Suite.__table__.insert().values(
+                name="Bench", workers=4, is_active=True,
+            )).inserted_primary_key[0]
+            conn.execute(SuiteRun.__table__.insert(), [
+                {
+                    "suite_id": self.suite_id, "environment_id": self.environment_id,
+                    "status": SuiteRunStatus.SUCCESS.name, "triggered_by": "bench",
+                    "started_at": now - timedelta(hours=SUITE_RUNS - i),
+                    "finished_at": now - timedelta(hours=SUITE_RUNS - i) + timedelta(minutes=10),
+                }
+                for i in range(SUITE_RUNS)
+            ])
+
+            rows = []
+            for i in range(self.groups):
+                status, resolution = states[i % len(states)]
+                last_run = rnd.randint(1, SUITE_RUNS)
+                rows.append({
+                    "environment_id": self.environment_id,
+                    "last_suite_run_id": last_run,
+                    "suite_run_history": json.dumps(sorted(rnd.sample(range(1, last_run + 1), min(last_run, 5)))),
+                    "business_rule": RULES[i % len(RULES)],
+                    "alert_type": "bug",
+                    "title": f"Reguła {RULES[i % len(RULES)]}",
+                    "occurrence_count": 1,
+                    "scenario_ids": json.dumps(sorted(rnd.sample(range(1, SCENARIO_POOL + 1), rnd.randint(1, 5)))),
+                    "repeat_count": rnd.randint(1, 20),
+                    "clean_runs_count": 0,
+                    "status": status.name,
+                    "resolution_type": resolution,
+                    # Duplikat wskazuje na grupę czekającą na fix — ścieżka „cichy repeat”
+                    "duplicate_of_id": i - 4 + 1 if resolution == ResolutionType.DUPLICATE.value else None,
+                    "first_seen_at": now - timedelta(days=30),
+                    "last_seen_at": now - timedelta(hours=rnd.randint(1, SUITE_RUNS)),
+                })
+            if rows:
+                conn.execute(AlertGroup.__table__.insert(), rows)
+            alert_search.rebuild_index(conn)
+
+    def session(self):
+        """Sesja w zewnętrznej transakcji — commit kodu zwalnia savepoint, rollback cofa rundę."""
+        from sqlalchemy.orm import Session
+
+        conn = self.engine.connect()
+        transaction = conn.begin()
+        return Session(bind=conn, join_transaction_mode="create_savepoint"), transaction, conn
+
+    @staticmethod
+    def rollback(db, transaction, conn) -> None:
+        db.close()
+        transaction.rollback()
+        conn.close()
+
+
+_fixtures: dict[int, Fixture] = {}
+
+
+def fixture(groups: int) -> Fixture:
+    """Baza budowana przy pierwszym przypadku, który jej potrzebuje (poza pomiarem rundy)."""
+    if groups not in _fixtures:
+        print(f"  (baza w pamięci: {groups} alert_groups)")
+        _fixtures[groups] = Fixture(groups)
+    return _fixtures[groups]
+
+
+# ── Dane syntetyczne ──────────────────────────────────────────────────────────
+
+def scenario_context(options: int):
+    from scenarios.contexts.scenario_context import ScenarioContext
+
+    return ScenarioContext(
+        scenario_id=1,
+        scenario_name="Bench",
+        environment_url="http://127.0.0.1",
+        environment_name="BENCH",
+        listing_urls=["/s?k=laptop"],
+        delivery_name=f"Dostawa {options - 1}",          # ostatnia na liście — pełne przeszukanie
+        delivery_cutoff="14:00",
+        payment_name=f"Płatność {options - 1}",
+        postal_code="00-001",
+        flags={"company_address": True},
+    )
+
+
+def run_data(options: int, with_alerts: bool):
+    from scenarios.run_data import (
+        Cart0Data, Cart1Data, Cart2Data, Cart3Data, Cart4Data, HomeData, ProductData, RunData,
+    )
+
+    deliveries = [f"Dostawa {i}" for i in range(options)]
+    payments = [f"Płatność {i}" for i in range(options)]
+    product = ProductData(name="Laptop", price=3999.0, url="/p/1")
+    # Wariant z alertami: różnice cen, godziny granicznej, kodu i podsumowania — bez stopu
+    drift = 10.0 if with_alerts else 0.0
+    return RunData(
+        home=HomeData(loaded=True),
+        listing=product,
+        cart0=Cart0Data(total_price=3999.0 + drift, item_count=1, products=[product]),
+        cart1=Cart1Data(
+            available_options=deliveries, selected=deliveries[-1], cutoff_time="16:00" if with_alerts else "14:00",
+            price=19.99, postal_code_required=True, postal_code_filled=True,
+        ),
+        cart2=Cart2Data(available_options=payments, selected=payments[-1], price=0.0),
+        cart3=Cart3Data(postal_code="99-999" if with_alerts else "00-001", street="Prosta 1", city="Warszawa"),
+        cart4=Cart4Data(
+            total_price=3999.0 + 19.99 + drift * 2, delivery_name="Inna" if with_alerts else deliveries[-1],
+            delivery_price=19.99, payment_name="Inna" if with_alerts else payments[-1],
+        ),
+    )
+
+
+def scenario_results(alerts: int) -> list[dict]:
+    """Wyniki scenariuszy w formacie run_with_limit — alerty rozłożone na scenariusze i reguły."""
+    rnd = random.Random(SEED + alerts)
+    per_scenario = max(1, min(20, alerts // 50))
+    results = []
+    scenario_ids = rnd.sample(range(1, SCENARIO_POOL + 1), min(SCENARIO_POOL, -(-alerts // per_scenario)))
+    remaining = alerts
+    for scenario_id in scenario_ids:
+        count = min(per_scenario, remaining)
+        remaining -= count
+        results.append({
+            "scenario_id": scenario_id,
+            "status": "failed" if count else "success",
+            "alerts": [
+                {"business_rule": rule, "alert_type": "bug", "title": f"Reguła {rule}"}
+                for rule in (RULES[rnd.randrange(len(RULES))] for _ in range(count))
+            ],
+        })
+    # Reszta (gdy pula scenariuszy mniejsza niż potrzeba) — dopisana do ostatnich scenariuszy
+    for i in range(remaining):
+        rule = RULES[i % len(RULES)]
+        results[i % len(results)]["alerts"].append({"business_rule": rule, "alert_type": "bug", "title": f"Reguła {rule}"})
+    return results
+
+
+# ── Przypadki ─────────────────────────────────────────────────────────────────
+
+def rules_cases() -> list[Case]:
+    from scenarios.rules import (
+        Cart0Rules, Cart1Rules, Cart2Rules, Cart3Rules, Cart4Rules, GlobalRules, HomeRules, ListingRules,
+    )
+
+    stages = (HomeRules, ListingRules, Cart0Rules, Cart1Rules, Cart2Rules, Cart3Rules, Cart4Rules, GlobalRules)
+    cases = []
+    for options in (10, 1000):
+        context = scenario_context(options)
+        for with_alerts in (False, True):
+            data = run_data(options, with_alerts)
+
+            def check_all(_, context=context, data=data):
+                # Jak ShopRunner._check_rules — nowa instancja reguł na każdy etap
+                for rules_cls in stages:
+                    rules_cls(context, None).check(data)
+
+            variant = "alerts" if with_alerts else "clean"
+            cases.append(Case(f"rules.all_stages[{variant},options={options}]", "rules", check_all,
+                              rounds=20, inner=200 if options == 10 else 50))
+    return cases
+
+
+def process_result_cases() -> list[Case]:
+    from core import event_bus
+    from scenarios.rules_result import AlertResult, RulesResult
+    from scenarios.shop_runner import ShopRunner
+
+    cases = []
+    for alerts in (10, 1000, 10_000):
+        result = RulesResult(
+            alerts=[AlertResult(business_rule=RULES[i % len(RULES)], description=f"Opis {i}") for i in range(alerts)],
+            instructions={"requires_postal_code": True},
+        )
+
+        def setup(context=scenario_context(10)):
+            return ShopRunner(page=None, scenario_context=context, events=event_bus.EventPublisher(None, run_id=1))
+
+        cases.append(Case(f"shop_runner.process_result[alerts={alerts}]", "shop_runner",
+                          lambda runner, result=result: runner._process_result(result, "cart1"),
+                          setup=setup, rounds=100 if alerts <= 1000 else 10, size=alerts))
+    return cases
+
+
+def alert_engine_cases() -> list[Case]:
+    from core.alert_engine import AlertEngine
+
+    cases = []
+    for alerts in (10, 1000, 10_000):
+        def setup():
+            db, transaction, conn = fixture(100).session()
+            engine = AlertEngine(run_id=1, scenario_id=1, environment_id=fixture(100).environment_id, db=db)
+            return engine, (db, transaction, conn)
+
+        def add_and_save(arg, alerts=alerts):
+            engine, _ = arg
+            for i in range(alerts):
+                engine.add_alert(RULES[i % len(RULES)], description=f"Opis {i}")
+            engine.save_all()
+
+        cases.append(Case(f"alert_engine.add_and_save[alerts={alerts}]", "alert_engine", add_and_save,
+                          setup=setup, teardown=lambda arg: Fixture.rollback(*arg[1]),
+                          rounds=20 if alerts <= 1000 else 3, size=alerts))
+    return cases
+
+
+def dedupe_cases() -> list[Case]:
+    from app.models.alert_group import AlertGroup
+    from scenarios.suite_executor import SuiteExecutor
+
+    cases = []
+    for groups in (100, 10_000):
+        rnd = random.Random(SEED + groups)
+        candidates = [
+            AlertGroup(scenario_ids=json.dumps(sorted(rnd.sample(range(1, SCENARIO_POOL + 1), rnd.randint(2, 5)))))
+            for _ in range(groups)
+        ]
+        # Zbiór rozłączny z każdym kandydatem — najgorszy przypadek, pełny przegląd listy
+        new_ids = [SCENARIO_POOL + 1, SCENARIO_POOL + 2]
+        executor = SuiteExecutor.__new__(SuiteExecutor)
+        cases.append(Case(f"dedupe.find_matching_candidate[groups={groups}]", "dedupe",
+                          lambda _, candidates=candidates: executor._find_matching_candidate(candidates, new_ids),
+                          rounds=20, inner=50 if groups == 100 else 1, size=groups))
+    return cases
+
+
+def finalize_cases() -> list[Case]:
+    from app.models.environment import Environment
+    from app.models.suite import Suite
+    from app.models.suite_run import SuiteRun, SuiteRunStatus
+    from scenarios.suite_executor import SuiteExecutor
+
+    cases = []
+    for groups in (100, 10_000):
+        for alerts in (10, 1000, 10_000):
+            results = scenario_results(alerts)
+
+            def setup(groups=groups, results=results):
+                base = fixture(groups)
+                db, transaction, conn = base.session()
+                suite_run = SuiteRun(
+                    suite_id=base.suite_id, environment_id=base.environment_id,
+                    status=SuiteRunStatus.RUNNING, total_scenarios=len(results), triggered_by="bench",
+                )
+                db.add(suite_run)
+                db.flush()
+                executor = SuiteExecutor(
+                    suite=db.get(Suite, base.suite_id), environment=db.get(Environment, base.environment_id),
+                    scenarios=[], workers=1, headless=True, db=db,
+                )
+                return executor, suite_run, results, (db, transaction, conn)
+
+            cases.append(Case(
+                f"suite_executor.finalize[alerts={alerts},groups={groups}]", "finalize",
+                lambda arg: arg[0]._finalize_suite_run(arg[1], arg[2]),
+                setup=setup, teardown=lambda arg: Fixture.rollback(*arg[3]),
+                rounds=10 if max(alerts, groups) < 10_000 else 3, size=max(alerts, groups),
+            ))
+    return cases
+
+
+def flakiness_cases() -> list[Case]:
+    from app.models.suite_run import SuiteRun, SuiteRunStatus
+    from core import flakiness
+
+    cases = []
+    for alerts in (1000, 10_000):
+        results = scenario_results(alerts)
+
+        def setup(results=results):
+            base = fixture(100)
+            db, transaction, conn = base.session()
+            suite_run = SuiteRun(
+                suite_id=base.suite_id, environment_id=base.environment_id,
+                status=SuiteRunStatus.RUNNING, total_scenarios=len(results), triggered_by="bench",
+            )
+            db.add(suite_run)
+            db.flush()
+            # Stan ustalony — liczniki wszystkich scenariuszy i reguł już istnieją
+            flakiness.update_for_suite_run(db, suite_run, results)
+            db.flush()
+            return db, suite_run, (db, transaction, conn)
+
+        cases.append(Case(
+            f"flakiness.update[alerts={alerts},scenarios={len(results)}]", "flakiness",
+            lambda arg, results=results: (flakiness.update_for_suite_run(arg[0], arg[1], results), arg[0].flush()),
+            setup=setup, teardown=lambda arg: Fixture.rollback(*arg[2]),
+            rounds=10, size=alerts,
+        ))
+    return cases
+
+
+def price_series_cases() -> list[Case]:
+    from core import price_series
+    from core.config import settings
+
+    if price_series.np is None:
+        return []
+
+    cases = []
+    for count in (1000, 10_000):
+        rnd = random.Random(SEED)
+        series = {}
+        for i in range(count):
+            base = rnd.uniform(19, 4999)
+            for stage in ("listing", "cart0"):
+                series[(f"/p/{i}", stage)] = [
+                    price_series._Point(run_id=run, scenario_id=i, price=round(base * rnd.choice((1, 1, 1, 0.9, 1.2)), 2))
+                    for run in range(settings.price_window)
+                ]
+        current_runs = {settings.price_window - 1}
+
+        cases.append(Case(f"price_series.anomalies[series={count * 2}]", "price_series",
+                          lambda _, series=series, current_runs=current_runs:
+                          price_series._anomalies(series, current_runs),
+                          rounds=10, size=count))
+    return cases
+
+
+def api_stats_cases() -> list[Case]:
+    from core import api_stats
+
+    paths = ("/api/cart", "/api/products/{}/availability", "/api/delivery/options",
+             "/api/orders/{}/status", "/api/recommendations")
+    cases = []
+    for count in (1000, 10_000):
+        rnd = random.Random(SEED)
+        calls = [
+            ("GET", f"https://shop.example.com{rnd.choice(paths).format(rnd.randint(1, 10**6))}?v={i}",
+             rnd.lognormvariate(5, 0.5), rnd.choice((200, 200, 200, 200, 500)), rnd.randint(200, 5000))
+            for i in range(count)
+        ]
+
+        def record_run(_, calls=calls):
+            recorder = api_stats.TrafficRecorder("https://www.shop.example.com")
+            for method, url, duration, status, size in calls:
+                recorder.add(method, url, duration, status, size)
+            return recorder.summary()
+
+        cases.append(Case(f"api_stats.record_run[requests={count}]", "api_stats", record_run,
+                          rounds=10, size=count))
+    return cases
+
+
+# ── Raport ────────────────────────────────────────────────────────────────────
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _delta(old: float, new: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def _format_ms(value: float) -> str:
+    return f"{value * 1000:.1f} µs" if value < 1 else f"{value:.2f} ms"
+
+
+def print_result(result: CaseResult) -> None:
+    print(f"  {result.name:<52} {_format_ms(result.min_ms):>11} {_format_ms(result.median_ms):>11} "
+          f"{_format_ms(result.mean_ms):>11} ±{_format_ms(result.stddev_ms):<10} {result.ops:>12,.1f}/s")
+
+
+def compare(previous_path: str, results: list[CaseResult]) -> None:
+    previous = {r["name"]: r for r in json.loads(Path(previous_path).read_text())["results"]}
+    print(f"\nPorównanie mediany z {previous_path}:")
+    for r in results:
+        old = previous.get(r.name)
+        if old is None:
+            continue
+        print(f"  {r.name:<52} {_format_ms(old['median_ms']):>11} → {_format_ms(r.median_ms):<11} "
+              f"{_delta(old['median_ms'], r.median_ms)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Mikrobenchmarki reguł, AlertEngine i finalizacji suite runu")
+    parser.add_argument("--filter", help="Fragmenty nazw przypadków po przecinku, np. finalize,dedupe")
+    parser.add_argument("--quick", action="store_true", help="Bez przypadków z 10k alertów / grup")
+    parser.add_argument("--out", help="Plik wyników JSON (domyślnie benchmarks/results/micro-<czas>.json)")
+    parser.add_argument("--compare", help="Wcześniejszy plik wyników do porównania")
+    args = parser.parse_args()
+
+    # Przed importem aplikacji — database.py (listenery alert_fts) nie może wskazywać na prawdziwą bazę
+    os.environ["DATABASE_URL"] = "sqlite://"
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()], force=True)
+
+    import database  # noqa: F401 — zdarzenia ORM indeksu alert_fts, jak w procesie executora
+
+    patterns = [p.strip() for p in args.filter.split(",")] if args.filter else []
+    limit = 1000 if args.quick else 10_000
+
+    def wanted(case: Case) -> bool:
+        return case.size <= limit and (not patterns or any(p in case.name for p in patterns))
+
+    cases = (rules_cases() + process_result_cases() + dedupe_cases() + alert_engine_cases() + finalize_cases()
+             + flakiness_cases() + price_series_cases() + api_stats_cases())
+    cases = [case for case in cases if wanted(case)]
+    if not cases:
+        parser.error("Żaden przypadek nie pasuje do --filter")
+
+    print(f"\n  {'przypadek':<52} {'min':>11} {'mediana':>11} {'średnia':>11} {'odch.':<11} {'wywołań':>14}")
+    results = []
+    group = None
+    for case in cases:
+        if case.group != group:
+            group = case.group
+            print(f"  ── {group}")
+        result = run_case(case)
+        print_result(result)
+        results.append(result)
+
+    output = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "quick": args.quick,
+            "filter": patterns,
+        },
+        "results": [asdict(r) for r in results],
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"micro-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(output, ensure_ascii=False, indent=2))
+    print(f"\nZapisano: {out}")
+
+    if args.compare:
+        compare(args.compare, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+Mock Shop — lokalny sklep ze ścieżką home → listing → cart0..cart4 pod selektory page objects.
+
+Odpowiedzialności:
+  1. Strony z dokładnie tymi selektorami, których używają scenarios/pages
+     (.product-item .product-name, .delivery-option, .cart-total .price, przyciski
+     „Akceptuję”, „Dodaj do koszyka”, „Dalej”, „Zamawiam i płacę” …) — ShopRunner przechodzi
+     całą ścieżkę bez sieci
+  2. Stan koszyka w ciasteczku — każdy kontekst przeglądarki to osobny klient
+  3. Konfigurowalne zakłócenia: opóźnienie (+ jitter), wstrzykiwane błędy HTTP 500,
+     dryf ceny między listingiem a koszykiem, znikające formy dostawy i przesunięte
+     godziny graniczne — każde wyzwala odpowiadającą mu regułę (GLOBAL_PRICE_CHANGED,
+     CART1_DELIVERY_UNAVAILABLE, CART1_CUTOFF_MISMATCH)
+  4. Rejestracja środowiska MOCK w bazie (--register) — cel benchmarków całego executora
+  5. Endpointy JSON wołane przez fetch z listingu i koszyka (/api/products/{id}/availability,
+     /api/cart) — ruch XHR dla statystyk API (core/api_stats.py); podlegają tym samym
+     opóźnieniom i wstrzykiwanym błędom co strony
+
+Ceny i produkty są deterministyczne per zapytanie listingu (?k=), a zakłócenia losowane
+z generatora z ziarnem (--seed) — powtórzony benchmark widzi ten sam rozkład.
+
+Użycie:
+    python benchmarks/mock_shop.py                               # http://127.0.0.1:8100
+    python benchmarks/mock_shop.py --latency 150 --jitter 50     # ms na każde żądanie
+    python benchmarks/mock_shop.py --error-rate 0.05 --price-drift 0.1 --delivery-variation 0.1
+    python benchmarks/mock_shop.py --register                    # środowisko MOCK → ten adres
+
+Z kodu (np. benchmark executora):
+    server = start_in_thread(MockShopConfig(latency_ms=100), port=8100)
+    ...
+    server.should_exit = True
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import html
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from fastapi import FastAPI, Form, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_PORT = 8100
+MOCK_ENVIRONMENT = "MOCK"
+CART_COOKIE = "mock_cart"
+
+# Formy dostawy i płatności jak w słownikach seed.py: nazwa → (cena, godzina graniczna, wymaga kodu)
+DELIVERIES = {
+    "Kurier DPD":       (14.99, "15:00", True),
+    "Kurier InPost":    (12.99, "16:00", True),
+    "Paczkomat":        (9.99,  "20:00", False),
+    "Kurier DHL":       (15.99, "14:00", True),
+    "Dostawa paletowa": (99.00, "12:00", True),
+}
+PAYMENTS = {
+    "Karta kredytowa": 0.0,
+    "BLIK":            0.0,
+    "Przelew bankowy": 0.0,
+    "PayPo":           0.0,
+    "Raty":            0.0,
+}
+
+PRODUCT_NAMES = ("Laptop", "Monitor", "Słuchawki", "Klawiatura", "Książka", "Ekspres do kawy", "Odkurzacz")
+
+
+@dataclass
+class MockShopConfig:
+    latency_ms: float = 0.0            # opóźnienie każdej odpowiedzi
+    jitter_ms: float = 0.0             # + losowo 0..jitter
+    error_rate: float = 0.0            # szansa HTTP 500 na stronie (GET)
+    price_drift: float = 0.0           # szansa innej ceny w koszyku niż na listingu (±1–10%)
+    delivery_variation: float = 0.0    # szansa ukrycia formy dostawy / przesunięcia godziny granicznej
+    seed: int = 42
+
+
+# ── Stan koszyka ──────────────────────────────────────────────────────────────
+
+def _load_cart(request: Request) -> dict:
+    raw = request.cookies.get(CART_COOKIE)
+    if not raw:
+        return {}
+    try:
+        return json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)).decode())
+    except (ValueError, UnicodeDecodeError):
+        return {}
+
+
+def _redirect(url: str, cart: dict) -> RedirectResponse:
+    response = RedirectResponse(url, status_code=303)
+    response.set_cookie(CART_COOKIE, base64.urlsafe_b64encode(json.dumps(cart).encode()).decode().rstrip("="))
+    return response
+
+
+def _product(query: str) -> tuple[str, float]:
+    """Produkt i cena deterministyczne dla zapytania listingu."""
+    digest = int(hashlib.sha256(query.encode()).hexdigest(), 16)
+    name = f"{PRODUCT_NAMES[digest % len(PRODUCT_NAMES)]} {query.strip().title() or 'Standard'}"
+    price = round(49 + (digest % 450000) / 100, 2)
+    return name, price
+
+
+def _product_id(query: str) -> int:
+    return int(hashlib.sha256(query.encode()).hexdigest(), 16) % 100000
+
+
+def _money(value: float) -> str:
+    return f"{value:,.2f}".replace(",", " ").replace(".", ",") + " zł"
+
+
+# ── HTML ──────────────────────────────────────────────────────────────────────
+
+_STYLE = """
+body { font-family: sans-serif; margin: 2rem; }
+.hidden { display: none; }
+.delivery-option, .payment-option { border: 1px solid #ccc; padding: .5rem; margin: .25rem 0; cursor: pointer; }
+.selected { border-color: #2a7; background: #efe; }
+"""
+
+# Szczegóły opcji (cena, termin) trafiają do DOM dopiero po wyborze — jak w sklepie,
+# selektor '.delivery-option .price' trafia wtedy w dokładnie jeden element
+_SELECT_SCRIPT = """
+function selectOption(el, group) {
+  document.querySelectorAll('.' + group + ' .details').forEach(d => d.remove());
+  document.querySelectorAll('.' + group).forEach(o => o.classList.remove('selected'));
+  el.classList.add('selected');
+  el.appendChild(el.querySelector('template').content.cloneNode(true));
+  document.getElementById(group + '-value').value = el.dataset.name;
+  const postal = document.getElementById('postal');
+  if (postal) postal.classList.toggle('hidden', el.dataset.postal !== '1');
+  document.getElementById('next').disabled = false;
+}
+"""
+
+
+def _fetch_script(url: str) -> str:
+    """Wywołanie API po załadowaniu strony — wynik nie wpływa na selektory scenariuszy."""
+    return f"fetch({json.dumps(url)}).then(r => r.ok ? r.json() : null).catch(() => null);"
+
+
+def _page(title: str, body: str, script: str = "") -> HTMLResponse:
+    return HTMLResponse(
+        f"<!doctype html><html lang='pl'><head><meta charset='utf-8'><title>{html.escape(title)} — Mock Shop</title>"
+        f"<style>{_STYLE}</style></head><body>{body}<script>{script}</script></body></html>"
+    )
+
+
+# ── Aplikacja ─────────────────────────────────────────────────────────────────
+
+def create_app(config: MockShopConfig | None = None) -> FastAPI:
+    config = config or MockShopConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Mock Shop", docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.config = config
+    app.state.stats = {"requests": 0, "errors_injected": 0}
+
+    @app.middleware("http")
+    async def disturbances(request: Request, call_next):
+        app.state.stats["requests"] += 1
+        delay = config.latency_ms + (rng.uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if request.method == "GET" and request.url.path != "/_stats" and rng.random() < config.error_rate:
+            app.state.stats["errors_injected"] += 1
+            return HTMLResponse("<h1>500 — błąd wstrzyknięty przez mock shop</h1>", status_code=500)
+        return await call_next(request)
+
+    @app.get("/_stats")
+    async def stats():
+        return {"config": asdict(config), **app.state.stats}
+
+    @app.get("/")
+    async def home(request: Request):
+        banner = "" if request.cookies.get("cookies_ok") else (
+            "<div id='cookies'>Używamy ciasteczek. "
+            "<button onclick=\"document.cookie='cookies_ok=1';this.parentElement.remove()\">Akceptuję</button></div>"
+        )
+        links = "".join(f"<li><a href='/s?k={q}'>{q}</a></li>" for q in ("laptop", "monitor", "python programming"))
+        return _page("Strona główna", f"{banner}<h1>Mock Shop</h1><ul>{links}</ul>")
+
+    @app.get("/cart")
+    async def cart0(request: Request):
+        cart = _load_cart(request)
+        if not cart.get("product"):
+            return _page("Koszyk", "<h1>Koszyk</h1><p>Koszyk jest pusty</p><div class='cart-total'><span class='price'></span></div>")
+        return _page("Koszyk", f"""
+            <h1>Koszyk</h1>
+            <div class='cart-item'><span class='name'>{html.escape(cart['product'])}</span></div>
+            <div class='cart-total'>Razem: <span class='price'>{_money(cart['price'])}</span></div>
+            <form method='post' action='/cart/next'><button type='submit'>Dalej</button></form>
+        """, _fetch_script("/api/cart"))
+
+    @app.post("/cart/add")
+    async def add_to_cart(request: Request, query: str = Form("")):
+        name, price = _product(query)
+        if rng.random() < config.price_drift:
+            price = round(price * (1 + rng.choice((-1, 1)) * rng.uniform(0.01, 0.10)), 2)
+        return _redirect("/cart", {**_load_cart(request), "product": name, "price": price})
+
+    @app.post("/cart/next")
+    async def cart0_next(request: Request):
+        return _redirect("/cart/delivery", _load_cart(request))
+
+    @app.get("/cart/delivery")
+    async def cart1(request: Request):
+        tomorrow = (date.today() + timedelta(days=1)).strftime("%d.%m.%Y")
+        options = []
+        for name, (price, cutoff, postal) in DELIVERIES.items():
+            if rng.random() < config.delivery_variation:
+                continue                                    # forma dostawy chwilowo niedostępna
+            if rng.random() < config.delivery_variation:
+                cutoff = f"{int(cutoff[:2]) - 1:02d}:00"      # przesunięta godzina graniczna
+            options.append(f"""
+                <div class='delivery-option' data-name='{html.escape(name)}' data-postal='{int(postal)}'
+                     onclick="selectOption(this, 'delivery-option')">
+                    <span class='name'>{html.escape(name)}</span>
+                    <template><div class='details'>
+                        <span class='estimated-date'>{tomorrow}</span>
+                        <span class='cutoff-time'>{cutoff}</span>
+                        <span class='price'>{_money(price)}</span>
+                    </div></template>
+                </div>""")
+        return _page("Dostawa", f"""
+            <h1>Dostawa</h1>
+            <form method='post' action='/cart/delivery'>
+                {''.join(options)}
+                <input type='hidden' name='delivery' id='delivery-option-value'>
+                <input type='text' name='postal' id='postal' class='hidden' placeholder='Kod pocztowy'>
+                <button type='submit' id='next' disabled>Dalej</button>
+            </form>
+        """, _SELECT_SCRIPT)
+
+    @app.post("/cart/delivery")
+    async def cart1_next(request: Request, delivery: str = Form(""), postal: str = Form("")):
+        return _redirect("/cart/payment", {**_load_cart(request), "delivery": delivery, "postal": postal})
+
+    @app.get("/cart/payment")
+    async def cart2(request: Request):
+        options = "".join(f"""
+            <div class='payment-option' data-name='{html.escape(name)}' onclick="selectOption(this, 'payment-option')">
+                <span class='name'>{html.escape(name)}</span>
+                <template><div class='details'><span class='price'>{_money(fee)}</span></div></template>
+            </div>""" for name, fee in PAYMENTS.items())
+        return _page("Płatność", f"""
+            <h1>Płatność</h1>
+            <form method='post' action='/cart/payment'>
+                {options}
+                <input type='hidden' name='payment' id='payment-option-value'>
+                <button type='submit' id='next' disabled>Dalej</button>
+            </form>
+        """, _SELECT_SCRIPT)
+
+    @app.post("/cart/payment")
+    async def cart2_next(request: Request, payment: str = Form("")):
+        return _redirect("/cart/address", {**_load_cart(request), "payment": payment})
+
+    @app.get("/cart/address")
+    async def cart3(request: Request):
+        postal = html.escape(_load_cart(request).get("postal", ""))
+        return _page("Adres", f"""
+            <h1>Adres dostawy</h1>
+            <form method='post' action='/cart/address'>
+                <label><input type='checkbox' name='company'> Zamówienie na firmę</label><br>
+                <input type='text' name='postal' placeholder='Kod pocztowy' value='{postal}'>
+                <input type='text' name='street' placeholder='Ulica'>
+                <input type='text' name='city' placeholder='Miasto'>
+                <button type='submit'>Dalej</button>
+            </form>
+        """)
+
+    @app.post("/cart/address")
+    async def cart3_next(request: Request, postal: str = Form(""), company: str = Form("")):
+        return _redirect("/cart/summary", {**_load_cart(request), "postal": postal, "company": bool(company)})
+
+    @app.get("/cart/summary")
+    async def cart4(request: Request):
+        cart = _load_cart(request)
+        delivery_price = DELIVERIES.get(cart.get("delivery"), (0.0,))[0]
+        total = cart.get("price", 0.0) + delivery_price
+        return _page("Podsumowanie", f"""
+            <h1>Podsumowanie</h1>
+            <div class='summary-delivery'><span class='name'>{html.escape(cart.get('delivery', ''))}</span>
+                <span class='price'>{_money(delivery_price)}</span></div>
+            <div class='summary-payment'><span class='name'>{html.escape(cart.get('payment', ''))}</span></div>
+            <div class='summary-address'>
+                <input type='text' readonly placeholder='Kod pocztowy' value='{html.escape(cart.get('postal', ''))}'>
+            </div>
+            <div class='summary-total'>Do zapłaty: <span class='price'>{_money(total)}</span></div>
+            <form method='post' action='/order'><button type='submit'>Zamawiam i płacę</button></form>
+        """)
+
+    @app.post("/order")
+    async def place_order(request: Request):
+        number = f"MOCK-{int(time.time() * 1000) % 10**9:09d}"
+        return _redirect(f"/order/{number}", {})
+
+    @app.get("/order/{number}")
+    async def confirmation(number: str):
+        return _page("Zamówienie", f"""
+            <div class='order-confirmation'>Dziękujemy! Numer zamówienia:
+                <span class='order-number'>{html.escape(number)}</span></div>
+        """)
+
+    # ── API (fetch) — przed catch-all listingu ────────────────────────────────
+
+    @app.get("/api/cart")
+    async def api_cart(request: Request):
+        cart = _load_cart(request)
+        return {"items": 1 if cart.get("product") else 0, "total": cart.get("price", 0)}
+
+    @app.get("/api/products/{product_id}/availability")
+    async def api_availability(product_id: int):
+        return {"id": product_id, "available": True, "stock": 1 + product_id % 20}
+
+        # Listing — /s?k=… jak w seed.py i każda inna ścieżka z listing_urls scenariuszy
+    @app.get("/s")
+    @app.get("/{path:path}")
+    async def listing(request: Request, k: str = "", path: str = ""):
+        query = k or path.replace("/", " ")
+        name, price = _product(query)
+        return _page("Listing", f"""
+            <h1>Wyniki: {html.escape(query)}</h1>
+            <div class='product-item'>
+                <span class='product-name'>{html.escape(name)}</span>
+                <span class='product-price'>{_money(price)}</span>
+                <form method='post' action='/cart/add'>
+                    <input type='hidden' name='query' value='{html.escape(query)}'>
+                    <button type='submit'>Dodaj do koszyka</button>
+                </form>
+            </div>
+        """, _fetch_script(f"/api/products/{_product_id(query)}/availability"))
+
+    return app
+
+
+# ── Uruchamianie ──────────────────────────────────────────────────────────────
+
+def start_in_thread(config: MockShopConfig, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+    """Serwer w wątku w tle — zwraca uvicorn.Server (zatrzymanie: server.should_exit = True)."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="mock-shop", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError(f"Mock shop nie wystartował na {host}:{port}")
+        time.sleep(0.05)
+    return server
+
+
+def register_environment(base_url: str) -> int:
+    """Tworzy lub aktualizuje środowisko MOCK wskazujące na mock shop. Zwraca jego id."""
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from app.models.environment import Environment
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        environment = db.query(Environment).filter_by(name=MOCK_ENVIRONMENT).first()
+        if environment is None:
+            environment = Environment(name=MOCK_ENVIRONMENT, base_url=base_url, type="web")
+            db.add(environment)
+        environment.base_url = base_url
+        environment.is_active = True
+        db.commit()
+        return environment.id
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Lokalny mock sklepu dla benchmarków executora")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="Opóźnienie odpowiedzi w ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Dodatkowe losowe opóźnienie 0..N ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Szansa HTTP 500 na stronie (0–1)")
+    parser.add_argument("--price-drift", type=float, default=0.0, help="Szansa zmiany ceny w koszyku (0–1)")
+    parser.add_argument("--delivery-variation", type=float, default=0.0,
+                        help="Szansa ukrycia formy dostawy / zmiany godziny granicznej (0–1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--register", action="store_true", help=f"Ustaw środowisko {MOCK_ENVIRONMENT} w bazie na ten adres")
+    args = parser.parse_args()
+
+    config = MockShopConfig(
+        latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+        price_drift=args.price_drift, delivery_variation=args.delivery_variation, seed=args.seed,
+    )
+    base_url = f"http://{args.host}:{args.port}"
+    if args.register:
+        print(f"Środowisko {MOCK_ENVIRONMENT} (#{register_environment(base_url)}) → {base_url}")
+
+    import uvicorn
+
+    print(f"Mock shop: {base_url}  {asdict(config)}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
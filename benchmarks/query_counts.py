@@ -0,0 +1,192 @@
+"""
+Query Counts — regresja liczby zapytań SQL (N+1) ścieżek startu suite i list panelu.
+
+Odpowiedzialności:
+  1. Buduje bazę syntetyczną (seed_history.py) z flagami na każdym scenariuszu
+  2. Liczy zapytania każdej ścieżki przez core/db_metrics.py: strony panelu (TestClient)
+     oraz przygotowanie scenariuszy do uruchomienia (read_models + ScenarioContext.from_db)
+  3. Powiększa bazę (więcej scenariuszy w suite, więcej runów i grup alertów) i liczy ponownie
+  4. Kończy się kodem 1, gdy liczba zapytań ścieżki wzrosła razem z danymi
+     albo przekroczyła budżet z QUERY_BUDGET
+
+Budżet to górna granica, nie dokładna wartość — zmiana widoku może dodać zapytanie,
+ale nie zapytanie per wiersz / scenariusz.
+
+Użycie:
+    python benchmarks/query_counts.py
+    python benchmarks/query_counts.py --scenarios 8,40      # scenariusze per suite: baza, po wzroście
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Ścieżka → maksymalna liczba zapytań
+QUERY_BUDGET = {
+    "suite start (panel)":   2,     # scenariusze + flagi z definicjami (selectinload)
+    "suite start (CLI)":     4,     # + doładowanie po commit suite_run (preload_scenarios)
+    "manual run":            2,
+    "/scenarios":            4,
+    "/suites":               2,
+    "/suites/{suite_id}":    2,
+    "/runs":                 2,
+    "/suite-runs":           2,
+    "/suite-runs/{suite_run_id}": 5,
+    "/alerts":               6,
+    "/alerts?status=all":    6,
+    "/dashboard":            10,    # + znacznik danych response_cache (sync_with_db)
+}
+
+FLAGS = ("mobile", "guest_checkout", "express_delivery", "newsletter", "coupon")
+
+
+# ── Dane ──────────────────────────────────────────────────────────────────────
+
+def _add_flags(engine) -> None:
+    """Definicje FLAGS i przypisanie każdej do każdego scenariusza bez flag."""
+    from sqlalchemy import select
+
+    from app.models.flag_definition import FlagDefinition, ScenarioFlag
+    from app.models.scenario import Scenario
+
+    with engine.begin() as conn:
+        flag_ids = []
+        for name in FLAGS:
+            flag_id = conn.scalar(select(FlagDefinition.id).where(FlagDefinition.name == name))
+            if flag_id is None:
+                flag_id = conn.execute(FlagDefinition.__table__.insert().values(
+                    name=name, display_name=name.replace("_", " ").capitalize(), is_active=True,
+                )).inserted_primary_key[0]
+            flag_ids.append(flag_id)
+
+        flagged = set(conn.scalars(select(ScenarioFlag.scenario_id).distinct()))
+        rows = [
+            {"scenario_id": scenario_id, "flag_id": flag_id, "is_enabled": i % 2 == 0}
+            for scenario_id in conn.scalars(select(Scenario.id)) if scenario_id not in flagged
+            for i, flag_id in enumerate(flag_ids)
+        ]
+        if rows:
+            conn.execute(ScenarioFlag.__table__.insert(), rows)
+
+
+# ── Pomiar ────────────────────────────────────────────────────────────────────
+
+def measure(client, session_factory) -> dict[str, int]:
+    from app.models.environment import Environment
+    from app.models.suite import Suite
+    from app.models.suite_run import SuiteRun
+    from core import db_metrics, read_models, response_cache
+    from scenarios.contexts.scenario_context import ScenarioContext
+
+    counts = {}
+    db = session_factory()
+    try:
+        suite = db.query(Suite).order_by(Suite.id).first()
+        environment = db.query(Environment).order_by(Environment.id).first()
+        suite_run_id = db.query(SuiteRun.id).order_by(SuiteRun.id.desc()).first()[0]
+        scenario_ids = [s.id for s in read_models.suite_scenarios(db, suite.id)]
+        db.expunge_all()
+
+        # Start suite z panelu (_run_suite_background) — scenariusze gotowe do from_db
+        with db_metrics.track() as stats:
+            for scenario in read_models.suite_scenarios(db, suite.id):
+                ScenarioContext.from_db(scenario, environment)
+        counts["suite start (panel)"] = stats.queries
+        db.expunge_all()
+
+        # Start z CLI — SuiteExecutor commituje suite_run, co wygasza scenariusze
+        with db_metrics.track() as stats:
+            scenarios = read_models.suite_scenarios(db, suite.id)
+            db.commit()
+            read_models.preload_scenarios(db, scenarios)
+            for scenario in scenarios:
+                ScenarioContext.from_db(scenario, environment)
+        counts["suite start (CLI)"] = stats.queries
+        db.expunge_all()
+
+        with db_metrics.track() as stats:
+            for scenario in read_models.scenarios_by_ids(db, scenario_ids):
+                ScenarioContext.from_db(scenario, environment)
+        counts["manual run"] = stats.queries
+    finally:
+        db.close()
+
+    for route in QUERY_BUDGET:
+        if not route.startswith("/"):
+            continue
+        response_cache.bump("query_counts")   # /dashboard bez trafienia w cache
+        url = route.format(suite_id=suite.id, suite_run_id=suite_run_id)
+        with db_metrics.track() as stats:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} → HTTP {response.status_code}")
+        counts[route] = stats.queries
+    return counts
+
+
+def report(before: dict[str, int], after: dict[str, int], sizes: tuple[int, int]) -> list[str]:
+    failures = []
+    print(f"\n{'=' * 72}\nZapytania per ścieżka — {sizes[0]} → {sizes[1]} scenariuszy per suite\n{'=' * 72}")
+    for path, budget in QUERY_BUDGET.items():
+        problems = []
+        if after[path] != before[path]:
+            problems.append(f"rośnie z danymi ({before[path]} → {after[path]})")
+        if after[path] > budget:
+            problems.append(f"ponad budżet {budget}")
+        marker = "❌" if problems else "✅"
+        print(f"  {marker} {path:<30} {before[path]:>3} → {after[path]:<3} (budżet {budget})  {', '.join(problems)}")
+        if problems:
+            failures.append(path)
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Liczba zapytań SQL ścieżek panelu i startu suite")
+    parser.add_argument("--scenarios", default="8,40", help="Scenariusze per suite: baza,po wzroście (domyślnie 8,40)")
+    args = parser.parse_args()
+    sizes = tuple(int(n) for n in args.scenarios.split(","))
+
+    tmp_dir = tempfile.mkdtemp(prefix="query_counts_")
+    # Przed importem aplikacji — database.py tworzy silnik z DATABASE_URL
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp_dir) / 'counts.db'}"
+    os.environ["DB_METRICS_ENABLED"] = "true"
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.models import Base
+    from database import SessionLocal, engine
+    from seed_history import PROFILES, generate
+
+    quiet = lambda message: None
+    profile = replace(PROFILES["small"], suite_runs=300, alert_groups=80, scenarios_per_run=sizes[0])
+    try:
+        Base.metadata.create_all(engine)
+        with TestClient(app) as client:
+            generate(engine, profile, progress=quiet)
+            _add_flags(engine)
+            before = measure(client, SessionLocal)
+
+            generate(engine, replace(profile, scenarios_per_run=sizes[1], seed=profile.seed + 1), progress=quiet)
+            _add_flags(engine)
+            after = measure(client, SessionLocal)
+    finally:
+        engine.dispose()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if report(before, after, sizes):
+        print("\n❌ Regresja: liczba zapytań zależy od liczby scenariuszy / wierszy")
+        return 1
+    print("\n✅ Liczba zapytań stała na wszystkich ścieżkach")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Query Plans — regresja planów zapytań panelu i SuiteExecutora na dużej syntetycznej bazie.
+
+Odpowiedzialności:
+  1. Buduje bazę SQLite ze schematu modeli i wypełnia ją generatorem historii
+     (seed_history.py) — suite_runs, scenario_runs, alerty, grupy, snapshoty, błędy API
+  2. Przechwytuje rzeczywiste SELECT-y: gorące strony panelu przez TestClient
+     oraz zapytania deduplikacji alertów SuiteExecutora
+  3. Dla każdego zapytania wykonuje EXPLAIN QUERY PLAN z tymi samymi parametrami
+     i mierzy czas wykonania
+  4. Kończy się kodem 1, gdy plan którejś z dużych tabel spadł do pełnego skanu
+     (SCAN <tabela> bez indeksu) — np. po usunięciu indeksu z modelu
+
+Schemat powstaje z Base.metadata, czyli z tego samego źródła, z którego
+alembic autogenerate tworzy migrację (reset_database.py).
+
+Użycie:
+    python benchmarks/query_plans.py
+    python benchmarks/query_plans.py --suite-runs 20000       # większa baza
+    python benchmarks/query_plans.py --json plans.json        # raport maszynowy (CI)
+    python benchmarks/query_plans.py --db /tmp/plans.db       # zachowaj bazę / użyj istniejącej
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Tabele rosnące z każdym runem — pełny skan którejkolwiek z nich to regresja
+HOT_TABLES = {"suite_runs", "scenario_runs", "alert_groups", "alerts", "basket_snapshots", "api_errors"}
+
+# Świadomie akceptowane skany (źródło, tabela) → powód; raportowane, ale nie przerywają
+ACCEPTED_SCANS = {
+    ("SuiteExecutor._handle_alerts_not_occurred", "alert_groups"):
+        "status IN (4 z 5 statusów) — bez STAT4 SQLite zakłada równy rozkład statusów, "
+        "a tabelę ogranicza retencja",
+}
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+
+@dataclass
+class QueryPlan:
+    source: str                                   # URL panelu lub metoda SuiteExecutor
+    sql: str
+    plan: list[str] = field(default_factory=list)
+    full_scans: list[str] = field(default_factory=list)
+    accepted_scans: list[str] = field(default_factory=list)
+    temp_sort: bool = False
+    ms: float = 0.0
+
+
+# ── Przechwytywanie zapytań ───────────────────────────────────────────────────
+
+class QueryRecorder:
+    """Zbiera unikalne SELECT-y (SQL + parametry) wykonane przez silnik, z etykietą źródła."""
+
+    def __init__(self):
+        self.source = ""
+        self.queries: dict[str, tuple[str, str, tuple]] = {}
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            return
+        if "sqlite_master" in statement or "alert_fts" in statement:
+            return
+        self.queries.setdefault(statement, (self.source, statement, tuple(parameters or ())))
+
+
+def _hot_urls(db, business_rule: str) -> list[str]:
+    """Strony panelu z parametrami wskazującymi na środek historii (głębokie kursory)."""
+    from app.models.alert_group import AlertGroup
+    from app.models.run import ScenarioRun
+    from app.models.suite_run import SuiteRun
+    from core.pagination import encode_cursor
+
+    middle_suite_run = db.query(SuiteRun).order_by(SuiteRun.id).offset(db.query(SuiteRun).count() // 2).first()
+    middle_run = db.query(ScenarioRun).filter(ScenarioRun.suite_run_id == middle_suite_run.id).first()
+    middle_group = db.query(AlertGroup).order_by(AlertGroup.id).offset(db.query(AlertGroup).count() // 2).first()
+
+    suite_run_cursor = encode_cursor(middle_suite_run.started_at, middle_suite_run.id)
+    run_cursor = encode_cursor(middle_run.started_at, middle_run.id)
+    group_cursor = encode_cursor(middle_group.last_seen_at, middle_group.id)
+
+    return [
+        "/dashboard",
+        "/dashboard/runs-table",
+        "/suite-runs",
+        f"/suite-runs/rows?cursor={suite_run_cursor}",
+        f"/suite-runs/{middle_suite_run.id}",
+        f"/suite-runs/{middle_suite_run.id}/{middle_run.id}",
+        "/runs",
+        f"/runs/rows?cursor={run_cursor}",
+        f"/runs/{middle_run.id}",
+        "/alerts",
+        "/alerts?status=all",
+        "/alerts?status=closed&environment_id=1",
+        f"/alerts/rows?status=all&cursor={group_cursor}",
+        f"/alerts?status=all&search={business_rule.split('_')[0].lower()}",
+        f"/alerts/{middle_group.id}",
+        f"/scenarios/{middle_run.scenario_id}",
+    ]
+
+
+def capture(engine, session_factory) -> list[tuple[str, str, tuple]]:
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.main import app
+    from app.models.alert_group import AlertGroup
+    from app.models.suite_run import SuiteRun
+    from scenarios.suite_executor import SuiteExecutor
+
+    recorder = QueryRecorder()
+    db = session_factory()
+    try:
+        suite_run = db.query(SuiteRun).order_by(SuiteRun.id.desc()).first()
+        business_rule = db.query(AlertGroup.business_rule).order_by(AlertGroup.id).first()[0]
+        urls = _hot_urls(db, business_rule)
+        event.listen(engine, "before_cursor_execute", recorder)
+        try:
+            with TestClient(app) as client:
+                for url in urls:
+                    recorder.source = url
+                    response = client.get(url)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} → HTTP {response.status_code}")
+
+            # Deduplikacja alertów po każdym runie suite — zmiany wycofywane
+            executor = SuiteExecutor(suite=None, environment=None, scenarios=[], workers=1, headless=True, db=db)
+            recorder.source = "SuiteExecutor._handle_alerts_not_occurred"
+            executor._handle_alerts_not_occurred(suite_run, set(), set())
+            recorder.source = "SuiteExecutor._find_closed_duplicate"
+            executor._find_closed_duplicate(business_rule, suite_run.environment_id, [1])
+            recorder.source = "SuiteExecutor._find_closed_candidate"
+            executor._find_closed_candidate(business_rule, suite_run.environment_id, [1])
+        finally:
+            event.remove(engine, "before_cursor_execute", recorder)
+            db.rollback()
+    finally:
+        db.close()
+    return list(recorder.queries.values())
+
+
+# ── EXPLAIN ───────────────────────────────────────────────────────────────────
+
+def explain(engine, source: str, sql: str, parameters: tuple, repeat: int = 3) -> QueryPlan:
+    result = QueryPlan(source=source, sql=" ".join(sql.split()))
+    with engine.connect() as conn:
+        for _, _, _, detail in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters):
+            result.plan.append(detail)
+            match = _SCAN_RE.match(detail)
+            if match and match.group(1) in HOT_TABLES and " USING " not in detail:
+                table = match.group(1)
+                if (source, table) in ACCEPTED_SCANS:
+                    result.accepted_scans.append(table)
+                else:
+                    result.full_scans.append(table)
+            if detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+                result.temp_sort = True
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.exec_driver_sql(sql, parameters).fetchall()
+            timings.append(time.perf_counter() - start)
+    result.ms = round(min(timings) * 1000, 2)
+    return result
+
+
+def report(plans: list[QueryPlan], verbose: bool) -> None:
+    regressions = [p for p in plans if p.full_scans]
+    print(f"\n{'=' * 72}\nPlany zapytań: {len(plans)} zapytań, pełne skany: {len(regressions)}\n{'=' * 72}")
+
+    for plan in sorted(plans, key=lambda p: p.ms, reverse=True)[:10]:
+        flags = " FULL SCAN" if plan.full_scans else (" temp-sort" if plan.temp_sort else "")
+        print(f"  {plan.ms:>8.2f} ms  {plan.source}{flags}")
+
+    for plan in plans:
+        for table in plan.accepted_scans:
+            print(f"\n⚠️  [{plan.source}] akceptowany skan {table}: {ACCEPTED_SCANS[(plan.source, table)]}")
+
+    for plan in regressions if not verbose else plans:
+        marker = "❌" if plan.full_scans else "  "
+        print(f"\n{marker} [{plan.source}] {plan.sql[:300]}")
+        for detail in plan.plan:
+            print(f"      {detail}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN gorących zapytań panelu na syntetycznej bazie")
+    parser.add_argument("--suite-runs", type=int, default=5000, help="Liczba suite runów w bazie (domyślnie 5000)")
+    parser.add_argument("--db", help="Ścieżka bazy SQLite — istniejąca jest używana bez generowania")
+    parser.add_argument("--json", help="Zapisz wyniki do pliku JSON")
+    parser.add_argument("--verbose", action="store_true", help="Pokaż plany wszystkich zapytań")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    db_path = Path(args.db) if args.db else None
+    if db_path is None:
+        tmp_dir = tempfile.mkdtemp(prefix="query_plans_")
+        db_path = Path(tmp_dir) / "plans.db"
+    reuse = db_path.exists()
+
+    # Przed importem aplikacji — database.py tworzy silnik z DATABASE_URL
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.resolve()}"
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+
+    from app.models import Base
+    from database import SessionLocal, engine
+    from seed_history import HistoryProfile, generate
+
+    try:
+        if not reuse:
+            Base.metadata.create_all(engine)
+            generate(engine, HistoryProfile(suite_runs=args.suite_runs, alert_groups=args.suite_runs // 5))
+            print(f"Baza syntetyczna: {db_path}")
+
+        plans = [explain(engine, *query) for query in capture(engine, SessionLocal)]
+        report(plans, args.verbose)
+
+        if args.json:
+            Path(args.json).write_text(json.dumps([asdict(p) for p in plans], ensure_ascii=False, indent=2))
+            print(f"\nZapisano: {args.json}")
+    finally:
+        engine.dispose()
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if any(p.full_scans for p in plans):
+        print("\n❌ Regresja planu: pełny skan dużej tabeli")
+        return 1
+    print("\n✅ Wszystkie gorące zapytania korzystają z indeksów")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
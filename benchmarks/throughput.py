@@ -0,0 +1,396 @@
+"""
+Throughput — benchmark executora: suite albo zestaw scenariuszy uruchamiany N razy
+przy kolejnych liczbach workers (python main.py bench).
+
+Odpowiedzialności:
+  1. Wybór celu: suite (--suite) albo scenariusze (--scenarios, jak ręczny wybór w panelu)
+     na środowisku z bazy (--environment) lub na lokalnym mock shopie (--mock)
+  2. Dla każdej liczby workers: --repeat pełnych uruchomień SuiteExecutor (headless)
+  3. Pomiar: scenariusze na minutę, czas scenariusza, p50/p95 per etap ścieżki zakupowej
+     i start przeglądarki (spany core/tracing.py), czas i liczba zapytań bazy
+     (core/db_metrics.py), szczytowe RSS procesu z potomkami (driver Playwright, Chromium)
+  4. Tabela w konsoli + JSON w benchmarks/results/bench-<czas>.json; --compare pokazuje
+     zmiany względem wcześniejszego pliku
+
+Benchmark zapisuje prawdziwe suite runy (z alertami) w bazie z DATABASE_URL — przy --mock
+trafiają na środowisko MOCK i nie mieszają się z historią RC/PROD.
+
+Użycie:
+    python main.py bench --mock --suite 1 --workers 1,2,4 --repeat 3
+    python main.py bench --environment 2 --scenarios 3,5,8 --workers 2,4
+    python main.py bench --mock --suite 1 --out before.json
+    python main.py bench --mock --suite 1 --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# Co ile sekund próbkowane jest RSS drzewa procesów
+RSS_INTERVAL = 0.25
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LevelResult:
+    workers: int
+    repeats: int
+    scenarios: int
+    failed: int
+    duration_s: float
+    scenarios_per_min: float
+    scenario_p50_s: float
+    scenario_p95_s: float
+    browser_start_p50_ms: float
+    browser_start_p95_ms: float
+    db_queries_per_scenario: float
+    db_ms_per_scenario: float
+    rss_peak_mb: float | None
+    stages: dict = field(default_factory=dict)         # etap → {count, p50_ms, p95_ms}
+    suite_run_ids: list = field(default_factory=list)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _p50_p95(values: list[float]) -> tuple[float, float]:
+    values = sorted(values)
+    return _percentile(values, 50), _percentile(values, 95)
+
+
+# ── RSS ───────────────────────────────────────────────────────────────────────
+
+def _tree_rss() -> int | None:
+    """RSS procesu i wszystkich potomków w bajtach (z /proc). Poza Linuksem None."""
+    proc = Path("/proc")
+    if not (proc / "self" / "statm").exists():
+        return None
+    children: dict[int, list[int]] = {}
+    for stat in proc.glob("[0-9]*/stat"):
+        try:
+            # pid (comm) state ppid … — comm może zawierać spacje i nawiasy
+            ppid = int(stat.read_text().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(stat.parent.name))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [os.getpid()]
+    while pending:
+        pid = pending.pop()
+        try:
+            total += int((proc / str(pid) / "statm").read_text().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue                                  # proces zakończył się w trakcie odczytu
+        pending.extend(children.get(pid, []))
+    return total
+
+
+class _RssSampler:
+    """Wątek próbkujący RSS drzewa procesów — szczyt na czas pomiaru."""
+
+    def __init__(self, interval: float = RSS_INTERVAL):
+        self.interval = interval
+        self.peak: int | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-rss", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            rss = _tree_rss()
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "_RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> float | None:
+        return round(self.peak / 2**20, 1) if self.peak is not None else None
+
+
+# ── Pomiar ────────────────────────────────────────────────────────────────────
+
+def _span_ms(span) -> float:
+    return (span.end_ns - span.start_ns) / 1e6
+
+
+def _level_result(workers: int, repeats: int, suite_run_ids: list[int], duration: float,
+                  db_stats, rss_peak_mb: float | None) -> LevelResult:
+    from core import tracing
+
+    spans = [s for suite_run_id in suite_run_ids for s in tracing.load(suite_run_id)]
+    scenario_spans = [s for s in spans if s.name == "scenario"]
+    browser_ms = [_span_ms(s) for s in spans if s.name == "browser.start"]
+
+    stage_ms: dict[str, list[float]] = {}
+    for s in spans:
+        if s.name == "stage":
+            stage_ms.setdefault(s.attributes.get("stage", "?"), []).append(_span_ms(s))
+
+    count = len(scenario_spans)
+    scenario_p50, scenario_p95 = _p50_p95([_span_ms(s) / 1000 for s in scenario_spans])
+    browser_p50, browser_p95 = _p50_p95(browser_ms)
+    stages = {}
+    for stage, values in stage_ms.items():
+        p50, p95 = _p50_p95(values)
+        stages[stage] = {"count": len(values), "p50_ms": round(p50, 1), "p95_ms": round(p95, 1)}
+
+    return LevelResult(
+        workers=workers,
+        repeats=repeats,
+        scenarios=count,
+        failed=sum(1 for s in scenario_spans if s.attributes.get("status") != "success"),
+        duration_s=round(duration, 2),
+        scenarios_per_min=round(count / duration * 60, 2) if duration else 0.0,
+        scenario_p50_s=round(scenario_p50, 2),
+        scenario_p95_s=round(scenario_p95, 2),
+        browser_start_p50_ms=round(browser_p50, 1),
+        browser_start_p95_ms=round(browser_p95, 1),
+        db_queries_per_scenario=round(db_stats.queries / count, 1) if count else 0.0,
+        db_ms_per_scenario=round(db_stats.duration * 1000 / count, 2) if count else 0.0,
+        rss_peak_mb=rss_peak_mb,
+        stages=stages,
+        suite_run_ids=suite_run_ids,
+    )
+
+
+async def run_benchmark(suite, environment, scenarios, levels: list[int], repeats: int,
+                        max_retries: int) -> list[LevelResult]:
+    results = []
+    for workers in levels:
+        result = await run_level(suite, environment, scenarios, workers, repeats, max_retries)
+        results.append(result)
+        print(f"  workers={workers:<3} {result.scenarios_per_min:>7.2f} scen/min  "
+              f"p95={result.scenario_p95_s:.1f} s  fail={result.failed}")
+    return results
+
+
+async def run_level(suite, environment, scenarios, workers: int, repeats: int, max_retries: int) -> LevelResult:
+    """repeats uruchomień suite przy danej liczbie workers — czas mierzony od startu do finalizacji."""
+    from core import db_metrics
+    from database import SessionLocal
+    from scenarios.suite_executor import SuiteExecutor
+
+    suite_run_ids = []
+    duration = 0.0
+    with _RssSampler() as rss, db_metrics.track(f"bench workers={workers}") as db_stats:
+        for _ in range(repeats):
+            db = SessionLocal()
+            try:
+                executor = SuiteExecutor(
+                    suite=suite,
+                    environment=environment,
+                    scenarios=scenarios,
+                    workers=workers,
+                    headless=True,
+                    db=db,
+                    max_retries=max_retries,
+                )
+                started = time.perf_counter()
+                suite_run = await executor.run()
+                duration += time.perf_counter() - started
+                suite_run_ids.append(suite_run.id)
+            finally:
+                db.close()
+    return _level_result(workers, repeats, suite_run_ids, duration, db_stats, rss.peak_mb)
+
+
+def _load_target(args, parser):
+    """Suite, środowisko i scenariusze z bazy (obiekty odłączone od sesji — jak w main.py)."""
+    from app.models.environment import Environment
+    from app.models.suite import Suite
+    from core import read_models
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        # Suite najpierw — utworzenie 'Manual Runs' commituje i wygasiłoby wcześniej wczytane obiekty
+        if args.scenarios:
+            from app.routers.execute import get_or_create_manual_suite
+            suite = get_or_create_manual_suite(db)
+        else:
+            query = db.query(Suite).filter_by(is_active=True)
+            suite = query.filter_by(id=args.suite).first() if args.suite else query.first()
+            if suite is None:
+                parser.error("Brak aktywnej suite")
+
+        environment = db.query(Environment).filter_by(id=args.environment, is_active=True).first()
+        if environment is None:
+            parser.error(f"Środowisko #{args.environment} nie istnieje lub nieaktywne")
+
+        if args.scenarios:
+            ids = [int(s) for s in args.scenarios.split(",") if s.strip()]
+            scenarios = read_models.scenarios_by_ids(db, ids)
+        else:
+            scenarios = read_models.suite_scenarios(db, suite.id)
+        if not scenarios:
+            parser.error("Brak aktywnych scenariuszy do uruchomienia")
+        return suite, environment, scenarios
+    finally:
+        db.close()
+
+
+# ── Raport ────────────────────────────────────────────────────────────────────
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _delta(old: float, new: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def print_results(results: list[LevelResult]) -> None:
+    print(f"\n  {'workers':>7} {'scen':>5} {'fail':>5} {'scen/min':>9} {'scen p50/p95 s':>16} "
+          f"{'browser p50/p95 ms':>19} {'q/scen':>7} {'db ms/scen':>11} {'RSS MB':>8}")
+    for r in results:
+        rss = f"{r.rss_peak_mb:.0f}" if r.rss_peak_mb is not None else "n/a"
+        print(f"  {r.workers:>7} {r.scenarios:>5} {r.failed:>5} {r.scenarios_per_min:>9.2f} "
+              f"{r.scenario_p50_s:>7.1f}/{r.scenario_p95_s:<8.1f} "
+              f"{r.browser_start_p50_ms:>8.0f}/{r.browser_start_p95_ms:<10.0f} "
+              f"{r.db_queries_per_scenario:>7.1f} {r.db_ms_per_scenario:>11.1f} {rss:>8}")
+
+    stages = list(dict.fromkeys(stage for r in results for stage in r.stages))
+    if not stages:
+        print("\n  Brak spanów etapów — scenariusze nie doszły do etapów albo TRACING_ENABLED=false")
+        return
+    print(f"\n  Etapy — p50/p95 ms\n  {'etap':<20}" + "".join(f"{f'w={r.workers}':>18}" for r in results))
+    for stage in stages:
+        cells = []
+        for r in results:
+            s = r.stages.get(stage)
+            cells.append(f"{s['p50_ms']:>8.0f}/{s['p95_ms']:<9.0f}" if s else f"{'—':>18}")
+        print(f"  {stage:<20}" + "".join(cells))
+
+
+def compare(previous_path: str, results: list[LevelResult]) -> None:
+    previous = {r["workers"]: r for r in json.loads(Path(previous_path).read_text())["results"]}
+    print(f"\nPorównanie z {previous_path}:")
+    print(f"  {'workers':>7} {'scen/min':>22} {'scen p95 s':>20} {'browser p95 ms':>22} {'db ms/scen':>20}")
+    for r in results:
+        old = previous.get(r.workers)
+        if old is None:
+            continue
+        print(f"  {r.workers:>7} "
+              f"{old['scenarios_per_min']:>6.1f}→{r.scenarios_per_min:<6.1f}{_delta(old['scenarios_per_min'], r.scenarios_per_min)} "
+              f"{old['scenario_p95_s']:>5.1f}→{r.scenario_p95_s:<5.1f}{_delta(old['scenario_p95_s'], r.scenario_p95_s)} "
+              f"{old['browser_start_p95_ms']:>6.0f}→{r.browser_start_p95_ms:<6.0f}{_delta(old['browser_start_p95_ms'], r.browser_start_p95_ms)} "
+              f"{old['db_ms_per_scenario']:>5.1f}→{r.db_ms_per_scenario:<5.1f}{_delta(old['db_ms_per_scenario'], r.db_ms_per_scenario)}")
+
+
+def _quiet_console() -> None:
+    """Konsola tylko z ostrzeżeniami — logi scenariuszy zostają w plikach (logs/)."""
+    for handler in logging.getLogger().handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.WARNING)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py bench", description="Benchmark executora — przepustowość i opóźnienia przy różnej liczbie workers",
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--suite", type=int, help="ID suite (domyślnie pierwsza aktywna)")
+    target.add_argument("--scenarios", help="ID scenariuszy po przecinku (suite 'Manual Runs')")
+    env = parser.add_mutually_exclusive_group(required=True)
+    env.add_argument("--environment", type=int, help="ID środowiska z bazy")
+    env.add_argument("--mock", action="store_true", help="Uruchom benchmarks/mock_shop.py w tle (środowisko MOCK)")
+    parser.add_argument("--mock-port", type=int, default=None, help="Port mock shopu (domyślnie 8100)")
+    parser.add_argument("--mock-latency", type=float, default=0.0, help="Opóźnienie odpowiedzi mock shopu w ms")
+    parser.add_argument("--workers", default="1,2,4", help="Liczby workers po przecinku, np. 1,2,4,8")
+    parser.add_argument("--repeat", type=int, default=1, help="Uruchomień suite na liczbę workers")
+    parser.add_argument("--retries", type=int, default=0, help="Ponowienia scenariusza (jak --retries)")
+    parser.add_argument("--out", help="Plik wyników JSON (domyślnie benchmarks/results/bench-<czas>.json)")
+    parser.add_argument("--compare", help="Wcześniejszy plik wyników do porównania")
+    parser.add_argument("--verbose", action="store_true", help="Logi scenariuszy także w konsoli")
+    args = parser.parse_args(argv)
+
+    levels = [int(w) for w in args.workers.split(",") if w.strip()]
+    if not levels or min(levels) < 1 or args.repeat < 1:
+        parser.error("--workers i --repeat muszą być dodatnie")
+    if not args.verbose:
+        _quiet_console()
+
+    from core.config import settings
+    from database import engine
+
+    if not settings.tracing_enabled:
+        logger.warning("[Bench] TRACING_ENABLED=false — bez etapów i startu przeglądarki w wynikach")
+
+    server = None
+    if args.mock:
+        sys.path.insert(0, str(ROOT / "benchmarks"))
+        import mock_shop
+
+        port = args.mock_port or mock_shop.DEFAULT_PORT
+        server = mock_shop.start_in_thread(mock_shop.MockShopConfig(latency_ms=args.mock_latency), port=port)
+        args.environment = mock_shop.register_environment(f"http://127.0.0.1:{port}")
+
+    try:
+        suite, environment, scenarios = _load_target(args, parser)
+        print(f"\nCel: {suite.name} ({len(scenarios)} scenariuszy) @ {environment.name} {environment.base_url}")
+        print(f"Workers: {levels}, uruchomień na poziom: {args.repeat}")
+
+        results = asyncio.run(run_benchmark(suite, environment, scenarios, levels, args.repeat, args.retries))
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    print_results(results)
+    output = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": engine.url.render_as_string(hide_password=True),
+            "suite": suite.name,
+            "environment": environment.name,
+            "base_url": environment.base_url,
+            "scenarios": [s.id for s in scenarios],
+            "workers": levels,
+            "repeat": args.repeat,
+            "retries": args.retries,
+            "mock": {"latency_ms": args.mock_latency} if args.mock else None,
+        },
+        "results": [asdict(r) for r in results],
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(output, ensure_ascii=False, indent=2))
+    print(f"\nZapisano: {out}")
+
+    if args.compare:
+        compare(args.compare, results)
+    return 0
@@ -3,7 +3,8 @@ Clean Runs — usuwa wszystkie runy zachowując konfigurację.
 
 Usuwa:
 - suite_runs, scenario_runs, alerts, alert_groups
-- basket_snapshots, api_errors
+- basket_snapshots, api_errors, scenario_run_data, price_points, flakiness_scores
+- api_endpoint_stats, api_endpoint_rollups
 - logi z katalogu logs/
 
 Zachowuje:
@@ -14,6 +15,9 @@ Użycie:
     python clean_runs.py              # interaktywne potwierdzenie
     python clean_runs.py --force      # bez pytania
     python clean_runs.py --keep-logs  # nie usuwaj logów
+
+    python clean_runs.py --retention            # tylko runy starsze niż polityki RETENTION_*
+    python clean_runs.py --retention --dry-run  # raport bez usuwania
 """
 
 import sys
@@ -21,6 +25,10 @@ from pathlib import Path
 from database import SessionLocal
 from app.models.basket_snapshot import BasketSnapshot
 from app.models.api_error import ApiError
+from app.models.api_endpoint_stat import ApiEndpointRollup, ApiEndpointStat
+from app.models.scenario_run_data import ScenarioRunData
+from app.models.price_point import PricePoint
+from app.models.flakiness_score import FlakinessScore
 from app.models.alert import Alert
 from app.models.alert_group import AlertGroup
 from app.models.run import ScenarioRun
@@ -49,10 +57,15 @@ def clean_runs(force: bool = False, keep_logs: bool = False):
         # 1. Zależności scenario_runs
         counts['basket_snapshots'] = db.query(BasketSnapshot).delete()
         counts['api_errors'] = db.query(ApiError).delete()
+        counts['api_endpoint_stats'] = db.query(ApiEndpointStat).delete()
         counts['alerts'] = db.query(Alert).delete()
+        counts['scenario_run_data'] = db.query(ScenarioRunData).delete()
+        counts['price_points'] = db.query(PricePoint).delete()
         
         # 2. Zależności suite_runs
         counts['alert_groups'] = db.query(AlertGroup).delete()
+        counts['flakiness_scores'] = db.query(FlakinessScore).delete()
+        counts['api_endpoint_rollups'] = db.query(ApiEndpointRollup).delete()
         
         # 3. Główne tabele
         counts['scenario_runs'] = db.query(ScenarioRun).delete()
@@ -87,8 +100,23 @@ def clean_runs(force: bool = False, keep_logs: bool = False):
         db.close()
 
 
+def clean_expired(dry_run: bool = False):
+    """Usuwa runy starsze niż polityki retencji (core/retention.py)."""
+    from core import retention
+
+    db = SessionLocal()
+    try:
+        report = retention.run_pass(db, dry_run=dry_run)
+        print(f"\n🗑️  Retencja: {report.summary()}")
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
     force = "--force" in sys.argv or "-f" in sys.argv
     keep_logs = "--keep-logs" in sys.argv
-    
-    clean_runs(force=force, keep_logs=keep_logs)
+
+    if "--retention" in sys.argv:
+        clean_expired(dry_run="--dry-run" in sys.argv)
+    else:
+        clean_runs(force=force, keep_logs=keep_logs)
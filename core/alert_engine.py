@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from app.models.alert import Alert
 from app.models.alert_config import AlertConfig
 from app.models.alert_type import AlertType
+from core import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +70,7 @@ class AlertEngine:
         )
         
         self.alerts.append(alert)
+        metrics.ALERTS_RAISED.inc(business_rule=rule)
         logger.info(f"Alert dodany: {rule} [{alert_type.name}]")
 
     def counted_alerts(self) -> int:
@@ -0,0 +1,300 @@
+"""
+AlertSearch — indeks pełnotekstowy alertów (SQLite FTS5 / MySQL FULLTEXT).
+
+Odpowiedzialności:
+  1. Indeksuje alert_groups (business_rule, title, resolution_note, notes)
+     oraz alerts (business_rule, title, description) — opisy z pojedynczych runów
+  2. Synchronizuje indeks przy INSERT / UPDATE / DELETE przez zdarzenia ORM
+     (w tej samej transakcji co zmiana wiersza)
+  3. Zwraca warunek na AlertGroup dla /alerts?search= oraz fragmenty pasujących opisów —
+     opis alertu dopasowuje tylko grupy z tym samym business_rule na środowisku alertu
+     (AlertGroup.environment_id)
+  4. Usuwa wpisy alertów kasowanych masowo przez retencję (forget_*)
+  5. Przebudowuje indeks po hurtowych wstawieniach (rebuild_index)
+
+SQLite: wirtualna tabela alert_fts w bazie aplikacji, tworzona przy pierwszym użyciu
+i wypełniana istniejącymi danymi. rowid = id * 2 (alert_groups) lub id * 2 + 1 (alerts).
+Wpis alertu trzyma business_rule i environment_id — zarchiwizowane opisy nadal wskazują swoją grupę.
+Tabela bez kolumny environment_id (starszy schemat) jest przebudowywana przy pierwszym użyciu.
+
+MySQL: indeksy FULLTEXT z modeli (Index(...).ddl_if(dialect="mysql")) na tych samych kolumnach
+co alert_fts, zapytania MATCH … AGAINST w trybie BOOLEAN. Zdarzenia ORM nic nie robią — indeks
+utrzymuje silnik.
+
+Inne bazy / SQLite bez FTS5: ILIKE po tych samych kolumnach.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from sqlalchemy import and_, event, exists, false, inspect, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.alert import Alert
+from app.models.alert_group import AlertGroup
+
+logger = logging.getLogger(__name__)
+
+# Maksymalna liczba wierszy indeksu branych pod uwagę w jednym wyszukiwaniu
+MAX_MATCHES = 1000
+
+# Kolumny indeksowane — zmiana innych pól (last_seen_at, repeat_count…) nie dotyka indeksu
+_GROUP_FIELDS = ("business_rule", "title", "resolution_note", "notes")
+_ALERT_FIELDS = ("business_rule", "title", "description", "environment_id")
+
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE alert_fts USING fts5("
+    "business_rule, title, body, environment_id UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Silniki (URL), dla których alert_fts istnieje (True) lub FTS5 jest niedostępne (False)
+_fts_ready: dict[str, bool] = {}
+
+
+@dataclass
+class AlertSearchResult:
+    clause: ColumnElement                                   # warunek na AlertGroup
+    # (business_rule, environment_id) → fragment opisu alertu
+    snippets: dict[tuple[str, int], str] = field(default_factory=dict)
+
+
+def _group_rowid(group_id: int) -> int:
+    return group_id * 2
+
+
+def _alert_rowid(alert_id: int) -> int:
+    return alert_id * 2 + 1
+
+
+# ── SQLite FTS5 ───────────────────────────────────────────────────────────────
+
+def _ensure_fts(connection: Connection) -> bool:
+    """Tworzy i wypełnia alert_fts przy pierwszym użyciu na danej bazie. False = brak FTS5."""
+    if connection.dialect.name != "sqlite":
+        return False
+    key = str(connection.engine.url)
+    ready = _fts_ready.get(key)
+    if ready is not None:
+        return ready
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'alert_fts'").first() is not None
+    if exists and "environment_id" not in {
+        row[1] for row in connection.exec_driver_sql("PRAGMA table_info(alert_fts)")
+    }:
+        # Indeks sprzed zawężenia opisów do środowiska — przebudowa z danych tabel
+        connection.exec_driver_sql("DROP TABLE alert_fts")
+        exists = False
+    if not exists:
+        try:
+            connection.exec_driver_sql(_FTS_SCHEMA)
+        except Exception as e:
+            logger.warning(f"[AlertSearch] SQLite bez FTS5 — wyszukiwanie przez LIKE ({e})")
+            _fts_ready[key] = False
+            return False
+        connection.exec_driver_sql(
+            "INSERT INTO alert_fts (rowid, business_rule, title, body) "
+            "SELECT id * 2, business_rule, title, coalesce(resolution_note, '') || ' ' || coalesce(notes, '') "
+            "FROM alert_groups")
+        connection.exec_driver_sql(
+            "INSERT INTO alert_fts (rowid, business_rule, title, body, environment_id) "
+            "SELECT id * 2 + 1, business_rule, title, coalesce(description, ''), environment_id FROM alerts")
+        logger.info("[AlertSearch] Utworzono indeks alert_fts")
+        # Bez zapamiętania — transakcja tworząca może zostać wycofana; kolejne wywołanie sprawdzi ponownie
+        return True
+
+    _fts_ready[key] = True
+    return True
+
+
+def _index_row(connection: Connection, rowid: int, business_rule: str, title: str, body: str,
+               environment_id: int | None = None) -> None:
+    connection.execute(text("DELETE FROM alert_fts WHERE rowid = :rowid"), {"rowid": rowid})
+    connection.execute(
+        text("INSERT INTO alert_fts (rowid, business_rule, title, body, environment_id) "
+             "VALUES (:rowid, :rule, :title, :body, :environment_id)"),
+        {"rowid": rowid, "rule": business_rule or "", "title": title or "", "body": body or "",
+         "environment_id": environment_id},
+    )
+
+
+def _delete_rows(connection: Connection, rowids: Iterable[int]) -> None:
+    rowids = list(rowids)
+    if rowids:
+        connection.execute(text("DELETE FROM alert_fts WHERE rowid = :rowid"), [{"rowid": r} for r in rowids])
+
+
+def _changed(target, fields: tuple[str, ...]) -> bool:
+    state = inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in fields)
+
+
+# ── Zdarzenia ORM ─────────────────────────────────────────────────────────────
+
+def _index_group(connection: Connection, group: AlertGroup) -> None:
+    body = " ".join(filter(None, (group.resolution_note, group.notes)))
+    _index_row(connection, _group_rowid(group.id), group.business_rule, group.title, body)
+
+
+def _index_alert(connection: Connection, alert: Alert) -> None:
+    _index_row(connection, _alert_rowid(alert.id), alert.business_rule, alert.title, alert.description,
+               alert.environment_id)
+
+
+@event.listens_for(AlertGroup, "after_insert")
+def _group_inserted(mapper, connection, target):
+    if _ensure_fts(connection):
+        _index_group(connection, target)
+
+
+@event.listens_for(AlertGroup, "after_update")
+def _group_updated(mapper, connection, target):
+    if _changed(target, _GROUP_FIELDS) and _ensure_fts(connection):
+        _index_group(connection, target)
+
+
+@event.listens_for(AlertGroup, "after_delete")
+def _group_deleted(mapper, connection, target):
+    if _ensure_fts(connection):
+        _delete_rows(connection, [_group_rowid(target.id)])
+
+
+@event.listens_for(Alert, "after_insert")
+def _alert_inserted(mapper, connection, target):
+    if _ensure_fts(connection):
+        _index_alert(connection, target)
+
+
+@event.listens_for(Alert, "after_update")
+def _alert_updated(mapper, connection, target):
+    if _changed(target, _ALERT_FIELDS) and _ensure_fts(connection):
+        _index_alert(connection, target)
+
+
+@event.listens_for(Alert, "after_delete")
+def _alert_deleted(mapper, connection, target):
+    if _ensure_fts(connection):
+        _delete_rows(connection, [_alert_rowid(target.id)])
+
+
+# ── Usuwanie masowe (retencja) ────────────────────────────────────────────────
+
+def forget_alerts(db: Session, alert_ids: Iterable[int]) -> None:
+    """Usuwa wpisy alertów kasowanych przez query.delete() — zdarzenia ORM ich nie widzą."""
+    connection = db.connection()
+    if _ensure_fts(connection):
+        _delete_rows(connection, (_alert_rowid(i) for i in alert_ids))
+
+
+def forget_groups(db: Session, group_ids: Iterable[int]) -> None:
+    connection = db.connection()
+    if _ensure_fts(connection):
+        _delete_rows(connection, (_group_rowid(i) for i in group_ids))
+
+
+def rebuild_index(connection: Connection) -> None:
+    """Buduje alert_fts od nowa — po wstawieniach z pominięciem ORM (seed_history.py)."""
+    if connection.dialect.name != "sqlite":
+        return
+    connection.exec_driver_sql("DROP TABLE IF EXISTS alert_fts")
+    _fts_ready.pop(str(connection.engine.url), None)
+    _ensure_fts(connection)
+
+
+# ── Wyszukiwanie ──────────────────────────────────────────────────────────────
+
+def _described(condition) -> ColumnElement:
+    """Grupa ma alert spełniający warunek — ten sam business_rule i to samo środowisko."""
+    return exists(
+        select(Alert.id).where(
+            Alert.business_rule == AlertGroup.business_rule,
+            Alert.environment_id == AlertGroup.environment_id,
+            condition,
+        )
+    )
+
+
+def _fts_query(query: str) -> str | None:
+    """Tokeny jako frazy (AND), ostatni jako prefiks — wyszukiwanie w trakcie pisania."""
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return " ".join([f'"{t}"' for t in tokens[:-1]] + [f'"{tokens[-1]}"*'])
+
+
+def _search_fts(db: Session, query: str) -> AlertSearchResult:
+    match = _fts_query(query)
+    if match is None:
+        return AlertSearchResult(clause=false())
+
+    rows = db.execute(
+        text("SELECT rowid, business_rule, environment_id, snippet(alert_fts, 2, '', '', '…', 12) "
+             "FROM alert_fts WHERE alert_fts MATCH :match ORDER BY rank LIMIT :limit"),
+        {"match": match, "limit": MAX_MATCHES},
+    ).all()
+
+    group_ids, scopes, snippets = set(), {}, {}
+    for rowid, business_rule, environment_id, snippet in rows:
+        if rowid % 2 == 0:
+            group_ids.add(rowid // 2)
+        elif environment_id is not None:
+            scopes.setdefault(business_rule, set()).add(environment_id)
+            key = (business_rule, environment_id)
+            if snippet.strip() and key not in snippets:
+                snippets[key] = snippet
+
+    if not group_ids and not scopes:
+        return AlertSearchResult(clause=false())
+    return AlertSearchResult(
+        clause=or_(
+            AlertGroup.id.in_(group_ids),
+            *(and_(AlertGroup.business_rule == rule, AlertGroup.environment_id.in_(environment_ids))
+              for rule, environment_ids in scopes.items()),
+        ),
+        snippets=snippets,
+    )
+
+
+def _search_mysql(query: str) -> AlertSearchResult:
+    from sqlalchemy.dialects.mysql import match
+
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return AlertSearchResult(clause=false())
+    against = " ".join(f"+{t}" for t in tokens) + "*"
+
+    # Kolumny MATCH muszą dokładnie odpowiadać indeksom FULLTEXT z modeli
+    groups = match(AlertGroup.business_rule, AlertGroup.title, AlertGroup.resolution_note, AlertGroup.notes,
+                   against=against).in_boolean_mode()
+    alerts = match(Alert.business_rule, Alert.title, Alert.description,
+                   against=against).in_boolean_mode()
+    # EXISTS zamiast IN (… LIMIT) — MySQL nie obsługuje LIMIT w podzapytaniu IN (błąd 1235)
+    return AlertSearchResult(clause=or_(groups, _described(alerts)))
+
+
+def _search_like(query: str) -> AlertSearchResult:
+    pattern = f"%{query}%"
+    return AlertSearchResult(clause=or_(
+        AlertGroup.business_rule.ilike(pattern),
+        AlertGroup.title.ilike(pattern),
+        AlertGroup.resolution_note.ilike(pattern),
+        AlertGroup.notes.ilike(pattern),
+        _described(Alert.description.ilike(pattern)),
+    ))
+
+
+def search(db: Session, query: str) -> AlertSearchResult:
+    """Warunek na AlertGroup: pasuje grupa lub alert z jej business_rule na jej środowisku."""
+    dialect = db.bind.dialect.name
+    if dialect == "mysql":
+        return _search_mysql(query)
+    if dialect == "sqlite" and _ensure_fts(db.connection()):
+        if str(db.bind.url) not in _fts_ready:
+            db.commit()  # indeks utworzony przy pierwszym wyszukiwaniu
+        return _search_fts(db, query)
+    return _search_like(query)
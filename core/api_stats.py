@@ -0,0 +1,414 @@
+"""
+API stats — czasy i błędy żądań XHR/fetch sklepu widziane przez przeglądarkę.
+
+Odpowiedzialności:
+  1. Normalizacja endpointu: metoda + ścieżka bez query, identyfikatory w segmentach
+     (liczby, UUID, hashe, kody z ≥ 4 cyframi) → {id}; host tylko gdy inny niż środowiska
+  2. TrafficRecorder (ShopRunner) — zbiera czasy żądań runu, ShopRunResult.api_stats to
+     agregaty per endpoint: liczba, p50/p95/max, błędy HTTP ≥ 400, żądania bez odpowiedzi,
+     bajty i histogram czasów w koszykach logarytmicznych
+  3. Zapis ApiEndpointStat per run (SHOP_API_STATS_ENABLED)
+  4. Po suite runie — rollup per środowisko (ApiEndpointRollup): scalone histogramy runów,
+     tylko INSERT, jeden wiersz na (suite run, endpoint)
+  5. Raport dla panelu /api-stats: okno N dni z p95 per dzień i porównaniem
+     z poprzednim oknem tej samej długości
+
+Liczone są tylko żądania do hosta środowiska, jego subdomen i SHOP_API_HOSTS —
+analityka i skrypty zewnętrzne nie zaśmiecają statystyk.
+
+Przykład:
+    recorder = api_stats.TrafficRecorder(scenario_context.environment_url)
+    recorder.add("GET", url, duration_ms=84.0, status=200, size=1532)
+    api_stats.record(db, scenario_run, recorder.summary())
+"""
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.api_endpoint_stat import ApiEndpointRollup, ApiEndpointStat
+from app.models.run import ScenarioRun
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Typy zasobów Playwright liczone jako wywołania API
+RESOURCE_TYPES = ('xhr', 'fetch')
+
+ID_PLACEHOLDER = '{id}'
+OTHER_PATH = '{other}'
+
+# Koszyki histogramu: HIST_STEPS na podwojenie czasu (górna granica 2^(i/HIST_STEPS) ms,
+# ~19% szerokości), ostatni koszyk ≈ 17 min
+HIST_STEPS = 4
+HIST_MAX = 80
+
+_SPARK = '▁▂▃▄▅▆▇█'
+
+_UUID = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+_HEX = re.compile(r'^[0-9a-f]{16,}$', re.IGNORECASE)
+_DIGIT = re.compile(r'\d')
+
+
+# ── Normalizacja ──────────────────────────────────────────────────────────────
+
+def _is_id(segment: str) -> bool:
+    return (
+        segment.isdigit()
+        or bool(_UUID.match(segment))
+        or bool(_HEX.match(segment))
+        or len(_DIGIT.findall(segment)) >= 4
+    )
+
+
+# Ścieżki powtarzają się między runami — regexy tylko przy pierwszym wystąpieniu
+@lru_cache(maxsize=4096)
+def normalize_path(path: str) -> str:
+    segments = [ID_PLACEHOLDER if segment and _is_id(segment) else segment for segment in path.split('/')]
+    return '/'.join(segments) or '/'
+
+
+# ── Histogram ─────────────────────────────────────────────────────────────────
+
+def bucket(ms: float) -> int:
+    if ms <= 1:
+        return 0
+    return min(HIST_MAX, math.ceil(HIST_STEPS * math.log2(ms)))
+
+
+def bucket_upper(index: int) -> float:
+    return 2 ** (index / HIST_STEPS)
+
+
+def merge_histogram(into: Counter, histogram: dict | None) -> None:
+    """Dodaje histogram zapisany w JSON (klucze tekstowe) do licznika."""
+    for index, count in (histogram or {}).items():
+        into[int(index)] += count
+
+
+def histogram_percentile(histogram: Counter, pct: float) -> float | None:
+    """Percentyl z histogramu — górna granica koszyka (zawyżenie najwyżej o szerokość koszyka)."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = math.ceil(pct * total)
+    seen = 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= rank:
+            return bucket_upper(index)
+    return bucket_upper(max(histogram))
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank na posortowanej liście."""
+    return sorted_values[max(0, math.ceil(pct * len(sorted_values)) - 1)]
+
+
+def sparkline(values: list[float | None]) -> str:
+    present = [v for v in values if v is not None]
+    if not present:
+        return ''
+    low, high = min(present), max(present)
+    span = (high - low) or 1.0
+    return ''.join(
+        ' ' if v is None else _SPARK[min(len(_SPARK) - 1, int((v - low) / span * len(_SPARK)))]
+        for v in values
+    )
+
+
+# ── Zbieranie w przeglądarce ──────────────────────────────────────────────────
+
+@dataclass
+class EndpointSummary:
+    method: str
+    path: str
+    count: int
+    errors: int
+    failures: int
+    p50_ms: float | None
+    p95_ms: float | None
+    max_ms: float | None
+    total_ms: float
+    bytes: int
+    histogram: dict[str, int]
+
+
+@dataclass
+class _Calls:
+    durations: list[float] = field(default_factory=list)
+    count: int = 0
+    errors: int = 0
+    failures: int = 0
+    bytes: int = 0
+
+
+class TrafficRecorder:
+    """Czasy żądań API jednego runu — agregowane per (metoda, znormalizowana ścieżka)."""
+
+    def __init__(self, environment_url: str):
+        self.base_host = (urlsplit(environment_url).hostname or '').lower()
+        # api.sklep.com.pl pasuje do www.sklep.com.pl, inny-sklep.com.pl już nie
+        self._domain = self.base_host.removeprefix('www.')
+        self._extra_hosts = set(settings.shop_api_hosts)
+        self._max_endpoints = settings.shop_api_max_endpoints
+        self._calls: dict[tuple[str, str], _Calls] = {}
+
+    def is_shop(self, url: str) -> bool:
+        host = (urlsplit(url).hostname or '').lower()
+        return (
+            host == self.base_host
+            or host == self._domain
+            or host.endswith('.' + self._domain)
+            or host in self._extra_hosts
+        )
+
+    def _key(self, method: str, url: str) -> tuple[str, str]:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        path = normalize_path(parts.path)
+        if host != self.base_host:
+            path = f"{host}{path}"
+        key = (method.upper()[:10], path[:255])
+        if key not in self._calls and len(self._calls) >= self._max_endpoints:
+            return (key[0], OTHER_PATH)
+        return key
+
+    def add(self, method: str, url: str, duration_ms: float | None, status: int | None, size: int = 0) -> None:
+        """Jedno żądanie. status=None — brak odpowiedzi (requestfailed)."""
+        calls = self._calls.setdefault(self._key(method, url), _Calls())
+        calls.count += 1
+        calls.bytes += max(size, 0)
+        if status is None:
+            calls.failures += 1
+        elif status >= 400:
+            calls.errors += 1
+        if duration_ms is not None and duration_ms >= 0:
+            calls.durations.append(duration_ms)
+
+    def summary(self) -> list[EndpointSummary]:
+        summaries = []
+        for (method, path), calls in self._calls.items():
+            durations = sorted(calls.durations)
+            histogram = Counter(bucket(ms) for ms in durations)
+            summaries.append(EndpointSummary(
+                method=method,
+                path=path,
+                count=calls.count,
+                errors=calls.errors,
+                failures=calls.failures,
+                p50_ms=round(_percentile(durations, 0.50), 1) if durations else None,
+                p95_ms=round(_percentile(durations, 0.95), 1) if durations else None,
+                max_ms=round(durations[-1], 1) if durations else None,
+                total_ms=round(sum(durations), 1),
+                bytes=calls.bytes,
+                histogram={str(index): count for index, count in sorted(histogram.items())},
+            ))
+        return summaries
+
+
+# ── Zapis ─────────────────────────────────────────────────────────────────────
+
+def record(db: Session, run: ScenarioRun, summaries: list[EndpointSummary]) -> None:
+    """Dodaje ApiEndpointStat runu (commit po stronie wywołującego)."""
+    if not settings.shop_api_stats_enabled:
+        return
+    db.add_all(
+        ApiEndpointStat(
+            run_id=run.id,
+            environment_id=run.environment_id,
+            method=s.method,
+            path=s.path,
+            count=s.count,
+            errors=s.errors,
+            failures=s.failures,
+            p50_ms=s.p50_ms,
+            p95_ms=s.p95_ms,
+            max_ms=s.max_ms,
+            total_ms=s.total_ms,
+            bytes=s.bytes,
+            histogram=s.histogram,
+        )
+        for s in summaries
+    )
+
+
+def aggregate(rows) -> dict[tuple[str, str], dict]:
+    """
+    Sumuje statystyki runów per (metoda, ścieżka). Wiersz: (method, path, count, errors,
+    failures, max_ms, total_ms, bytes, histogram) — percentyle później z połączonego histogramu.
+    """
+    totals: dict[tuple[str, str], dict] = defaultdict(lambda: {
+        'runs': 0, 'count': 0, 'errors': 0, 'failures': 0,
+        'max_ms': None, 'total_ms': 0.0, 'bytes': 0, 'histogram': Counter(),
+    })
+    for method, path, count, errors, failures, max_ms, total_ms, size, histogram in rows:
+        t = totals[(method, path)]
+        t['runs'] += 1
+        t['count'] += count
+        t['errors'] += errors
+        t['failures'] += failures
+        t['total_ms'] += total_ms or 0.0
+        t['bytes'] += size or 0
+        if max_ms is not None:
+            t['max_ms'] = max_ms if t['max_ms'] is None else max(t['max_ms'], max_ms)
+        merge_histogram(t['histogram'], histogram)
+    return totals
+
+
+def rollup_values(totals: dict[tuple[str, str], dict]) -> list[dict]:
+    """Kolumny wierszy ApiEndpointRollup (bez environment_id, suite_run_id, day)."""
+    return [
+        {
+            'method': method, 'path': path,
+            'runs': t['runs'], 'count': t['count'], 'errors': t['errors'], 'failures': t['failures'],
+            'max_ms': t['max_ms'], 'total_ms': round(t['total_ms'], 1), 'bytes': t['bytes'],
+            'histogram': {str(index): count for index, count in sorted(t['histogram'].items())},
+        }
+        for (method, path), t in totals.items()
+    ]
+
+
+def rollup(db: Session, suite_run) -> int:
+    """Rollup statystyk runów suite runu per endpoint (commit po stronie wywołującego)."""
+    if not settings.shop_api_stats_enabled:
+        return 0
+
+    totals = aggregate(db.execute(
+        select(ApiEndpointStat.method, ApiEndpointStat.path, ApiEndpointStat.count, ApiEndpointStat.errors,
+               ApiEndpointStat.failures, ApiEndpointStat.max_ms, ApiEndpointStat.total_ms,
+               ApiEndpointStat.bytes, ApiEndpointStat.histogram)
+        .join(ScenarioRun, ScenarioRun.id == ApiEndpointStat.run_id)
+        .where(ScenarioRun.suite_run_id == suite_run.id)
+    ))
+
+    # Ponowna finalizacja tego samego suite runu nie dubluje wierszy
+    db.execute(delete(ApiEndpointRollup).where(ApiEndpointRollup.suite_run_id == suite_run.id))
+    day = (suite_run.started_at or datetime.now(timezone.utc)).date()
+    db.add_all(
+        ApiEndpointRollup(environment_id=suite_run.environment_id, suite_run_id=suite_run.id, day=day, **values)
+        for values in rollup_values(totals)
+    )
+    return len(totals)
+
+
+# ── Raport panelu ─────────────────────────────────────────────────────────────
+
+@dataclass
+class _Window:
+    runs: int = 0
+    count: int = 0
+    errors: int = 0
+    failures: int = 0
+    total_ms: float = 0.0
+    max_ms: float | None = None
+    bytes: int = 0
+    histogram: Counter = field(default_factory=Counter)
+
+    def add(self, row) -> None:
+        """row — wiersz z kolumnami ApiEndpointRollup (encja albo Row z select kolumn)."""
+        self.runs += row.runs
+        self.count += row.count
+        self.errors += row.errors
+        self.failures += row.failures
+        self.total_ms += row.total_ms or 0.0
+        self.bytes += row.bytes or 0
+        if row.max_ms is not None:
+            self.max_ms = row.max_ms if self.max_ms is None else max(self.max_ms, row.max_ms)
+        merge_histogram(self.histogram, row.histogram)
+
+    @property
+    def error_rate(self) -> float:
+        return (self.errors + self.failures) / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float | None:
+        return histogram_percentile(self.histogram, pct)
+
+
+@dataclass
+class EndpointReport:
+    method: str
+    path: str
+    current: _Window = field(default_factory=_Window)
+    previous: _Window = field(default_factory=_Window)
+    daily: dict[date, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    days: list[date] = field(default_factory=list)
+
+    @property
+    def p50_ms(self) -> float | None:
+        return self.current.percentile(0.50)
+
+    @property
+    def p95_ms(self) -> float | None:
+        return self.current.percentile(0.95)
+
+    @property
+    def avg_ms(self) -> float | None:
+        timed = sum(self.current.histogram.values())
+        return self.current.total_ms / timed if timed else None
+
+    @property
+    def avg_bytes(self) -> float:
+        return self.current.bytes / self.current.count if self.current.count else 0.0
+
+    @property
+    def p95_change(self) -> float | None:
+        """Zmiana p95 względem poprzedniego okna (ułamek), None gdy brak porównania."""
+        before, now = self.previous.percentile(0.95), self.p95_ms
+        if not before or now is None:
+            return None
+        return (now - before) / before
+
+    @property
+    def error_rate_change(self) -> float | None:
+        if not self.previous.count:
+            return None
+        return self.current.error_rate - self.previous.error_rate
+
+    @property
+    def daily_p95(self) -> list[float | None]:
+        return [histogram_percentile(self.daily[day], 0.95) if day in self.daily else None for day in self.days]
+
+    @property
+    def trend(self) -> str:
+        return sparkline(self.daily_p95)
+
+
+def endpoint_report(db: Session, environment_id: int, days: int, today: date | None = None) -> list[EndpointReport]:
+    """Endpointy środowiska z ostatnich `days` dni (z porównaniem do poprzednich `days` dni)."""
+    today = today or datetime.now(timezone.utc).date()
+    start = today - timedelta(days=days - 1)
+    previous_start = start - timedelta(days=days)
+    window_days = [start + timedelta(days=i) for i in range(days)]
+
+    reports: dict[tuple[str, str], EndpointReport] = {}
+    # Kolumny zamiast encji — bez kosztu tożsamości ORM na dziesiątkach tysięcy wierszy okna
+    rows = db.execute(
+        select(ApiEndpointRollup.day, ApiEndpointRollup.method, ApiEndpointRollup.path, ApiEndpointRollup.runs,
+               ApiEndpointRollup.count, ApiEndpointRollup.errors, ApiEndpointRollup.failures,
+               ApiEndpointRollup.max_ms, ApiEndpointRollup.total_ms, ApiEndpointRollup.bytes,
+               ApiEndpointRollup.histogram)
+        .where(ApiEndpointRollup.environment_id == environment_id,
+               ApiEndpointRollup.day >= previous_start,
+               ApiEndpointRollup.day <= today)
+        .execution_options(yield_per=1000)
+    )
+    for row in rows:
+        key = (row.method, row.path)
+        if key not in reports:
+            reports[key] = EndpointReport(row.method, row.path, days=window_days)
+        report = reports[key]
+        if row.day >= start:
+            report.current.add(row)
+            merge_histogram(report.daily[row.day], row.histogram)
+        else:
+            report.previous.add(row)
+
+    return [report for report in reports.values() if report.current.count]
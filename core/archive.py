@@ -0,0 +1,361 @@
+"""
+Archive — zimny magazyn starych runów (pliki miesięczne JSONL.gz).
+
+Odpowiedzialności:
+  1. Przenosi scenario_runs, alerts, basket_snapshots, api_errors, api_endpoint_stats,
+     scenario_run_data starych suite_run
+     do archive/YYYY-MM.jsonl.gz — w bazie zostaje wiersz suite_runs z podsumowaniem
+  2. Zapamiętuje w SuiteRun offset i długość członka gzip z danymi tej suite
+  3. Odczytuje dane pojedynczej suite bez rozpakowywania całego miesiąca (seek + jeden członek)
+  4. Usuwa miesiące starsze niż ARCHIVE_KEEP_MONTHS razem z podsumowaniami i plikami runów
+     oraz miesiące, których wszystkie podsumowania usunęła już retencja
+
+Plik miesiąca to sklejone strumienie gzip (poprawny .gz — `zcat` czyta całość),
+każdy strumień to jedna suite_run: linie {"table": ..., "row": {...}}.
+
+Runy chronione przez retencję (otwarte alert_groups, joby, runy w toku) nie są archiwizowane.
+Zarchiwizowane podsumowania i ich pliki żyją do horyzontu ARCHIVE_KEEP_MONTHS — retencja
+usuwa je według niego (oldest_kept_month), a nie według RETENTION_SUCCESS_DAYS / FAILED_DAYS.
+Szeregi cen (price_points) zostają w bazie — archiwizacja zeruje tylko ich run_id.
+"""
+import asyncio
+import base64
+import enum
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import DateTime, Enum, LargeBinary, Numeric
+from sqlalchemy.orm import Session
+
+from app.models.alert import Alert
+from app.models.api_error import ApiError
+from app.models.api_endpoint_stat import ApiEndpointStat
+from app.models.basket_snapshot import BasketSnapshot
+from app.models.environment import Environment
+from app.models.price_point import PricePoint
+from app.models.run import ScenarioRun
+from app.models.scenario import Scenario
+from app.models.scenario_run_data import ScenarioRunData
+from app.models.suite_run import SuiteRun, SuiteRunStatus
+from core import response_cache, retention
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Suite_run wczytywane na partię (każda suite_run to osobny commit)
+BATCH_SIZE = 50
+
+# Kolejność zapisu i usuwania — od zależnych do scenario_runs
+_CHILD_MODELS = (BasketSnapshot, ApiError, ApiEndpointStat, Alert, ScenarioRunData)
+_MODELS = {model.__tablename__: model for model in (ScenarioRun, *_CHILD_MODELS)}
+
+
+@dataclass
+class ArchiveReport:
+    suite_runs: int = 0
+    rows: int = 0
+    bytes_written: int = 0
+    months_removed: int = 0
+    duration: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Zarchiwizowano suite_run: {self.suite_runs} ({self.rows} wierszy, "
+            f"{self.bytes_written / 1024:.0f} KB) | Usunięte miesiące: {self.months_removed} | "
+            f"{self.duration:.1f}s"
+        )
+
+
+class ArchivedRecord:
+    """Wiersz odczytany z archiwum — atrybuty jak w modelu, bez sesji SQLAlchemy."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    @property
+    def duration_seconds(self) -> int | None:
+        started, finished = self.__dict__.get("started_at"), self.__dict__.get("finished_at")
+        if started and finished:
+            return int((finished - started).total_seconds())
+        return None
+
+
+@dataclass
+class ArchivedSuiteRun:
+    scenario_runs: list[ArchivedRecord] = field(default_factory=list)
+    alerts: list[ArchivedRecord] = field(default_factory=list)
+    basket_snapshots: list[ArchivedRecord] = field(default_factory=list)
+    api_errors: list[ArchivedRecord] = field(default_factory=list)
+    api_endpoint_stats: list[ArchivedRecord] = field(default_factory=list)
+    scenario_run_data: list[ArchivedRecord] = field(default_factory=list)
+
+    def for_run(self, rows: list[ArchivedRecord], run_id: int) -> list[ArchivedRecord]:
+        return [row for row in rows if row.run_id == run_id]
+
+    def scenario_run(self, run_id: int) -> ArchivedRecord | None:
+        return next((run for run in self.scenario_runs if run.id == run_id), None)
+
+
+# ── Serializacja ──────────────────────────────────────────────────────────────
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def _dump_row(obj) -> dict:
+    return {col.key: _dump_value(getattr(obj, col.key)) for col in obj.__table__.columns}
+
+
+def _load_row(model, row: dict) -> ArchivedRecord:
+    fields = {}
+    for col in model.__table__.columns:
+        value = row.get(col.key)
+        if value is not None:
+            if isinstance(col.type, DateTime):
+                value = datetime.fromisoformat(value)
+                if value.tzinfo is None:
+                    value = value.replace(tzinfo=timezone.utc)
+            elif isinstance(col.type, Enum) and col.type.enum_class is not None:
+                value = col.type.enum_class(value)
+            elif isinstance(col.type, Numeric) and col.type.asdecimal:
+                value = Decimal(value)
+            elif isinstance(col.type, LargeBinary):
+                value = base64.b64decode(value)
+        fields[col.key] = value
+    return ArchivedRecord(**fields)
+
+
+def _month_path(started_at: datetime) -> Path:
+    return Path(settings.archive_dir) / f"{started_at:%Y-%m}.jsonl.gz"
+
+
+def oldest_kept_month(now: datetime) -> datetime:
+    """Początek najstarszego zachowywanego miesiąca archiwum (ARCHIVE_KEEP_MONTHS)."""
+    months = now.year * 12 + now.month - 1 - settings.archive_keep_months
+    return datetime(months // 12, months % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+# ── Archiwizacja ──────────────────────────────────────────────────────────────
+
+def _collect(db: Session, suite_run_id: int) -> tuple[list[str], list[int]]:
+    """Linie JSONL z danymi suite_run oraz id jej scenario_runs."""
+    runs = db.query(ScenarioRun).filter(ScenarioRun.suite_run_id == suite_run_id).all()
+    run_ids = [run.id for run in runs]
+
+    lines = [json.dumps({"table": ScenarioRun.__tablename__, "row": _dump_row(run)}, ensure_ascii=False)
+             for run in runs]
+    if run_ids:
+        for model in _CHILD_MODELS:
+            for obj in db.query(model).filter(model.run_id.in_(run_ids)):
+                lines.append(json.dumps({"table": model.__tablename__, "row": _dump_row(obj)},
+                                        ensure_ascii=False, default=str))
+    return lines, run_ids
+
+
+def _append_member(path: Path, lines: list[str]) -> tuple[int, int]:
+    """Dopisuje jeden strumień gzip na koniec pliku. Zwraca (offset, length)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+    with path.open("ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset, len(payload)
+
+
+def archive_suite_run(db: Session, suite_run: SuiteRun) -> int:
+    """Archiwizuje jedną suite_run — plik najpierw, potem usunięcie z bazy (jeden commit)."""
+    lines, run_ids = _collect(db, suite_run.id)
+    path = _month_path(suite_run.started_at)
+    offset, length = _append_member(path, lines)
+
+    if run_ids:
+        for model in _CHILD_MODELS:
+            db.query(model).filter(model.run_id.in_(run_ids)).delete(synchronize_session=False)
+        # Szeregi cen zostają w bazie (analiza historii) — bez powiązania z runem
+        db.query(PricePoint).filter(PricePoint.run_id.in_(run_ids)).update(
+            {PricePoint.run_id: None}, synchronize_session=False)
+        db.query(ScenarioRun).filter(ScenarioRun.id.in_(run_ids)).delete(synchronize_session=False)
+
+    suite_run.archived_at = datetime.now(timezone.utc)
+    suite_run.archive_path = str(path)
+    suite_run.archive_offset = offset
+    suite_run.archive_length = length
+    db.commit()
+    return len(lines)
+
+
+def _remove_expired_months(db: Session, now: datetime, report: ArchiveReport) -> None:
+    """Usuwa pliki miesięcy starszych niż ARCHIVE_KEEP_MONTHS (z podsumowaniami) i miesięcy bez podsumowań."""
+    archive_dir = Path(settings.archive_dir)
+    if not archive_dir.exists():
+        return
+
+    # Najstarszy zachowywany miesiąc jako "YYYY-MM" — porównywalny z nazwą pliku
+    oldest_kept = f"{oldest_kept_month(now):%Y-%m}"
+    protected = retention.protected_suite_run_ids(db)
+
+    for path in sorted(archive_dir.glob("*.jsonl.gz")):
+        month = path.name.removesuffix(".jsonl.gz")
+        if month >= oldest_kept:
+            # Wszystkie podsumowania usunięte (retencja, ręczne usunięcie) — dane miesiąca nie są już osiągalne
+            if not db.query(SuiteRun.id).filter(SuiteRun.archive_path == str(path)).first():
+                path.unlink()
+                report.months_removed += 1
+                _read_member.cache_clear()
+            continue
+
+        suite_run_ids = [
+            suite_run_id for (suite_run_id,) in
+            db.query(SuiteRun.id).filter(SuiteRun.archive_path == str(path))
+            if suite_run_id not in protected
+        ]
+        for i in range(0, len(suite_run_ids), retention.BATCH_SIZE):
+            batch = suite_run_ids[i:i + retention.BATCH_SIZE]
+            retention.delete_suite_runs(db, batch, retention.RetentionReport())
+            for suite_run_id in batch:
+                retention.delete_suite_run_files(suite_run_id)
+
+        if db.query(SuiteRun.id).filter(SuiteRun.archive_path == str(path)).first():
+            continue  # chronione podsumowania nadal wskazują na plik
+        path.unlink()
+        report.months_removed += 1
+        _read_member.cache_clear()
+
+
+def run_pass(db: Session, now: datetime | None = None) -> ArchiveReport:
+    """Jeden przebieg archiwizacji — wszystkie kwalifikujące się suite_run + usunięcie starych miesięcy."""
+    started = time.perf_counter()
+    now = now or datetime.now(timezone.utc)
+    report = ArchiveReport()
+
+    protected = retention.protected_suite_run_ids(db)
+    cutoff = now - timedelta(days=settings.archive_after_days)
+
+    after = 0
+    while True:
+        batch = (
+            db.query(SuiteRun)
+            .filter(
+                SuiteRun.archived_at.is_(None),
+                SuiteRun.status != SuiteRunStatus.RUNNING,
+                SuiteRun.started_at < cutoff,
+                SuiteRun.id > after,
+            )
+            .order_by(SuiteRun.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            break
+        after = batch[-1].id
+
+        for suite_run in batch:
+            if suite_run.id in protected:
+                continue
+            try:
+                report.rows += archive_suite_run(db, suite_run)
+                report.bytes_written += suite_run.archive_length or 0
+                report.suite_runs += 1
+            except Exception as e:
+                db.rollback()
+                logger.error(f"[Archive] Błąd archiwizacji suite_run #{suite_run.id}: {e}")
+        time.sleep(retention.BATCH_PAUSE)
+
+    _remove_expired_months(db, now, report)
+
+    report.duration = time.perf_counter() - started
+    return report
+
+
+async def run_scheduled() -> ArchiveReport | None:
+    """Przebieg z schedulera — w osobnym wątku, żeby nie blokować pętli zdarzeń."""
+    if not settings.archive_enabled:
+        return None
+
+    from database import SessionLocal
+
+    def _run() -> ArchiveReport:
+        db = SessionLocal()
+        try:
+            return run_pass(db)
+        finally:
+            db.close()
+
+    report = await asyncio.to_thread(_run)
+    if report.suite_runs or report.months_removed:
+        response_cache.bump("archive")
+    return report
+
+
+# ── Odczyt (panel) ────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=32)
+def _read_member(path: str, offset: int, length: int) -> tuple[tuple[str, dict], ...]:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        payload = f.read(length)
+    rows = []
+    for line in gzip.decompress(payload).decode("utf-8").splitlines():
+        if line:
+            record = json.loads(line)
+            rows.append((record["table"], record["row"]))
+    return tuple(rows)
+
+
+def archived_rows(suite_run: SuiteRun, table: str) -> list[dict]:
+    """Surowe wiersze tabeli z archiwum suite_run (referencje artefaktów, indeks alertów)."""
+    if not suite_run.is_archived or not suite_run.archive_path:
+        return []
+    try:
+        rows = _read_member(suite_run.archive_path, suite_run.archive_offset, suite_run.archive_length)
+    except (OSError, EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+        logger.error(f"[Archive] Nie można odczytać archiwum suite_run #{suite_run.id}: {e}")
+        return []
+    return [row for row_table, row in rows if row_table == table]
+
+
+def load_suite_run(db: Session, suite_run: SuiteRun) -> ArchivedSuiteRun:
+    """Dane zarchiwizowanej suite_run — scenario_runs z dołączonymi scenario/environment."""
+    result = ArchivedSuiteRun()
+    if not suite_run.is_archived or not suite_run.archive_path:
+        return result
+
+    try:
+        rows = _read_member(suite_run.archive_path, suite_run.archive_offset, suite_run.archive_length)
+    except (OSError, EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+        logger.error(f"[Archive] Nie można odczytać archiwum suite_run #{suite_run.id}: {e}")
+        return result
+
+    for table, row in rows:
+        model = _MODELS.get(table)
+        if model is not None:
+            getattr(result, table).append(_load_row(model, row))
+
+    # Relacje używane przez szablony — słowniki są w bazie, nie w archiwum
+    scenario_ids = {run.scenario_id for run in result.scenario_runs}
+    scenarios = {s.id: s for s in db.query(Scenario).filter(Scenario.id.in_(scenario_ids))} if scenario_ids else {}
+    environment = db.get(Environment, suite_run.environment_id)
+    for run in result.scenario_runs:
+        run.scenario = scenarios.get(run.scenario_id)
+        run.environment = environment
+
+    result.scenario_runs.sort(key=lambda run: run.started_at or datetime.min.replace(tzinfo=timezone.utc))
+    return result
@@ -0,0 +1,304 @@
+"""
+ArtifactStore — magazyn screenshotów adresowany treścią (SHA-256).
+
+Odpowiedzialności:
+  1. Zapisuje PNG pod hashem treści: artifacts/ab/abcd….png — identyczne zrzuty
+     z wielu runów to jeden plik na dysku
+  2. Generuje miniaturę JPEG przy zapisie (artifacts/ab/abcd….thumb.jpg, wymaga Pillow)
+  3. Liczy referencje z basket_snapshots.raw_data['artifact'] (tabela artifacts)
+  4. Usuwa artefakty bez referencji razem z plikami (collect_garbage)
+  5. Zwraca URL-e pełnego obrazu i miniatury dla szablonów
+
+Pliki są niezmienne — ten sam URL zawsze oznacza te same bajty, więc
+/artifacts/{hash} wysyła Cache-Control: immutable (app/routers/artifacts.py).
+
+Zapis w dwóch krokach: write_file() / write_bytes() — hash, plik i miniatura bez sesji bazy
+(bezpieczne w asyncio.to_thread), potem add_ref() na sesji wywołującego, gdy plik już istnieje.
+
+Referencje:
+  - add_ref()   — +1 przy zapisie snapshotu (ScenarioExecutor); put_bytes() / put_file() łączą oba kroki
+  - release()   — -N przy usuwaniu snapshotów (retencja, usunięcie runu, miesiąc archiwum)
+Zarchiwizowane snapshoty nadal trzymają referencję — zwalnia ją usunięcie podsumowania.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import struct
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.models.artifact import Artifact
+from app.models.basket_snapshot import BasketSnapshot
+from core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow opcjonalny — bez niego panel pokazuje pełne obrazy
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Artefakty bez referencji usuwane w jednej transakcji
+GC_BATCH_SIZE = 200
+
+THUMB_QUALITY = 75
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def is_valid_hash(value: str | None) -> bool:
+    return bool(value) and _HASH_RE.match(value) is not None
+
+
+def file_path(artifact_hash: str) -> Path:
+    return Path(settings.artifact_dir) / artifact_hash[:2] / f"{artifact_hash}.png"
+
+
+def thumb_path(artifact_hash: str) -> Path:
+    return Path(settings.artifact_dir) / artifact_hash[:2] / f"{artifact_hash}.thumb.jpg"
+
+
+def url(artifact_hash: str) -> str:
+    return f"/artifacts/{artifact_hash}"
+
+
+def thumb_url(artifact_hash: str) -> str:
+    return f"/artifacts/{artifact_hash}/thumb"
+
+
+# ── Zapis ─────────────────────────────────────────────────────────────────────
+
+def _png_size(data: bytes) -> tuple[int | None, int | None]:
+    """Wymiary z nagłówka IHDR — bez dekodowania obrazu."""
+    if data[:8] == _PNG_SIGNATURE and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    return None, None
+
+
+def _thumbnail(data: bytes) -> bytes | None:
+    width = settings.artifact_thumb_width
+    if Image is None or width <= 0:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            thumb = img.convert("RGB")
+            thumb.thumbnail((width, width * 4))
+            buf = io.BytesIO()
+            thumb.save(buf, "JPEG", quality=THUMB_QUALITY, optimize=True)
+            return buf.getvalue()
+    except Exception as e:
+        logger.warning(f"[ArtifactStore] Nie udało się wygenerować miniatury: {e}")
+        return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Zapis przez plik tymczasowy + rename — czytelnik nigdy nie widzi połowy pliku."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+@dataclass
+class StoredArtifact:
+    """Plik zapisany w magazynie — jeszcze bez referencji w bazie."""
+    hash: str
+    data: bytes
+    width: int | None
+    height: int | None
+    thumb_size: int | None
+
+
+def write_bytes(data: bytes) -> StoredArtifact:
+    """Hash, plik PNG i miniatura — bez sesji bazy, do wywołania w wątku (asyncio.to_thread)."""
+    artifact_hash = hashlib.sha256(data).hexdigest()
+    width, height = _png_size(data)
+    path, thumb = file_path(artifact_hash), thumb_path(artifact_hash)
+
+    if not path.exists():
+        _write_atomic(path, data)
+    if not thumb.exists():
+        thumb_data = _thumbnail(data)
+        if thumb_data:
+            _write_atomic(thumb, thumb_data)
+    thumb_size = thumb.stat().st_size if thumb.exists() else None
+    return StoredArtifact(artifact_hash, data, width, height, thumb_size)
+
+
+def write_file(source: str | Path) -> StoredArtifact | None:
+    """
+    Przenosi plik screenshotu do magazynu (plik źródłowy jest usuwany) — bez sesji bazy.
+    None, gdy plik nie istnieje lub zapis się nie udał.
+    """
+    source = Path(source)
+    try:
+        stored = write_bytes(source.read_bytes())
+    except OSError as e:
+        logger.warning(f"[ArtifactStore] Nie udało się zapisać {source}: {e}")
+        return None
+    source.unlink(missing_ok=True)
+    return stored
+
+
+def ensure_file(stored: StoredArtifact) -> None:
+    """Odtwarza plik usunięty przez collect_garbage między zapisem a add_ref (wiersz miał ref_count 0)."""
+    path = file_path(stored.hash)
+    if not path.exists():
+        _write_atomic(path, stored.data)
+
+
+def add_ref(db: Session, stored: StoredArtifact) -> None:
+    """
+    Dodaje jedną referencję do zapisanego pliku. Commit należy do wywołującego
+    (transakcja snapshotu) — na SQLite blokada zapisu trwa tylko od tego miejsca.
+    """
+    now = datetime.now(timezone.utc)
+    _add_ref(db, {
+        "hash": stored.hash,
+        "size": len(stored.data),
+        "width": stored.width,
+        "height": stored.height,
+        "thumb_size": stored.thumb_size,
+        "ref_count": 1,
+        "created_at": now,
+        "last_used_at": now,
+    })
+
+
+def _add_ref(db: Session, values: dict) -> None:
+    """INSERT lub ref_count + 1 — równoległe scenariusze mogą zapisać ten sam hash."""
+    now = values["last_used_at"]
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(Artifact).values(**values).on_conflict_do_update(
+            index_elements=[Artifact.hash],
+            set_={"ref_count": Artifact.ref_count + 1, "last_used_at": now},
+        )
+        db.execute(stmt)
+    elif dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(Artifact).values(**values).on_duplicate_key_update(
+            ref_count=Artifact.ref_count + 1, last_used_at=now,
+        )
+        db.execute(stmt)
+    else:
+        artifact = db.get(Artifact, values["hash"])
+        if artifact is None:
+            db.add(Artifact(**values))
+        else:
+            artifact.ref_count += 1
+            artifact.last_used_at = now
+        db.flush()
+
+
+def put_bytes(db: Session, data: bytes) -> str:
+    """
+    Zapisuje PNG w magazynie i dodaje jedną referencję (synchronicznie). Zwraca hash.
+    Referencja dopiero po zapisie pliku — nieudany zapis nie zostawia wiersza bez pliku.
+    """
+    stored = write_bytes(data)
+    add_ref(db, stored)
+    ensure_file(stored)
+    return stored.hash
+
+
+def put_file(db: Session, source: str | Path) -> str | None:
+    """Jak write_file() + add_ref() — synchronicznie. Zwraca hash albo None."""
+    stored = write_file(source)
+    if stored is None:
+        return None
+    add_ref(db, stored)
+    ensure_file(stored)
+    return stored.hash
+
+
+# ── Referencje ────────────────────────────────────────────────────────────────
+
+def refs_from_raw_data(values: Iterable[dict | None]) -> Counter:
+    """Liczba referencji per hash z kolekcji raw_data snapshotów."""
+    refs: Counter = Counter()
+    for raw_data in values:
+        artifact_hash = raw_data.get("artifact") if isinstance(raw_data, dict) else None
+        if is_valid_hash(artifact_hash):
+            refs[artifact_hash] += 1
+    return refs
+
+
+def snapshot_refs(db: Session, *criteria) -> Counter:
+    """Referencje snapshotów spełniających warunki (np. BasketSnapshot.run_id.in_(...))."""
+    return refs_from_raw_data(raw_data for (raw_data,) in db.query(BasketSnapshot.raw_data).filter(*criteria))
+
+
+def release(db: Session, refs: Counter) -> None:
+    """Zmniejsza ref_count — w transakcji wywołującego, przed usunięciem snapshotów."""
+    for artifact_hash, count in refs.items():
+        db.query(Artifact).filter(Artifact.hash == artifact_hash).update(
+            {Artifact.ref_count: Artifact.ref_count - count}, synchronize_session=False)
+
+
+# ── Sprzątanie ────────────────────────────────────────────────────────────────
+
+def collect_garbage(db: Session, dry_run: bool = False) -> tuple[int, int]:
+    """Usuwa artefakty bez referencji i ich pliki. Zwraca (liczba plików, bajty)."""
+    count, freed = 0, 0
+    after = ""
+    while True:
+        batch = [
+            artifact_hash for (artifact_hash,) in
+            db.query(Artifact.hash).filter(Artifact.ref_count <= 0, Artifact.hash > after)
+            .order_by(Artifact.hash).limit(GC_BATCH_SIZE)
+        ]
+        if not batch:
+            break
+        after = batch[-1]
+
+        if dry_run:
+            deleted = batch
+        else:
+            # Warunek powtórzony — referencja mogła przybyć od czasu SELECT
+            deleted = [
+                artifact_hash for artifact_hash in batch
+                if db.query(Artifact).filter(Artifact.hash == artifact_hash, Artifact.ref_count <= 0)
+                .delete(synchronize_session=False)
+            ]
+            db.commit()
+
+        for artifact_hash in deleted:
+            for path in (file_path(artifact_hash), thumb_path(artifact_hash)):
+                try:
+                    if path.exists():
+                        freed += path.stat().st_size
+                        if not dry_run:
+                            path.unlink()
+                        count += 1
+                except OSError as e:
+                    logger.warning(f"[ArtifactStore] Nie udało się usunąć {path}: {e}")
+    return count, freed
+
+
+# ── Panel ─────────────────────────────────────────────────────────────────────
+
+def screenshot_urls(raw_data: dict | None) -> tuple[str, str] | None:
+    """
+    (pełny obraz, miniatura) dla raw_data snapshotu.
+    Starsze snapshoty mają raw_data['screenshot'] — ścieżkę pod /screenshots (bez miniatury).
+    """
+    if not isinstance(raw_data, dict):
+        return None
+    artifact_hash = raw_data.get("artifact")
+    if is_valid_hash(artifact_hash):
+        return url(artifact_hash), thumb_url(artifact_hash)
+    legacy = raw_data.get("screenshot")
+    if legacy:
+        return f"/{legacy}", f"/{legacy}"
+    return None
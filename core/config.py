@@ -38,6 +38,18 @@ class Settings:
     Sekcje:
         Baza danych       — DATABASE_*
         Aplikacja         — APP_*
+        Logi suite        — SUITE_LOG_*
+        Retencja          — RETENTION_*
+        Archiwum          — ARCHIVE_*
+        Artefakty         — ARTIFACT_*
+        Metryki bazy      — DB_METRICS_*
+        Metryki           — METRICS_*
+        Tracing           — TRACING_*
+        Profilowanie      — PROFILING_*
+        Dane runów        — RUN_DATA_*
+        Szeregi cen       — PRICE_*
+        Flakiness         — FLAKINESS_*
+        Ruch API sklepu   — SHOP_API_*
         API zewnętrzne    — API_*
     """
 
@@ -57,6 +69,268 @@ class Settings:
     def app_port(self) -> int:
         return int(_get("APP_PORT", "8000"))
 
+    # ── Logi suite ────────────────────────────────────────────────────────────
+
+    @property
+    def suite_log_level(self) -> str:
+        """Domyślny poziom logów zapisywanych do pliku suite_run."""
+        return _get("SUITE_LOG_LEVEL", "DEBUG").upper()
+
+    @property
+    def suite_log_levels(self) -> dict[str, str]:
+        """
+        Poziomy per suite (po nazwie suite), np.:
+            SUITE_LOG_LEVELS=Smoke=INFO,Pełna regresja=WARNING
+        """
+        levels = {}
+        for item in (_get("SUITE_LOG_LEVELS") or "").split(","):
+            name, sep, level = item.partition("=")
+            if sep and name.strip():
+                levels[name.strip()] = level.strip().upper()
+        return levels
+
+
+    # ── Retencja ──────────────────────────────────────────────────────────────
+    #
+    # Wiek (dni) po którym runy i ich pliki (screenshots/, logs/) są usuwane.
+    # Runy powiązane z otwartymi alert_groups nie są usuwane nigdy.
+    #   RETENTION_ENVIRONMENTS=prod=30/180,stage=7/30   (sukces/porażka per środowisko)
+
+    @property
+    def retention_enabled(self) -> bool:
+        return _get("RETENTION_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def retention_interval_hours(self) -> int:
+        return int(_get("RETENTION_INTERVAL_HOURS", "6"))
+
+    @property
+    def retention_success_days(self) -> int:
+        return int(_get("RETENTION_SUCCESS_DAYS", "14"))
+
+    @property
+    def retention_failed_days(self) -> int:
+        return int(_get("RETENTION_FAILED_DAYS", "60"))
+
+    @property
+    def retention_snapshot_days(self) -> int:
+        return int(_get("RETENTION_SNAPSHOT_DAYS", "30"))
+
+    @property
+    def retention_api_error_days(self) -> int:
+        return int(_get("RETENTION_API_ERROR_DAYS", "30"))
+
+    @property
+    def retention_price_days(self) -> int:
+        """Punkty szeregów cen (price_points) — niezależnie od retencji runów."""
+        return int(_get("RETENTION_PRICE_DAYS", "365"))
+
+    @property
+    def retention_shop_api_days(self) -> int:
+        """Rollupy statystyk API sklepu (api_endpoint_rollups) — niezależnie od retencji runów."""
+        return int(_get("RETENTION_SHOP_API_DAYS", "180"))
+
+    @property
+    def retention_environments(self) -> dict[str, tuple[int, int]]:
+        """Nadpisania per środowisko: nazwa → (dni sukcesu, dni porażki)."""
+        policies = {}
+        for item in (_get("RETENTION_ENVIRONMENTS") or "").split(","):
+            name, sep, days = item.partition("=")
+            success, slash, failed = days.partition("/")
+            if sep and slash and name.strip():
+                try:
+                    policies[name.strip()] = (int(success), int(failed))
+                except ValueError:
+                    continue
+        return policies
+
+    # ── Archiwum ──────────────────────────────────────────────────────────────
+    #
+    # Runy starsze niż ARCHIVE_AFTER_DAYS są przenoszone do archive/YYYY-MM.jsonl.gz
+    # (zostaje wiersz suite_runs z podsumowaniem). Miesiące starsze niż
+    # ARCHIVE_KEEP_MONTHS są usuwane razem z podsumowaniami.
+
+    @property
+    def archive_enabled(self) -> bool:
+        return _get("ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def archive_after_days(self) -> int:
+        return int(_get("ARCHIVE_AFTER_DAYS", "7"))
+
+    @property
+    def archive_keep_months(self) -> int:
+        return int(_get("ARCHIVE_KEEP_MONTHS", "12"))
+
+    @property
+    def archive_dir(self) -> str:
+        return _get("ARCHIVE_DIR", "archive")
+
+    # ── Artefakty ─────────────────────────────────────────────────────────────
+    #
+    # Screenshoty zapisywane pod hashem treści (artifacts/ab/abcd….png) —
+    # identyczne zrzuty z wielu runów to jeden plik. Miniatury wymagają Pillow.
+
+    @property
+    def artifact_dir(self) -> str:
+        return _get("ARTIFACT_DIR", "artifacts")
+
+    @property
+    def artifact_thumb_width(self) -> int:
+        """Szerokość miniatury (px) generowanej przy zapisie; 0 = bez miniatur."""
+        return int(_get("ARTIFACT_THUMB_WIDTH", "320"))
+
+    # ── Metryki bazy ──────────────────────────────────────────────────────────
+    #
+    # Liczba zapytań i czas bazy per żądanie (nagłówek Server-Timing, /metrics/db)
+    # i per suite run (podsumowanie w logu suite). Tryb debug ostrzega o identycznych
+    # zapytaniach powtórzonych w jednym żądaniu / suite runie (N+1).
+
+    @property
+    def db_metrics_enabled(self) -> bool:
+        return _get("DB_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def db_metrics_debug(self) -> bool:
+        return _get("DB_METRICS_DEBUG", "false").lower() in ("1", "true", "yes")
+
+    @property
+    def db_metrics_repeat_threshold(self) -> int:
+        """Od ilu wykonań identycznego zapytania w zakresie tryb debug zgłasza N+1."""
+        return int(_get("DB_METRICS_REPEAT_THRESHOLD", "5"))
+
+    # ── Metryki ───────────────────────────────────────────────────────────────
+    #
+    # GET /metrics — format Prometheusa (core/metrics.py).
+
+    @property
+    def metrics_loop_lag_interval(self) -> float:
+        """Co ile sekund mierzyć opóźnienie event loop panelu; 0 = wyłączone."""
+        return float(_get("METRICS_LOOP_LAG_INTERVAL", "1.0"))
+
+    # ── Tracing ───────────────────────────────────────────────────────────────
+    #
+    # Spany suite runu (core/tracing.py) zapisywane jako OTLP-JSON,
+    # jeden plik na suite run — widok waterfall scenariusza w panelu.
+
+    @property
+    def tracing_enabled(self) -> bool:
+        return _get("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def tracing_dir(self) -> str:
+        return _get("TRACING_DIR", "logs/traces")
+
+    # ── Profilowanie ──────────────────────────────────────────────────────────
+    #
+    # Profil CPU suite runu na żądanie (core/profiling.py) — przełącznik w /execute
+    # albo python main.py --profile.
+
+    @property
+    def profiling_dir(self) -> str:
+        return _get("PROFILING_DIR", "logs/profiles")
+
+    @property
+    def profiling_top_n(self) -> int:
+        """Liczba funkcji w podsumowaniu na stronie suite runu."""
+        return int(_get("PROFILING_TOP_N", "25"))
+
+    @property
+    def profiling_task_interval(self) -> float:
+        """Co ile sekund próbkować taski asyncio; 0 = bez zliczania tasków."""
+        return float(_get("PROFILING_TASK_INTERVAL", "0.5"))
+
+    # ── Dane runów ────────────────────────────────────────────────────────────
+    #
+    # Pełne RunData każdego scenario_runu (core/run_data_store.py) — wejście
+    # offline'owego replay reguł (replay_rules.py).
+
+    @property
+    def run_data_enabled(self) -> bool:
+        return _get("RUN_DATA_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # ── Szeregi cen ───────────────────────────────────────────────────────────
+    #
+    # Ceny z etapów każdego runu (price_points) i wykrywanie anomalii po suite runie
+    # (core/price_series.py). Detekcja wymaga NumPy — bez niego szeregi są tylko zapisywane.
+
+    @property
+    def price_series_enabled(self) -> bool:
+        return _get("PRICE_SERIES_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def price_window(self) -> int:
+        """Liczba ostatnich punktów szeregu brana do analizy."""
+        return int(_get("PRICE_WINDOW", "30"))
+
+    @property
+    def price_min_points(self) -> int:
+        """Minimalna historia (bez bieżącego punktu), od której szereg jest oceniany."""
+        return int(_get("PRICE_MIN_POINTS", "8"))
+
+    @property
+    def price_jump_pct(self) -> float:
+        """Skok: odchylenie bieżącej ceny od mediany okna (ułamek, 0.15 = 15%)."""
+        return float(_get("PRICE_JUMP_PCT", "0.15"))
+
+    @property
+    def price_jump_z(self) -> float:
+        """Skok: minimalny odporny z-score (mediana/MAD) — szereg z naturalnym szumem nie alarmuje."""
+        return float(_get("PRICE_JUMP_Z", "5.0"))
+
+    @property
+    def price_drift_pct(self) -> float:
+        """Dryf: zmiana ceny wg trendu liniowego w całym oknie (ułamek)."""
+        return float(_get("PRICE_DRIFT_PCT", "0.10"))
+
+    @property
+    def price_mismatch_ratio(self) -> float:
+        """Rozbieżność listing/koszyk: udział runów okna z różnicą > 1%."""
+        return float(_get("PRICE_MISMATCH_RATIO", "0.5"))
+
+    # ── Flakiness ─────────────────────────────────────────────────────────────
+    #
+    # Wygaszane wykładniczo liczniki niestabilności per (scenariusz, środowisko)
+    # i per (business_rule, środowisko), aktualizowane przy finalizacji suite runu
+    # (core/flakiness.py). Polityka suite (Suite.flaky_policy) używa progu poniżej.
+
+    @property
+    def flakiness_enabled(self) -> bool:
+        return _get("FLAKINESS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def flakiness_half_life(self) -> float:
+        """Po ilu obserwacjach waga starej obserwacji spada o połowę."""
+        return float(_get("FLAKINESS_HALF_LIFE", "20"))
+
+    @property
+    def flakiness_threshold(self) -> float:
+        """Score (0–1), od którego scenariusz jest niestabilny (kwarantanna / pominięcie)."""
+        return float(_get("FLAKINESS_THRESHOLD", "0.3"))
+
+    @property
+    def flakiness_min_runs(self) -> int:
+        """Minimalna liczba obserwacji, zanim score wpływa na politykę suite."""
+        return int(_get("FLAKINESS_MIN_RUNS", "10"))
+
+    # ── Ruch API sklepu ───────────────────────────────────────────────────────
+    #
+    # Czasy i błędy żądań XHR/fetch sklepu widziane przez przeglądarkę
+    # (core/api_stats.py) — agregaty per run i rollup per środowisko dla /api-stats.
+
+    @property
+    def shop_api_stats_enabled(self) -> bool:
+        return _get("SHOP_API_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    @property
+    def shop_api_hosts(self) -> list[str]:
+        """Dodatkowe hosty API sklepu (po przecinku) — domyślnie host środowiska i jego subdomeny."""
+        return [h.strip().lower() for h in _get("SHOP_API_HOSTS", "").split(",") if h.strip()]
+
+    @property
+    def shop_api_max_endpoints(self) -> int:
+        """Limit endpointów per run — nadmiar (nieznormalizowane ścieżki) trafia do jednego wiersza {other}."""
+        return int(_get("SHOP_API_MAX_ENDPOINTS", "100"))
 
     # ── API zewnętrzne ────────────────────────────────────────────────────────
     #
@@ -0,0 +1,219 @@
+"""
+DbMetrics — liczba zapytań SQL i czas bazy per żądanie HTTP i per suite run.
+
+Odpowiedzialności:
+  1. Zdarzenia silnika (before/after_cursor_execute) dopisują zapytanie i jego czas
+     do bieżącego zakresu pomiaru (ContextVar — dziedziczony przez taski i wątki puli)
+  2. Zakres żądania: DbMetricsMiddleware → nagłówek Server-Timing
+  3. Zakres suite runu: SuiteExecutor → podsumowanie w logu suite (razem ze scenariuszami)
+  4. Agregaty per trasa i ostatnie suite runy dla /metrics/db
+  5. Tryb debug (DB_METRICS_DEBUG): identyczne zapytania powtórzone ≥ DB_METRICS_REPEAT_THRESHOLD
+     razy w jednym zakresie (typowe N+1 z leniwego ładowania relacji) → ostrzeżenie w logu
+
+Zakresy można zagnieżdżać — wewnętrzny po zakończeniu dolicza się do zewnętrznego
+(np. finalizacja w ramach całego suite runu).
+
+Przykład:
+    with db_metrics.track("suite_run #12") as stats:
+        ...
+    stats.queries, stats.duration_ms, stats.repeated()
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Liczba ostatnich suite runów trzymanych dla /metrics/db
+SUITE_HISTORY = 50
+
+# Długość SQL w ostrzeżeniach i na /metrics/db
+SQL_PREVIEW = 200
+
+
+@dataclass
+class QueryStats:
+    label: str = ""
+    queries: int = 0
+    duration: float = 0.0                          # sekundy
+    statements: Counter | None = None              # SQL → liczba wykonań (tylko tryb debug)
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 2)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.queries += 1
+        self.duration += elapsed
+        if self.statements is not None:
+            self.statements[statement] += 1
+
+    def merge(self, other: "QueryStats") -> None:
+        self.queries += other.queries
+        self.duration += other.duration
+        if self.statements is not None and other.statements:
+            self.statements.update(other.statements)
+
+    def repeated(self, threshold: int | None = None) -> list[tuple[str, int]]:
+        """Zapytania wykonane co najmniej threshold razy, od najczęstszych."""
+        if not self.statements:
+            return []
+        threshold = threshold or settings.db_metrics_repeat_threshold
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def summary(self) -> str:
+        return f"{self.queries} zapytań, {self.duration_ms:.1f} ms w bazie"
+
+
+@dataclass
+class _RouteTotals:
+    requests: int = 0
+    queries: int = 0
+    duration: float = 0.0
+    max_queries: int = 0
+    max_duration: float = 0.0
+
+
+_current: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("db_metrics_scope", default=None)
+
+_lock = threading.Lock()
+_routes: dict[str, _RouteTotals] = {}
+_suite_runs: deque = deque(maxlen=SUITE_HISTORY)
+_installed: set[int] = set()
+
+
+# ── Zdarzenia silnika ─────────────────────────────────────────────────────────
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("db_metrics_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("db_metrics_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def install(engine: Engine) -> None:
+    """Podpina liczniki do silnika (idempotentne). Bez zakresu track() zapytania nie są liczone."""
+    if not settings.db_metrics_enabled or id(engine) in _installed:
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    _installed.add(id(engine))
+
+
+# ── Zakresy pomiaru ───────────────────────────────────────────────────────────
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track(label: str = "") -> Iterator[QueryStats]:
+    """Zakres pomiaru — zapytania z bieżącego kontekstu (i tasków utworzonych w nim) trafiają do stats."""
+    debug = settings.db_metrics_debug
+    stats = QueryStats(label=label, statements=Counter() if debug else None)
+    parent = _current.get()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent.merge(stats)
+        if debug:
+            report_repeated(stats)
+
+
+def report_repeated(stats: QueryStats) -> None:
+    for sql, count in stats.repeated():
+        logger.warning(f"[DbMetrics] Możliwe N+1 w {stats.label or 'zakresie'}: {count}× {' '.join(sql.split())[:SQL_PREVIEW]}")
+
+
+# ── Agregaty ──────────────────────────────────────────────────────────────────
+
+def record_request(route: str, stats: QueryStats) -> None:
+    with _lock:
+        totals = _routes.setdefault(route, _RouteTotals())
+        totals.requests += 1
+        totals.queries += stats.queries
+        totals.duration += stats.duration
+        totals.max_queries = max(totals.max_queries, stats.queries)
+        totals.max_duration = max(totals.max_duration, stats.duration)
+
+
+def record_suite_run(suite_run_id: int, stats: QueryStats, finalize: QueryStats | None = None) -> None:
+    entry = {
+        "suite_run_id": suite_run_id,
+        "queries": stats.queries,
+        "db_ms": stats.duration_ms,
+        "finalize_queries": finalize.queries if finalize else None,
+        "finalize_db_ms": finalize.duration_ms if finalize else None,
+        "repeated": [
+            {"count": count, "sql": " ".join(sql.split())[:SQL_PREVIEW]} for sql, count in stats.repeated()[:10]
+        ],
+    }
+    with _lock:
+        _suite_runs.append(entry)
+
+
+def route_totals() -> dict[str, dict]:
+    """Surowe sumy per trasa (requests, queries, duration w sekundach) — dla /metrics."""
+    with _lock:
+        return {
+            route: {"requests": t.requests, "queries": t.queries, "duration": t.duration}
+            for route, t in _routes.items()
+        }
+
+
+def server_timing(stats: QueryStats, total: float | None = None) -> str:
+    """Wartość nagłówka Server-Timing, np. db;dur=12.3;desc="7 queries", app;dur=45.0"""
+    value = f'db;dur={stats.duration_ms:.1f};desc="{stats.queries} queries"'
+    if total is not None:
+        value += f", app;dur={total * 1000:.1f}"
+    return value
+
+
+def snapshot() -> dict:
+    with _lock:
+        routes = [
+            {
+                "route": route,
+                "requests": t.requests,
+                "queries_total": t.queries,
+                "queries_avg": round(t.queries / t.requests, 1) if t.requests else 0,
+                "queries_max": t.max_queries,
+                "db_ms_avg": round(t.duration / t.requests * 1000, 2) if t.requests else 0,
+                "db_ms_max": round(t.max_duration * 1000, 2),
+            }
+            for route, t in _routes.items()
+        ]
+        suite_runs = list(_suite_runs)
+    routes.sort(key=lambda r: r["queries_total"], reverse=True)
+    return {
+        "enabled": settings.db_metrics_enabled,
+        "debug": settings.db_metrics_debug,
+        "routes": routes,
+        "suite_runs": suite_runs[::-1],
+    }
+
+
+def reset() -> None:
+    with _lock:
+        _routes.clear()
+        _suite_runs.clear()
@@ -0,0 +1,168 @@
+"""
+EventBus — wewnątrzprocesowa szyna zdarzeń postępu suite.
+
+Publikują:
+  - RunnerRegistry   — RUNNING_CHANGED (liczba aktywnych suite)
+  - SuiteExecutor    — SUITE_STARTED, SUITE_FINISHED
+  - ScenarioExecutor — SCENARIO_STARTED, SCENARIO_FINISHED
+  - ShopRunner       — STAGE_REACHED, ALERT_RAISED
+
+Subskrybują endpointy SSE panelu (/suite-runs/{id}/events, /execute/events).
+Publikacja nigdy nie blokuje — wolny subskrybent traci zdarzenia, executor nie czeka.
+
+Dla każdego suite_run trzymana jest krótka historia zdarzeń — nowy subskrybent
+dostaje ją na starcie, więc odświeżenie strony nie wymaga ponownych zapytań do bazy.
+Historia odczytywana jest dopiero po subskrypcji, a zdarzenia z kolejki deduplikowane
+po numerze sekwencyjnym (seq) — nic nie ginie między odczytem historii a subskrypcją.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# ── Typy zdarzeń ──────────────────────────────────────────────────────────────
+
+SUITE_STARTED     = "suite_started"
+SUITE_FINISHED    = "suite_finished"
+SCENARIO_STARTED  = "scenario_started"
+STAGE_REACHED     = "stage_reached"
+ALERT_RAISED      = "alert_raised"
+SCENARIO_FINISHED = "scenario_finished"
+RUNNING_CHANGED   = "running_changed"
+
+# Rozmiar kolejki pojedynczego subskrybenta
+QUEUE_SIZE = 1000
+
+# Historia zdarzeń per suite_run i liczba pamiętanych suite_run
+HISTORY_SIZE = 2000
+HISTORY_SUITES = 20
+
+
+@dataclass
+class Event:
+    type: str
+    suite_run_id: int | None = None
+    data: dict = field(default_factory=dict)
+    ts: float = field(default_factory=time.time)
+    seq: int = 0            # numer z publish(); 0 = zdarzenie syntetyczne (spoza szyny)
+
+    def to_dict(self) -> dict:
+        return {"type": self.type, "suite_run_id": self.suite_run_id, "ts": self.ts, "seq": self.seq, **self.data}
+
+    def to_sse(self) -> str:
+        """Format Server-Sent Events: nazwa zdarzenia + JSON w polu data."""
+        return f"event: {self.type}\ndata: {json.dumps(self.to_dict(), ensure_ascii=False, default=str)}\n\n"
+
+
+# suite_run_id → kolejki subskrybentów; klucz None = zdarzenia globalne (wszystkie)
+_subscribers: dict[int | None, set[asyncio.Queue]] = {}
+_history: "OrderedDict[int, deque[Event]]" = OrderedDict()
+_seq = itertools.count(1)
+
+
+def publish(event_type: str, suite_run_id: int | None = None, **data) -> None:
+    """Publikuje zdarzenie do subskrybentów danego suite_run oraz globalnych."""
+    event = Event(type=event_type, suite_run_id=suite_run_id, data=data, seq=next(_seq))
+
+    if suite_run_id is not None:
+        history = _history.get(suite_run_id)
+        if history is None:
+            history = _history[suite_run_id] = deque(maxlen=HISTORY_SIZE)
+            while len(_history) > HISTORY_SUITES:
+                _history.popitem(last=False)
+        history.append(event)
+
+    for key in {suite_run_id, None}:
+        for queue in _subscribers.get(key, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.debug(f"[EventBus] Kolejka subskrybenta pełna — pominięto {event_type}")
+
+
+def history(suite_run_id: int) -> list[Event]:
+    """Zdarzenia zebrane dotąd dla suite_run (pusta lista jeśli brak)."""
+    return list(_history.get(suite_run_id, ()))
+
+
+@contextmanager
+def subscribe(suite_run_id: int | None = None) -> Iterator[asyncio.Queue]:
+    """
+    Subskrypcja zdarzeń. suite_run_id=None → wszystkie zdarzenia.
+
+    Przykład:
+        with event_bus.subscribe(suite_run_id) as queue:
+            event = await queue.get()
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    _subscribers.setdefault(suite_run_id, set()).add(queue)
+    try:
+        yield queue
+    finally:
+        subscribers = _subscribers.get(suite_run_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del _subscribers[suite_run_id]
+
+
+class EventPublisher:
+    """
+    Publisher związany z konkretnym suite_run (i opcjonalnie scenario_run).
+    Przekazywany do ShopRunner, żeby nie musiał znać identyfikatorów runów.
+    """
+
+    def __init__(self, suite_run_id: int | None, **context):
+        self.suite_run_id = suite_run_id
+        self.context = context
+
+    def emit(self, event_type: str, **data) -> None:
+        publish(event_type, self.suite_run_id, **self.context, **data)
+
+
+# Co ile sekund wysyłany jest komentarz SSE podtrzymujący połączenie
+HEARTBEAT_INTERVAL = 15
+
+
+async def sse_stream(
+    suite_run_id: int | None,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    initial: Callable[[], Iterable[Event]] = tuple,
+    types: set[str] | None = None,
+    stop_on: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Generator strumienia SSE dla StreamingResponse.
+
+    initial  — zdarzenia wysyłane na starcie (np. historia suite_run); wywoływane
+               dopiero po subskrypcji, zdarzenia z kolejki o seq <= ostatniego wysłanego są pomijane
+    types    — filtr typów zdarzeń (None = wszystkie)
+    stop_on  — typ zdarzenia kończący strumień (np. SUITE_FINISHED)
+    """
+    with subscribe(suite_run_id) as queue:
+        last_seq = 0
+        for event in initial():
+            last_seq = max(last_seq, event.seq)
+            yield event.to_sse()
+            if stop_on and event.type == stop_on:
+                return
+
+        while not await is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+
+            if event.seq <= last_seq or (types and event.type not in types):
+                continue
+            yield event.to_sse()
+            if stop_on and event.type == stop_on:
+                return
@@ -0,0 +1,189 @@
+"""
+Flakiness — przyrostowa ocena niestabilności scenariuszy i reguł biznesowych.
+
+Odpowiedzialności:
+  1. Po każdym suite runie jedna obserwacja na (scenariusz, środowisko):
+     porażka = status inny niż success, ratunek = success dopiero po retry
+     (ScenarioRun.attempts > 1)
+  2. Obserwacje per (business_rule, środowisko): reguła wystąpiła albo nie —
+     zmiany wystąpiła ↔ nie wystąpiła to flip-flop alertu. Brak wystąpienia liczy się
+     tylko, gdy w suite runie był scenariusz, w którym reguła kiedyś wystąpiła —
+     inne suite na tym samym środowisku nie zaliczają fałszywych zmian
+  3. Liczniki wygaszane wykładniczo (FlakinessScore) — aktualizacja O(1),
+     bez odczytu historii runów; okres połowicznego zaniku FLAKINESS_HALF_LIFE obserwacji
+  4. Lista niestabilnych scenariuszy dla polityki suite (Suite.flaky_policy):
+     score ≥ FLAKINESS_THRESHOLD przy co najmniej FLAKINESS_MIN_RUNS obserwacjach
+
+Score = (przejścia pass ↔ fail + ratunki przez retry) / waga obserwacji, obcięty do 1.
+Scenariusz, który zawsze pada, ma score 0 — jest zepsuty, nie niestabilny.
+
+Przykład:
+    flakiness.update_for_suite_run(db, suite_run, results)
+    flaky = flakiness.flaky_scenarios(db, environment.id, [s.id for s in scenarios])
+"""
+import logging
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.flakiness_score import FlakinessScore
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCENARIO = 'scenario'
+RULE = 'rule'
+
+POLICY_OFF = 'off'
+POLICY_QUARANTINE = 'quarantine'
+POLICY_SKIP = 'skip'
+POLICIES = (POLICY_OFF, POLICY_QUARANTINE, POLICY_SKIP)
+
+# Statusy runów, które nie mówią nic o stabilności scenariusza
+_NOT_OBSERVED = ('skipped', 'cancelled')
+
+
+def decay() -> float:
+    """Mnożnik starych obserwacji: waga spada o połowę co FLAKINESS_HALF_LIFE obserwacji."""
+    return 0.5 ** (1.0 / max(settings.flakiness_half_life, 1.0))
+
+
+def observe(row: FlakinessScore, failed: bool, retry_saved: bool = False, alpha: float | None = None) -> None:
+    """Jedna obserwacja: c = c·α + x dla każdego licznika."""
+    alpha = decay() if alpha is None else alpha
+    transition = row.last_failed is not None and row.last_failed != failed
+    row.weight = row.weight * alpha + 1.0
+    row.failures = row.failures * alpha + failed
+    row.transitions = row.transitions * alpha + transition
+    row.retry_saved = row.retry_saved * alpha + retry_saved
+    row.observations += 1
+    row.last_failed = failed
+
+
+def _new_row(kind: str, environment_id: int, scenario_id: int | None = None,
+             business_rule: str | None = None) -> FlakinessScore:
+    # Liczniki jawnie — default kolumny pojawia się dopiero przy flush
+    return FlakinessScore(
+        kind=kind, environment_id=environment_id, scenario_id=scenario_id, business_rule=business_rule,
+        weight=0.0, failures=0.0, transitions=0.0, retry_saved=0.0, observations=0,
+        scenario_ids=[] if kind == RULE else None,
+    )
+
+
+# ── Aktualizacja ──────────────────────────────────────────────────────────────
+
+def update_for_suite_run(db: Session, suite_run, results: list) -> None:
+    """Aktualizuje liczniki po suite runie (commit po stronie wywołującego)."""
+    if not settings.flakiness_enabled:
+        return
+    alpha = decay()
+    environment_id = suite_run.environment_id
+
+    observed = [
+        r for r in results
+        if not isinstance(r, Exception) and r['status'] not in _NOT_OBSERVED
+    ]
+    if not observed:
+        return
+    ran_ids = {r['scenario_id'] for r in observed}
+
+    # Scenariusze
+    rows = {
+        row.scenario_id: row
+        for row in db.scalars(select(FlakinessScore).where(
+            FlakinessScore.kind == SCENARIO,
+            FlakinessScore.environment_id == environment_id,
+            FlakinessScore.scenario_id.in_(ran_ids),
+        ))
+    }
+    for result in observed:
+        row = rows.get(result['scenario_id'])
+        if row is None:
+            row = rows[result['scenario_id']] = _new_row(SCENARIO, environment_id, scenario_id=result['scenario_id'])
+            db.add(row)
+        failed = result['status'] != 'success'
+        observe(row, failed, retry_saved=not failed and result.get('attempts', 1) > 1, alpha=alpha)
+        row.last_suite_run_id = suite_run.id
+
+    # Reguły — wystąpienie w którymkolwiek scenariuszu suite runu
+    occurred: dict[str, set[int]] = defaultdict(set)
+    for result in observed:
+        for alert in result['alerts']:
+            occurred[alert['business_rule']].add(result['scenario_id'])
+
+    rule_rows = {
+        row.business_rule: row
+        for row in db.scalars(select(FlakinessScore).where(
+            FlakinessScore.kind == RULE,
+            FlakinessScore.environment_id == environment_id,
+        ))
+    }
+    for business_rule, scenario_ids in occurred.items():
+        if business_rule not in rule_rows:
+            rule_rows[business_rule] = _new_row(RULE, environment_id, business_rule=business_rule)
+            db.add(rule_rows[business_rule])
+
+    for business_rule, row in rule_rows.items():
+        if business_rule in occurred:
+            # Nowa lista — zmiana w miejscu nie jest widoczna dla kolumny JSON
+            row.scenario_ids = sorted(set(row.scenario_ids or ()) | occurred[business_rule])
+            observe(row, True, alpha=alpha)
+        elif ran_ids.intersection(row.scenario_ids or ()):
+            observe(row, False, alpha=alpha)
+        else:
+            continue
+        row.last_suite_run_id = suite_run.id
+
+    logger.info(
+        f"[Flakiness] SUITE RUN #{suite_run.id}: {len(observed)} scenariuszy, "
+        f"{len(occurred)} reguł wystąpiło"
+    )
+
+
+# ── Odczyt ────────────────────────────────────────────────────────────────────
+
+def flaky_scenarios(db: Session, environment_id: int, scenario_ids: list[int]) -> dict[int, float]:
+    """scenario_id → score dla scenariuszy ponad progiem (polityka suite)."""
+    if not settings.flakiness_enabled or not scenario_ids:
+        return {}
+    rows = db.scalars(select(FlakinessScore).where(
+        FlakinessScore.kind == SCENARIO,
+        FlakinessScore.environment_id == environment_id,
+        FlakinessScore.scenario_id.in_(scenario_ids),
+        FlakinessScore.observations >= settings.flakiness_min_runs,
+    ))
+    return {row.scenario_id: row.score for row in rows if row.score >= settings.flakiness_threshold}
+
+
+def scenario_scores(db: Session, scenario_id: int) -> list[FlakinessScore]:
+    """Liczniki scenariusza na wszystkich środowiskach (strona scenariusza)."""
+    return list(db.scalars(
+        select(FlakinessScore)
+        .where(FlakinessScore.kind == SCENARIO, FlakinessScore.scenario_id == scenario_id)
+        .order_by(FlakinessScore.environment_id)
+    ))
+
+
+def rule_score(db: Session, business_rule: str, environment_id: int) -> FlakinessScore | None:
+    return db.scalars(select(FlakinessScore).where(
+        FlakinessScore.kind == RULE,
+        FlakinessScore.environment_id == environment_id,
+        FlakinessScore.business_rule == business_rule,
+    )).first()
+
+
+def is_flaky(row: FlakinessScore | None) -> bool:
+    return (
+        row is not None
+        and row.observations >= settings.flakiness_min_runs
+        and row.score >= settings.flakiness_threshold
+    )
+
+
+def reset_scenario(db: Session, scenario_id: int) -> int:
+    """Usuwa liczniki scenariusza — zwalnia go z kwarantanny/pominięcia (commit po stronie wywołującego)."""
+    rows = scenario_scores(db, scenario_id)
+    for row in rows:
+        db.delete(row)
+    return len(rows)
@@ -0,0 +1,218 @@
+"""
+LogIndex — indeks pełnotekstowy ustrukturyzowanych logów suite (SQLite FTS5).
+
+Odpowiedzialności:
+  1. Przyjmuje rekordy od listenera suite_logging i zapisuje je partiami
+  2. Utrzymuje tabelę log_records (pola strukturalne) + log_fts (treść)
+  3. Wyszukuje po treści w oknie czasowym z filtrami poziomu / scenariusza
+  4. Usuwa wpisy usuniętych suite_run
+
+Indeks jest osobnym plikiem (logs/log_index.db), niezależnym od bazy aplikacji —
+zapis z wątku listenera nie konkuruje o blokady z executorami.
+Gdy SQLite nie ma FTS5, wyszukiwanie przechodzi na LIKE (wolniej, ten sam wynik).
+"""
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from core import log_reader
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = log_reader.LOG_DIR / "log_index.db"
+
+# Zapis partiami — commit co tyle rekordów lub co tyle sekund
+BATCH_SIZE = 500
+BATCH_SECONDS = 2.0
+
+MAX_RESULTS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_records (
+    id           INTEGER PRIMARY KEY,
+    ts           REAL    NOT NULL,
+    suite_run_id INTEGER NOT NULL,
+    run_id       INTEGER,
+    scenario     TEXT,
+    stage        TEXT,
+    level        TEXT    NOT NULL,
+    levelno      INTEGER NOT NULL,
+    message      TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_log_records_ts ON log_records (ts);
+CREATE INDEX IF NOT EXISTS ix_log_records_suite_run ON log_records (suite_run_id);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+    message, content='log_records', content_rowid='id', tokenize='unicode61'
+);
+"""
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class LogHit:
+    ts: float
+    suite_run_id: int
+    run_id: int | None
+    scenario: str | None
+    stage: str | None
+    level: str
+    message: str
+
+
+def _connect() -> sqlite3.Connection:
+    INDEX_PATH.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH, timeout=10, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'log_fts'").fetchone()
+    return row is not None
+
+
+# ── Zapis (wątek listenera) ───────────────────────────────────────────────────
+
+class LogIndexWriter:
+    """Zapis partiami — używany wyłącznie z wątku QueueListener."""
+
+    def __init__(self):
+        self._conn: sqlite3.Connection | None = None
+        self._fts = False
+        self._pending: list[tuple] = []
+        self._last_flush = time.monotonic()
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = _connect()
+            self._conn.executescript(_SCHEMA)
+            try:
+                self._conn.executescript(_FTS_SCHEMA)
+                self._fts = True
+            except sqlite3.OperationalError:
+                logger.warning("[LogIndex] SQLite bez FTS5 — wyszukiwanie przez LIKE")
+        return self._conn
+
+    def add(self, entry: dict) -> None:
+        self._pending.append((
+            entry["ts"], entry["suite_run_id"], entry.get("run_id"), entry.get("scenario"),
+            entry.get("stage"), entry["level"], entry["levelno"], entry["message"],
+        ))
+        if len(self._pending) >= BATCH_SIZE or time.monotonic() - self._last_flush >= BATCH_SECONDS:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        try:
+            conn = self._open()
+            with conn:
+                for row in rows:
+                    cur = conn.execute(
+                        "INSERT INTO log_records (ts, suite_run_id, run_id, scenario, stage, level, levelno, message) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        row,
+                    )
+                    if self._fts:
+                        conn.execute("INSERT INTO log_fts (rowid, message) VALUES (?, ?)", (cur.lastrowid, row[7]))
+        except sqlite3.Error as e:
+            # Logger tego modułu nie trafia do plików suite — brak rekurencji
+            logger.error(f"[LogIndex] Błąd zapisu {len(rows)} rekordów: {e}")
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# ── Odczyt (panel) ────────────────────────────────────────────────────────────
+
+def _fts_query(text: str) -> str | None:
+    """Tokeny jako frazy w cudzysłowie (AND) — bez interpretacji składni FTS5 z wejścia."""
+    tokens = _TOKEN_RE.findall(text)
+    return " ".join(f'"{t}"' for t in tokens) if tokens else None
+
+
+def search(
+    query: str,
+    since: float,
+    until: float | None = None,
+    level: str | None = None,
+    scenario: str | None = None,
+    suite_run_id: int | None = None,
+    limit: int = 100,
+) -> list[LogHit]:
+    """Najnowsze rekordy pasujące do query w oknie [since, until]."""
+    if not INDEX_PATH.exists():
+        return []
+
+    where = ["r.ts >= ?"]
+    params: list = [since]
+    if until is not None:
+        where.append("r.ts <= ?")
+        params.append(until)
+    if level:
+        levelno = logging.getLevelName(level.upper())
+        if isinstance(levelno, int):
+            where.append("r.levelno >= ?")
+            params.append(levelno)
+    if scenario:
+        where.append("r.scenario LIKE ?")
+        params.append(f"%{scenario}%")
+    if suite_run_id is not None:
+        where.append("r.suite_run_id = ?")
+        params.append(suite_run_id)
+
+    conn = _connect()
+    try:
+        fts = _has_fts(conn)
+        match = _fts_query(query) if query else None
+        if match and fts:
+            sql = "SELECT r.ts, r.suite_run_id, r.run_id, r.scenario, r.stage, r.level, r.message " \
+                  "FROM log_fts JOIN log_records r ON r.id = log_fts.rowid " \
+                  f"WHERE log_fts MATCH ? AND {' AND '.join(where)} ORDER BY r.ts DESC LIMIT ?"
+            params = [match, *params]
+        else:
+            if query:
+                where.append("r.message LIKE ?")
+                params.append(f"%{query}%")
+            sql = "SELECT r.ts, r.suite_run_id, r.run_id, r.scenario, r.stage, r.level, r.message " \
+                  f"FROM log_records r WHERE {' AND '.join(where)} ORDER BY r.ts DESC LIMIT ?"
+        params.append(max(1, min(limit, MAX_RESULTS)))
+        return [LogHit(*row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def delete_suite_runs(suite_run_ids: list[int]) -> int:
+    """Usuwa rekordy podanych suite_run z indeksu. Zwraca liczbę usuniętych."""
+    if not suite_run_ids or not INDEX_PATH.exists():
+        return 0
+
+    conn = _connect()
+    try:
+        fts = _has_fts(conn)
+        placeholders = ",".join("?" * len(suite_run_ids))
+        with conn:
+            if fts:
+                # External content — usunięcie z FTS wymaga oryginalnej treści
+                conn.execute(
+                    "INSERT INTO log_fts (log_fts, rowid, message) "
+                    f"SELECT 'delete', id, message FROM log_records WHERE suite_run_id IN ({placeholders})",
+                    suite_run_ids,
+                )
+            cur = conn.execute(f"DELETE FROM log_records WHERE suite_run_id IN ({placeholders})", suite_run_ids)
+        return cur.rowcount
+    finally:
+        conn.close()
@@ -0,0 +1,155 @@
+"""
+LogReader — odczyt fragmentów logu suite bez wczytywania całego pliku.
+
+Odpowiedzialności:
+  1. Zwraca ostatnie N KB logu (tail)
+  2. Doczytuje starsze fragmenty przed danym offsetem (przewijanie w górę)
+  3. Zwraca nowe linie od danego offsetu (polling w trakcie runu)
+  4. Filtruje linie po poziomie logowania i nazwie scenariusza
+
+Offsety są bajtowe i zawsze wyrównane do początku linii — klient zapamiętuje
+`start` / `end` z odpowiedzi i przekazuje je w kolejnym zapytaniu.
+
+Format linii (suite_logging.FORMAT):
+    12:34:56 | WARNING  | Scenariusz X | treść
+Scenariusz pochodzi z kontekstu rekordu ("-" poza scenariuszem), więc filtr
+obejmuje wszystkie linie scenariusza, nie tylko te z jego nazwą w treści.
+Linie bez prefiksu (traceback) należą do poprzedniego rekordu.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+LOG_DIR = Path("logs")
+
+# Domyślny i maksymalny rozmiar pojedynczego fragmentu (KB)
+DEFAULT_CHUNK_KB = 64
+MAX_CHUNK_KB = 1024
+
+_RECORD_RE = re.compile(r"^\d{2}:\d{2}:\d{2} \| (\w+)\s*\| (?:(.+?) \| )?")
+
+
+@dataclass
+class LogChunk:
+    lines: list[str] = field(default_factory=list)
+    start: int = 0          # offset pierwszego bajtu fragmentu
+    end: int = 0            # offset za ostatnią pełną linią
+    size: int = 0           # rozmiar pliku w chwili odczytu
+
+    @property
+    def has_older(self) -> bool:
+        return self.start > 0
+
+    def to_dict(self) -> dict:
+        return {
+            "lines": self.lines,
+            "start": self.start,
+            "end": self.end,
+            "size": self.size,
+            "has_older": self.has_older,
+        }
+
+
+def log_path(suite_run_id: int) -> Path:
+    return LOG_DIR / f"suite_run_{suite_run_id}.log"
+
+
+def json_log_path(suite_run_id: int) -> Path:
+    """Ustrukturyzowane rekordy (JSON Lines) zapisywane obok logu tekstowego."""
+    return LOG_DIR / f"suite_run_{suite_run_id}.jsonl"
+
+
+# ── Odczyt fragmentów ─────────────────────────────────────────────────────────
+
+def read_tail(path: Path, limit_kb: int = DEFAULT_CHUNK_KB) -> LogChunk:
+    """Ostatnie limit_kb KB pliku, od pierwszej pełnej linii."""
+    size = path.stat().st_size
+    return read_before(path, size, limit_kb)
+
+
+def read_before(path: Path, offset: int, limit_kb: int = DEFAULT_CHUNK_KB) -> LogChunk:
+    """Fragment kończący się na offset (starsze linie) — do przewijania w górę."""
+    limit = _limit_bytes(limit_kb)
+    with path.open("rb") as f:
+        size = f.seek(0, 2)
+        end = min(max(offset, 0), size)
+        start = max(0, end - limit)
+        f.seek(start)
+        data = f.read(end - start)
+
+    # Pierwsza linia może być ucięta — zaczynamy od następnej
+    if start > 0:
+        newline = data.find(b"\n")
+        if newline != -1:
+            start += newline + 1
+            data = data[newline + 1:]
+
+    # Ostatnia linia pliku może być jeszcze zapisywana — zostaje dla read_after
+    if end == size and data and not data.endswith(b"\n"):
+        newline = data.rfind(b"\n")
+        if newline != -1:
+            end -= len(data) - newline - 1
+            data = data[:newline + 1]
+
+    return LogChunk(lines=_split(data), start=start, end=end, size=size)
+
+
+def read_after(path: Path, offset: int, limit_kb: int = DEFAULT_CHUNK_KB) -> LogChunk:
+    """Nowe linie od offset — tylko pełne linie, niedokończona zostaje na kolejne zapytanie."""
+    limit = _limit_bytes(limit_kb)
+    with path.open("rb") as f:
+        size = f.seek(0, 2)
+        start = min(max(offset, 0), size)
+        f.seek(start)
+        data = f.read(min(limit, size - start))
+
+    newline = data.rfind(b"\n")
+    if newline != -1:
+        data = data[:newline + 1]
+    elif len(data) < limit:
+        # Linia jeszcze zapisywana — poczekaj na jej koniec
+        data = b""
+
+    return LogChunk(lines=_split(data), start=start, end=start + len(data), size=size)
+
+
+def _limit_bytes(limit_kb: int) -> int:
+    return max(1, min(limit_kb, MAX_CHUNK_KB)) * 1024
+
+
+def _split(data: bytes) -> list[str]:
+    return data.decode("utf-8", errors="replace").splitlines()
+
+
+# ── Filtrowanie ───────────────────────────────────────────────────────────────
+
+def filter_lines(lines: list[str], level: str | None = None, scenario: str | None = None) -> list[str]:
+    """
+    Filtruje linie po minimalnym poziomie (np. WARNING → WARNING, ERROR, CRITICAL)
+    i po scenariuszu rekordu (podciąg nazwy, bez rozróżniania wielkości liter).
+    Linie kontynuacji (traceback) dziedziczą wynik swojego rekordu.
+    """
+    min_level = logging.getLevelName(level.upper()) if level else None
+    if not isinstance(min_level, int):
+        min_level = None
+    needle = scenario.lower() if scenario else None
+
+    if min_level is None and not needle:
+        return lines
+
+    result = []
+    keep = False  # linie kontynuacji na początku fragmentu — rekord nieznany
+    for line in lines:
+        match = _RECORD_RE.match(line)
+        if match:
+            record_level = logging.getLevelName(match.group(1))
+            keep = (
+                (min_level is None or (isinstance(record_level, int) and record_level >= min_level))
+                and (not needle or needle in (match.group(2) or "").lower())
+            )
+        if keep:
+            result.append(line)
+    return result
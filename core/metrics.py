@@ -0,0 +1,273 @@
+"""
+Metrics — metryki w formacie tekstowym Prometheusa dla GET /metrics.
+
+Odpowiedzialności:
+  1. Minimalny rejestr: Counter, Gauge, Histogram z etykietami (bez zależności
+     prometheus_client) i render do formatu ekspozycji 0.0.4
+  2. Katalog serii monitora — executor (suite, scenariusze, etapy, alerty, kolejka),
+     przeglądarki, scheduler, baza, event loop — zdefiniowany w jednym miejscu
+  3. Serie liczone przy scrape (callback) dla stanu, który już istnieje gdzie indziej:
+     aktywne suite (runner_registry), zapytania SQL per trasa (db_metrics)
+  4. Monitor opóźnienia event loop — task w lifespan panelu
+
+Wartości żyją w pamięci procesu — restart panelu zeruje liczniki (Prometheus
+obsługuje to przez rate()/increase()).
+
+Przykład:
+    metrics.SCENARIO_DURATION.observe(12.5, environment="RC", suite="Smoke")
+    with metrics.BROWSERS_OPEN.track_inprogress():
+        ...
+"""
+import asyncio
+import logging
+import math
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry: list["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ── Typy metryk ───────────────────────────────────────────────────────────────
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 callback: Callable[[], dict | float] | None = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback            # wartości liczone przy scrape: float albo {etykiety: wartość}
+        self._values: dict[tuple, float] = {} if labelnames else {(): 0}   # seria bez etykiet widoczna od startu
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: oczekiwane etykiety {self.labelnames}, podano {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def _samples(self) -> dict[tuple, float]:
+        if self.callback is None:
+            with self._lock:
+                return dict(self._values)
+        try:
+            values = self.callback()
+        except Exception as e:
+            logger.warning(f"[Metrics] Błąd callbacku {self.name}: {e}")
+            return {}
+        return values if isinstance(values, dict) else {(): values}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, value in sorted(self._samples().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        """+1 na czas bloku — np. otwarte przeglądarki."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60)):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, list] = {}     # etykiety → [liczniki kubełków, suma, liczba]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {bucket_count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render() -> str:
+    """Wszystkie serie w formacie ekspozycji Prometheusa."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ── Callbacki (stan trzymany w innych modułach) ───────────────────────────────
+
+def _active_suites() -> float:
+    from core import runner_registry
+    return runner_registry.count_running()
+
+
+def _db_routes(field: str) -> Callable[[], dict]:
+    def collect() -> dict:
+        from core import db_metrics
+        return {(route,): values[field] for route, values in db_metrics.route_totals().items()}
+    return collect
+
+
+# ── Katalog serii ─────────────────────────────────────────────────────────────
+
+# Executor
+SUITE_DURATION = Histogram(
+    "shop_monitor_suite_duration_seconds", "Czas trwania suite runu",
+    ("environment", "suite"), buckets=(30, 60, 120, 300, 600, 1200, 1800, 3600, 7200),
+)
+SCENARIO_DURATION = Histogram(
+    "shop_monitor_scenario_duration_seconds", "Czas trwania scenariusza (z przeglądarką)",
+    ("environment", "suite", "status"), buckets=(5, 10, 20, 30, 60, 120, 300, 600),
+)
+STAGE_DURATION = Histogram(
+    "shop_monitor_stage_duration_seconds", "Czas etapu ścieżki zakupowej (od wejścia do następnego etapu)",
+    ("stage",), buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+ALERTS_RAISED = Counter(
+    "shop_monitor_alerts_raised_total", "Alerty zgłoszone przez scenariusze (skonfigurowane i aktywne)",
+    ("business_rule",),
+)
+ACTIVE_SUITES = Gauge(
+    "shop_monitor_active_suites", "Suite runy w toku (runner_registry)", callback=_active_suites,
+)
+SCENARIOS_QUEUED = Gauge(
+    "shop_monitor_scenarios_queued", "Scenariusze czekające na wolnego workera suite",
+)
+SCENARIOS_RUNNING = Gauge(
+    "shop_monitor_scenarios_running", "Scenariusze w trakcie wykonania",
+)
+
+# Przeglądarki
+BROWSERS_OPEN = Gauge("shop_monitor_browsers_open", "Uruchomione procesy przeglądarki (Playwright)")
+BROWSER_CONTEXTS_OPEN = Gauge("shop_monitor_browser_contexts_open", "Otwarte konteksty przeglądarki")
+
+# Scheduler
+SCHEDULER_TICK_LAG = Gauge(
+    "shop_monitor_scheduler_tick_lag_seconds", "Opóźnienie ostatniego ticka schedulera względem planu",
+)
+SCHEDULER_MISSED_RUNS = Counter(
+    "shop_monitor_scheduler_missed_runs_total",
+    "Pominięte uruchomienia — terminy cron jobów przespane między tickami i misfire APSchedulera",
+    ("job",),
+)
+
+# Baza (agregaty core/db_metrics.py)
+HTTP_REQUESTS = Counter(
+    "shop_monitor_http_requests_total", "Żądania panelu per trasa", ("route",),
+    callback=_db_routes("requests"),
+)
+DB_QUERIES = Counter(
+    "shop_monitor_db_queries_total", "Zapytania SQL żądań panelu per trasa", ("route",),
+    callback=_db_routes("queries"),
+)
+DB_QUERY_SECONDS = Counter(
+    "shop_monitor_db_query_seconds_total", "Łączny czas zapytań SQL żądań panelu per trasa", ("route",),
+    callback=_db_routes("duration"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "shop_monitor_http_request_duration_seconds", "Czas żądań panelu per szablon trasy (DbMetricsMiddleware)",
+    ("route", "method"), buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SUITE_DB_SECONDS = Histogram(
+    "shop_monitor_suite_db_seconds", "Łączny czas zapytań SQL suite runu (z finalizacją)",
+    ("environment", "suite"), buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+SUITE_DB_QUERIES = Counter(
+    "shop_monitor_suite_db_queries_total", "Zapytania SQL suite runów", ("environment", "suite"),
+)
+
+# Event loop
+EVENT_LOOP_LAG = Histogram(
+    "shop_monitor_event_loop_lag_seconds", "Opóźnienie wybudzenia event loop ponad zaplanowany sleep",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+# ── Monitor event loop ────────────────────────────────────────────────────────
+
+async def _watch_loop_lag(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+
+
+def start_loop_monitor() -> asyncio.Task | None:
+    """Uruchamia pomiar opóźnienia event loop (wywoływane w lifespan panelu)."""
+    interval = settings.metrics_loop_lag_interval
+    if interval <= 0:
+        return None
+    return asyncio.create_task(_watch_loop_lag(interval))
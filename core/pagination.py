@@ -0,0 +1,85 @@
+"""
+Pagination — stronicowanie keyset (kursorem) list runów i alertów.
+
+Odpowiedzialności:
+  1. Koduje pozycję ostatniego wiersza strony (wartość sortowania, id) w nieprzezroczysty kursor
+  2. Zwraca kolejną stronę warunkiem (sort, id) < (kursor) zamiast OFFSET —
+     strona 500 kosztuje tyle co strona 1 (zakres na indeksie złożonym)
+  3. Liczniki statusów jednym GROUP BY zamiast osobnych count() per status
+
+Wymaga indeksu złożonego (sort, id) na tabeli — patrz __table_args__ modeli
+SuiteRun, ScenarioRun, AlertGroup.
+
+Przykład:
+    page = pagination.keyset_page(query, SuiteRun.started_at, SuiteRun.id, cursor, PAGE_SIZE)
+    page.items, page.next_cursor
+"""
+import base64
+import binascii
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query, Session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Page:
+    items: list = field(default_factory=list)
+    next_cursor: str | None = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+# ── Kursor ────────────────────────────────────────────────────────────────────
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    """(wartość sortowania, id) albo None dla pustego / uszkodzonego kursora (pierwsza strona)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        sort_value = datetime.fromisoformat(sort_value)
+        if sort_value.tzinfo is None:
+            sort_value = sort_value.replace(tzinfo=timezone.utc)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, binascii.Error, json.JSONDecodeError):
+        logger.debug(f"[Pagination] Nieprawidłowy kursor: {cursor!r}")
+        return None
+
+
+# ── Strony ────────────────────────────────────────────────────────────────────
+
+def keyset_page(query: Query, sort_col, id_col, cursor: str | None, limit: int) -> Page:
+    """Strona malejąco po (sort_col, id_col) zaczynająca się za kursorem."""
+    position = decode_cursor(cursor)
+    if position is not None:
+        query = query.filter(tuple_(sort_col, id_col) < tuple_(*position))
+
+    rows = query.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return Page(items=rows)
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(
+        items=rows,
+        next_cursor=encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key)),
+    )
+
+
+def status_counts(db: Session, status_col) -> dict:
+    """Liczba wierszy per status — jedno zapytanie GROUP BY."""
+    return {status: count for status, count in db.query(status_col, func.count()).group_by(status_col)}
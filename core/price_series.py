@@ -0,0 +1,318 @@
+"""
+Price series — szeregi czasowe cen per (środowisko, produkt, etap) i wykrywanie anomalii.
+
+Odpowiedzialności:
+  1. Zapis punktów price_points z RunData każdego runu: cena listingu, suma cart0,
+     cena dostawy (cart1), suma podsumowania (cart4)
+  2. Po suite runie — analiza całych okien historii szeregów, których dotknął run,
+     jako obliczenia macierzowe NumPy (szereg = wiersz, run = kolumna):
+       PRICE_JUMP                   — skok względem poprzedniego punktu i mediany okna
+                                      (odporny z-score mediana/MAD)
+       PRICE_DRIFT                  — stopniowa zmiana: mediany tercji okna rosną/maleją
+                                      monotonicznie (pojedynczy skok poziomu to nie dryf)
+       PRICE_LISTING_CART_MISMATCH  — cena listingu ≠ cart0 w większości runów okna
+  3. Anomalie jako zwykłe alerty (AlertEngine — tylko z konfiguracją w alert_configs)
+     przypisane do bieżącego runu szeregu; SuiteExecutor grupuje je razem z alertami reguł
+
+NumPy jest opcjonalny — bez niego punkty są zapisywane, a detekcja jest pomijana
+z ostrzeżeniem. GlobalRules nadal porównuje listing z koszykiem w obrębie runu —
+tu oceniana jest historia.
+
+Przykład:
+    price_series.record(db, scenario_run, result.run_data, scenario_context)
+    alerts = price_series.detect(db, suite_run.id)
+"""
+import logging
+import warnings
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.price_point import PricePoint
+from app.models.run import ScenarioRun
+from core.alert_engine import AlertEngine
+from core.config import settings
+from scenarios.contexts.scenario_context import ScenarioContext
+from scenarios.run_data import RunData
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opcjonalny — bez niego szeregi są tylko zapisywane
+    np = None
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('listing', 'cart0', 'cart1', 'cart4')
+
+PRICE_JUMP = 'PRICE_JUMP'
+PRICE_DRIFT = 'PRICE_DRIFT'
+PRICE_LISTING_CART_MISMATCH = 'PRICE_LISTING_CART_MISMATCH'
+
+# Różnica listing/koszyk uznawana za rozbieżność (ułamek ceny listingu)
+MISMATCH_TOLERANCE = 0.01
+
+# Mianownik zmian względnych nie mniejszy niż 1 zł — darmowa dostawa (0) nie dzieli przez zero
+_MIN_BASE = 1.0
+
+# Stała odpornego z-score: MAD rozkładu normalnego = 0.6745 σ
+_MAD_SCALE = 0.6745
+
+_numpy_warned = False
+
+
+# ── Zapis ─────────────────────────────────────────────────────────────────────
+
+def stage_prices(run_data: RunData) -> dict[str, float]:
+    """Ceny etapów zebrane przez pages — tylko te, które page odczytał."""
+    prices = {}
+    if run_data.listing and run_data.listing.price is not None:
+        prices['listing'] = run_data.listing.price
+    if run_data.cart0 and run_data.cart0.total_price is not None:
+        prices['cart0'] = run_data.cart0.total_price
+    if run_data.cart1 and run_data.cart1.price is not None:
+        prices['cart1'] = run_data.cart1.price
+    if run_data.cart4 and run_data.cart4.total_price is not None:
+        prices['cart4'] = run_data.cart4.total_price
+    return prices
+
+
+def product_url(run_data: RunData, context: ScenarioContext) -> str | None:
+    url = (run_data.listing.url if run_data.listing else None) or next(iter(context.listing_urls), None)
+    return url[:500] if url else None
+
+
+def record(db: Session, run: ScenarioRun, run_data: RunData, context: ScenarioContext) -> None:
+    """Dodaje punkty szeregów dla runu (commit po stronie wywołującego)."""
+    if not settings.price_series_enabled:
+        return
+    url = product_url(run_data, context)
+    if not url:
+        return
+    db.add_all([
+        PricePoint(
+            run_id=run.id,
+            environment_id=run.environment_id,
+            scenario_id=run.scenario_id,
+            product_url=url,
+            stage=stage,
+            price=round(price, 2),
+        )
+        for stage, price in stage_prices(run_data).items()
+    ])
+
+
+# ── Okna historii ─────────────────────────────────────────────────────────────
+
+@dataclass
+class _Point:
+    run_id: int | None
+    scenario_id: int
+    price: float
+
+
+def _current_points(db: Session, suite_run_id: int) -> list[PricePoint]:
+    return list(db.scalars(
+        select(PricePoint)
+        .join(ScenarioRun, ScenarioRun.id == PricePoint.run_id)
+        .where(ScenarioRun.suite_run_id == suite_run_id)
+    ))
+
+
+def _load_windows(db: Session, environment_id: int, keys: set[tuple[str, str]],
+                  window: int) -> dict[tuple[str, str], list[_Point]]:
+    """Ostatnie `window` punktów każdego szeregu (url, etap), chronologicznie."""
+    ranked = (
+        select(
+            PricePoint.product_url, PricePoint.stage, PricePoint.run_id,
+            PricePoint.scenario_id, PricePoint.price, PricePoint.captured_at,
+            func.row_number().over(
+                partition_by=(PricePoint.product_url, PricePoint.stage),
+                order_by=(PricePoint.captured_at.desc(), PricePoint.id.desc()),
+            ).label("rn"),
+        )
+        .where(
+            PricePoint.environment_id == environment_id,
+            tuple_(PricePoint.product_url, PricePoint.stage).in_(list(keys)),
+        )
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked.c.product_url, ranked.c.stage, ranked.c.run_id, ranked.c.scenario_id, ranked.c.price)
+        .where(ranked.c.rn <= window)
+        .order_by(ranked.c.product_url, ranked.c.stage, ranked.c.captured_at, ranked.c.rn.desc())
+    )
+    series: dict[tuple[str, str], list[_Point]] = defaultdict(list)
+    for url, stage, run_id, scenario_id, price in rows:
+        series[(url, stage)].append(_Point(run_id, scenario_id, float(price)))
+    return series
+
+
+def _matrix(rows: list[list[float]], width: int):
+    """Wiersze różnej długości → macierz (len(rows), width) wyrównana do prawej, NaN na brakach."""
+    matrix = np.full((len(rows), width), np.nan)
+    for i, values in enumerate(rows):
+        if values:
+            matrix[i, width - len(values):] = values
+    return matrix
+
+
+# ── Detektory (NumPy) ─────────────────────────────────────────────────────────
+
+def jumps(matrix, min_points: int, jump_pct: float, jump_z: float):
+    """
+    Skok ostatniej kolumny: względem poprzedniego punktu i mediany historii,
+    z odpornym z-score ponad szum szeregu. Zwraca (maska, mediana, zmiana względna).
+    """
+    history, last = matrix[:, :-1], matrix[:, -1]
+    previous = history[:, -1]
+    count = np.sum(~np.isnan(history), axis=1)
+
+    median = np.nanmedian(history, axis=1)
+    mad = np.nanmedian(np.abs(history - median[:, None]), axis=1)
+    deviation = last - median
+    change = deviation / np.maximum(median, _MIN_BASE)
+    step = np.abs(last - previous) / np.maximum(previous, _MIN_BASE)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(mad > 0, _MAD_SCALE * np.abs(deviation) / mad, np.where(deviation != 0, np.inf, 0.0))
+
+    mask = (count >= min_points) & (np.abs(change) >= jump_pct) & (step >= jump_pct) & (z >= jump_z)
+    return mask, median, change
+
+
+def drifts(matrix, min_points: int, drift_pct: float):
+    """
+    Dryf: mediany trzech tercji okna (po liczbie punktów, nie kolumnach) zmieniają się
+    monotonicznie, a środkowa leży wyraźnie między skrajnymi — skok poziomu daje
+    środkową równą jednej ze skrajnych. Zwraca (maska, mediana 1. tercji, mediana 3. tercji, zmiana).
+    """
+    valid = ~np.isnan(matrix)
+    count = valid.sum(axis=1)
+    position = np.cumsum(valid, axis=1) - 1
+    third = np.where(valid, position * 3 // np.maximum(count, 1)[:, None], -1)
+
+    medians = [np.nanmedian(np.where(third == t, matrix, np.nan), axis=1) for t in range(3)]
+    first, middle, last = medians
+    total = last - first
+    change = total / np.maximum(first, _MIN_BASE)
+    gradual = (
+        ((middle - first) * (last - middle) > 0)
+        & (np.minimum(np.abs(middle - first), np.abs(last - middle)) >= 0.25 * np.abs(total))
+    )
+    mask = (count >= min_points + 1) & (np.abs(change) >= drift_pct) & gradual
+    return mask, first, last, change
+
+
+def mismatches(listing, cart, min_points: int, ratio: float):
+    """
+    Rozbieżność listing/cart0 w oknie (macierze wyrównane po runach):
+    udział runów z różnicą > MISMATCH_TOLERANCE i rozbieżność w bieżącym runie.
+    Zwraca (maska, liczba rozbieżnych runów, liczba runów).
+    """
+    both = ~np.isnan(listing) & ~np.isnan(cart)
+    with np.errstate(invalid="ignore"):
+        differs = both & (np.abs(listing - cart) / np.maximum(listing, _MIN_BASE) > MISMATCH_TOLERANCE)
+    count = both.sum(axis=1)
+    differing = differs.sum(axis=1)
+    mask = (count >= min_points) & (differing >= ratio * np.maximum(count, 1)) & differs[:, -1]
+    return mask, differing, count
+
+
+# ── Detekcja po suite runie ───────────────────────────────────────────────────
+
+def _numpy_available() -> bool:
+    global _numpy_warned
+    if np is not None:
+        return True
+    if not _numpy_warned:
+        logger.warning("[PriceSeries] Brak NumPy — wykrywanie anomalii cen wyłączone (pip install numpy)")
+        _numpy_warned = True
+    return False
+
+
+def _anomalies(series: dict[tuple[str, str], list[_Point]], current_runs: set[int]) -> list[tuple[_Point, str, str]]:
+    """(punkt bieżącego runu, business_rule, opis) dla wszystkich szeregów naraz."""
+    found: list[tuple[_Point, str, str]] = []
+    window = settings.price_window
+    min_points = settings.price_min_points
+
+    # Tylko szeregi, których ostatni punkt pochodzi z tego suite runu
+    keys = [key for key, points in series.items() if points and points[-1].run_id in current_runs]
+    if not keys:
+        return found
+    matrix = _matrix([[p.price for p in series[key]] for key in keys], window)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)    # nanmedian z pustych wierszy/tercji
+        jump_mask, median, jump_change = jumps(matrix, min_points, settings.price_jump_pct, settings.price_jump_z)
+        drift_mask, drift_from, drift_to, drift_change = drifts(matrix, min_points, settings.price_drift_pct)
+
+    for i in np.flatnonzero(jump_mask | drift_mask):
+        url, stage = keys[i]
+        points = series[keys[i]]
+        if jump_mask[i]:
+            found.append((points[-1], PRICE_JUMP,
+                          f"Skok ceny {stage}: {points[-2].price:.2f} → {points[-1].price:.2f} "
+                          f"({jump_change[i]:+.1%} względem mediany {median[i]:.2f} z {len(points) - 1} runów) — {url}"))
+        else:
+            found.append((points[-1], PRICE_DRIFT,
+                          f"Dryf ceny {stage}: {drift_from[i]:.2f} → {drift_to[i]:.2f} "
+                          f"({drift_change[i]:+.1%}) w ostatnich {len(points)} runach — {url}"))
+
+    # Listing vs cart0 — pary wyrównane po run_id, ostatnia para z bieżącego runu
+    urls, listing_rows, cart_rows = [], [], []
+    for url, stage in keys:
+        if stage != 'cart0' or (url, 'listing') not in series:
+            continue
+        listing_by_run = {p.run_id: p.price for p in series[(url, 'listing')]}
+        if series[(url, 'cart0')][-1].run_id not in listing_by_run:
+            continue
+        pairs = [(listing_by_run[p.run_id], p.price) for p in series[(url, 'cart0')] if p.run_id in listing_by_run]
+        urls.append(url)
+        listing_rows.append([listing for listing, _ in pairs])
+        cart_rows.append([cart for _, cart in pairs])
+    if urls:
+        mask, differing, count = mismatches(
+            _matrix(listing_rows, window), _matrix(cart_rows, window), min_points, settings.price_mismatch_ratio,
+        )
+        for i in np.flatnonzero(mask):
+            url = urls[i]
+            current = series[(url, 'cart0')][-1]
+            found.append((current, PRICE_LISTING_CART_MISMATCH,
+                          f"Cena listingu ≠ koszyk w {differing[i]}/{count[i]} ostatnich runach "
+                          f"(teraz {listing_rows[i][-1]:.2f} vs {cart_rows[i][-1]:.2f}) — {url}"))
+    return found
+
+
+def detect(db: Session, suite_run_id: int) -> list:
+    """
+    Anomalie szeregów dotkniętych przez suite run → alerty (AlertEngine, flush bez commit).
+    Zwraca zapisane obiekty Alert.
+    """
+    if not settings.price_series_enabled or not _numpy_available():
+        return []
+    current = _current_points(db, suite_run_id)
+    if not current:
+        return []
+
+    environment_id = current[0].environment_id
+    current_runs = {p.run_id for p in current}
+    series = _load_windows(db, environment_id, {(p.product_url, p.stage) for p in current}, settings.price_window)
+
+    engines: dict[int, AlertEngine] = {}
+    for point, rule, description in _anomalies(series, current_runs):
+        engine = engines.get(point.run_id)
+        if engine is None:
+            engine = engines[point.run_id] = AlertEngine(point.run_id, point.scenario_id, environment_id, db)
+        engine.add_alert(rule, description)
+
+    alerts = []
+    for engine in engines.values():
+        engine.save_all()
+        alerts.extend(engine.alerts)
+    logger.info(
+        f"[PriceSeries] suite_run #{suite_run_id}: {len(series)} szeregów, "
+        f"{len(alerts)} alertów anomalii cen"
+    )
+    return alerts
@@ -0,0 +1,203 @@
+"""
+Profiling — opcjonalny profil CPU orkiestratora na czas suite runu.
+
+Odpowiedzialności:
+  1. cProfile włączony na czas SuiteExecutor.run (przełącznik „Profil” w /execute,
+     python main.py --profile)
+  2. Zliczanie tasków asyncio: próbkowanie asyncio.all_tasks() co PROFILING_TASK_INTERVAL s
+     — szczyt i średnia liczba tasków per korutyna (ile scenariuszy czeka, ile pracuje)
+  3. Artefakty runu: {PROFILING_DIR}/suite_run_{id}.prof (surowy pstats — snakeviz,
+     python -m pstats) i suite_run_{id}.json (podsumowanie top-N dla panelu)
+
+cProfile mierzy tylko wątek event loop — wątki asyncio.to_thread i procesy przeglądarki
+są poza profilem. W procesie panelu pętla obsługuje też żądania HTTP, więc trafiają one
+do profilu razem z suite. Jednocześnie profilowany jest jeden suite run (profiler jest
+globalny dla wątku) — kolejne prośby w tym czasie są pomijane z ostrzeżeniem.
+
+Przykład:
+    with profiling.capture(suite_run.id):
+        await ...
+    summary = profiling.load_summary(suite_run.id)
+"""
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_busy = threading.Lock()
+
+
+def profile_path(suite_run_id: int) -> Path:
+    return Path(settings.profiling_dir) / f"suite_run_{suite_run_id}.prof"
+
+
+def summary_path(suite_run_id: int) -> Path:
+    return Path(settings.profiling_dir) / f"suite_run_{suite_run_id}.json"
+
+
+# ── Zliczanie tasków ──────────────────────────────────────────────────────────
+
+def _task_name(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class _TaskSampler:
+    """Próbkuje tasków event loop — szczyt i średnia per nazwa korutyny."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.peak = 0
+        self.total = 0
+        self.by_name: dict[str, list[int]] = {}     # nazwa → [szczyt, suma próbek]
+        self._task: asyncio.Task | None = None
+
+    def sample(self) -> None:
+        counts: dict[str, int] = {}
+        tasks = asyncio.all_tasks()
+        for task in tasks:
+            if task is not self._task:
+                name = _task_name(task)
+                counts[name] = counts.get(name, 0) + 1
+        self.samples += 1
+        self.peak = max(self.peak, len(tasks) - 1)
+        self.total += len(tasks) - 1
+        for name, count in counts.items():
+            entry = self.by_name.setdefault(name, [0, 0])
+            entry[0] = max(entry[0], count)
+            entry[1] += count
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+    def to_dict(self) -> dict:
+        samples = self.samples or 1
+        rows = [
+            {"name": name, "peak": peak, "avg": round(total / samples, 2)}
+            for name, (peak, total) in self.by_name.items()
+        ]
+        rows.sort(key=lambda r: r["avg"], reverse=True)
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "peak": self.peak,
+            "avg": round(self.total / samples, 2),
+            "by_coroutine": rows,
+        }
+
+
+# ── Podsumowanie pstats ───────────────────────────────────────────────────────
+
+def _function_label(key: tuple) -> str:
+    filename, lineno, funcname = key
+    if filename == "~":                      # funkcje wbudowane: ('~', 0, '<built-in method …>')
+        return funcname
+    path = Path(filename)
+    try:
+        filename = str(path.relative_to(Path.cwd()))
+    except ValueError:
+        # Biblioteki — od katalogu pakietu, bez ścieżki site-packages
+        parts = path.parts
+        filename = "/".join(parts[parts.index("site-packages") + 1:]) if "site-packages" in parts else path.name
+    return f"{filename}:{lineno}({funcname})"
+
+
+def summarize(stats: pstats.Stats, top_n: int) -> dict:
+    rows = [
+        {
+            "function": _function_label(key),
+            "ncalls": nc,
+            "tottime": round(tt, 4),
+            "cumtime": round(ct, 4),
+        }
+        for key, (cc, nc, tt, ct, callers) in stats.stats.items()
+    ]
+    return {
+        "total_calls": stats.total_calls,
+        "cpu_seconds": round(stats.total_tt, 3),
+        "top_tottime": sorted(rows, key=lambda r: r["tottime"], reverse=True)[:top_n],
+        "top_cumtime": sorted(rows, key=lambda r: r["cumtime"], reverse=True)[:top_n],
+    }
+
+
+# ── Przechwytywanie ───────────────────────────────────────────────────────────
+
+@contextmanager
+def capture(suite_run_id: int, enabled: bool = True) -> Iterator[bool]:
+    """Profil na czas bloku (w event loop). Zwraca True, jeśli profil jest zbierany."""
+    if not enabled:
+        yield False
+        return
+    if not _busy.acquire(blocking=False):
+        logger.warning(f"[Profiling] Inny suite run jest profilowany — suite_run #{suite_run_id} bez profilu")
+        yield False
+        return
+
+    # Czas CPU wątku — oczekiwanie w select() event loop nie jest liczone jako praca
+    profiler = cProfile.Profile(time.thread_time)
+    sampler = _TaskSampler(settings.profiling_task_interval)
+    started = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield True
+    finally:
+        profiler.disable()
+        sampler.stop()
+        wall = time.perf_counter() - started
+        _busy.release()
+        save(suite_run_id, profiler, sampler, wall)
+
+
+def save(suite_run_id: int, profiler: cProfile.Profile, sampler: _TaskSampler, wall: float) -> None:
+    path = profile_path(suite_run_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+        summary = {
+            "suite_run_id": suite_run_id,
+            "wall_seconds": round(wall, 3),
+            **summarize(pstats.Stats(profiler), settings.profiling_top_n),
+            "tasks": sampler.to_dict(),
+        }
+        tmp = summary_path(suite_run_id).with_suffix(".tmp")
+        tmp.write_text(json.dumps(summary), encoding="utf-8")
+        tmp.replace(summary_path(suite_run_id))
+        logger.info(
+            f"[Profiling] suite_run #{suite_run_id}: {summary['cpu_seconds']}s CPU w event loop "
+            f"/ {summary['wall_seconds']}s → {path}"
+        )
+    except OSError as e:
+        logger.warning(f"[Profiling] Nie udało się zapisać profilu suite_run #{suite_run_id}: {e}")
+
+
+def load_summary(suite_run_id: int) -> dict | None:
+    path = summary_path(suite_run_id)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"[Profiling] Nieczytelne podsumowanie {path}: {e}")
+        return None
@@ -0,0 +1,161 @@
+"""
+Read Models — zapytania odczytu z jawnym ładowaniem relacji (bez N+1).
+
+Odpowiedzialności:
+  1. Scenariusze do uruchomienia (suite, ręczny wybór, CLI) razem z flagami —
+     ScenarioContext.from_db nie dociąga już scenario.flags i sf.flag per scenariusz
+  2. Mapy i liczniki dla list panelu jednym zapytaniem zamiast pętli:
+     flagi scenariuszy, liczba scenariuszy per suite, alerty liczone per run,
+     wartości słowników formularzy
+  3. Stałe opcje loaderów dla list runów i alertów (scenario, suite, environment)
+
+Liczba zapytań każdej ścieżki jest stała — nie rośnie z liczbą scenariuszy ani wierszy
+strony. Pilnuje tego benchmarks/query_counts.py.
+
+Przykład:
+    scenarios = read_models.suite_scenarios(db, suite.id)
+    flags_map = read_models.scenario_flags_map(db)
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import case, func, inspect
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+
+from app.models.alert import Alert
+from app.models.alert_group import AlertGroup
+from app.models.dictionary import Dictionary
+from app.models.flag_definition import ScenarioFlag
+from app.models.run import ScenarioRun
+from app.models.scenario import Scenario
+from app.models.suite import Suite
+from app.models.suite_run import SuiteRun
+from app.models.suite_scenario import SuiteScenario
+
+# Scenariusz gotowy do ScenarioContext.from_db — flagi i ich definicje w dwóch zapytaniach
+SCENARIO_WITH_FLAGS = (selectinload(Scenario.flags).joinedload(ScenarioFlag.flag),)
+
+# Wiersze list runów — nazwy scenariusza, suite i środowiska w tym samym SELECT
+SCENARIO_RUN_ROW = (
+    joinedload(ScenarioRun.scenario),
+    joinedload(ScenarioRun.suite),
+    joinedload(ScenarioRun.environment),
+)
+SUITE_RUN_ROW = (joinedload(SuiteRun.suite), joinedload(SuiteRun.environment))
+
+# Wiersze alert_groups — zapytanie musi już mieć (outer)join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
+ALERT_GROUP_ROW = (
+    contains_eager(AlertGroup.last_suite_run).joinedload(SuiteRun.suite),
+    joinedload(AlertGroup.environment),
+)
+
+
+@dataclass
+class SuiteScenarioCounts:
+    all: int = 0         # aktywne przypisania do suite
+    active: int = 0      # ... z aktywnym scenariuszem (faktycznie uruchamiane)
+
+
+# ── Scenariusze do uruchomienia ───────────────────────────────────────────────
+
+def suite_scenarios(db: Session, suite_id: int) -> list[Scenario]:
+    """Aktywne scenariusze suite w kolejności SuiteScenario.order, z flagami."""
+    return (
+        db.query(Scenario)
+        .join(SuiteScenario, SuiteScenario.scenario_id == Scenario.id)
+        .filter(
+            SuiteScenario.suite_id == suite_id,
+            SuiteScenario.is_active == True,
+            Scenario.is_active == True,
+        )
+        .order_by(SuiteScenario.order)
+        .options(*SCENARIO_WITH_FLAGS)
+        .all()
+    )
+
+
+def suite_for_scenario(db: Session, scenario_id: int) -> Suite | None:
+    """Pierwsza suite, w której scenariusz jest aktywny (uruchomienie pojedynczego scenariusza z CLI)."""
+    return (
+        db.query(Suite)
+        .join(SuiteScenario, SuiteScenario.suite_id == Suite.id)
+        .filter(SuiteScenario.scenario_id == scenario_id, SuiteScenario.is_active == True)
+        .order_by(SuiteScenario.id)
+        .first()
+    )
+
+
+def scenarios_by_ids(db: Session, scenario_ids: list[int]) -> list[Scenario]:
+    """Aktywne scenariusze w kolejności scenario_ids (ręczny wybór), z flagami."""
+    if not scenario_ids:
+        return []
+    found = {
+        s.id: s for s in db.query(Scenario)
+        .filter(Scenario.id.in_(scenario_ids), Scenario.is_active == True)
+        .options(*SCENARIO_WITH_FLAGS)
+    }
+    return [found[sid] for sid in scenario_ids if sid in found]
+
+
+def preload_scenarios(db: Session, scenarios: list[Scenario]) -> None:
+    """
+    Ponownie wczytuje scenariusze z flagami po commit (expire_on_commit) —
+    te same obiekty, bez zapytania per scenariusz przy pierwszym dostępie.
+    """
+    if not scenarios:
+        return
+    (
+        db.query(Scenario)
+        .filter(Scenario.id.in_([inspect(s).identity[0] for s in scenarios]))   # bez odświeżania per obiekt
+        .options(*SCENARIO_WITH_FLAGS)
+        .execution_options(populate_existing=True)
+        .all()
+    )
+
+
+# ── Mapy i liczniki list ──────────────────────────────────────────────────────
+
+def scenario_flags_map(db: Session) -> dict[int, dict[int, bool]]:
+    """scenario_id → {flag_id: is_enabled} dla wszystkich scenariuszy."""
+    flags_map: dict[int, dict[int, bool]] = {}
+    for scenario_id, flag_id, is_enabled in db.query(
+        ScenarioFlag.scenario_id, ScenarioFlag.flag_id, ScenarioFlag.is_enabled
+    ):
+        flags_map.setdefault(scenario_id, {})[flag_id] = is_enabled
+    return flags_map
+
+
+def suite_scenario_counts(db: Session) -> dict[int, SuiteScenarioCounts]:
+    """suite_id → liczba przypisanych i faktycznie aktywnych scenariuszy — jeden GROUP BY."""
+    rows = (
+        db.query(
+            SuiteScenario.suite_id,
+            func.count(),
+            func.sum(case((Scenario.is_active == True, 1), else_=0)),
+        )
+        .join(Scenario, SuiteScenario.scenario_id == Scenario.id)
+        .filter(SuiteScenario.is_active == True)
+        .group_by(SuiteScenario.suite_id)
+    )
+    return {suite_id: SuiteScenarioCounts(all=total, active=active or 0) for suite_id, total, active in rows}
+
+
+def counted_alerts(db: Session, run_ids: list[int]) -> dict[int, int]:
+    """run_id → liczba alertów is_counted dla runów ze strony listy."""
+    if not run_ids:
+        return {}
+    return dict(
+        db.query(Alert.run_id, func.count())
+        .filter(Alert.run_id.in_(run_ids), Alert.is_counted == True)
+        .group_by(Alert.run_id)
+    )
+
+
+def dictionary_values(db: Session, system_names: list[str]) -> dict[str, list[str]]:
+    """system_name → wartości aktywnych słowników; brakujące jako pusta lista."""
+    entries = db.query(Dictionary).filter(
+        Dictionary.system_name.in_(system_names), Dictionary.is_active == True
+    ).order_by(Dictionary.id)
+    values: dict[str, list[str]] = {}
+    for entry in entries:
+        values.setdefault(entry.system_name, entry.get_values())   # pierwszy wpis wygrywa, jak .first()
+    return {name: values.get(name, []) for name in system_names}
@@ -0,0 +1,243 @@
+"""
+Replay reguł — ponowna ocena zapisanych RunData bieżącymi klasami reguł, bez przeglądarki.
+
+Odpowiedzialności:
+  1. Przebieg reguł jak w ShopRunner: home → listing → cart0 → (cart1..cart4 dla is_order),
+     flagi stop_at_cartX i should_not_complete, should_stop reguł, GlobalRules tylko
+     gdy nic nie zatrzymało testu
+  2. Porównanie z alertami zapisanymi w chwili runu: które business_rule zostałyby
+     dodane, a które zniknęłyby (per run i zbiorczo per reguła)
+  3. Masowy odczyt scenario_run_data (yield_per) — tysiące runów w kilka sekund
+
+Ograniczenia:
+  - suite_context = None — reguły czytające API (get_api) widzą wartości domyślne
+  - gdy nowe reguły nie zatrzymują testu tam, gdzie zatrzymał go oryginał, dalszych
+    etapów nie ma w danych — replay kończy się na ostatnim zapisanym etapie
+    (truncated) i nie uruchamia GlobalRules
+  - instrukcje reguł wpływają tylko na pages, więc replay je pomija
+
+Przykład:
+    report = replay.run(db, environment="RC", days=30)
+    for rule in report.rules.values(): ...
+"""
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.environment import Environment
+from app.models.run import ScenarioRun
+from app.models.scenario import Scenario
+from app.models.scenario_run_data import ScenarioRunData
+from core import run_data_store
+from scenarios.rules import (
+    HomeRules, ListingRules,
+    Cart0Rules, Cart1Rules, Cart2Rules, Cart3Rules, Cart4Rules,
+    GlobalRules,
+)
+from scenarios.rules_result import AlertResult
+
+logger = logging.getLogger(__name__)
+
+# (etap, pole RunData, klasa reguł, flaga stopu po etapie)
+_BASE_STAGES = (
+    ('home', 'home', HomeRules, None),
+    ('listing', 'listing', ListingRules, None),
+    ('cart0', 'cart0', Cart0Rules, None),
+)
+_ORDER_STAGES = (
+    ('cart1', 'cart1', Cart1Rules, 'stop_at_cart1'),
+    ('cart2', 'cart2', Cart2Rules, 'stop_at_cart2'),
+    ('cart3', 'cart3', Cart3Rules, 'stop_at_cart3'),
+    ('cart4', 'cart4', Cart4Rules, None),
+)
+
+
+@dataclass
+class ReplayOutcome:
+    alerts: list[AlertResult]
+    stopped_at: str | None
+    truncated: bool = False        # brak danych etapu, do którego doszłyby nowe reguły
+
+
+def replay_run(stored: run_data_store.StoredRun) -> ReplayOutcome:
+    """Przebieg reguł na zapisanym RunData — odpowiednik ShopRunner.run bez pages."""
+    context, run_data = stored.context, stored.run_data
+    alerts: list[AlertResult] = []
+
+    stages = _BASE_STAGES + (_ORDER_STAGES if context.is_order else ())
+    for stage, attr, rules_cls, stop_flag in stages:
+        if stage == 'cart4' and context.flag('should_not_complete'):
+            return ReplayOutcome(alerts, stopped_at='cart3')
+        if getattr(run_data, attr) is None:
+            # Oryginał nie zebrał danych etapu: błąd page (success=False) albo stop,
+            # którego nowe reguły już nie robią (truncated)
+            return ReplayOutcome(alerts, stopped_at=stored.stopped_at, truncated=stored.success)
+        result = rules_cls(context).check(run_data)
+        alerts.extend(result.alerts)
+        if result.should_stop:
+            return ReplayOutcome(alerts, stopped_at=stage)
+        if stop_flag and context.flag(stop_flag):
+            return ReplayOutcome(alerts, stopped_at=stage)
+
+    alerts.extend(GlobalRules(context).check(run_data).alerts)
+    return ReplayOutcome(alerts, stopped_at=None)
+
+
+# ── Raport ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class RuleDiff:
+    business_rule: str
+    before: int = 0                # alerty w zapisanych runach
+    after: int = 0                 # alerty po replay
+    added_runs: list[int] = field(default_factory=list)
+    removed_runs: list[int] = field(default_factory=list)
+
+
+@dataclass
+class RunDiff:
+    run_id: int
+    scenario: str
+    added: list[AlertResult]
+    removed: list[AlertResult]
+    stopped_before: str | None
+    stopped_after: str | None
+    truncated: bool
+
+
+@dataclass
+class ReplayReport:
+    runs: int = 0
+    changed: list[RunDiff] = field(default_factory=list)
+    rules: dict[str, RuleDiff] = field(default_factory=dict)
+    stop_changed: int = 0
+    truncated: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)   # (run_id, błąd)
+    runs_without_data: int = 0
+    seconds: float = 0.0
+
+    def rule(self, business_rule: str) -> RuleDiff:
+        if business_rule not in self.rules:
+            self.rules[business_rule] = RuleDiff(business_rule)
+        return self.rules[business_rule]
+
+
+def _multiset_diff(before: list[AlertResult], after: list[AlertResult]) -> tuple[list[AlertResult], list[AlertResult]]:
+    """Alerty dodane / usunięte — porównanie po business_rule z krotnością."""
+    added_counts = Counter(a.business_rule for a in after) - Counter(a.business_rule for a in before)
+    removed_counts = Counter(a.business_rule for a in before) - Counter(a.business_rule for a in after)
+
+    def pick(alerts: list[AlertResult], counts: Counter) -> list[AlertResult]:
+        picked = []
+        for alert in alerts:
+            if counts[alert.business_rule] > 0:
+                counts[alert.business_rule] -= 1
+                picked.append(alert)
+        return picked
+
+    return pick(after, added_counts), pick(before, removed_counts)
+
+
+def compare(report: ReplayReport, run_id: int, scenario: str, stored: run_data_store.StoredRun) -> None:
+    outcome = replay_run(stored)
+    report.runs += 1
+    for alert in stored.alerts:
+        report.rule(alert.business_rule).before += 1
+    for alert in outcome.alerts:
+        report.rule(alert.business_rule).after += 1
+    if outcome.truncated:
+        report.truncated += 1
+
+    added, removed = _multiset_diff(stored.alerts, outcome.alerts)
+    stop_changed = outcome.stopped_at != stored.stopped_at and not outcome.truncated
+    if stop_changed:
+        report.stop_changed += 1
+    if not (added or removed or stop_changed):
+        return
+
+    for rule in {a.business_rule for a in added}:
+        report.rule(rule).added_runs.append(run_id)
+    for rule in {a.business_rule for a in removed}:
+        report.rule(rule).removed_runs.append(run_id)
+    report.changed.append(RunDiff(
+        run_id=run_id,
+        scenario=scenario,
+        added=added,
+        removed=removed,
+        stopped_before=stored.stopped_at,
+        stopped_after=outcome.stopped_at,
+        truncated=outcome.truncated,
+    ))
+
+
+# ── Masowy replay ─────────────────────────────────────────────────────────────
+
+def _filtered(query, environment: str | None, scenario: str | None, suite_run_id: int | None, days: int | None):
+    if environment:
+        query = query.join(Environment, Environment.id == ScenarioRun.environment_id).where(
+            Environment.name == environment
+        )
+    if scenario:
+        query = query.where(Scenario.name == scenario)
+    if suite_run_id:
+        query = query.where(ScenarioRun.suite_run_id == suite_run_id)
+    if days:
+        query = query.where(ScenarioRun.started_at >= datetime.now(timezone.utc) - timedelta(days=days))
+    return query
+
+
+def run(
+    db: Session,
+    environment: str | None = None,
+    scenario: str | None = None,
+    suite_run_id: int | None = None,
+    days: int | None = None,
+    limit: int | None = None,
+) -> ReplayReport:
+    """Replay wszystkich runów z zapisanym RunData (najnowsze pierwsze)."""
+    report = ReplayReport()
+    started = time.perf_counter()
+
+    query = _filtered(
+        select(ScenarioRunData.run_id, ScenarioRunData.format_version, ScenarioRunData.data, Scenario.name)
+        .join(ScenarioRun, ScenarioRun.id == ScenarioRunData.run_id)
+        .join(Scenario, Scenario.id == ScenarioRun.scenario_id),
+        environment, scenario, suite_run_id, days,
+    ).order_by(ScenarioRunData.run_id.desc())
+    if limit:
+        query = query.limit(limit)
+
+    for run_id, format_version, blob, scenario_name in db.execute(query.execution_options(yield_per=500)):
+        if format_version > run_data_store.FORMAT_VERSION:
+            report.errors.append((run_id, f"format {format_version} nowszy niż obsługiwany"))
+            continue
+        try:
+            stored = run_data_store.load(blob)
+            compare(report, run_id, scenario_name, stored)
+        except Exception as e:
+            # Reguła rzucająca wyjątkiem na starych danych to też wynik replay
+            report.errors.append((run_id, f"{type(e).__name__}: {e}"))
+
+    if not limit:
+        report.runs_without_data = db.scalar(
+            _filtered(
+                select(func.count())
+                .select_from(ScenarioRun)
+                .join(Scenario, Scenario.id == ScenarioRun.scenario_id)
+                .outerjoin(ScenarioRunData, ScenarioRunData.run_id == ScenarioRun.id)
+                .where(ScenarioRunData.run_id.is_(None)),
+                environment, scenario, suite_run_id, days,
+            )
+        ) or 0
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        f"[Replay] {report.runs} runów w {report.seconds:.2f}s — "
+        f"zmienione: {len(report.changed)}, błędy: {len(report.errors)}"
+    )
+    return report
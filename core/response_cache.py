@@ -0,0 +1,185 @@
+"""
+ResponseCache — cache wyrenderowanych fragmentów panelu w pamięci procesu.
+
+Odpowiedzialności:
+  1. Trzyma globalny licznik wersji danych (data version)
+  2. Cache'uje wyrenderowane HTML pod kluczem (ścieżka + query + użytkownik)
+  3. Ustawia ETag / Last-Modified i odpowiada 304 gdy nic się nie zmieniło
+
+Licznik podbijany przez:
+  - RunnerRegistry — start i koniec suite
+  - DataVersionMiddleware — każdy udany POST/DELETE (zmiana statusu alertu, edycja konfiguracji)
+  - znacznik danych z bazy (max suite_runs.id / finished_at, max alert_groups.id / last_seen_at)
+    — zmiany zapisane przez inne procesy (main.py, CLI)
+
+Wpis jest ważny tylko dla bieżącej wersji i bieżącego okna TTL — dashboard
+zawiera liczniki "ostatnie 24h", więc nawet bez zmian w danych odświeża się co CACHE_TTL.
+ETag to skrót wyrenderowanej treści — poprawny także po restarcie procesu i między procesami.
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.alert_group import AlertGroup
+from app.models.suite_run import SuiteRun
+from core.auth_core import get_current_user
+
+logger = logging.getLogger(__name__)
+
+# Maksymalny wiek wpisu (sekundy) — ogranicza "zamrożenie" liczników czasowych
+CACHE_TTL = 300
+
+# Maksymalna liczba wpisów — najstarsze usuwane (LRU)
+MAX_ENTRIES = 128
+
+_version: int = 0
+_changed_at: datetime = datetime.now(timezone.utc).replace(microsecond=0)
+_db_stamp: tuple | None = None
+_entries: "OrderedDict[str, _Entry]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+
+@dataclass
+class _Entry:
+    etag: str
+    body: bytes
+    media_type: str
+    version: int
+    window: int
+
+
+# ── Wersja danych ─────────────────────────────────────────────────────────────
+
+def bump(reason: str = "") -> int:
+    """Podbija wersję danych — wszystkie wpisy cache stają się nieaktualne."""
+    global _version, _changed_at
+    _version += 1
+    _changed_at = datetime.now(timezone.utc).replace(microsecond=0)
+    _entries.clear()
+    logger.debug(f"[ResponseCache] Wersja danych → {_version} ({reason or 'brak powodu'})")
+    return _version
+
+
+def sync_with_db(db: Session) -> None:
+    """Podbija wersję, gdy znacznik danych w bazie się zmienił (zapis z innego procesu)."""
+    global _db_stamp
+    stamp = tuple(db.execute(select(
+        select(func.max(SuiteRun.id)).scalar_subquery(),
+        select(func.max(SuiteRun.finished_at)).scalar_subquery(),
+        select(func.max(AlertGroup.id)).scalar_subquery(),
+        select(func.max(AlertGroup.last_seen_at)).scalar_subquery(),
+    )).one())
+    if _db_stamp is not None and stamp != _db_stamp:
+        bump("zmiana danych w bazie")
+    _db_stamp = stamp
+
+
+def current_version() -> int:
+    return _version
+
+
+def last_modified() -> datetime:
+    """Czas ostatniej zmiany danych (dokładność do sekundy — jak nagłówek HTTP)."""
+    return _changed_at
+
+
+def stats() -> dict:
+    """Liczniki trafień — hits / misses / not_modified oraz liczba wpisów."""
+    return {**_stats, "entries": len(_entries), "version": _version}
+
+
+# ── Cache odpowiedzi ──────────────────────────────────────────────────────────
+
+def _cache_key(request: Request) -> str:
+    user = get_current_user(request)
+    username = user["username"] if user else ""
+    return f"{request.url.path}?{request.url.query}|{username}"
+
+
+def _etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [t.strip() for t in if_none_match.split(",")]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # Bez ETag nie znamy okna TTL — porównujemy tylko gdy wpis jest świeży
+        return since >= _changed_at and time.time() - since.timestamp() < CACHE_TTL
+    return False
+
+
+def _headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(_changed_at, usegmt=True),
+        # Przeglądarka zawsze rewaliduje — dostaje 304 gdy treść się nie zmieniła
+        "Cache-Control": "no-cache",
+    }
+
+
+def cached_response(request: Request, render: Callable[[], Response], db: Session | None = None) -> Response:
+    """
+    Zwraca odpowiedź z cache lub renderuje ją przez render().
+
+    render() wywoływany jest tylko przy braku wpisu — zapytania do bazy
+    wewnątrz render() nie są wykonywane przy HIT ani przy 304 z wpisu.
+    Z db wersja jest najpierw weryfikowana znacznikiem danych z bazy (jedno zapytanie).
+
+    Przykład:
+        return response_cache.cached_response(request, lambda: templates.TemplateResponse(...), db)
+    """
+    if db is not None:
+        sync_with_db(db)
+
+    key = _cache_key(request)
+    window = int(time.time() // CACHE_TTL)
+
+    entry = _entries.get(key)
+    if entry and entry.version == _version and entry.window == window:
+        _entries.move_to_end(key)
+        headers = _headers(entry.etag)
+        if _is_not_modified(request, entry.etag):
+            _stats["not_modified"] += 1
+            return Response(status_code=304, headers={**headers, "X-Cache": "NOT-MODIFIED"})
+        _stats["hits"] += 1
+        return HTMLResponse(entry.body, media_type=entry.media_type, headers={**headers, "X-Cache": "HIT"})
+
+    response = render()
+    _stats["misses"] += 1
+    if response.status_code != 200:
+        return response
+
+    body = bytes(response.body)
+    etag = _etag(body)
+    _entries[key] = _Entry(etag=etag, body=body, media_type=response.media_type or "text/html",
+                           version=_version, window=window)
+    _entries.move_to_end(key)
+    while len(_entries) > MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+    headers = _headers(etag)
+    # Treść identyczna z wersją klienta (np. po restarcie procesu) — wystarczy 304
+    if _is_not_modified(request, etag):
+        _stats["not_modified"] += 1
+        return Response(status_code=304, headers={**headers, "X-Cache": "NOT-MODIFIED"})
+
+    response.headers.update({**headers, "X-Cache": "MISS"})
+    return response
@@ -0,0 +1,413 @@
+"""
+Retention — usuwanie starych runów i ich plików według polityk wieku.
+
+Odpowiedzialności:
+  1. Polityki per tabela i per środowisko (porażki trzymane dłużej niż sukcesy)
+  2. Chroni runy powiązane z otwartymi alert_groups i zaplanowanymi jobami;
+     zamknięte alert_groups zostają — z last_suite_run_id = NULL
+  3. Usuwa małymi partiami — każda partia to osobny commit (krótkie blokady)
+  4. Usuwa pliki runu: screenshots/{suite_run_id}/, logs/suite_run_{id}.log/.jsonl, trace OTLP-JSON, profil CPU, wpisy LogIndex
+     oraz zwalnia referencje artefaktów (screenshoty bez referencji usuwa collect_garbage)
+     i wpisy indeksu wyszukiwania alertów
+  5. Raportuje liczbę usuniętych wierszy i zwolnionych bajtów
+
+Uruchamiane cyklicznie z app/scheduler.py oraz ręcznie:
+    python clean_runs.py --retention [--dry-run]
+"""
+import asyncio
+import json
+import logging
+import shutil
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.alert import Alert
+from app.models.alert_group import AlertGroup, AlertStatus
+from app.models.api_error import ApiError
+from app.models.api_endpoint_stat import ApiEndpointRollup, ApiEndpointStat
+from app.models.basket_snapshot import BasketSnapshot
+from app.models.environment import Environment
+from app.models.price_point import PricePoint
+from app.models.run import ScenarioRun
+from app.models.scenario_run_data import ScenarioRunData
+from app.models.scheduled_job import ScheduledJob
+from app.models.suite_run import SuiteRun, SuiteRunStatus
+from core import alert_search, artifact_store, log_index, log_reader, profiling, response_cache, runner_registry, tracing
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOTS_DIR = Path("screenshots")
+
+# Liczba suite_run / wierszy szczegółów usuwanych w jednej transakcji
+BATCH_SIZE = 50
+DETAIL_BATCH_SIZE = 1000
+
+# Przerwa między partiami — oddaje bazę executorom (SQLite: jeden writer)
+BATCH_PAUSE = 0.05
+
+FAILED_STATUSES = (SuiteRunStatus.FAILED, SuiteRunStatus.PARTIAL)
+SUCCESS_STATUSES = (SuiteRunStatus.SUCCESS, SuiteRunStatus.CANCELLED)
+
+
+@dataclass
+class RetentionPolicy:
+    success_days: int
+    failed_days: int
+
+
+@dataclass
+class RetentionReport:
+    rows: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    files: int = 0
+    bytes_freed: int = 0
+    protected: int = 0
+    duration: float = 0.0
+    dry_run: bool = False
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    def summary(self) -> str:
+        rows = ", ".join(f"{table}={count}" for table, count in self.rows.items() if count) or "brak"
+        prefix = "[DRY RUN] " if self.dry_run else ""
+        return (
+            f"{prefix}Wiersze: {rows} | Pliki: {self.files} ({self.bytes_freed / 1024 / 1024:.1f} MB) | "
+            f"Chronione runy: {self.protected} | {self.duration:.1f}s"
+        )
+
+
+# ── Polityki ──────────────────────────────────────────────────────────────────
+
+def policy_for(environment_name: str) -> RetentionPolicy:
+    """Polityka środowiska — RETENTION_ENVIRONMENTS lub domyślne RETENTION_*_DAYS."""
+    override = settings.retention_environments.get(environment_name)
+    if override:
+        return RetentionPolicy(success_days=override[0], failed_days=override[1])
+    return RetentionPolicy(
+        success_days=settings.retention_success_days,
+        failed_days=settings.retention_failed_days,
+    )
+
+
+def _parse_history(value) -> list[int]:
+    """suite_run_history — lista, string lub podwójnie zakodowany JSON (jak w SuiteExecutor)."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+            if isinstance(value, str):
+                value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    if not isinstance(value, list):
+        return []
+    return [int(v) for v in value if isinstance(v, int) or (isinstance(v, str) and v.isdigit())]
+
+
+def protected_suite_run_ids(db: Session) -> set[int]:
+    """Runy, których nie wolno usunąć: otwarte alert_groups, ostatnie runy jobów, runy w toku."""
+    protected: set[int] = set(runner_registry.get_running().keys())
+
+    groups = db.query(AlertGroup.last_suite_run_id, AlertGroup.suite_run_history).filter(
+        AlertGroup.status != AlertStatus.CLOSED
+    )
+    for last_suite_run_id, history in groups:
+        if last_suite_run_id is not None:
+            protected.add(last_suite_run_id)
+        protected.update(_parse_history(history))
+
+    jobs = db.query(ScheduledJob.last_suite_run_id).filter(ScheduledJob.last_suite_run_id.isnot(None))
+    protected.update(suite_run_id for (suite_run_id,) in jobs)
+    return protected
+
+
+def _expired_filter(db: Session, now: datetime):
+    """
+    Warunek SQL: run zakończony i starszy niż polityka swojego środowiska,
+    a zarchiwizowany — starszy niż horyzont archiwum (ARCHIVE_KEEP_MONTHS).
+    """
+    conditions = []
+    for env_id, env_name in db.query(Environment.id, Environment.name):
+        policy = policy_for(env_name)
+        conditions.append(and_(
+            SuiteRun.environment_id == env_id,
+            or_(
+                and_(SuiteRun.status.in_(FAILED_STATUSES),
+                     SuiteRun.started_at < now - timedelta(days=policy.failed_days)),
+                and_(SuiteRun.status.in_(SUCCESS_STATUSES),
+                     SuiteRun.started_at < now - timedelta(days=policy.success_days)),
+            ),
+        ))
+    # Zarchiwizowane runy — własny horyzont; retencja usuwa podsumowanie i pliki
+    # (screenshoty, logi, trace), a plik miesiąca bez podsumowań usuwa archiwizator
+    from core import archive  # archive importuje retention
+    archived = and_(SuiteRun.archived_at.isnot(None), SuiteRun.started_at < archive.oldest_kept_month(now))
+    if not conditions:
+        return archived
+    return or_(and_(SuiteRun.archived_at.is_(None), or_(*conditions)), archived)
+
+
+# ── Pliki ─────────────────────────────────────────────────────────────────────
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+
+def suite_run_files(suite_run_id: int) -> list[Path]:
+    """Pliki na dysku należące do suite_run."""
+    candidates = [
+        SCREENSHOTS_DIR / str(suite_run_id),
+        log_reader.log_path(suite_run_id),
+        log_reader.json_log_path(suite_run_id),
+        tracing.trace_path(suite_run_id),
+        profiling.profile_path(suite_run_id),
+        profiling.summary_path(suite_run_id),
+    ]
+    return [p for p in candidates if p.exists()]
+
+
+def delete_suite_run_files(suite_run_id: int, dry_run: bool = False) -> tuple[int, int]:
+    """Usuwa screenshoty i logi suite_run. Zwraca (liczba ścieżek, bajty)."""
+    count, freed = 0, 0
+    for path in suite_run_files(suite_run_id):
+        try:
+            size = _size(path)
+            if not dry_run:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+            count += 1
+            freed += size
+        except OSError as e:
+            logger.warning(f"[Retention] Nie udało się usunąć {path}: {e}")
+    return count, freed
+
+
+def _orphan_suite_run_ids(db: Session) -> set[int]:
+    """suite_run_id z plików na dysku, których nie ma już w bazie (np. usunięte ręcznie)."""
+    on_disk: set[int] = set()
+    if SCREENSHOTS_DIR.exists():
+        on_disk.update(int(p.name) for p in SCREENSHOTS_DIR.iterdir() if p.is_dir() and p.name.isdigit())
+    if log_reader.LOG_DIR.exists():
+        for p in log_reader.LOG_DIR.glob("suite_run_*.*"):
+            suffix = p.stem.removeprefix("suite_run_")
+            if suffix.isdigit():
+                on_disk.add(int(suffix))
+    if not on_disk:
+        return set()
+
+    existing = {
+        suite_run_id for (suite_run_id,) in
+        db.query(SuiteRun.id).filter(SuiteRun.id.in_(on_disk))
+    }
+    return on_disk - existing - set(runner_registry.get_running().keys())
+
+
+# ── Usuwanie ──────────────────────────────────────────────────────────────────
+
+def _release_references(db: Session, suite_run_ids: list[int], run_ids) -> None:
+    """
+    Zwalnia referencje artefaktów i wpisy indeksu alertów usuwanych suite_run —
+    także z archiwum (zarchiwizowane snapshoty i opisy alertów nadal je trzymają).
+    """
+    refs = artifact_store.snapshot_refs(db, BasketSnapshot.run_id.in_(run_ids))
+    alert_ids = [alert_id for (alert_id,) in db.query(Alert.id).filter(Alert.run_id.in_(run_ids))]
+
+    archived = db.query(SuiteRun).filter(SuiteRun.id.in_(suite_run_ids), SuiteRun.archived_at.isnot(None)).all()
+    if archived:
+        from core import archive  # archive importuje retention
+        for suite_run in archived:
+            snapshots = archive.archived_rows(suite_run, BasketSnapshot.__tablename__)
+            refs.update(artifact_store.refs_from_raw_data(row.get("raw_data") for row in snapshots))
+            alert_ids.extend(row["id"] for row in archive.archived_rows(suite_run, Alert.__tablename__))
+
+    artifact_store.release(db, refs)
+    alert_search.forget_alerts(db, alert_ids)
+    alert_search.forget_groups(db, [
+        group_id for (group_id,) in
+        db.query(AlertGroup.id).filter(AlertGroup.last_suite_run_id.in_(suite_run_ids))
+    ])
+
+
+def _detach_closed_groups(db: Session, suite_run_ids: list[int]) -> None:
+    """
+    Zamknięte grupy (NAB, CANT_REPRODUCE, DUPLICATE) są historią decyzji — potrzebne do
+    reopen i wykrywania duplikatów. Zostają bez last_suite_run (środowisko trzyma environment_id).
+    """
+    db.query(AlertGroup).filter(
+        AlertGroup.last_suite_run_id.in_(suite_run_ids), AlertGroup.status == AlertStatus.CLOSED,
+    ).update({AlertGroup.last_suite_run_id: None}, synchronize_session=False)
+
+
+def delete_suite_runs(db: Session, suite_run_ids: list[int], report: RetentionReport) -> None:
+    """Usuwa partię suite_run wraz z zależnościami — jedna transakcja."""
+    run_ids = select(ScenarioRun.id).where(ScenarioRun.suite_run_id.in_(suite_run_ids))
+    group_ids = select(AlertGroup.id).where(AlertGroup.last_suite_run_id.in_(suite_run_ids))
+
+    _detach_closed_groups(db, suite_run_ids)
+    _release_references(db, suite_run_ids, run_ids)
+
+    report.rows["basket_snapshots"] += db.query(BasketSnapshot).filter(
+        BasketSnapshot.run_id.in_(run_ids)).delete(synchronize_session=False)
+    report.rows["api_errors"] += db.query(ApiError).filter(
+        ApiError.run_id.in_(run_ids)).delete(synchronize_session=False)
+    report.rows["api_endpoint_stats"] += db.query(ApiEndpointStat).filter(
+        ApiEndpointStat.run_id.in_(run_ids)).delete(synchronize_session=False)
+    report.rows["alerts"] += db.query(Alert).filter(
+        Alert.run_id.in_(run_ids)).delete(synchronize_session=False)
+    report.rows["scenario_run_data"] += db.query(ScenarioRunData).filter(
+        ScenarioRunData.run_id.in_(run_ids)).delete(synchronize_session=False)
+    # Szeregi cen zostają — tracą tylko powiązanie z runem (RETENTION_PRICE_DAYS)
+    db.query(PricePoint).filter(PricePoint.run_id.in_(run_ids)).update(
+        {PricePoint.run_id: None}, synchronize_session=False)
+
+    # Pozostałe grupy usuwanych runów (ręczne usunięcie runu) — retencja chroni otwarte wcześniej
+    db.query(AlertGroup).filter(AlertGroup.duplicate_of_id.in_(group_ids)).update(
+        {AlertGroup.duplicate_of_id: None}, synchronize_session=False)
+    report.rows["alert_groups"] += db.query(AlertGroup).filter(
+        AlertGroup.last_suite_run_id.in_(suite_run_ids)).delete(synchronize_session=False)
+
+    report.rows["scenario_runs"] += db.query(ScenarioRun).filter(
+        ScenarioRun.suite_run_id.in_(suite_run_ids)).delete(synchronize_session=False)
+    report.rows["suite_runs"] += db.query(SuiteRun).filter(
+        SuiteRun.id.in_(suite_run_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _purge_suite_runs(db: Session, now: datetime, protected: set[int], report: RetentionReport) -> None:
+    expired = _expired_filter(db, now)
+    if expired is None:
+        return
+
+    after = 0
+    while True:
+        batch = [
+            suite_run_id for (suite_run_id,) in
+            db.query(SuiteRun.id).filter(expired, SuiteRun.id > after)
+            .order_by(SuiteRun.id).limit(BATCH_SIZE)
+        ]
+        if not batch:
+            break
+        after = batch[-1]
+
+        to_delete = [suite_run_id for suite_run_id in batch if suite_run_id not in protected]
+        report.protected += len(batch) - len(to_delete)
+        if not to_delete:
+            continue
+
+        if report.dry_run:
+            report.rows["suite_runs"] += len(to_delete)
+        else:
+            delete_suite_runs(db, to_delete, report)
+            log_index.delete_suite_runs(to_delete)
+
+        for suite_run_id in to_delete:
+            count, freed = delete_suite_run_files(suite_run_id, report.dry_run)
+            report.files += count
+            report.bytes_freed += freed
+
+        time.sleep(BATCH_PAUSE)
+
+
+def _purge_details(db: Session, model, cutoff: datetime, protected: set[int], report: RetentionReport) -> None:
+    """Usuwa stare wiersze szczegółów (snapshoty, błędy API, punkty cen) z runów, które zostają w bazie."""
+    protected_runs = select(ScenarioRun.id).where(ScenarioRun.suite_run_id.in_(protected))
+    query = db.query(model.id).filter(model.captured_at < cutoff,
+                                      or_(model.run_id.is_(None), model.run_id.notin_(protected_runs)))
+    if report.dry_run:
+        report.rows[model.__tablename__] += query.count()
+        return
+    while True:
+        ids = [row_id for (row_id,) in query.limit(DETAIL_BATCH_SIZE)]
+        if not ids:
+            break
+        if model is BasketSnapshot:
+            artifact_store.release(db, artifact_store.snapshot_refs(db, BasketSnapshot.id.in_(ids)))
+        report.rows[model.__tablename__] += db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        time.sleep(BATCH_PAUSE)
+
+
+def _purge_api_rollups(db: Session, cutoff: datetime, report: RetentionReport) -> None:
+    """Rollupy statystyk API sklepu — bez powiązania z runami, usuwane tylko po dniu."""
+    query = db.query(ApiEndpointRollup).filter(ApiEndpointRollup.day < cutoff.date())
+    if report.dry_run:
+        report.rows[ApiEndpointRollup.__tablename__] += query.count()
+        return
+    report.rows[ApiEndpointRollup.__tablename__] += query.delete(synchronize_session=False)
+    db.commit()
+
+
+def _compact(db: Session) -> None:
+    """SQLite — przycina plik WAL i odświeża statystyki planera po usunięciu danych."""
+    if db.bind.dialect.name != "sqlite":
+        return
+    with db.bind.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.exec_driver_sql("PRAGMA optimize")
+
+
+def run_pass(db: Session, dry_run: bool = False, now: datetime | None = None) -> RetentionReport:
+    """Jeden pełny przebieg retencji. dry_run=True — tylko raport, bez usuwania."""
+    started = time.perf_counter()
+    now = now or datetime.now(timezone.utc)
+    report = RetentionReport(dry_run=dry_run)
+
+    protected = protected_suite_run_ids(db)
+
+    _purge_suite_runs(db, now, protected, report)
+
+    for model, days in (
+        (BasketSnapshot, settings.retention_snapshot_days),
+        (ApiError,       settings.retention_api_error_days),
+        (PricePoint,     settings.retention_price_days),
+    ):
+        if days > 0:
+            _purge_details(db, model, now - timedelta(days=days), protected, report)
+    if settings.retention_shop_api_days > 0:
+        _purge_api_rollups(db, now - timedelta(days=settings.retention_shop_api_days), report)
+
+    for suite_run_id in _orphan_suite_run_ids(db):
+        count, freed = delete_suite_run_files(suite_run_id, dry_run)
+        report.files += count
+        report.bytes_freed += freed
+
+    count, freed = artifact_store.collect_garbage(db, dry_run)
+    report.files += count
+    report.bytes_freed += freed
+
+    if report.total_rows and not dry_run:
+        _compact(db)
+
+    report.duration = time.perf_counter() - started
+    return report
+
+
+async def run_scheduled() -> RetentionReport | None:
+    """Przebieg z schedulera — w osobnym wątku, żeby nie blokować pętli zdarzeń."""
+    if not settings.retention_enabled:
+        return None
+
+    from database import SessionLocal
+
+    def _run() -> RetentionReport:
+        db = SessionLocal()
+        try:
+            return run_pass(db)
+        finally:
+            db.close()
+
+    report = await asyncio.to_thread(_run)
+    if report.total_rows:
+        response_cache.bump("retention")
+    return report
@@ -0,0 +1,150 @@
+"""
+Run data store — zapis pełnego RunData scenario_runu w zwartej postaci.
+
+Odpowiedzialności:
+  1. Serializacja RunData (home/listing/cart0..cart4) razem z ScenarioContext,
+     alertami reguł i miejscem zatrzymania — wszystko, czego potrzebuje replay reguł
+  2. Format zwarty: JSON bez spacji i bez pól równych wartościom domyślnym
+     dataclassy, skompresowany zlib (zwykle kilkaset bajtów na run)
+  3. Odczyt do dataclass — nieznane klucze są pomijane, brakujące dostają
+     wartości domyślne, więc stare wiersze przeżywają dodanie/usunięcie pola
+  4. Zapis wiersza ScenarioRunData przy zapisie wyników runu (RUN_DATA_ENABLED)
+
+Kontekst scenariusza jest zapisywany z chwili runu — replay ocenia reguły
+względem tej konfiguracji scenariusza, nie bieżącej.
+
+Przykład:
+    blob = run_data_store.dump(result.run_data, scenario_context, result.alerts, ...)
+    stored = run_data_store.load(blob)
+"""
+import json
+import logging
+import typing
+import zlib
+from dataclasses import MISSING, dataclass, fields, is_dataclass
+from functools import cache
+
+from sqlalchemy.orm import Session
+
+from app.models.scenario_run_data import ScenarioRunData
+from core.config import settings
+from scenarios.contexts.scenario_context import ScenarioContext
+from scenarios.rules_result import AlertResult
+from scenarios.run_data import RunData
+
+logger = logging.getLogger(__name__)
+
+# Podbij przy zmianie, której load() nie obsłuży przez wartości domyślne pól
+FORMAT_VERSION = 1
+
+
+@dataclass
+class StoredRun:
+    run_data: RunData
+    context: ScenarioContext
+    alerts: list[AlertResult]
+    stopped_at: str | None
+    success: bool
+
+
+# ── Kodowanie ─────────────────────────────────────────────────────────────────
+
+def _default(f) -> object:
+    if f.default is not MISSING:
+        return f.default
+    if f.default_factory is not MISSING:
+        return f.default_factory()
+    return MISSING
+
+
+def _compact(obj) -> object:
+    """Dataclass → dict bez pól o wartości domyślnej (rekurencyjnie)."""
+    if is_dataclass(obj):
+        return {
+            f.name: _compact(value)
+            for f in fields(obj)
+            if (value := getattr(obj, f.name)) != _default(f)
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_compact(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: _compact(value) for key, value in obj.items()}
+    return obj
+
+
+def dump(
+    run_data: RunData,
+    context: ScenarioContext,
+    alerts: list[AlertResult],
+    stopped_at: str | None,
+    success: bool,
+) -> bytes:
+    payload = {
+        "run_data": _compact(run_data),
+        "context": _compact(context),
+        "alerts": [[a.business_rule, a.description] for a in alerts],
+        "stopped_at": stopped_at,
+        "success": success,
+    }
+    # default=str — wartości spoza JSON (np. Decimal z page) zapisane jako tekst
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+    return zlib.compress(raw.encode("utf-8"), 6)
+
+
+# ── Dekodowanie ───────────────────────────────────────────────────────────────
+
+@cache
+def _hints(cls) -> dict:
+    return typing.get_type_hints(cls)
+
+
+def _dataclass_arg(tp) -> type | None:
+    """Dataclass zagnieżdżona w adnotacji: X, Optional[X], list[X]."""
+    if is_dataclass(tp):
+        return tp
+    for arg in typing.get_args(tp):
+        if is_dataclass(arg):
+            return arg
+    return None
+
+
+def _build(cls, data: dict):
+    hints = _hints(cls)
+    kwargs = {}
+    for f in fields(cls):
+        if f.name not in data:
+            continue
+        value = data[f.name]
+        nested = _dataclass_arg(hints[f.name])
+        if nested is not None and value is not None:
+            if isinstance(value, list):
+                value = [_build(nested, item) for item in value]
+            else:
+                value = _build(nested, value)
+        kwargs[f.name] = value
+    return cls(**kwargs)
+
+
+def load(blob: bytes) -> StoredRun:
+    payload = json.loads(zlib.decompress(blob))
+    return StoredRun(
+        run_data=_build(RunData, payload.get("run_data", {})),
+        context=_build(ScenarioContext, payload["context"]),
+        alerts=[AlertResult(rule, description) for rule, description in payload.get("alerts", [])],
+        stopped_at=payload.get("stopped_at"),
+        success=payload.get("success", True),
+    )
+
+
+# ── Zapis ─────────────────────────────────────────────────────────────────────
+
+def record(db: Session, run_id: int, result, context: ScenarioContext) -> None:
+    """Dodaje ScenarioRunData dla ShopRunResult (commit po stronie wywołującego)."""
+    if not settings.run_data_enabled:
+        return
+    try:
+        blob = dump(result.run_data, context, result.alerts, result.stopped_at, result.success)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"[RunDataStore] RUN #{run_id}: nie udało się zserializować RunData: {e}")
+        return
+    db.add(ScenarioRunData(run_id=run_id, format_version=FORMAT_VERSION, data=blob))
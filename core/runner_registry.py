@@ -4,10 +4,14 @@ Odpowiedzialności:
   1. Śledzi aktywne suite_run_id → Task
   2. Limituje liczbę równoległych suite (MAX_CONCURRENT_SUITES)
   3. Umożliwia anulowanie konkretnego runu
+  4. Podbija wersję danych panelu (response_cache) przy starcie i końcu suite
+  5. Publikuje liczbę aktywnych suite do EventBus (RUNNING_CHANGED)
 """
 import asyncio
 import logging
 
+from core import response_cache, event_bus
+
 logger = logging.getLogger(__name__)
 
 # Maksymalna liczba równolegle uruchomionych suite
@@ -71,12 +75,18 @@ async def run_suite(suite_run_id: int, coro) -> None:
                 await coro
             except asyncio.CancelledError:
                 logger.info(f"[RunnerRegistry] suite_run #{suite_run_id} anulowany")
+                event_bus.publish(event_bus.SUITE_FINISHED, suite_run_id, status="cancelled")
             except Exception as e:
                 logger.exception(f"[RunnerRegistry] suite_run #{suite_run_id} błąd: {e}")
+                event_bus.publish(event_bus.SUITE_FINISHED, suite_run_id, status="failed", error=str(e))
             finally:
                 _running.pop(suite_run_id, None)
+                response_cache.bump(f"suite_run #{suite_run_id} zakończony")
+                event_bus.publish(event_bus.RUNNING_CHANGED, running=len(_running))
                 logger.info(f"[RunnerRegistry] suite_run #{suite_run_id} zakończony — aktywnych: {len(_running)}")
 
     task = asyncio.create_task(_wrapper())
     _running[suite_run_id] = task
+    response_cache.bump(f"suite_run #{suite_run_id} uruchomiony")
+    event_bus.publish(event_bus.RUNNING_CHANGED, running=len(_running))
     logger.info(f"[RunnerRegistry] Zarejestrowano suite_run #{suite_run_id} — aktywnych: {len(_running)}")
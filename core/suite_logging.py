@@ -0,0 +1,239 @@
+"""
+SuiteLogging — routing logów do plików per suite_run.
+
+Odpowiedzialności:
+  1. Trzyma suite_run_id bieżącego kodu w ContextVar (dziedziczony przez taski asyncio)
+  2. Na root loggerze wisi jeden QueueHandler — rekord trafia do kolejki bez I/O
+  3. QueueListener (wątek w tle) zapisuje rekord do logs/suite_run_{id}.log
+     oraz ustrukturyzowany rekord JSON do logs/suite_run_{id}.jsonl i do LogIndex
+  4. Poziom logów konfigurowalny per suite (SUITE_LOG_LEVEL / SUITE_LOG_LEVELS)
+  5. Kontekst rekordu: run_id i scenariusz (ScenarioExecutor), etap (ShopRunner)
+
+Równoległe suite (MAX_CONCURRENT_SUITES) piszą każda do swojego pliku,
+a pętla zdarzeń nie czeka na zapis na dysk.
+
+Przykład:
+    token = suite_logging.start_suite(suite_run.id, suite.name)
+    try:
+        ...
+    finally:
+        suite_logging.stop_suite(suite_run.id, token)
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import TextIO
+
+from core import log_index, log_reader
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT = '%(asctime)s | %(levelname)-8s | %(scenario_tag)s | %(message)s'
+DATE_FORMAT = '%H:%M:%S'
+
+# Biblioteki zewnętrzne generujące szum w logach
+NOISY_LOGGERS = ('multipart', 'multipart.multipart')
+
+current_suite_run: contextvars.ContextVar[int | None] = contextvars.ContextVar("current_suite_run", default=None)
+current_scenario_run: contextvars.ContextVar[tuple[int, str] | None] = contextvars.ContextVar("current_scenario_run", default=None)
+current_stage: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_stage", default=None)
+
+# suite_run_id → minimalny poziom (aktywne suite)
+_levels: dict[int, int] = {}
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: logging.handlers.QueueListener | None = None
+_install_lock = threading.Lock()
+
+
+# ── Handlery ──────────────────────────────────────────────────────────────────
+
+class _SuiteQueueHandler(logging.handlers.QueueHandler):
+    """
+    Wrzuca do kolejki tylko rekordy z kontekstu aktywnej suite.
+    prepare() rozwiązuje msg % args i traceback do tekstu jeszcze w wątku logującym
+    (argumenty mogą się zmienić lub nie dać się zserializować później); linię
+    z czasem i poziomem składa wątek listenera.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        suite_run_id = current_suite_run.get()
+        if suite_run_id is None:
+            return
+        level = _levels.get(suite_run_id)
+        if level is None or record.levelno < level:
+            return
+        scenario_run = current_scenario_run.get()
+        record.suite_run_id = suite_run_id
+        record.run_id, record.scenario = scenario_run or (None, None)
+        record.stage = current_stage.get()
+        self.enqueue(self.prepare(record))
+
+
+class _CloseRecord(logging.LogRecord):
+    """Znacznik końca suite — listener zamyka plik po zapisaniu wcześniejszych rekordów."""
+
+    def __init__(self, suite_run_id: int):
+        super().__init__("suite_logging", logging.CRITICAL, "", 0, "", None, None)
+        self.suite_run_id = suite_run_id
+
+
+def _structured(record: logging.LogRecord) -> dict:
+    # Traceback jest już w msg — QueueHandler.prepare()
+    return {
+        "ts":           record.created,
+        "suite_run_id": record.suite_run_id,
+        "run_id":       record.run_id,
+        "scenario":     record.scenario,
+        "stage":        record.stage,
+        "level":        record.levelname,
+        "levelno":      record.levelno,
+        "logger":       record.name,
+        "message":      record.getMessage(),
+    }
+
+
+class _TextFormatter(logging.Formatter):
+    """Dokleja do linii scenariusz z kontekstu rekordu ("-" poza scenariuszem)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.scenario_tag = getattr(record, "scenario", None) or "-"
+        return super().format(record)
+
+
+class _RoutingHandler(logging.Handler):
+    """
+    Działa w wątku QueueListener — rozdziela rekordy na pliki per suite_run:
+    tekstowy (.log), JSON Lines (.jsonl) oraz indeks LogIndex.
+    """
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self._files: dict[int, tuple[logging.FileHandler, TextIO]] = {}
+        self._formatter = _TextFormatter(FORMAT, datefmt=DATE_FORMAT)
+        self._index = log_index.LogIndexWriter()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        suite_run_id = getattr(record, "suite_run_id", None)
+        if suite_run_id is None:
+            return False
+
+        if isinstance(record, _CloseRecord):
+            files = self._files.pop(suite_run_id, None)
+            if files:
+                files[0].close()
+                files[1].close()
+            self._index.flush()
+            return True
+
+        files = self._files.get(suite_run_id)
+        if files is None:
+            path = log_reader.log_path(suite_run_id)
+            path.parent.mkdir(exist_ok=True)
+            text = logging.FileHandler(path, encoding='utf-8')
+            text.setFormatter(self._formatter)
+            jsonl = log_reader.json_log_path(suite_run_id).open("a", encoding="utf-8")
+            files = self._files[suite_run_id] = (text, jsonl)
+
+        text, jsonl = files
+        text.handle(record)
+        try:
+            entry = _structured(record)
+            jsonl.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            jsonl.flush()
+            self._index.add(entry)
+        except Exception:
+            self.handleError(record)
+        return True
+
+    def close(self) -> None:
+        for text, jsonl in self._files.values():
+            text.close()
+            jsonl.close()
+        self._files.clear()
+        self._index.close()
+        super().close()
+
+
+# ── Publiczne API ─────────────────────────────────────────────────────────────
+
+def install() -> None:
+    """Podpina QueueHandler do root loggera i startuje listener (idempotentne)."""
+    global _listener
+    with _install_lock:
+        if _listener is not None:
+            return
+
+        root = logging.getLogger()
+        root.addHandler(_SuiteQueueHandler(_queue))
+
+        for noisy in NOISY_LOGGERS:
+            logging.getLogger(noisy).setLevel(logging.WARNING)
+
+        _listener = logging.handlers.QueueListener(_queue, _RoutingHandler())
+        _listener.start()
+        atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """Zatrzymuje listener — zapisuje rekordy pozostałe w kolejce."""
+    global _listener
+    with _install_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def level_for(suite_name: str | None) -> int:
+    """Poziom logów dla suite — SUITE_LOG_LEVELS[nazwa] lub SUITE_LOG_LEVEL."""
+    name = settings.suite_log_levels.get(suite_name or "", settings.suite_log_level)
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.DEBUG
+
+
+def start_suite(suite_run_id: int, suite_name: str | None = None) -> contextvars.Token:
+    """
+    Włącza zapis logów bieżącego kontekstu do pliku suite_run.
+    Taski tworzone później (scenariusze, Playwright) dziedziczą suite_run_id.
+    """
+    install()
+    level = level_for(suite_name)
+    _levels[suite_run_id] = level
+
+    # Root logger nie może odcinać rekordów poniżej najniższego poziomu aktywnych suite
+    root = logging.getLogger()
+    if root.getEffectiveLevel() > level:
+        root.setLevel(level)
+
+    return current_suite_run.set(suite_run_id)
+
+
+def stop_suite(suite_run_id: int, token: contextvars.Token | None = None) -> None:
+    """Kończy zapis logów suite — plik zamykany po opróżnieniu kolejki."""
+    _levels.pop(suite_run_id, None)
+    if token is not None:
+        current_suite_run.reset(token)
+    _queue.put_nowait(_CloseRecord(suite_run_id))
+
+
+def bind_scenario(run_id: int, scenario: str) -> contextvars.Token:
+    """Dołącza run_id i nazwę scenariusza do rekordów bieżącego taska."""
+    return current_scenario_run.set((run_id, scenario))
+
+
+def unbind_scenario(token: contextvars.Token) -> None:
+    current_scenario_run.reset(token)
+    current_stage.set(None)
+
+
+def set_stage(stage: str | None) -> None:
+    """Etap testu (home, listing, cart0…) dołączany do kolejnych rekordów."""
+    current_stage.set(stage)
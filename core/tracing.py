@@ -0,0 +1,341 @@
+"""
+Tracing — spany suite runu zapisywane lokalnie w formacie OTLP-JSON.
+
+Odpowiedzialności:
+  1. Drzewo spanów: suite run → scenariusz → (browser.start) próba → etap → page.execute /
+     rules.check / screenshot, plus db.flush i api.fetch w miejscu, w którym wystąpiły
+  2. Bieżący span w ContextVar — dziedziczony przez taski gather i wątki asyncio.to_thread,
+     bez przekazywania go przez konstruktory executorów
+  3. Atrybuty kontekstu (suite_run_id, environment, scenario, scenario_run_id, attempt)
+     przechodzą z rodzica na dzieci — każdy span da się przypisać do scenariusza
+  4. Eksport po zakończeniu suite runu: {TRACING_DIR}/suite_run_{id}.otlp.json
+     (struktura resourceSpans / scopeSpans / spans z OTLP/HTTP JSON — plik można
+     wysłać kolektorem OpenTelemetry bez konwersji)
+  5. Odczyt pliku i wiersze widoku waterfall scenariusza dla panelu
+
+Bez aktywnego suite runu (start_trace) wszystkie spany są no-op — ręczne uruchomienia
+i skrypty nie płacą za instrumentację.
+
+Przykład:
+    with tracing.start_trace(suite_run.id, suite="Smoke", environment="RC"):
+        with tracing.span("scenario", scenario="Kurier"):
+            ...
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "shop_monitor"
+SCOPE_NAME = "shop_monitor.tracing"
+
+# Atrybuty kopiowane z rodzica do dzieci
+INHERITED = ("suite_run_id", "environment", "scenario", "scenario_run_id", "attempt")
+
+# Kody statusu OTLP
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict = field(default_factory=dict)
+    status: int = STATUS_UNSET
+    message: str = ""
+    trace: "_Trace | None" = field(default=None, repr=False)
+
+    def child(self, name: str, attributes: dict, start_ns: int | None = None) -> "Span":
+        inherited = {key: self.attributes[key] for key in INHERITED if key in self.attributes}
+        return Span(
+            name=name,
+            trace_id=self.trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=self.span_id,
+            start_ns=start_ns or time.time_ns(),
+            attributes={**inherited, **_clean(attributes)},
+            trace=self.trace,
+        )
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.message = f"{type(error).__name__}: {error}"[:500]
+
+    def end(self, end_ns: int | None = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if self.trace is not None:
+            self.trace.add(self)
+
+
+class _Trace:
+    """Bufor zakończonych spanów jednego suite runu."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            if not self.closed:      # np. odświeżenie ApiDataProvider po zakończeniu suite
+                self.spans.append(span)
+
+    def close(self) -> list[Span]:
+        with self._lock:
+            self.closed = True
+            return list(self.spans)
+
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("tracing_span", default=None)
+
+
+def _clean(attributes: dict) -> dict:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+def trace_path(suite_run_id: int) -> Path:
+    return Path(settings.tracing_dir) / f"suite_run_{suite_run_id}.otlp.json"
+
+
+# ── Spany ─────────────────────────────────────────────────────────────────────
+
+def current() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def start_trace(suite_run_id: int, **attributes) -> Iterator[Span | None]:
+    """Span główny suite runu — po wyjściu zapisuje wszystkie spany do pliku OTLP-JSON."""
+    if not settings.tracing_enabled:
+        yield None
+        return
+    root = Span(
+        name="suite_run",
+        trace_id=os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=None,
+        start_ns=time.time_ns(),
+        attributes={"suite_run_id": suite_run_id, **_clean(attributes)},
+        trace=_Trace(),
+    )
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        root.end()
+        export(suite_run_id, root.trace.close())
+
+
+@contextmanager
+def span(name: str, parent: Span | None = None, **attributes) -> Iterator[Span | None]:
+    """Span potomny bieżącego (albo parent) — na czas bloku staje się bieżącym."""
+    parent = parent or _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def start_span(name: str, **attributes) -> Span | None:
+    """Span potomny bieżącego bez zmiany bieżącego — zakończenie przez span.end() (etapy ShopRunner)."""
+    parent = _current.get()
+    return parent.child(name, attributes) if parent else None
+
+
+def annotate(**attributes) -> None:
+    """Dopisuje atrybuty do bieżącego spanu (np. scenario_run_id znany po commit)."""
+    current_span = _current.get()
+    if current_span is not None:
+        current_span.attributes.update(_clean(attributes))
+
+
+# ── Flush sesji ORM ───────────────────────────────────────────────────────────
+
+def _before_flush(session, flush_context, instances):
+    if _current.get() is not None:
+        session.info["tracing_flush"] = (
+            time.time_ns(), len(session.new), len(session.dirty), len(session.deleted),
+        )
+
+
+def _after_flush(session, flush_context):
+    started = session.info.pop("tracing_flush", None)
+    parent = _current.get()
+    if started is None or parent is None:
+        return
+    start_ns, new, dirty, deleted = started
+    parent.child("db.flush", {"new": new, "dirty": dirty, "deleted": deleted}, start_ns=start_ns).end()
+
+
+def install() -> None:
+    """Span db.flush dla każdego flush sesji w zakresie trace (idempotentne)."""
+    if event.contains(Session, "before_flush", _before_flush):
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush_postexec", _after_flush)
+
+
+# ── Eksport OTLP-JSON ─────────────────────────────────────────────────────────
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _from_otlp_value(value: dict):
+    if "intValue" in value:
+        return int(value["intValue"])
+    for key in ("boolValue", "doubleValue", "stringValue"):
+        if key in value:
+            return value[key]
+    return None
+
+
+def to_otlp(spans: list[Span]) -> dict:
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": SCOPE_NAME},
+            "spans": [
+                {
+                    "traceId": s.trace_id,
+                    "spanId": s.span_id,
+                    "parentSpanId": s.parent_id or "",
+                    "name": s.name,
+                    "kind": 1,    # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                    "status": {"code": s.status, **({"message": s.message} if s.message else {})},
+                }
+                for s in sorted(spans, key=lambda s: s.start_ns)
+            ],
+        }],
+    }]}
+
+
+def export(suite_run_id: int, spans: list[Span]) -> None:
+    path = trace_path(suite_run_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(to_otlp(spans)), encoding="utf-8")
+        tmp.replace(path)
+        logger.debug(f"[Tracing] suite_run #{suite_run_id}: {len(spans)} spanów → {path}")
+    except OSError as e:
+        logger.warning(f"[Tracing] Nie udało się zapisać trace suite_run #{suite_run_id}: {e}")
+
+
+# ── Odczyt i widok waterfall ──────────────────────────────────────────────────
+
+def load(suite_run_id: int) -> list[Span]:
+    """Spany suite runu z pliku OTLP-JSON; brak pliku → pusta lista."""
+    path = trace_path(suite_run_id)
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"[Tracing] Nieczytelny plik {path}: {e}")
+        return []
+    return [
+        Span(
+            name=s["name"],
+            trace_id=s["traceId"],
+            span_id=s["spanId"],
+            parent_id=s.get("parentSpanId") or None,
+            start_ns=int(s["startTimeUnixNano"]),
+            end_ns=int(s["endTimeUnixNano"]),
+            attributes={a["key"]: _from_otlp_value(a["value"]) for a in s.get("attributes", [])},
+            status=s.get("status", {}).get("code", STATUS_UNSET),
+            message=s.get("status", {}).get("message", ""),
+        )
+        for resource in data.get("resourceSpans", [])
+        for scope in resource.get("scopeSpans", [])
+        for s in scope.get("spans", [])
+    ]
+
+
+@dataclass
+class WaterfallRow:
+    name: str
+    depth: int
+    offset_pct: float          # początek względem spanu scenariusza
+    width_pct: float
+    duration_ms: float
+    attributes: dict
+    error: bool
+    message: str
+
+
+def waterfall(spans: list[Span], scenario_run_id: int) -> list[WaterfallRow]:
+    """Poddrzewo spanu scenariusza w kolejności wykonania (DFS) z pozycjami pasków."""
+    root = next(
+        (s for s in spans if s.name == "scenario" and s.attributes.get("scenario_run_id") == scenario_run_id),
+        None,
+    )
+    if root is None:
+        return []
+
+    children: dict[str, list[Span]] = {}
+    for s in spans:
+        if s.parent_id:
+            children.setdefault(s.parent_id, []).append(s)
+
+    total = max(root.end_ns - root.start_ns, 1)
+    rows: list[WaterfallRow] = []
+
+    def visit(s: Span, depth: int, inherited: dict) -> None:
+        rows.append(WaterfallRow(
+            name=s.name,
+            depth=depth,
+            offset_pct=round(max(s.start_ns - root.start_ns, 0) / total * 100, 3),
+            width_pct=round(max((s.end_ns - s.start_ns) / total * 100, 0.2), 3),
+            duration_ms=round((s.end_ns - s.start_ns) / 1e6, 1),
+            # Tylko atrybuty własne — odziedziczone po rodzicu nie powtarzają się w każdym wierszu
+            attributes={k: v for k, v in s.attributes.items() if inherited.get(k, object()) != v},
+            error=s.status == STATUS_ERROR,
+            message=s.message,
+        ))
+        for child in sorted(children.get(s.span_id, []), key=lambda c: c.start_ns):
+            visit(child, depth + 1, s.attributes)
+
+    visit(root, 0, {})
+    return rows
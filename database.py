@@ -26,6 +26,19 @@ if DATABASE_URL.startswith("sqlite"):
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Liczniki zapytań per żądanie / suite run (Server-Timing, /metrics/db)
+from core import db_metrics  # noqa: E402
+
+db_metrics.install(engine)
+
+# Spany db.flush w trace suite runu (OTLP-JSON, core/tracing.py)
+from core import tracing  # noqa: E402
+
+tracing.install()
+
+# Listenery ORM synchronizujące indeks wyszukiwania alertów (alert_fts)
+import core.alert_search  # noqa: E402,F401
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -10,6 +10,8 @@ Uzycie:
     python main.py --environment 1          # konkretne srodowisko
     python main.py --workers 4              # nadpisz liczbe workers
     python main.py --headless               # bez okna przegladarki
+    python main.py --profile                # profil CPU suite (logs/profiles/, strona suite runu)
+    python main.py bench --mock --suite 1 --workers 1,2,4   # benchmark executora (benchmarks/throughput.py)
 """
 
 import asyncio
@@ -22,12 +24,11 @@ from sqlalchemy.orm import Session
 
 from database import SessionLocal, engine
 from app.models import Base
-from app.models.scenario import Scenario
 from app.models.suite import Suite
 from app.models.environment import Environment
-from app.models.suite_scenario import SuiteScenario
 from app.models.suite_run import SuiteRun, SuiteRunStatus
 from scenarios.scenario_executor import ScenarioExecutor
+from core import read_models
 
 Path("logs").mkdir(exist_ok=True)
 
@@ -52,6 +53,7 @@ def parse_args():
     environment_id = None
     workers = None
     headless = "--headless" in sys.argv
+    profile = "--profile" in sys.argv
     retries = 0
 
     if "--suite" in sys.argv:
@@ -74,7 +76,7 @@ def parse_args():
         idx = sys.argv.index("--retries")
         retries = int(sys.argv[idx + 1])
 
-    return suite_id, scenario_id, environment_id, workers, headless, retries
+    return suite_id, scenario_id, environment_id, workers, headless, retries, profile
 
 
 def load_from_db(db: Session, suite_id: int | None, scenario_id: int | None, environment_id: int | None):
@@ -98,18 +100,17 @@ def load_from_db(db: Session, suite_id: int | None, scenario_id: int | None, env
     
     # Pojedynczy scenariusz
     if scenario_id:
-        scenario = db.query(Scenario).filter_by(id=scenario_id, is_active=True).first()
+        scenario = next(iter(read_models.scenarios_by_ids(db, [scenario_id])), None)
         if not scenario:
             logger.error(f"Scenariusz #{scenario_id} nie istnieje lub nieaktywny.")
             sys.exit(1)
         
         # Znajdz suite dla tego scenariusza (pierwsza w ktorej jest)
-        suite_scenario = db.query(SuiteScenario).filter_by(scenario_id=scenario_id, is_active=True).first()
-        if not suite_scenario:
+        suite = read_models.suite_for_scenario(db, scenario_id)
+        if not suite:
             logger.error(f"Scenariusz #{scenario_id} nie nalezy do zadnej suite.")
             sys.exit(1)
         
-        suite = suite_scenario.suite
         scenarios = [scenario]
         
         logger.info(f"Tryb: POJEDYNCZY SCENARIUSZ #{scenario.id}")
@@ -125,14 +126,7 @@ def load_from_db(db: Session, suite_id: int | None, scenario_id: int | None, env
         logger.error("Brak aktywnych suite w bazie.")
         sys.exit(1)
 
-    suite_scenarios = (
-        db.query(SuiteScenario)
-        .filter_by(suite_id=suite.id, is_active=True)
-        .order_by(SuiteScenario.order)
-        .all()
-    )
-
-    scenarios = [ss.scenario for ss in suite_scenarios if ss.scenario.is_active]
+    scenarios = read_models.suite_scenarios(db, suite.id)
     
     logger.info(f"Tryb: CALA SUITE '{suite.name}'")
     return suite, environment, scenarios
@@ -190,7 +184,7 @@ async def run_single_scenario(scenario, suite, environment, headless: bool):
         db.close()
 
 
-async def run_suite(suite, environment, scenarios, workers: int, headless: bool, max_retries: int = 0):
+async def run_suite(suite, environment, scenarios, workers: int, headless: bool, max_retries: int = 0, profile: bool = False):
     """Uruchamia pelna suite przez SuiteExecutor."""
 
     from scenarios.suite_executor import SuiteExecutor
@@ -205,6 +199,7 @@ async def run_suite(suite, environment, scenarios, workers: int, headless: bool,
             headless=headless,
             db=db,
             max_retries=max_retries,
+            profile=profile,
         )
         await executor.run()
     finally:
@@ -212,7 +207,11 @@ async def run_suite(suite, environment, scenarios, workers: int, headless: bool,
 
 
 if __name__ == "__main__":
-    suite_id, scenario_id, environment_id, workers_override, headless, retries = parse_args()
+    if sys.argv[1:2] == ["bench"]:
+        from benchmarks import throughput
+        sys.exit(throughput.main(sys.argv[2:]))
+
+    suite_id, scenario_id, environment_id, workers_override, headless, retries, profile = parse_args()
 
     db = SessionLocal()
     try:
@@ -222,8 +221,10 @@ if __name__ == "__main__":
 
     # Pojedynczy scenariusz — prostsza logika
     if scenario_id:
+        if profile:
+            logger.warning("--profile dotyczy uruchomienia suite (SuiteExecutor) — pojedynczy scenariusz bez profilu")
         asyncio.run(run_single_scenario(scenarios[0], suite, environment, headless))
     # Cala suite — SuiteExecutor
     else:
         workers = workers_override or suite.workers
-        asyncio.run(run_suite(suite, environment, scenarios, workers, headless, retries))
\ No newline at end of file
+        asyncio.run(run_suite(suite, environment, scenarios, workers, headless, retries, profile))
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Replay Rules — ponowna ocena historycznych runów bieżącymi regułami, bez przeglądarki.
+
+Czyta zapisane RunData (scenario_run_data) i przepuszcza je przez klasy reguł
+i GlobalRules (core/replay.py). Raport: które business_rule zostałyby dodane,
+a które zniknęłyby po zmianie reguł — zanim zmiana trafi na środowiska.
+
+Użycie:
+    python replay_rules.py                          # wszystkie runy z zapisanym RunData
+    python replay_rules.py --environment RC --days 30
+    python replay_rules.py --scenario "Kurier" --limit 5000
+    python replay_rules.py --suite-run 123 --runs   # lista zmienionych runów
+    python replay_rules.py --json > replay.json
+"""
+import argparse
+import json
+import sys
+
+from core import replay
+from database import SessionLocal
+
+
+def print_report(report: replay.ReplayReport, show_runs: bool, examples: int) -> None:
+    print(f"\n🔁 Replay reguł: {report.runs:,} runów w {report.seconds:.2f}s "
+          f"({report.runs / max(report.seconds, 1e-9):,.0f} runów/s)")
+    if report.runs_without_data:
+        print(f"   Pominięte (brak zapisanego RunData): {report.runs_without_data:,}")
+
+    changed = [r for r in report.rules.values() if r.added_runs or r.removed_runs]
+    if not changed:
+        print("\n✅ Bez zmian — bieżące reguły dają te same alerty")
+    else:
+        print(f"\n{'business_rule':<32} {'przed':>8} {'po':>8} {'+ runy':>8} {'- runy':>8}")
+        for rule in sorted(changed, key=lambda r: len(r.added_runs) + len(r.removed_runs), reverse=True):
+            print(f"{rule.business_rule:<32} {rule.before:>8} {rule.after:>8} "
+                  f"{len(rule.added_runs):>8} {len(rule.removed_runs):>8}")
+            if examples:
+                sample = (rule.added_runs + rule.removed_runs)[:examples]
+                print(f"{'':<32} np. runy: {', '.join(f'#{run_id}' for run_id in sample)}")
+
+    print(f"\n   Zmienione runy: {len(report.changed):,} | inny etap zatrzymania: {report.stop_changed:,} "
+          f"| ucięte (brak danych dalszych etapów): {report.truncated:,}")
+
+    if show_runs:
+        for diff in report.changed:
+            parts = [f"+{a.business_rule}" for a in diff.added] + [f"-{a.business_rule}" for a in diff.removed]
+            if diff.stopped_before != diff.stopped_after and not diff.truncated:
+                parts.append(f"stop {diff.stopped_before or '—'} → {diff.stopped_after or '—'}")
+            print(f"   RUN #{diff.run_id} [{diff.scenario}]: {' '.join(parts)}")
+
+    if report.errors:
+        print(f"\n❌ Błędy replay: {len(report.errors)}")
+        for run_id, error in report.errors[:10]:
+            print(f"   RUN #{run_id}: {error}")
+
+
+def to_json(report: replay.ReplayReport) -> dict:
+    return {
+        "runs": report.runs,
+        "seconds": round(report.seconds, 3),
+        "runs_without_data": report.runs_without_data,
+        "stop_changed": report.stop_changed,
+        "truncated": report.truncated,
+        "rules": {
+            name: {"before": r.before, "after": r.after, "added_runs": r.added_runs, "removed_runs": r.removed_runs}
+            for name, r in report.rules.items()
+        },
+        "changed": [
+            {
+                "run_id": d.run_id,
+                "scenario": d.scenario,
+                "added": [[a.business_rule, a.description] for a in d.added],
+                "removed": [[a.business_rule, a.description] for a in d.removed],
+                "stopped_before": d.stopped_before,
+                "stopped_after": d.stopped_after,
+                "truncated": d.truncated,
+            }
+            for d in report.changed
+        ],
+        "errors": [{"run_id": run_id, "error": error} for run_id, error in report.errors],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay bieżących reguł na zapisanych RunData")
+    parser.add_argument("--environment", help="Nazwa środowiska, np. RC")
+    parser.add_argument("--scenario", help="Nazwa scenariusza")
+    parser.add_argument("--suite-run", type=int, help="Tylko runy jednego suite runu")
+    parser.add_argument("--days", type=int, help="Tylko runy z ostatnich N dni")
+    parser.add_argument("--limit", type=int, help="Maksymalna liczba runów (najnowsze)")
+    parser.add_argument("--runs", action="store_true", help="Wypisz każdy zmieniony run")
+    parser.add_argument("--examples", type=int, default=5, help="Przykładowe runy per reguła (0 = bez)")
+    parser.add_argument("--json", action="store_true", help="Raport jako JSON na stdout")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        report = replay.run(
+            db,
+            environment=args.environment,
+            scenario=args.scenario,
+            suite_run_id=args.suite_run,
+            days=args.days,
+            limit=args.limit,
+        )
+    finally:
+        db.close()
+
+    if args.json:
+        json.dump(to_json(report), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report, args.runs, args.examples)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -57,6 +57,11 @@ def reset_database(force: bool = False, seed: bool = True, only_temp: bool = Fal
             else:
                 print(f"   Usunięto {deleted} folderów ze screenami")
 
+        artifacts_dir = Path("artifacts/")
+        if artifacts_dir.exists():
+            shutil.rmtree(artifacts_dir)
+            print("   Usunięto magazyn artefaktów (screenshoty)")
+
         results_dir = Path("results/")
         if results_dir.exists():
             deleted = 0
@@ -18,6 +18,7 @@ import requests
 from sqlalchemy.orm import Session
 
 from app.models.dictionary import Dictionary
+from core import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -67,11 +68,17 @@ class ApiDataProvider:
 
     def _fetch_sync(self) -> None:
         """Synchroniczny fetch przez requests — odpala się w osobnym wątku."""
+        with tracing.span("api.fetch", url=self.api_url) as fetch_span:
+            self._fetch(fetch_span)
+
+    def _fetch(self, fetch_span: tracing.Span | None) -> None:
         try:
             headers = {}
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
             resp = requests.get(self.api_url, headers=headers, timeout=self.timeout)
+            if fetch_span:
+                fetch_span.attributes["http.status_code"] = resp.status_code
             resp.raise_for_status()
             self._data = resp.json()
             if self.refresh:
@@ -83,9 +90,13 @@ class ApiDataProvider:
                 )
         except requests.exceptions.RequestException as e:
             logger.error(f"[ApiDataProvider] Błąd połączenia: {e}")
+            if fetch_span:
+                fetch_span.set_error(e)
             # Stare dane zostają — nie zerujemy cache
         except Exception as e:
             logger.error(f"[ApiDataProvider] Nieoczekiwany błąd: {e}")
+            if fetch_span:
+                fetch_span.set_error(e)
 
     async def _refresh_loop(self) -> None:
         while True:
@@ -18,6 +18,7 @@ from app.models.run import ScenarioRun, RunStatus
 from app.models.scenario import Scenario
 from app.models.environment import Environment
 from core.alert_engine import AlertEngine
+from core import api_stats, artifact_store, event_bus, metrics, price_series, run_data_store, suite_logging, tracing
 from scenarios.contexts.scenario_context import ScenarioContext
 from scenarios.contexts.suite_context import SuiteContext
 from scenarios.shop_runner import ShopRunner, ShopRunResult
@@ -49,10 +50,14 @@ class ScenarioExecutor:
         self.suite_context = suite_context
         self.scenario_run = None
         self.alert_engine = None
+        self.events = None
 
     async def run(self) -> ScenarioRun:
         """Uruchamia scenariusz i zwraca ScenarioRun z wynikami."""
+        with tracing.span("scenario", scenario=self.scenario_db.name, environment=self.environment_db.name):
+            return await self._run()
 
+    async def _run(self) -> ScenarioRun:
         scenario_context = ScenarioContext.from_db(self.scenario_db, self.environment_db)
 
         self.scenario_run = ScenarioRun(
@@ -66,6 +71,7 @@ class ScenarioExecutor:
         self.db.add(self.scenario_run)
         self.db.commit()
         self.db.refresh(self.scenario_run)
+        tracing.annotate(scenario_run_id=self.scenario_run.id)
 
         self.alert_engine = AlertEngine(
             run_id=self.scenario_run.id,
@@ -74,6 +80,13 @@ class ScenarioExecutor:
             db=self.db,
         )
 
+        self.events = event_bus.EventPublisher(self.suite_run_id, run_id=self.scenario_run.id)
+        self.events.emit(
+            event_bus.SCENARIO_STARTED,
+            scenario_id=self.scenario_db.id, scenario=self.scenario_db.name,
+        )
+
+        log_token = suite_logging.bind_scenario(self.scenario_run.id, self.scenario_db.name)
         logger.info(f"[RUN #{self.scenario_run.id}] Start: {self.scenario_db.name}")
 
         try:
@@ -94,15 +107,27 @@ class ScenarioExecutor:
             self.alert_engine.add_alert("scenario.unexpected_error", description=str(e))
 
         finally:
-            self.alert_engine.save_all()
-            self.scenario_run.finished_at = datetime.now(timezone.utc)
-            self.db.commit()
+            with tracing.span("db.save_alerts"):
+                self.alert_engine.save_all()
+                self.scenario_run.finished_at = datetime.now(timezone.utc)
+                self.db.commit()
+            tracing.annotate(status=self.scenario_run.status.value)
+
+            self.events.emit(
+                event_bus.SCENARIO_FINISHED,
+                scenario_id=self.scenario_db.id,
+                status=self.scenario_run.status.value,
+                duration=self.scenario_run.duration_seconds,
+                alerts=self.alert_engine.counted_alerts(),
+                product_name=self.scenario_run.product_name,
+            )
 
             logger.info(
                 f"[RUN #{self.scenario_run.id}] Finished: {self.scenario_run.status.value} | "
                 f"Duration: {self.scenario_run.duration_seconds}s | "
                 f"Alerts: {self.alert_engine.counted_alerts()}"
             )
+            suite_logging.unbind_scenario(log_token)
 
         return self.scenario_run
 
@@ -129,14 +154,18 @@ class ScenarioExecutor:
         """Uruchamia Playwright i przekazuje sterowanie do ShopRunner."""
 
         async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=self.headless,
-                args=["--no-sandbox", "--disable-dev-shm-usage"],
-            )
-            browser_context = await browser.new_context(
-                viewport={'width': 390, 'height': 844} if scenario_context.is_mobile else {'width': 1280, 'height': 720},
-            )
-            page = await browser_context.new_page()
+            with tracing.span("browser.start", mobile=scenario_context.is_mobile):
+                browser = await p.chromium.launch(
+                    headless=self.headless,
+                    args=["--no-sandbox", "--disable-dev-shm-usage"],
+                )
+                browser_context = await browser.new_context(
+                    viewport={'width': 390, 'height': 844} if scenario_context.is_mobile else {'width': 1280, 'height': 720},
+                )
+                page = await browser_context.new_page()
+            # Zmniejszane w finally razem z zamknięciem
+            metrics.BROWSERS_OPEN.inc()
+            metrics.BROWSER_CONTEXTS_OPEN.inc()
 
             _cancelled = False
             try:
@@ -150,10 +179,13 @@ class ScenarioExecutor:
                     api_error_exclusions=self._load_exclusions(),
                     max_retries=self.max_retries,
                     suite_context=self.suite_context,
+                    events=self.events,
                 )
                 result = await runner.run()
 
-                self._save_run_data(result)
+                with tracing.span("db.save_run_data"):
+                    artifacts = await self._store_screenshots(result)
+                    self._save_run_data(result, scenario_context, artifacts)
                 self._register_alerts(result)
 
                 if result.stopped_at:
@@ -179,51 +211,83 @@ class ScenarioExecutor:
                     await asyncio.shield(browser_context.close())
                 except Exception:
                     pass
+                metrics.BROWSER_CONTEXTS_OPEN.dec()
                 try:
                     await asyncio.shield(browser.close())
                 except Exception:
                     pass
+                metrics.BROWSERS_OPEN.dec()
                 if _cancelled:
                     raise asyncio.CancelledError()
 
-    def _save_run_data(self, result: ShopRunResult) -> None:
+    async def _store_screenshots(self, result: ShopRunResult) -> dict[str, str | None]:
+        """
+        Przenosi screenshoty wszystkich etapów do magazynu artefaktów.
+        Hash, pliki i miniatury w wątku (bez sesji), referencje na sesji scenariusza —
+        dopiero gdy wszystkie pliki istnieją, więc blokada zapisu SQLite nie czeka na miniatury.
+        """
+        stored = {
+            stage: await asyncio.to_thread(artifact_store.write_file, path)
+            for stage, path in result.screenshots.items()
+        }
+        for item in stored.values():
+            if item:
+                artifact_store.add_ref(self.db, item)
+        for item in stored.values():
+            # collect_garbage mógł usunąć plik hasha z ref_count 0 przed add_ref
+            if item and not artifact_store.file_path(item.hash).exists():
+                await asyncio.to_thread(artifact_store.ensure_file, item)
+        return {stage: item.hash if item else None for stage, item in stored.items()}
+
+    def _save_run_data(self, result: ShopRunResult, scenario_context: ScenarioContext,
+                       artifacts: dict[str, str | None]) -> None:
         rd = result.run_data
+        self.scenario_run.attempts = result.attempts
 
         if rd.listing and rd.listing.name:
             self.scenario_run.product_name = rd.listing.name
 
-        if result.screenshots:
-            last = list(result.screenshots.values())[-1]
-            self.scenario_run.screenshot_url = last
-
         snapshots = []
         if rd.home:
             snapshots.append(BasketSnapshot(
                 run_id=self.scenario_run.id,
                 stage='home',
                 total_price=None,
-                raw_data={'screenshot': result.screenshots.get('home')},
+                raw_data=self._screenshot_data(result, artifacts, 'home'),
             ))
         if rd.listing:
             snapshots.append(BasketSnapshot(
                 run_id=self.scenario_run.id,
                 stage='listing',
                 total_price=None,
-                raw_data={'screenshot': result.screenshots.get('listing')},
+                raw_data=self._screenshot_data(result, artifacts, 'listing'),
             ))
         if rd.cart0:
             snapshots.append(BasketSnapshot(
                 run_id=self.scenario_run.id,
                 stage='cart0',
                 total_price=rd.cart0.total_price,
-                raw_data={'screenshot': result.screenshots.get('cart0')},
+                raw_data=self._screenshot_data(result, artifacts, 'cart0'),
             ))
         if rd.cart1:
             snapshots.append(BasketSnapshot(
                 run_id=self.scenario_run.id,
                 stage='cart1',
                 delivery_price=rd.cart1.price,
-                raw_data={'screenshot': result.screenshots.get('cart1')},
+                raw_data=self._screenshot_data(result, artifacts, 'cart1'),
+            ))
+        if rd.cart2:
+            snapshots.append(BasketSnapshot(
+                run_id=self.scenario_run.id,
+                stage='cart2',
+                delivery_price=rd.cart2.price,
+                raw_data=self._screenshot_data(result, artifacts, 'cart2'),
+            ))
+        if rd.cart3:
+            snapshots.append(BasketSnapshot(
+                run_id=self.scenario_run.id,
+                stage='cart3',
+                raw_data=self._screenshot_data(result, artifacts, 'cart3'),
             ))
         if rd.cart4:
             snapshots.append(BasketSnapshot(
@@ -231,12 +295,39 @@ class ScenarioExecutor:
                 stage='cart4',
                 total_price=rd.cart4.total_price,
                 delivery_price=rd.cart4.delivery_price,
-                raw_data={'screenshot': result.screenshots.get('cart4')},
+                raw_data=self._screenshot_data(result, artifacts, 'cart4'),
             ))
         if snapshots:
             self.db.add_all(snapshots)
 
+        stored = [s.raw_data['artifact'] for s in snapshots if s.raw_data.get('artifact')]
+        if stored:
+            self.scenario_run.screenshot_url = artifact_store.url(stored[-1])
+        self._remove_screenshot_dir(result)
+
         self._save_api_errors(result)
+        run_data_store.record(self.db, self.scenario_run.id, result, scenario_context)
+        api_stats.record(self.db, self.scenario_run, result.api_stats)
+        price_series.record(self.db, self.scenario_run, rd, scenario_context)
+
+    @staticmethod
+    def _screenshot_data(result: ShopRunResult, artifacts: dict[str, str | None], stage: str) -> dict:
+        """raw_data snapshotu — screenshot etapu w magazynie artefaktów (referencja dodana w _store_screenshots)."""
+        path = result.screenshots.get(stage)
+        if not path:
+            return {'artifact': None}
+        artifact = artifacts.get(stage)
+        # Zapis do magazynu nieudany — zostaje plik pod /screenshots
+        return {'artifact': artifact} if artifact else {'screenshot': path}
+
+    @staticmethod
+    def _remove_screenshot_dir(result: ShopRunResult) -> None:
+        """Usuwa katalog runu, gdy wszystkie screenshoty trafiły do magazynu."""
+        if result.screenshots:
+            try:
+                Path(next(iter(result.screenshots.values()))).parent.rmdir()
+            except OSError:
+                pass  # katalog niepusty — zawiera screenshoty nieprzeniesione do magazynu
 
     def _save_api_errors(self, result: ShopRunResult) -> None:
         """Zapisuje błędy API z przebiegu do bazy (body obcięte do 250 znaków)."""
@@ -5,12 +5,19 @@ Odpowiedzialności:
   2. Przekazuje instructions między etapami (rules → pages)
   3. Obsługuje zatrzymanie testu (StopTest)
   4. Zbiera alerty ze wszystkich etapów
+  5. Publikuje postęp (etapy, alerty) do EventBus
+  6. Spany trace: próba → etap → page.execute / screenshot / rules.check (core/tracing.py)
+  7. Czasy i błędy żądań XHR/fetch sklepu per endpoint (core/api_stats.py)
 """
 import logging
+import time
 from dataclasses import dataclass, field
 
 from playwright.async_api import Page
 
+from core import api_stats, event_bus, metrics, suite_logging, tracing
+from core.api_stats import EndpointSummary
+from core.config import settings
 from scenarios.contexts.scenario_context import ScenarioContext
 from scenarios.contexts.suite_context import SuiteContext
 from scenarios.run_data import RunData
@@ -40,6 +47,8 @@ class ShopRunResult:
     success: bool = True
     screenshots: dict[str, str] = field(default_factory=dict)  # stage → file path
     api_errors: list[dict] = field(default_factory=list)
+    attempts: int = 1                                       # 1 + wykonane retry
+    api_stats: list[EndpointSummary] = field(default_factory=list)
 
 
 class StopTest(Exception):
@@ -55,7 +64,7 @@ class StopTest(Exception):
 
 
 class ShopRunner:
-    def __init__(self, page: Page, scenario_context: ScenarioContext, screenshot_dir: str | None = None, api_error_exclusions: list[dict] | None = None, max_retries: int = 0, suite_context: SuiteContext | None = None):
+    def __init__(self, page: Page, scenario_context: ScenarioContext, screenshot_dir: str | None = None, api_error_exclusions: list[dict] | None = None, max_retries: int = 0, suite_context: SuiteContext | None = None, events: event_bus.EventPublisher | None = None):
         self.page = page
         self.scenario_context = scenario_context
         self.suite_context = suite_context
@@ -69,6 +78,15 @@ class ShopRunner:
         self.api_errors: list[dict] = []
         self._api_exclusions = api_error_exclusions or []
         self.max_retries = max_retries
+        self.attempts = 1
+        # Ruch API liczony przez wszystkie próby — czasy z nieudanej próby też mówią o backendzie
+        self.api_traffic = (
+            api_stats.TrafficRecorder(scenario_context.environment_url)
+            if settings.shop_api_stats_enabled else None
+        )
+        self.events = events
+        self._stage_started: tuple[str, float] | None = None   # (etap, perf_counter) — metryka czasu etapu
+        self._stage_span: tracing.Span | None = None
 
     # ── Helpers ───────────────────────────────────────────────────────────────
 
@@ -96,6 +114,7 @@ class ShopRunner:
 
     async def _reset_for_retry(self, attempt: int, forced_listing_url: str | None) -> None:
         """Resetuje stan runnera i przeglądarki przed kolejną próbą testu."""
+        self._finish_stage()
         self.run_data = RunData()
         self.alerts = []
         self._current_stage = 'init'
@@ -109,8 +128,32 @@ class ShopRunner:
             f"Retry {attempt}/{self.max_retries}"
         )
 
+    def _emit(self, event_type: str, **data) -> None:
+        if self.events:
+            self.events.emit(event_type, **data)
+
+    def _stage_reached(self, stage: str) -> None:
+        self._finish_stage()
+        self._stage_started = (stage, time.perf_counter())
+        self._stage_span = tracing.start_span("stage", stage=stage)
+        suite_logging.set_stage(stage)
+        self._emit(event_bus.STAGE_REACHED, stage=stage)
+
+    def _finish_stage(self, error: Exception | None = None) -> None:
+        """Zamyka pomiar bieżącego etapu — trwa do wejścia w następny albo końca próby."""
+        if self._stage_started:
+            stage, start = self._stage_started
+            metrics.STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
+            self._stage_started = None
+        if self._stage_span:
+            if error:
+                self._stage_span.set_error(error)
+            self._stage_span.end()
+            self._stage_span = None
+
     def _make_result(self, success: bool, stopped_at: str | None = None) -> ShopRunResult:
         """Buduje ShopRunResult z aktualnego stanu runnera."""
+        self._finish_stage()
         return ShopRunResult(
             run_data=self.run_data,
             alerts=self.alerts,
@@ -118,17 +161,34 @@ class ShopRunner:
             success=success,
             screenshots=self.screenshots,
             api_errors=self.api_errors,
+            attempts=self.attempts,
+            api_stats=self.api_traffic.summary() if self.api_traffic else [],
         )
 
     async def _screenshot(self, stage: str) -> None:
         if not self.screenshot_dir:
             return
         path = f"{self.screenshot_dir}/{stage}.png"
-        try:
-            await self.page.screenshot(path=path)
-            self.screenshots[stage] = path
-        except Exception:
-            pass  # screenshot failure must never abort the run
+        with tracing.span("screenshot", parent=self._stage_span, stage=stage) as screenshot_span:
+            try:
+                await self.page.screenshot(path=path)
+                self.screenshots[stage] = path
+            except Exception as e:
+                if screenshot_span:      # screenshot failure must never abort the run
+                    screenshot_span.set_error(e)
+
+    async def _execute_page(self, stage: str, desktop_cls, mobile_cls=None):
+        """execute() page etapu w spanie page.execute."""
+        with tracing.span("page.execute", parent=self._stage_span, stage=stage, page=desktop_cls.__name__):
+            return await self._get_page(desktop_cls, mobile_cls).execute(self.instructions)
+
+    def _check_rules(self, stage: str, rules_cls) -> None:
+        """check() rules etapu w spanie rules.check; StopTest z wyniku poza spanem (to nie błąd reguł)."""
+        with tracing.span("rules.check", parent=self._stage_span, stage=stage, rules=rules_cls.__name__) as rules_span:
+            result = rules_cls(self.scenario_context, self.suite_context).check(self.run_data)
+            if rules_span:
+                rules_span.attributes["alerts"] = len(result.alerts)
+        self._process_result(result, stage)
 
     # ── Publiczne API ─────────────────────────────────────────────────────────
 
@@ -150,90 +210,129 @@ class ShopRunner:
 
         self.page.on('response', _on_response)
 
+        def _is_api_call(request) -> bool:
+            return request.resource_type in api_stats.RESOURCE_TYPES and self.api_traffic.is_shop(request.url)
+
+        async def _on_request_finished(request) -> None:
+            if not _is_api_call(request):
+                return
+            try:
+                response = await request.response()
+                sizes = await request.sizes()
+            except Exception:
+                response, sizes = None, {}
+            response_end = request.timing.get('responseEnd', -1)
+            self.api_traffic.add(
+                request.method, request.url,
+                duration_ms=response_end if response_end >= 0 else None,
+                status=response.status if response else None,
+                size=sizes.get('responseHeadersSize', 0) + sizes.get('responseBodySize', 0),
+            )
+
+        def _on_request_failed(request) -> None:
+            if _is_api_call(request):
+                self.api_traffic.add(request.method, request.url, duration_ms=None, status=None)
+
+        if self.api_traffic:
+            self.page.on('requestfinished', _on_request_finished)
+            self.page.on('requestfailed', _on_request_failed)
+
         forced_listing_url: str | None = None
 
         for attempt in range(self.max_retries + 1):
+            self.attempts = attempt + 1
             if attempt > 0:
                 await self._reset_for_retry(attempt, forced_listing_url)
 
-            try:
-                await self._run_home()
-                await self._run_listing()
-                await self._run_cart0()
-
-                if self.scenario_context.is_order:
-                    await self._run_cart1()
-                    await self._run_cart2()
-                    await self._run_cart3()
-                    await self._run_cart4()
-
-                # Global rules — mają dostęp do danych ze wszystkich etapów
-                global_result = GlobalRules(self.scenario_context, self.suite_context).check(self.run_data)
-                self._process_result(global_result, 'global')
-
-            except StopTest as e:
-                level = logger.info if e.expected else logger.warning
-                level(
-                    f"[{self.scenario_context.scenario_name}] "
-                    f"Test {'zatrzymany' if e.expected else 'przerwany'} na '{e.stage}': {e.reason}"
-                )
-                return self._make_result(success=e.expected, stopped_at=e.stage)
-
-            except Exception as e:
-                logger.exception(
-                    f"[{self.scenario_context.scenario_name}] "
-                    f"Nieoczekiwany błąd (próba {attempt + 1}): {e}"
-                )
-                if attempt < self.max_retries:
-                    forced_listing_url = (
-                        self.run_data.listing.url
-                        if self.run_data.listing else None
+            with tracing.span("attempt", attempt=attempt + 1) as attempt_span:
+                try:
+                    await self._run_home()
+                    await self._run_listing()
+                    await self._run_cart0()
+
+                    if self.scenario_context.is_order:
+                        await self._run_cart1()
+                        await self._run_cart2()
+                        await self._run_cart3()
+                        await self._run_cart4()
+
+                    # Global rules — mają dostęp do danych ze wszystkich etapów
+                    with tracing.span("rules.check", stage='global', rules=GlobalRules.__name__):
+                        global_result = GlobalRules(self.scenario_context, self.suite_context).check(self.run_data)
+                    self._process_result(global_result, 'global')
+
+                except StopTest as e:
+                    level = logger.info if e.expected else logger.warning
+                    level(
+                        f"[{self.scenario_context.scenario_name}] "
+                        f"Test {'zatrzymany' if e.expected else 'przerwany'} na '{e.stage}': {e.reason}"
                     )
-                    continue
-                return self._make_result(success=False, stopped_at=self._current_stage)
+                    return self._make_result(success=e.expected, stopped_at=e.stage)
 
-            else:
-                return self._make_result(success=True)
+                except Exception as e:
+                    logger.exception(
+                        f"[{self.scenario_context.scenario_name}] "
+                        f"Nieoczekiwany błąd (próba {attempt + 1}): {e}"
+                    )
+                    if attempt_span:
+                        attempt_span.set_error(e)
+                    self._finish_stage(error=e)
+                    if attempt < self.max_retries:
+                        forced_listing_url = (
+                            self.run_data.listing.url
+                            if self.run_data.listing else None
+                        )
+                        continue
+                    return self._make_result(success=False, stopped_at=self._current_stage)
+
+                else:
+                    return self._make_result(success=True)
 
     # ── Etapy ─────────────────────────────────────────────────────────────────
 
     async def _run_home(self):
         self._current_stage = 'HomeScreen'
-        self.run_data.home = await self._get_page(HomePage).execute(self.instructions)
+        self._stage_reached('home')
+        self.run_data.home = await self._execute_page('home', HomePage)
         await self._screenshot('home')
-        self._process_result(HomeRules(self.scenario_context, self.suite_context).check(self.run_data), 'home')
+        self._check_rules('home', HomeRules)
 
     async def _run_listing(self):
         self._current_stage = 'Listing'
-        self.run_data.listing = await self._get_page(ListingPage).execute(self.instructions)
+        self._stage_reached('listing')
+        self.run_data.listing = await self._execute_page('listing', ListingPage)
         await self._screenshot('listing')
-        self._process_result(ListingRules(self.scenario_context, self.suite_context).check(self.run_data), 'listing')
+        self._check_rules('listing', ListingRules)
 
     async def _run_cart0(self):
-        self.run_data.cart0 = await self._get_page(Cart0Page).execute(self.instructions)
+        self._stage_reached('cart0')
+        self.run_data.cart0 = await self._execute_page('cart0', Cart0Page)
         await self._screenshot('cart0')
-        self._process_result(Cart0Rules(self.scenario_context, self.suite_context).check(self.run_data), 'cart0')
+        self._check_rules('cart0', Cart0Rules)
 
     async def _run_cart1(self):
-        self.run_data.cart1 = await self._get_page(Cart1Page).execute(self.instructions)
+        self._stage_reached('cart1')
+        self.run_data.cart1 = await self._execute_page('cart1', Cart1Page)
         await self._screenshot('cart1')
-        self._process_result(Cart1Rules(self.scenario_context, self.suite_context).check(self.run_data), 'cart1')
+        self._check_rules('cart1', Cart1Rules)
 
         if self.scenario_context.flag('stop_at_cart1'):
             raise StopTest('cart1', 'Oczekiwane zatrzymanie na cart1', expected=True)
 
     async def _run_cart2(self):
-        self.run_data.cart2 = await self._get_page(Cart2Page).execute(self.instructions)
+        self._stage_reached('cart2')
+        self.run_data.cart2 = await self._execute_page('cart2', Cart2Page)
         await self._screenshot('cart2')
-        self._process_result(Cart2Rules(self.scenario_context, self.suite_context).check(self.run_data), 'cart2')
+        self._check_rules('cart2', Cart2Rules)
 
         if self.scenario_context.flag('stop_at_cart2'):
             raise StopTest('cart2', 'Oczekiwane zatrzymanie na cart2', expected=True)
 
     async def _run_cart3(self):
-        self.run_data.cart3 = await self._get_page(Cart3Page).execute(self.instructions)
+        self._stage_reached('cart3')
+        self.run_data.cart3 = await self._execute_page('cart3', Cart3Page)
         await self._screenshot('cart3')
-        self._process_result(Cart3Rules(self.scenario_context, self.suite_context).check(self.run_data), 'cart3')
+        self._check_rules('cart3', Cart3Rules)
 
         if self.scenario_context.flag('stop_at_cart3'):
             raise StopTest('cart3', 'Oczekiwane zatrzymanie na cart3', expected=True)
@@ -247,9 +346,10 @@ class ShopRunner:
                 expected=False,
             )
 
-        self.run_data.cart4 = await self._get_page(Cart4Page).execute(self.instructions)
+        self._stage_reached('cart4')
+        self.run_data.cart4 = await self._execute_page('cart4', Cart4Page)
         await self._screenshot('cart4')
-        self._process_result(Cart4Rules(self.scenario_context, self.suite_context).check(self.run_data), 'cart4')
+        self._check_rules('cart4', Cart4Rules)
 
     def _get_page(self, desktop_cls, mobile_cls=None):
         """Zwraca odpowiednią klasę page dla desktop/mobile."""
@@ -265,7 +365,8 @@ class ShopRunner:
         - Rzuca StopTest jeśli rules zdecydowały o zatrzymaniu
         """
         for alert in result.alerts:
-            logger.warning(f"[{stage}] ALERT: {alert.business_rule} — {alert.title}")
+            logger.warning(f"[{stage}] ALERT: {alert.business_rule} — {alert.description}")
+            self._emit(event_bus.ALERT_RAISED, stage=stage, business_rule=alert.business_rule)
         self.alerts.extend(result.alerts)
 
         # Instrukcje są addytywne — kolejne etapy mogą je nadpisywać
@@ -1,14 +1,18 @@
 """
 Suite Executor — uruchamia cala suite i agreguje wyniki.
+
+Niestabilne scenariusze (core/flakiness.py) wg Suite.flaky_policy:
+  off         — bez zmian
+  quarantine  — scenariusz się wykonuje, ale jego alerty nie trafiają do alert_groups,
+                a porażka nie liczy się do wyniku suite runu
+  skip        — scenariusz nie jest uruchamiany (ScenarioRun ze statusem skipped)
 """
 
 import asyncio
 import logging
-import traceback
 import json
 from datetime import datetime, timezone
 from collections import defaultdict
-from pathlib import Path
 from sqlalchemy.orm import Session
 
 from app.models.suite_run import SuiteRun, SuiteRunStatus
@@ -17,17 +21,28 @@ from app.models.alert_group import (
     AWAITING_STATUSES, REOPEN_ON_RETURN, RESOLUTION_TO_STATUS
 )
 from app.models.alert import Alert
+from app.models.run import ScenarioRun, RunStatus
 from scenarios.scenario_executor import ScenarioExecutor
 from scenarios.contexts.suite_context import SuiteContext
 from core.config import settings
+from core import (
+    api_stats, db_metrics, event_bus, flakiness, metrics, price_series, profiling, read_models, suite_logging, tracing,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _elapsed(run) -> float:
+    """Czas runu w sekundach (z ułamkiem — duration_seconds obcina do int)."""
+    if not (run.started_at and run.finished_at):
+        return 0.0
+    return (run.finished_at - run.started_at).total_seconds()
+
+
 class SuiteExecutor:
     """Orchestrator suite — tworzy suite_run, uruchamia scenariusze, agreguje alerty."""
 
-    def __init__(self, suite, environment, scenarios, workers: int, headless: bool, db: Session, suite_run=None, max_retries: int = 0):
+    def __init__(self, suite, environment, scenarios, workers: int, headless: bool, db: Session, suite_run=None, max_retries: int = 0, profile: bool = False):
         self.suite = suite
         self.environment = environment
         self.scenarios = scenarios
@@ -35,10 +50,11 @@ class SuiteExecutor:
         self.headless = headless
         self.db = db
         self.suite_run_id = None
-        self.log_handler = None
-        self.log_file = None
+        self.log_token = None
         self.suite_run = suite_run
         self.max_retries = max_retries
+        self.profile = profile
+        self.quarantined: dict[int, float] = {}   # scenario_id → score (polityka quarantine)
 
     async def run(self) -> SuiteRun:
         """Uruchamia cala suite i zwraca suite_run z wynikami."""
@@ -56,15 +72,35 @@ class SuiteExecutor:
             self.db.add(suite_run)
             self.db.commit()
             self.db.refresh(suite_run)
+            # commit wygasił scenariusze — jedno doładowanie zamiast zapytań per scenariusz
+            read_models.preload_scenarios(self.db, self.scenarios)
 
         self.suite_run_id = suite_run.id
-        self._setup_logging()
+        self.log_token = suite_logging.start_suite(suite_run.id, self.suite.name)
+        try:
+            # Zapytania scenariuszy (taski gather) dziedziczą zakres — liczone razem z suite
+            with db_metrics.track(f"suite_run #{suite_run.id}"), tracing.start_trace(
+                suite_run.id, suite=self.suite.name, environment=self.environment.name,
+            ), profiling.capture(suite_run.id, enabled=self.profile):
+                return await self._run(suite_run)
+        finally:
+            suite_logging.stop_suite(suite_run.id, self.log_token)
 
+    async def _run(self, suite_run: SuiteRun) -> SuiteRun:
+        """Właściwe wykonanie suite — logi trafiają do pliku suite_run przez suite_logging."""
         logger.info(f"{'='*60}")
         logger.info(f"[SUITE RUN #{suite_run.id}] {self.suite.name} @ {self.environment.name}")
         logger.info(f"Scenariusze: {len(self.scenarios)} | Workers: {self.workers}")
         logger.info(f"{'='*60}\n")
 
+        event_bus.publish(
+            event_bus.SUITE_STARTED, suite_run.id,
+            suite=self.suite.name, environment=self.environment.name,
+            total_scenarios=len(self.scenarios), workers=self.workers,
+        )
+
+        scenarios, skipped_results = self._apply_flaky_policy(suite_run)
+
         # ── SuiteContext — inicjalizacja przed scenariuszami ─────────────────
         suite_context = await self._init_suite_context()
 
@@ -72,45 +108,63 @@ class SuiteExecutor:
 
         try:
             async def run_with_limit(scenario):
-                async with semaphore:
-                    db_session = Session(bind=self.db.bind)
-                    try:
-                        executor = ScenarioExecutor(
-                            scenario_db=scenario,
-                            environment_db=self.environment,
-                            suite_run_id=suite_run.id,
-                            suite_id=self.suite.id,
-                            db=db_session,
-                            headless=self.headless,
-                            max_retries=self.max_retries,
-                            suite_context=suite_context,
-                        )
-                        run = await executor.run()
-
-                        result = {
-                            'scenario_id': run.scenario_id,
-                            'status': run.status.value,
-                            'alerts': []
-                        }
-
-                        for alert in run.alerts:
-                            if alert.is_counted:
-                                result['alerts'].append({
-                                    'business_rule': alert.business_rule,
-                                    'alert_type': alert.alert_type,
-                                    'title': alert.title,
-                                })
-
-                        return result
-
-                    except Exception as e:
-                        logger.error(f"Blad w scenariuszu {scenario.name}: {e}")
-                        self._write_raw_traceback(scenario.name, e)
-                        return {'scenario_id': scenario.id, 'status': 'failed', 'alerts': []}
-                    finally:
-                        db_session.close()
-
-            tasks = [run_with_limit(s) for s in self.scenarios]
+                metrics.SCENARIOS_QUEUED.inc()
+                try:
+                    await semaphore.acquire()
+                finally:
+                    # Także przy anulowaniu suite w kolejce — inaczej gauge zostaje zawyżony
+                    metrics.SCENARIOS_QUEUED.dec()
+                metrics.SCENARIOS_RUNNING.inc()
+                db_session = Session(bind=self.db.bind)
+                try:
+                    executor = ScenarioExecutor(
+                        scenario_db=scenario,
+                        environment_db=self.environment,
+                        suite_run_id=suite_run.id,
+                        suite_id=self.suite.id,
+                        db=db_session,
+                        headless=self.headless,
+                        max_retries=self.max_retries,
+                        suite_context=suite_context,
+                    )
+                    run = await executor.run()
+                    metrics.SCENARIO_DURATION.observe(
+                        _elapsed(run), environment=self.environment.name,
+                        suite=self.suite.name, status=run.status.value,
+                    )
+
+                    result = {
+                        'scenario_id': run.scenario_id,
+                        'status': run.status.value,
+                        'attempts': run.attempts,
+                        'alerts': []
+                    }
+                    if run.scenario_id in self.quarantined:
+                        result['quarantined'] = True
+
+                    for alert in run.alerts:
+                        if alert.is_counted:
+                            result['alerts'].append({
+                                'business_rule': alert.business_rule,
+                                'alert_type': alert.alert_type,
+                                'title': alert.title,
+                            })
+
+                    return result
+
+                except Exception as e:
+                    logger.error(f"Blad w scenariuszu {scenario.name}: {e}")
+                    self._write_raw_traceback(scenario.name, e)
+                    return {
+                        'scenario_id': scenario.id, 'status': 'failed', 'alerts': [],
+                        'quarantined': scenario.id in self.quarantined,
+                    }
+                finally:
+                    metrics.SCENARIOS_RUNNING.dec()
+                    db_session.close()
+                    semaphore.release()
+
+            tasks = [run_with_limit(s) for s in scenarios]
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
         finally:
@@ -120,17 +174,59 @@ class SuiteExecutor:
 
         for i, result in enumerate(results):
             if isinstance(result, Exception):
-                logger.error(f"Exception w scenariuszu {self.scenarios[i].name}: {result}")
-                self._write_raw_traceback(self.scenarios[i].name, result)
-
-        self._finalize_suite_run(suite_run, results)
-
-        if self.log_handler:
-            logging.getLogger().removeHandler(self.log_handler)
-            self.log_handler.close()
+                logger.error(f"Exception w scenariuszu {scenarios[i].name}: {result}")
+                self._write_raw_traceback(scenarios[i].name, result)
+        results = [*results, *skipped_results]
+
+        with db_metrics.track(f"finalizacja suite_run #{suite_run.id}") as finalize_stats, \
+                tracing.span("suite.finalize"):
+            self._add_price_anomalies(suite_run, results)
+            self._finalize_suite_run(suite_run, results)
+            self._update_flakiness(suite_run, results)
+            self._rollup_api_stats(suite_run)
+        self._log_db_stats(suite_run, finalize_stats)
 
         return suite_run
 
+    def _apply_flaky_policy(self, suite_run: SuiteRun) -> tuple[list, list]:
+        """
+        Scenariusze do uruchomienia i wyniki pominiętych wg Suite.flaky_policy.
+        Polityka quarantine tylko zapamiętuje scenariusze — uruchamiane są wszystkie.
+        """
+        policy = self.suite.flaky_policy or flakiness.POLICY_OFF
+        if policy == flakiness.POLICY_OFF:
+            return self.scenarios, []
+        try:
+            flaky = flakiness.flaky_scenarios(self.db, self.environment.id, [s.id for s in self.scenarios])
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"[SuiteExecutor] Błąd odczytu flakiness — polityka '{policy}' pominięta: {e}")
+            return self.scenarios, []
+        if not flaky:
+            return self.scenarios, []
+
+        names = ", ".join(f"{s.name} ({flaky[s.id]:.2f})" for s in self.scenarios if s.id in flaky)
+        if policy == flakiness.POLICY_QUARANTINE:
+            self.quarantined = flaky
+            logger.warning(f"[SuiteExecutor] Kwarantanna (alerty bez alert_groups): {names}")
+            return self.scenarios, []
+
+        logger.warning(f"[SuiteExecutor] Pominięte niestabilne scenariusze: {names}")
+        now = datetime.now(timezone.utc)
+        for scenario_id in flaky:
+            self.db.add(ScenarioRun(
+                suite_run_id=suite_run.id,
+                scenario_id=scenario_id,
+                suite_id=self.suite.id,
+                environment_id=self.environment.id,
+                status=RunStatus.SKIPPED,
+                started_at=now,
+                finished_at=now,
+            ))
+        self.db.commit()
+        skipped = [{'scenario_id': scenario_id, 'status': 'skipped', 'alerts': []} for scenario_id in flaky]
+        return [s for s in self.scenarios if s.id not in flaky], skipped
+
     async def _init_suite_context(self) -> SuiteContext | None:
         """
         Inicjalizuje SuiteContext przed startem scenariuszy.
@@ -153,18 +249,66 @@ class SuiteExecutor:
             return None
 
     def _write_raw_traceback(self, scenario_name: str, exception: Exception):
-        if not self.log_file:
+        """Pełny traceback do logu suite — zapis przez kolejkę suite_logging, bez otwierania pliku."""
+        banner = '=' * 80
+        logger.error(
+            f"\n{banner}\nERROR in scenario: {scenario_name}\n{banner}",
+            exc_info=(type(exception), exception, exception.__traceback__),
+        )
+
+    def _add_price_anomalies(self, suite_run: SuiteRun, results: list):
+        """Alerty anomalii szeregów cen (core/price_series.py) dopisane do wyników scenariuszy."""
+        try:
+            with tracing.span("price.anomalies"):
+                alerts = price_series.detect(self.db, suite_run.id)
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"[SuiteExecutor] Błąd wykrywania anomalii cen: {e}")
             return
+
+        by_scenario = {r['scenario_id']: r for r in results if not isinstance(r, Exception)}
+        for alert in alerts:
+            result = by_scenario.get(alert.scenario_id)
+            if result is not None:
+                result['alerts'].append({
+                    'business_rule': alert.business_rule,
+                    'alert_type': alert.alert_type,
+                    'title': alert.title,
+                })
+
+    def _update_flakiness(self, suite_run: SuiteRun, results: list):
+        """Liczniki niestabilności (core/flakiness.py) — po zapisie wyniku suite runu, osobny commit."""
+        try:
+            with tracing.span("flakiness.update"):
+                flakiness.update_for_suite_run(self.db, suite_run, results)
+                self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"[SuiteExecutor] Błąd aktualizacji flakiness: {e}")
+
+    def _rollup_api_stats(self, suite_run: SuiteRun):
+        """Rollup statystyk API sklepu per środowisko (core/api_stats.py) — osobny commit."""
         try:
-            tb_lines = traceback.format_exception(type(exception), exception, exception.__traceback__)
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write('=' * 80 + '\n')
-                f.write(f'ERROR in scenario: {scenario_name}\n')
-                f.write('=' * 80 + '\n')
-                f.write(''.join(tb_lines))
-                f.write('=' * 80 + '\n\n')
+            with tracing.span("api_stats.rollup"):
+                endpoints = api_stats.rollup(self.db, suite_run)
+                self.db.commit()
         except Exception as e:
-            logger.error(f"Failed to write traceback: {e}")
+            self.db.rollback()
+            logger.exception(f"[SuiteExecutor] Błąd rollupu statystyk API: {e}")
+            return
+        if endpoints:
+            logger.info(f"[SuiteExecutor] Statystyki API: {endpoints} endpointów")
+
+    def _log_db_stats(self, suite_run: SuiteRun, finalize_stats):
+        """Podsumowanie zapytań SQL suite runu w logu suite, w agregatach /metrics/db i w /metrics."""
+        stats = db_metrics.current()
+        if stats is None or not settings.db_metrics_enabled:
+            return
+        logger.info(f"[SuiteExecutor] DB: {stats.summary()} (finalizacja: {finalize_stats.summary()})")
+        db_metrics.record_suite_run(suite_run.id, stats, finalize_stats)
+        labels = {"environment": self.environment.name, "suite": self.suite.name}
+        metrics.SUITE_DB_SECONDS.observe(stats.duration, **labels)
+        metrics.SUITE_DB_QUERIES.inc(stats.queries, **labels)
 
     @staticmethod
     def _parse_history(value) -> list:
@@ -181,29 +325,18 @@ class SuiteExecutor:
                 return []
         return []
 
-    def _setup_logging(self):
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        self.log_file = log_dir / f"suite_run_{self.suite_run_id}.log"
-        self.log_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-        self.log_handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s | %(levelname)-8s | %(message)s', datefmt='%H:%M:%S')
-        self.log_handler.setFormatter(formatter)
-        root = logging.getLogger()
-        root.setLevel(logging.DEBUG)
-        root.addHandler(self.log_handler)
-
-        # Wycisz biblioteki zewnętrzne generujące szum w logach
-        for noisy in ('multipart', 'multipart.multipart'):
-            logging.getLogger(noisy).setLevel(logging.WARNING)
-
     # ── Główna logika finalizacji ─────────────────────────────────────────────
 
     def _finalize_suite_run(self, suite_run: SuiteRun, results: list):
         """Agreguje wyniki scenariuszy i tworzy/aktualizuje alert_groups."""
 
+        # Pominięte nie liczą się wcale, porażki scenariuszy w kwarantannie nie psują wyniku
         success = sum(1 for r in results if not isinstance(r, Exception) and r['status'] == 'success')
-        failed  = sum(1 for r in results if isinstance(r, Exception) or r['status'] != 'success')
+        failed  = sum(
+            1 for r in results
+            if isinstance(r, Exception)
+            or (r['status'] not in ('success', 'skipped') and not r.get('quarantined'))
+        )
 
         # Zbierz alerty z tego runu pogrupowane po business_rule
         alert_groups_data = defaultdict(lambda: {
@@ -215,7 +348,7 @@ class SuiteExecutor:
         })
 
         for result in results:
-            if isinstance(result, Exception):
+            if isinstance(result, Exception) or result.get('quarantined'):
                 continue
             for alert in result['alerts']:
                 key = alert['business_rule']
@@ -230,6 +363,12 @@ class SuiteExecutor:
         # Zbiór business_rules które wystąpiły w tym runie
         active_rules = set(alert_groups_data.keys())
 
+        # Scenariusze bez miarodajnego wyniku (kwarantanna, skip) — ich alerty nie mogą się "wyleczyć"
+        unobserved = {
+            r['scenario_id'] for r in results
+            if not isinstance(r, Exception) and (r.get('quarantined') or r['status'] == 'skipped')
+        }
+
         # ── Krok 1: obsłuż alerty które WYSTĄPIŁY w tym runie ────────────────
         total_alerts = 0
 
@@ -238,7 +377,7 @@ class SuiteExecutor:
             self._handle_alert_occurred(suite_run, group_data)
 
         # ── Krok 2: obsłuż alerty które NIE wystąpiły (clean_runs_count++) ───
-        self._handle_alerts_not_occurred(suite_run, active_rules)
+        self._handle_alerts_not_occurred(suite_run, active_rules, unobserved)
 
         # ── Finalizacja suite_run ─────────────────────────────────────────────
         suite_run.success_scenarios = success
@@ -255,6 +394,14 @@ class SuiteExecutor:
 
         self.db.commit()
 
+        metrics.SUITE_DURATION.observe(_elapsed(suite_run), environment=self.environment.name, suite=self.suite.name)
+
+        event_bus.publish(
+            event_bus.SUITE_FINISHED, suite_run.id,
+            status=suite_run.status.value, success=success, failed=failed,
+            total_alerts=total_alerts, duration=suite_run.duration_seconds,
+        )
+
         logger.info(f"{'='*60}")
         logger.info(f"[SUITE RUN #{suite_run.id}] COMPLETED")
         logger.info(f"Status: {suite_run.status.value.upper()}")
@@ -273,7 +420,6 @@ class SuiteExecutor:
         # (CLOSED duplikaty obsługujemy osobno poniżej)
         candidates = (
             self.db.query(AlertGroup)
-            .join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
             .filter(
                 AlertGroup.business_rule == group_data['business_rule'],
                 AlertGroup.status.in_([
@@ -282,7 +428,7 @@ class SuiteExecutor:
                     AlertStatus.AWAITING_FIX,
                     AlertStatus.AWAITING_TEST_UPDATE,
                 ]),
-                SuiteRun.environment_id == suite_run.environment_id
+                AlertGroup.environment_id == suite_run.environment_id
             )
             .all()
         )
@@ -318,16 +464,17 @@ class SuiteExecutor:
         # Nowy AlertGroup
         self._create_new_alert(suite_run, group_data, scenario_ids_sorted, scenario_ids_json)
 
-    def _handle_alerts_not_occurred(self, suite_run: SuiteRun, active_rules: set):
+    def _handle_alerts_not_occurred(self, suite_run: SuiteRun, active_rules: set, unobserved: set):
         """
         Dla alertów które NIE wystąpiły w tym runie — inkrementuje clean_runs_count.
+        Pomija grupy scenariuszy z `unobserved` (kwarantanna, skip) — ich brak alertu
+        nie oznacza czystego runu.
         Nie zamyka automatycznie — kontrola po stronie użytkownika.
         """
 
         # Pobierz wszystkie aktywne alerty dla tego environment
         active_alerts = (
             self.db.query(AlertGroup)
-            .join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
             .filter(
                 AlertGroup.status.in_([
                     AlertStatus.OPEN,
@@ -335,18 +482,22 @@ class SuiteExecutor:
                     AlertStatus.AWAITING_FIX,
                     AlertStatus.AWAITING_TEST_UPDATE,
                 ]),
-                SuiteRun.environment_id == suite_run.environment_id
+                AlertGroup.environment_id == suite_run.environment_id
             )
             .all()
         )
 
         for alert in active_alerts:
-            if alert.business_rule not in active_rules:
-                alert.clean_runs_count += 1
-                logger.info(
-                    f"Alert {alert.business_rule} nie wystąpił "
-                    f"(clean runs: {alert.clean_runs_count})"
-                )
+            if alert.business_rule in active_rules:
+                continue
+            if unobserved & set(self._parse_history(alert.scenario_ids)):
+                logger.debug(f"Alert {alert.business_rule} pominięty — scenariusz w kwarantannie lub pominięty")
+                continue
+            alert.clean_runs_count += 1
+            logger.info(
+                f"Alert {alert.business_rule} nie wystąpił "
+                f"(clean runs: {alert.clean_runs_count})"
+            )
 
     # ── Helpers deduplikacji ──────────────────────────────────────────────────
 
@@ -368,13 +519,12 @@ class SuiteExecutor:
         """
         closed_candidates = (
             self.db.query(AlertGroup)
-            .join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
             .filter(
                 AlertGroup.business_rule == business_rule,
                 AlertGroup.status == AlertStatus.CLOSED,
                 AlertGroup.resolution_type == ResolutionType.DUPLICATE,
                 AlertGroup.duplicate_of_id.isnot(None),
-                SuiteRun.environment_id == environment_id
+                AlertGroup.environment_id == environment_id
             )
             .all()
         )
@@ -399,14 +549,13 @@ class SuiteExecutor:
         """Szuka CLOSED alertu (NAB/CANT_REPRODUCE) który wraca."""
         closed_candidates = (
             self.db.query(AlertGroup)
-            .join(SuiteRun, AlertGroup.last_suite_run_id == SuiteRun.id)
             .filter(
                 AlertGroup.business_rule == business_rule,
                 AlertGroup.status == AlertStatus.CLOSED,
                 AlertGroup.resolution_type.in_([
                     ResolutionType.NAB, ResolutionType.CANT_REPRODUCE
                 ]),
-                SuiteRun.environment_id == environment_id
+                AlertGroup.environment_id == environment_id
             )
             .order_by(AlertGroup.last_seen_at.desc())
             .first()
@@ -502,6 +651,7 @@ class SuiteExecutor:
                           scenario_ids_sorted: list, scenario_ids_json: str):
         """Tworzy nowy AlertGroup."""
         alert_group = AlertGroup(
+            environment_id     = suite_run.environment_id,
             last_suite_run_id  = suite_run.id,
             suite_run_history  = json.dumps([suite_run.id]),
             business_rule      = group_data['business_rule'],
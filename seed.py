@@ -188,6 +188,9 @@ def seed():
             AlertConfig(business_rule="CART4_DELIVERY_MISMATCH",     name="Dostawa w podsumowaniu niezgodna z wybraną",            alert_type_id=at_bug.id,    is_active=True),
             AlertConfig(business_rule="CART4_PAYMENT_MISMATCH",      name="Płatność w podsumowaniu niezgodna z wybraną",           alert_type_id=at_bug.id,    is_active=True),
             AlertConfig(business_rule="GLOBAL_PRICE_CHANGED",        name="Cena produktu zmieniła się między listingiem a koszem", alert_type_id=at_bug.id,    is_active=True),
+            AlertConfig(business_rule="PRICE_JUMP",                  name="Skok ceny względem historii produktu",                 alert_type_id=at_verify.id, is_active=True),
+            AlertConfig(business_rule="PRICE_DRIFT",                 name="Stopniowy dryf ceny produktu",                         alert_type_id=at_verify.id, is_active=True),
+            AlertConfig(business_rule="PRICE_LISTING_CART_MISMATCH", name="Cena listingu trwale różna od ceny w koszyku",         alert_type_id=at_bug.id,    is_active=True),
             AlertConfig(business_rule="scenario.unexpected_error",   name="Nieoczekiwany błąd scenariusza",                       alert_type_id=at_bug.id,    is_active=True),
         ]
         db.add_all(alert_configs)
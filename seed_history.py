@@ -0,0 +1,467 @@
+"""
+Seed History — generator dużej syntetycznej historii runów (testy obciążeniowe i skali).
+
+Wypełnia bazę realistycznymi wolumenami danych wstawianymi hurtowo (Core executemany):
+- suite_runs + scenario_runs rozłożone w czasie na zadanym okresie
+- basket_snapshots (stałe ceny produktu per scenariusz z szumem) i api_errors
+- scenario_run_data — RunData home/listing/cart0 z tymi samymi cenami (replay reguł)
+- price_points — szeregi cen listing/cart0 tych samych runów (core/price_series.py)
+- api_endpoint_stats + api_endpoint_rollups — czasy wywołań API per run i per suite run
+  (core/api_stats.py); błędy HTTP tych samych runów co api_errors
+- alert_groups z długą historią (suite_run_history) + alerts dla każdego wystąpienia
+
+Dopisuje do istniejącej bazy — środowiska bierze istniejące (po nazwie), suite i scenariusze
+tworzy własne („Historia N”). Rozkłady konfiguruje HistoryProfile: preset, plik JSON
+i/lub pojedyncze flagi (flaga > plik > preset).
+
+Służy jako fixture testów wydajności (benchmarks/query_plans.py i pozostałe benchmarki).
+
+Użycie:
+    python seed_history.py                          # preset medium (~80 tys. scenario runów)
+    python seed_history.py --profile large          # 1 mln scenario runów, 10 tys. grup alertów
+    python seed_history.py --profile small --days 30
+    python seed_history.py --config history.json --fail-rate 0.2
+"""
+import argparse
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+
+
+@dataclass
+class HistoryProfile:
+    suite_runs: int = 10_000
+    suites: int = 4
+    scenarios_per_run: int = 8
+    days: int = 180                   # okres historii kończący się teraz
+    environments: tuple = ("RC", "PRE", "PROD")
+
+    fail_rate: float = 0.08           # udział scenario runów FAILED
+    cancel_rate: float = 0.01         # udział suite runów CANCELLED
+    snapshots_per_run: int = 3        # etapy koszyka z cenami (max 4)
+    api_errors_per_run: float = 1.0   # średnia liczba błędów API na scenario run (rozkład geometryczny)
+    run_data_ratio: float = 1.0       # udział scenario runów z zapisanym RunData (replay_rules.py)
+    api_stats_ratio: float = 1.0      # udział scenario runów ze statystykami API (panel /api-stats)
+
+    alert_groups: int = 1_000
+    active_ratio: float = 0.2         # udział grup nie-CLOSED (trwają do ostatniego runu)
+    history_mean: int = 40            # średnia długość historii grupy (suite runy, rozkład wykładniczy)
+    history_max: int = 2_000
+    max_scenarios_per_group: int = 3
+
+    seed: int = 42
+    batch_size: int = 2_000           # suite runów na transakcję
+
+
+PROFILES = {
+    "small":  HistoryProfile(suite_runs=1_000, alert_groups=200, days=30),
+    "medium": HistoryProfile(),
+    "large":  HistoryProfile(suite_runs=125_000, alert_groups=10_000, days=365, history_mean=150,
+                             snapshots_per_run=3, api_errors_per_run=2.0),
+}
+
+STAGES = ("cart0", "cart1", "cart2", "cart3")
+
+API_ENDPOINTS = (
+    ("GET", "/api/cart"), ("POST", "/api/cart/items"), ("GET", "/api/delivery/options"),
+    ("POST", "/api/delivery/select"), ("GET", "/api/payment/methods"), ("GET", "/api/recommendations"),
+    ("GET", "/api/product/availability"), ("POST", "/api/analytics/event"),
+)
+API_STATUS_CODES = (404, 500, 502, 503, 429)
+# Mediana czasu odpowiedzi endpointu (ms) — statystyki API to szum log-normalny wokół niej
+API_MEDIAN_MS = {endpoint: 40 * (k % 4 + 1) + 25 * k for k, endpoint in enumerate(API_ENDPOINTS)}
+API_STATUS_WEIGHTS = (30, 35, 15, 15, 5)
+
+# Używane, gdy baza nie ma alert_configs (brak seed.py)
+DEFAULT_RULES = (
+    "HOME_NOT_LOADED", "PRODUCT_UNAVAILABLE", "CART0_EMPTY", "CART0_NO_PRICE",
+    "CART1_DELIVERY_UNAVAILABLE", "CART1_DELIVERY_NOT_SELECTED", "CART1_CUTOFF_MISMATCH",
+    "CART2_PAYMENT_UNAVAILABLE", "CART2_PAYMENT_NOT_SELECTED", "CART3_PRICE_MISMATCH",
+)
+
+
+# ── Plan ──────────────────────────────────────────────────────────────────────
+
+@dataclass
+class _Fixtures:
+    environment_ids: list[int]
+    suite_ids: list[int]
+    suite_scenarios: dict[int, list[int]]   # suite_id → scenario_id per pozycja w runie
+    rules: list[tuple[str, str]]            # (business_rule, tytuł)
+
+
+@dataclass
+class _Group:
+    business_rule: str
+    title: str
+    positions: list[int]          # pozycje scenariuszy w suite runie
+    history: list[int]            # indeksy suite runów (rosnąco)
+    status: object
+    resolution_type: object
+
+
+def _ensure_fixtures(conn: Connection, profile: HistoryProfile) -> _Fixtures:
+    from app.models.alert_config import AlertConfig
+    from app.models.environment import Environment
+    from app.models.scenario import Scenario
+    from app.models.suite import Suite
+    from app.models.suite_scenario import SuiteScenario
+
+    environment_ids = []
+    for name in profile.environments:
+        env_id = conn.scalar(select(Environment.id).where(Environment.name == name))
+        if env_id is None:
+            env_id = conn.execute(Environment.__table__.insert().values(
+                name=name, base_url=f"https://{name.lower()}.example.com", type=name, is_active=True,
+            )).inserted_primary_key[0]
+        environment_ids.append(env_id)
+
+    suite_ids, suite_scenarios = [], {}
+    for s in range(1, profile.suites + 1):
+        name = f"Historia {s}"
+        suite_id = conn.scalar(select(Suite.id).where(Suite.name == name))
+        if suite_id is None:
+            suite_id = conn.execute(Suite.__table__.insert().values(
+                name=name, description="Dane syntetyczne (seed_history.py)", workers=4, is_active=True,
+            )).inserted_primary_key[0]
+        scenario_ids = list(conn.scalars(
+            select(SuiteScenario.scenario_id).where(SuiteScenario.suite_id == suite_id).order_by(SuiteScenario.order)))
+        for k in range(len(scenario_ids), profile.scenarios_per_run):
+            scenario_id = conn.execute(Scenario.__table__.insert().values(
+                name=f"Historia {s} · scenariusz {k + 1}", is_active=True, listing_urls=[],
+                postal_code="00-001", is_order=False, guarantee=False,
+            )).inserted_primary_key[0]
+            conn.execute(SuiteScenario.__table__.insert().values(
+                suite_id=suite_id, scenario_id=scenario_id, order=k + 1, is_active=True))
+            scenario_ids.append(scenario_id)
+        suite_ids.append(suite_id)
+        suite_scenarios[suite_id] = scenario_ids[:profile.scenarios_per_run]
+
+    rules = [(rule, name) for rule, name in conn.execute(select(AlertConfig.business_rule, AlertConfig.name))]
+    if not rules:
+        rules = [(rule, rule.replace("_", " ").capitalize()) for rule in DEFAULT_RULES]
+    return _Fixtures(environment_ids, suite_ids, suite_scenarios, rules)
+
+
+def _plan_groups(profile: HistoryProfile, rnd: random.Random, fixtures: _Fixtures,
+                 run_keys: list[tuple[int, int]]) -> list[_Group]:
+    """Grupy alertów: ciągła historia w runach jednej pary (środowisko, suite)."""
+    from app.models.alert_group import AlertStatus, ResolutionType
+
+    by_key: dict[tuple[int, int], list[int]] = {}
+    for index, key in enumerate(run_keys):
+        by_key.setdefault(key, []).append(index)
+    keys = list(by_key)
+    weights = [len(by_key[k]) for k in keys]
+
+    active_statuses = [AlertStatus.OPEN, AlertStatus.IN_PROGRESS, AlertStatus.AWAITING_FIX,
+                       AlertStatus.AWAITING_TEST_UPDATE]
+    awaiting_resolution = {AlertStatus.AWAITING_FIX: ResolutionType.BUG,
+                           AlertStatus.AWAITING_TEST_UPDATE: ResolutionType.SCRIPT_FIX}
+    closed_resolutions = [ResolutionType.NAB, ResolutionType.DUPLICATE, ResolutionType.CANT_REPRODUCE]
+
+    groups = []
+    for _ in range(profile.alert_groups):
+        runs = by_key[rnd.choices(keys, weights)[0]]
+        length = min(len(runs), profile.history_max, 1 + int(rnd.expovariate(1 / max(profile.history_mean, 1))))
+        active = rnd.random() < profile.active_ratio
+        start = len(runs) - length if active else rnd.randrange(len(runs) - length + 1)
+
+        if active:
+            status = rnd.choices(active_statuses, weights=[50, 15, 25, 10])[0]
+            resolution = awaiting_resolution.get(status)
+        else:
+            status, resolution = AlertStatus.CLOSED, rnd.choice(closed_resolutions)
+
+        rule, title = rnd.choice(fixtures.rules)
+        count = rnd.randint(1, min(profile.max_scenarios_per_group, profile.scenarios_per_run))
+        groups.append(_Group(
+            business_rule=rule, title=title,
+            positions=sorted(rnd.sample(range(profile.scenarios_per_run), count)),
+            history=runs[start:start + length], status=status, resolution_type=resolution,
+        ))
+    return groups
+
+
+# ── Zapis ─────────────────────────────────────────────────────────────────────
+
+def _next_id(conn: Connection, model) -> int:
+    return (conn.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _insert(conn: Connection, table, rows: list[dict], stats: Counter) -> None:
+    if rows:
+        conn.execute(table.insert(), rows)
+        stats[table.name] += len(rows)
+
+
+def _run_data_blob(scenario_id: int, listing_price: float, cart_price: float, failed: bool) -> bytes:
+    """RunData runu z alertami, jakie dałyby mu bieżące reguły (punkt odniesienia replay)."""
+    from core import replay, run_data_store
+    from scenarios.contexts.scenario_context import ScenarioContext
+    from scenarios.run_data import Cart0Data, HomeData, ProductData, RunData
+
+    listing = ProductData(name=f"Produkt {scenario_id}", price=round(listing_price, 2),
+                          url=f"/p/{10_000 + scenario_id}")
+    run_data = RunData(home=HomeData(loaded=True), listing=listing)
+    if not failed:     # FAILED — błąd page na cart0, brak danych etapu
+        run_data.cart0 = Cart0Data(total_price=round(cart_price, 2), item_count=1, products=[listing])
+    context = ScenarioContext(scenario_id=scenario_id, scenario_name=f"Scenariusz {scenario_id}",
+                              environment_url="", environment_name="", listing_urls=[])
+    stopped_at = "Listing" if failed else None
+    stored = run_data_store.StoredRun(run_data, context, [], stopped_at, success=not failed)
+    alerts = replay.replay_run(stored).alerts
+    return run_data_store.dump(run_data, context, alerts, stopped_at, not failed)
+
+
+def generate(engine: Engine, profile: HistoryProfile, progress: Callable[[str], None] = print) -> Counter:
+    """Dopisuje historię wg profilu. Zwraca liczbę wstawionych wierszy per tabela."""
+    from app.models.alert import Alert, AlertType
+    from app.models.alert_group import AlertGroup, AlertStatus
+    from app.models.api_endpoint_stat import ApiEndpointRollup, ApiEndpointStat
+    from app.models.api_error import ApiError
+    from app.models.basket_snapshot import BasketSnapshot
+    from app.models.price_point import PricePoint
+    from app.models.run import RunStatus, ScenarioRun
+    from app.models.scenario_run_data import ScenarioRunData
+    from app.models.suite_run import SuiteRun, SuiteRunStatus
+    from core import alert_search, api_stats, run_data_store
+
+    rnd = random.Random(profile.seed)
+    data_rnd = random.Random(profile.seed + 1)    # osobny strumień — reszta historii bez zmian
+    api_rnd = random.Random(profile.seed + 2)
+    stats: Counter = Counter()
+    started = time.perf_counter()
+    spr = profile.scenarios_per_run
+
+    with engine.begin() as conn:
+        fixtures = _ensure_fixtures(conn, profile)
+        suite_run_base = _next_id(conn, SuiteRun)
+        run_base = _next_id(conn, ScenarioRun)
+        group_base = _next_id(conn, AlertGroup)
+
+    # Plan: (środowisko, suite) i czas startu każdego suite runu, grupy alertów
+    now = datetime.now(timezone.utc)
+    span = timedelta(days=profile.days).total_seconds()
+    run_keys = [(rnd.choice(fixtures.environment_ids), rnd.choice(fixtures.suite_ids))
+                for _ in range(profile.suite_runs)]
+    offsets = [span * (1 - (i + rnd.random()) / profile.suite_runs) for i in range(profile.suite_runs)]
+    started_at = [now - timedelta(seconds=offset) for offset in offsets]
+
+    groups = _plan_groups(profile, rnd, fixtures, run_keys)
+    alerts_per_suite_run: Counter = Counter()
+    for group in groups:
+        for index in group.history:
+            alerts_per_suite_run[index] += len(group.positions)
+
+    # Ceny bazowe produktów per scenariusz — snapshoty to szum wokół stałej ceny
+    base_price = {scenario_id: round(rnd.uniform(19, 4999), 2)
+                  for scenario_ids in fixtures.suite_scenarios.values() for scenario_id in scenario_ids}
+    error_p = 1 / (1 + profile.api_errors_per_run) if profile.api_errors_per_run > 0 else None
+
+    # ── Suite runy, scenario runy, snapshoty, błędy API ───────────────────────
+    for batch_start in range(0, profile.suite_runs, profile.batch_size):
+        suite_rows, run_rows, snapshot_rows, error_rows, data_rows, price_rows = [], [], [], [], [], []
+        endpoint_rows, rollup_rows = [], []
+        for i in range(batch_start, min(batch_start + profile.batch_size, profile.suite_runs)):
+            env_id, suite_id = run_keys[i]
+            suite_started = started_at[i]
+            suite_endpoint_rows = []
+            cancelled = rnd.random() < profile.cancel_rate
+            failed = 0
+            for k, scenario_id in enumerate(fixtures.suite_scenarios[suite_id]):
+                run_started = suite_started + timedelta(seconds=45 * k)
+                if cancelled and k >= spr // 2:
+                    status = RunStatus.CANCELLED
+                elif rnd.random() < profile.fail_rate:
+                    status = RunStatus.FAILED
+                    failed += 1
+                else:
+                    status = RunStatus.SUCCESS
+                run_id = run_base + i * spr + k
+                run_rows.append({
+                    "id": run_id, "suite_run_id": suite_run_base + i, "scenario_id": scenario_id,
+                    "suite_id": suite_id, "environment_id": env_id, "status": status,
+                    "started_at": run_started, "finished_at": run_started + timedelta(seconds=rnd.randint(30, 180)),
+                    "product_id": str(10_000 + scenario_id), "product_name": f"Produkt {scenario_id}",
+                })
+                if status == RunStatus.CANCELLED:
+                    continue
+
+                price = base_price[scenario_id] * rnd.choice((1, 1, 1, 1, 0.9, 1.05))
+                delivery = rnd.choice((0, 9.99, 14.99, 29.0))
+                for stage in STAGES[:profile.snapshots_per_run]:
+                    snapshot_rows.append({
+                        "run_id": run_id, "stage": stage, "product_price": round(price, 2),
+                        "delivery_price": delivery if stage != "cart0" else None,
+                        "total_price": round(price + delivery, 2), "raw_data": None, "captured_at": run_started,
+                    })
+                for stage, value in (("listing", base_price[scenario_id]), ("cart0", price)):
+                    price_rows.append({
+                        "run_id": run_id, "environment_id": env_id, "scenario_id": scenario_id,
+                        "product_url": f"/p/{10_000 + scenario_id}", "stage": stage,
+                        "price": round(value, 2), "captured_at": run_started,
+                    })
+                if data_rnd.random() < profile.run_data_ratio:
+                    data_rows.append({
+                        "run_id": run_id, "format_version": run_data_store.FORMAT_VERSION,
+                        "data": _run_data_blob(scenario_id, base_price[scenario_id], price,
+                                               status == RunStatus.FAILED),
+                        "captured_at": run_started,
+                    })
+                run_errors = []
+                if error_p is not None:
+                    errors = int(math.log(1 - rnd.random()) / math.log(1 - error_p)) if error_p < 1 else 0
+                    for _ in range(errors):
+                        method, endpoint = rnd.choice(API_ENDPOINTS)
+                        status_code = rnd.choices(API_STATUS_CODES, API_STATUS_WEIGHTS)[0]
+                        run_errors.append((method, endpoint, status_code))
+                        error_rows.append({
+                            "run_id": run_id, "endpoint": endpoint, "method": method,
+                            "status_code": status_code,
+                            "response_body": '{"error":"upstream"}', "captured_at": run_started,
+                        })
+                if api_rnd.random() < profile.api_stats_ratio:
+                    recorder = api_stats.TrafficRecorder("https://seed.local")
+                    for method, endpoint in API_ENDPOINTS:
+                        for _ in range(api_rnd.randint(1, 3)):
+                            recorder.add(method, f"https://seed.local{endpoint}",
+                                         API_MEDIAN_MS[(method, endpoint)] * api_rnd.lognormvariate(0, 0.4),
+                                         200, api_rnd.randint(200, 6000))
+                    for method, endpoint, status_code in run_errors:
+                        recorder.add(method, f"https://seed.local{endpoint}",
+                                     api_rnd.uniform(5, 3000), status_code, 64)
+                    for summary in recorder.summary():
+                        row = {"run_id": run_id, "environment_id": env_id, "captured_at": run_started,
+                               **vars(summary)}
+                        endpoint_rows.append(row)
+                        suite_endpoint_rows.append(row)
+
+            totals = api_stats.aggregate(
+                (r["method"], r["path"], r["count"], r["errors"], r["failures"], r["max_ms"],
+                 r["total_ms"], r["bytes"], r["histogram"])
+                for r in suite_endpoint_rows
+            )
+            rollup_rows.extend(
+                {"environment_id": env_id, "suite_run_id": suite_run_base + i, "day": suite_started.date(), **values}
+                for values in api_stats.rollup_values(totals)
+            )
+
+            if cancelled:
+                suite_status = SuiteRunStatus.CANCELLED
+            else:
+                suite_status = SuiteRunStatus.FAILED if failed else SuiteRunStatus.SUCCESS
+            suite_rows.append({
+                "id": suite_run_base + i, "suite_id": suite_id, "environment_id": env_id, "status": suite_status,
+                "started_at": suite_started, "finished_at": suite_started + timedelta(seconds=45 * spr + 120),
+                "triggered_by": "scheduler", "total_scenarios": spr, "success_scenarios": spr - failed,
+                "failed_scenarios": failed, "total_alerts": alerts_per_suite_run[i],
+            })
+
+        with engine.begin() as conn:
+            _insert(conn, SuiteRun.__table__, suite_rows, stats)
+            _insert(conn, ScenarioRun.__table__, run_rows, stats)
+            _insert(conn, BasketSnapshot.__table__, snapshot_rows, stats)
+            _insert(conn, ApiError.__table__, error_rows, stats)
+            _insert(conn, ScenarioRunData.__table__, data_rows, stats)
+            _insert(conn, PricePoint.__table__, price_rows, stats)
+            _insert(conn, ApiEndpointStat.__table__, endpoint_rows, stats)
+            _insert(conn, ApiEndpointRollup.__table__, rollup_rows, stats)
+
+        done = min(batch_start + profile.batch_size, profile.suite_runs)
+        progress(f"[SeedHistory] suite runy {done}/{profile.suite_runs} "
+                 f"({stats['scenario_runs'] / (time.perf_counter() - started):,.0f} scenario runów/s)")
+
+    # ── Grupy alertów i alerty ────────────────────────────────────────────────
+    with engine.begin() as conn:
+        group_rows, alert_rows = [], []
+        for g, group in enumerate(groups):
+            env_id, suite_id = run_keys[group.history[0]]
+            scenario_ids = [fixtures.suite_scenarios[suite_id][p] for p in group.positions]
+            last = group.history[-1]
+            closed = group.status == AlertStatus.CLOSED
+            group_rows.append({
+                "id": group_base + g, "environment_id": env_id, "last_suite_run_id": suite_run_base + last,
+                "suite_run_history": json.dumps([suite_run_base + i for i in group.history]),
+                "business_rule": group.business_rule, "alert_type": rnd.choice(("bug", "bug", "verify")),
+                "title": group.title, "occurrence_count": len(scenario_ids), "scenario_ids": json.dumps(scenario_ids),
+                "repeat_count": len(group.history), "clean_runs_count": 0 if not closed else rnd.randint(0, 20),
+                "status": group.status,
+                "resolution_type": group.resolution_type.value if group.resolution_type else None,
+                "resolved_at": started_at[last] if group.resolution_type else None,
+                "first_seen_at": started_at[group.history[0]], "last_seen_at": started_at[last],
+                "closed_at": started_at[last] if closed else None,
+            })
+            for index in group.history:
+                for position, scenario_id in zip(group.positions, scenario_ids):
+                    alert_rows.append({
+                        "run_id": run_base + index * spr + position, "scenario_id": scenario_id,
+                        "environment_id": env_id, "alert_type": AlertType.BUG, "title": group.title,
+                        "description": f"{group.title} — scenariusz {scenario_id}, run #{suite_run_base + index}",
+                        "business_rule": group.business_rule, "is_counted": True, "created_at": started_at[index],
+                    })
+                if len(alert_rows) >= profile.batch_size * spr:
+                    _insert(conn, Alert.__table__, alert_rows, stats)
+                    alert_rows = []
+        _insert(conn, AlertGroup.__table__, group_rows, stats)
+        _insert(conn, Alert.__table__, alert_rows, stats)
+
+    # Wstawienia z pominięciem ORM — indeks wyszukiwania budowany od nowa, statystyki planera
+    with engine.begin() as conn:
+        alert_search.rebuild_index(conn)
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+        elif conn.dialect.name == "mysql":
+            for table in ("suite_runs", "scenario_runs", "alert_groups", "alerts", "basket_snapshots", "api_errors"):
+                conn.exec_driver_sql(f"ANALYZE TABLE {table}")
+
+    progress(f"[SeedHistory] Gotowe w {time.perf_counter() - started:.1f}s: "
+             + ", ".join(f"{table}={count:,}" for table, count in stats.items()))
+    return stats
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def _parse_args(argv: list[str] | None = None) -> HistoryProfile:
+    parser = argparse.ArgumentParser(description="Generator dużej syntetycznej historii runów")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="medium", help="Preset wolumenów")
+    parser.add_argument("--config", help="Plik JSON z polami HistoryProfile (nadpisuje preset)")
+    for f in fields(HistoryProfile):
+        if f.type in ("int", "float", int, float):
+            parser.add_argument(f"--{f.name.replace('_', '-')}", dest=f.name, default=None,
+                                type=int if f.type in ("int", int) else float)
+    parser.add_argument("--environments", help="Nazwy środowisk po przecinku, np. RC,PROD")
+    args = parser.parse_args(argv)
+
+    profile = PROFILES[args.profile]
+    if args.config:
+        with open(args.config, encoding="utf-8") as fh:
+            overrides = json.load(fh)
+        if "environments" in overrides:
+            overrides["environments"] = tuple(overrides["environments"])
+        profile = replace(profile, **overrides)
+    overrides = {f.name: getattr(args, f.name) for f in fields(HistoryProfile)
+                 if getattr(args, f.name, None) is not None}
+    if args.environments:
+        overrides["environments"] = tuple(e.strip() for e in args.environments.split(",") if e.strip())
+    return replace(profile, **overrides)
+
+
+if __name__ == "__main__":
+    from core.config import settings
+    from database import engine
+
+    profile = _parse_args()
+    print(f"Baza: {settings.database_url}")
+    print("Profil: " + json.dumps(asdict(profile), ensure_ascii=False))
+    print(f"Szacunkowo: {profile.suite_runs * profile.scenarios_per_run:,} scenario runów, "
+          f"{profile.alert_groups:,} grup alertów")
+    generate(engine, profile)